@@ -85,6 +85,13 @@ class CertData(BaseAbstractModel , StructuredDataMixin) :
         verbose_name_plural = _('Сертификаты')
         ordering = ['sorting_order' , 'cert_variety']
 
+    # Тип, бренд и медиафайл читаются во всех форматах
+    STRUCTURED_DATA_PREFETCH = {
+        'compact' : {'select_related' : ['cert_variety' , 'media_item']} ,
+        'display' : {'select_related' : ['cert_variety' , 'brand']} ,
+        'full' : {'select_related' : ['cert_variety' , 'brand' , 'media_item']} ,
+    }
+
     def __str__(self) :
         return self.name or self.code or f"#{self.id}"
 
@@ -304,6 +311,13 @@ class AbstractCertRelation(StructuredDataMixin , models.Model) :  # Добавл
         abstract = True
         ordering = ['sorting_order']
 
+    # Данные связи строятся из данных сертификата (CertData.STRUCTURED_DATA_PREFETCH)
+    STRUCTURED_DATA_PREFETCH = {
+        'compact' : {'select_related' : ['cert_data__cert_variety' , 'cert_data__media_item']} ,
+        'display' : {'select_related' : ['cert_data__cert_variety' , 'cert_data__brand']} ,
+        'full' : {'select_related' : ['cert_data__cert_variety' , 'cert_data__brand' , 'cert_data__media_item']} ,
+    }
+
     def __str__(self) :
         related_obj = self.get_related_object()
         return f"{self.cert_data} → {related_obj}" if related_obj else str(self.cert_data)
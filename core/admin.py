@@ -1,8 +1,11 @@
 # core/admin.py
 from django.contrib import admin
+from django.urls import reverse
 from django.utils.html import format_html
 import json
 
+from core.models import BackgroundJob
+
 
 class BaseAdmin(admin.ModelAdmin) :
     """
@@ -99,4 +102,47 @@ class BaseAdmin(admin.ModelAdmin) :
         except Exception as e :
             return f"Ошибка: {str(e)}"
 
-    json_preview.short_description = "JSON данные"
\ No newline at end of file
+    json_preview.short_description = "JSON данные"
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin) :
+    """Фоновые задачи: состояние, результат, отмена"""
+    list_display = ('title' , 'job_type' , 'status' , 'progress' , 'progress_message' , 'created_by' ,
+                    'created_at' , 'finished_at' , 'result_file_link')
+    list_filter = ('status' , 'job_type')
+    search_fields = ('title' , 'job_type' , 'id')
+    ordering = ('-created_at' ,)
+    actions = ['cancel_jobs']
+    readonly_fields = [field.name for field in BackgroundJob._meta.fields] + ['result_file_link' , 'result_preview']
+    exclude = ('result' ,)
+
+    def has_add_permission(self , request) :
+        return False
+
+    def has_change_permission(self , request , obj=None) :
+        return False
+
+    def result_file_link(self , obj) :
+        if not obj.result_file :
+            return '-'
+        return format_html('<a href="{}">{}</a>' , reverse('job_result' , args=[obj.pk]) ,
+                           obj.result_file.name.rsplit('/' , 1)[-1])
+
+    result_file_link.short_description = "Файл результата"
+
+    def result_preview(self , obj) :
+        if obj.result is None :
+            return '-'
+        return format_html('<pre style="margin: 0; font-size: 11px;">{}</pre>' ,
+                           json.dumps(obj.result , ensure_ascii=False , indent=2))
+
+    result_preview.short_description = "Результат"
+
+    @admin.action(description="Отменить выбранные задачи")
+    def cancel_jobs(self , request , queryset) :
+        from core.services import JobQueue
+
+        job_ids = list(queryset.exclude(status__in=BackgroundJob.FINISHED_STATUSES).values_list('pk' , flat=True))
+        for job_id in job_ids :
+            JobQueue.cancel(job_id)
+        self.message_user(request , f"Отмена запрошена для задач: {len(job_ids)}")
@@ -8,6 +8,6 @@ class CoreConfig(AppConfig) :
     verbose_name = 'Ядро системы'
 
     def ready(self) :
-        # Импортируем сигналы
-        # import core.signals
-        pass
\ No newline at end of file
+        # Сброс кеша результатов GraphQL - только для моделей приложений, от которых он зависит
+        from core.signals import connect_graphql_response_cache_signals
+        connect_graphql_response_cache_signals()
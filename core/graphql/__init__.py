@@ -0,0 +1,23 @@
+from .loaders import DataLoader, LoaderRegistry, DataLoaderMiddleware, get_loaders
+from .persisted import PersistedQueryStore, PersistedQueryNotFound
+from .response_cache import GraphQLResponseCache
+from .pagination import CursorPaginator, CursorPage, CursorPageInfo, get_query_limits
+from .validation import QueryCostEstimator, get_validation_rules
+from .timing import ResolverTimingMiddleware
+
+__all__ = [
+    'DataLoader',
+    'LoaderRegistry',
+    'DataLoaderMiddleware',
+    'get_loaders',
+    'PersistedQueryStore',
+    'PersistedQueryNotFound',
+    'GraphQLResponseCache',
+    'CursorPaginator',
+    'CursorPage',
+    'CursorPageInfo',
+    'get_query_limits',
+    'QueryCostEstimator',
+    'get_validation_rules',
+    'ResolverTimingMiddleware',
+]
@@ -0,0 +1,63 @@
+# core/graphql/jobs.py
+import graphene
+from django.urls import reverse
+from graphene.types.generic import GenericScalar
+from graphql import GraphQLError
+
+
+class BackgroundJobNode(graphene.ObjectType):
+    """Фоновая задача (core.models.BackgroundJob)"""
+    id = graphene.UUID()
+    job_type = graphene.String()
+    title = graphene.String()
+    status = graphene.String()
+    progress = graphene.Int(description="Выполнено, %")
+    progress_message = graphene.String()
+    cancel_requested = graphene.Boolean()
+    result = GenericScalar()
+    result_url = graphene.String(description="Ссылка на файл результата (REST)")
+    error = graphene.String()
+    created_at = graphene.DateTime()
+    started_at = graphene.DateTime()
+    finished_at = graphene.DateTime()
+    expires_at = graphene.DateTime()
+
+    def resolve_result_url(self, info):
+        if not self.result_file:
+            return None
+        return info.context.build_absolute_uri(reverse('job_result', args=[self.pk]))
+
+
+def _get_job(info, id):
+    from core.models import BackgroundJob
+
+    job = BackgroundJob.objects.filter(pk=id).first()
+    if job is None or not job.is_visible_to(getattr(info.context, 'user', None)):
+        raise GraphQLError("Задача не найдена")
+    return job
+
+
+class JobQuery(graphene.ObjectType):
+    core_job = graphene.Field(BackgroundJobNode, id=graphene.UUID(required=True),
+                              description="Состояние фоновой задачи (для опроса)")
+
+    def resolve_core_job(self, info, id):
+        return _get_job(info, id)
+
+
+class CancelJob(graphene.Mutation):
+    """Отмена фоновой задачи: поставленной - сразу, выполняемой - запросом отмены"""
+
+    class Arguments:
+        id = graphene.UUID(required=True)
+
+    job = graphene.Field(BackgroundJobNode)
+
+    @classmethod
+    def mutate(cls, root, info, id):
+        from core.services import JobQueue
+        return CancelJob(job=JobQueue.cancel(_get_job(info, id).pk))
+
+
+class JobMutation(graphene.ObjectType):
+    core_cancel_job = CancelJob.Field()
@@ -0,0 +1,224 @@
+# core/graphql/loaders.py
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List
+
+from django.db.models import Count, Model, Q, QuerySet, prefetch_related_objects
+from graphene.utils.str_converters import to_snake_case
+
+logger = logging.getLogger(__name__)
+
+_snake_case = lru_cache(maxsize=2048)(to_snake_case)
+
+
+class DataLoader:
+    """
+    Загрузчик значений одного вида (ссылка, список, количество...) в рамках одного запроса GraphQL.
+
+    Выполнение схемы синхронное: узлы списка разрешаются по очереди, поэтому обычная
+    отложенная пакетная загрузка не работает. Вместо этого при первом промахе загружаются
+    значения сразу для всех "соседей" - объектов той же модели, которые уже попали в ответ
+    (LoaderRegistry.register). Результат кешируется до конца запроса.
+
+    batch_load_fn(instances) -> {ключ: значение}; ключ объекта - key_fn(instance).
+    """
+
+    def __init__(self, registry: 'LoaderRegistry', model, batch_load_fn: Callable[[List[Model]], Dict],
+                 key_fn: Callable[[Model], Any] = None, default=None):
+        self.registry = registry
+        self.model = model
+        self.batch_load_fn = batch_load_fn
+        self.key_fn = key_fn or (lambda instance: instance.pk)
+        self.default = default
+        self._cache: Dict[Any, Any] = {}
+        self._position = 0  # сколько соседей уже просмотрено
+
+    def load(self, instance):
+        key = self.key_fn(instance)
+        if key is None:
+            return self._default()
+        if key not in self._cache:
+            batch = {key: instance}
+            siblings = self.registry.siblings(self.model)
+            for sibling in siblings[self._position:]:
+                sibling_key = self.key_fn(sibling)
+                if sibling_key is not None and sibling_key not in self._cache:
+                    batch.setdefault(sibling_key, sibling)
+            self._position = len(siblings)
+            loaded = self.batch_load_fn(list(batch.values()))
+            for batch_key in batch:
+                self._cache[batch_key] = loaded.get(batch_key, self.default)
+        value = self._cache[key]
+        return self._default() if value is self.default else value
+
+    def load_many(self, instances: Iterable[Model]) -> List:
+        return [self.load(instance) for instance in instances]
+
+    def prime(self, key, value):
+        self._cache.setdefault(key, value)
+
+    def _default(self):
+        return list(self.default) if isinstance(self.default, list) else self.default
+
+
+class LoaderRegistry:
+    """
+    Загрузчики одного запроса GraphQL (get_loaders(info)).
+
+    Хранит объекты моделей, попавшие в ответ (соседи для пакетной загрузки),
+    и созданные загрузчики. Стандартные загрузчики:
+        foreign_key - объект по ForeignKey/OneToOne (один запрос на модель)
+        related_list - ManyToMany или обратная связь (prefetch_related по всем соседям)
+        count - количество связанных объектов (один запрос с COUNT)
+    Произвольный загрузчик - loader(model, name, batch_load_fn, ...).
+    """
+
+    def __init__(self):
+        self._siblings: Dict[type, List[Model]] = {}
+        self._seen: Dict[type, set] = {}
+        self._loaders: Dict[tuple, DataLoader] = {}
+
+    # ==================== СОСЕДИ ====================
+
+    def register(self, instances: Iterable[Model]):
+        """Запомнить объекты ответа, чтобы загружать их связи одним запросом"""
+        for instance in instances:
+            if not isinstance(instance, Model) or instance.pk is None:
+                continue
+            model = type(instance)
+            seen = self._seen.setdefault(model, set())
+            if id(instance) not in seen:
+                seen.add(id(instance))
+                self._siblings.setdefault(model, []).append(instance)
+
+    def siblings(self, model) -> List[Model]:
+        return self._siblings.get(model, [])
+
+    # ==================== ЗАГРУЗЧИКИ ====================
+
+    def loader(self, model, name: str, batch_load_fn, key_fn=None, default=None) -> DataLoader:
+        """Загрузчик по имени (создается при первом обращении)"""
+        cache_key = (model, name)
+        loader = self._loaders.get(cache_key)
+        if loader is None:
+            loader = DataLoader(self, model, batch_load_fn, key_fn=key_fn, default=default)
+            self._loaders[cache_key] = loader
+        return loader
+
+    def foreign_key(self, model, field_name: str) -> DataLoader:
+        """Объект по прямой ссылке (ForeignKey/OneToOneField) модели"""
+        field = model._meta.get_field(field_name)
+        related_model = field.related_model
+
+        def batch_load(instances):
+            ids = {field.value_from_object(instance) for instance in instances}
+            objects = related_model._base_manager.in_bulk(ids)
+            self.register(objects.values())
+            return objects
+
+        return self.loader(model, f"fk:{field_name}", batch_load,
+                           key_fn=lambda instance: field.value_from_object(instance))
+
+    def related_list(self, model, accessor_name: str) -> DataLoader:
+        """Список объектов ManyToMany или обратной связи (accessor_name - атрибут модели)"""
+
+        def batch_load(instances):
+            pending = [instance for instance in instances
+                       if accessor_name not in getattr(instance, '_prefetched_objects_cache', {})]
+            if pending:
+                prefetch_related_objects(pending, accessor_name)
+            result = {}
+            for instance in instances:
+                objects = list(getattr(instance, accessor_name).all())
+                self.register(objects)
+                result[instance.pk] = objects
+            return result
+
+        return self.loader(model, f"list:{accessor_name}", batch_load, default=[])
+
+    def count(self, model, relation: str, **filters) -> DataLoader:
+        """Количество связанных объектов (relation - имя связи для ORM-запросов, filters - условия)"""
+        name = f"count:{relation}:{sorted(filters.items())}"
+        condition = None
+        if filters:
+            condition = Q(**{f"{relation}__{key}": value for key, value in filters.items()})
+
+        def batch_load(instances):
+            return dict(model._base_manager.filter(pk__in=[instance.pk for instance in instances]).annotate(
+                _loader_count=Count(relation, filter=condition)).values_list('pk', '_loader_count'))
+
+        return self.loader(model, name, batch_load, default=0)
+
+
+def get_loaders(info) -> LoaderRegistry:
+    """Загрузчики текущего запроса: хранятся в info.context (HttpRequest)"""
+    context = info.context
+    if context is None:
+        return LoaderRegistry()
+    registry = getattr(context, '_graphql_loaders', None)
+    if registry is None:
+        registry = LoaderRegistry()
+        try:
+            context._graphql_loaders = registry
+        except AttributeError:
+            logger.debug("Контекст %s не поддерживает загрузчики", type(context).__name__)
+    return registry
+
+
+class DataLoaderMiddleware:
+    """
+    Middleware Graphene: подключает пакетную загрузку ко всем узлам Django-моделей.
+
+    - объекты моделей, которые вернули резолверы (в т.ч. списки и QuerySet), регистрируются
+      как соседи для загрузчиков;
+    - поля ForeignKey/OneToOne, ManyToMany и обратные связи, разрешаемые по имени поля модели,
+      перед вызовом резолвера загружаются сразу для всех соседей.
+    Подключается в settings.GRAPHENE['MIDDLEWARE'].
+    """
+    _relations: Dict[type, Dict[str, Any]] = {}
+
+    def resolve(self, next, root, info, **args):
+        if isinstance(root, Model):
+            self._prime_relation(root, info)
+        result = next(root, info, **args)
+        if isinstance(result, QuerySet):
+            result = list(result)
+            get_loaders(info).register(result)
+        elif isinstance(result, (list, tuple)):
+            if result and isinstance(result[0], Model):
+                get_loaders(info).register(result)
+        elif isinstance(result, Model):
+            get_loaders(info).register([result])
+        return result
+
+    def _prime_relation(self, root, info):
+        model = type(root)
+        field = self._model_relations(model).get(_snake_case(info.field_name))
+        if field is None:
+            return
+        loaders = get_loaders(info)
+        if field.many_to_many or field.one_to_many:
+            accessor_name = field.get_accessor_name() if field.auto_created else field.name
+            if accessor_name not in getattr(root, '_prefetched_objects_cache', {}):
+                loaders.register([root])
+                loaders.related_list(model, accessor_name).load(root)
+        elif not field.is_cached(root):
+            loaders.register([root])
+            field.set_cached_value(root, loaders.foreign_key(model, field.name).load(root))
+
+    @classmethod
+    def _model_relations(cls, model) -> Dict[str, Any]:
+        """Связи модели по имени атрибута: прямые ссылки, ManyToMany, обратные списки"""
+        relations = cls._relations.get(model)
+        if relations is None:
+            relations = {}
+            for field in model._meta.get_fields():
+                if not field.is_relation or field.related_model is None:
+                    continue
+                if field.auto_created and not field.concrete:
+                    if field.one_to_many or field.many_to_many:
+                        relations[field.get_accessor_name()] = field
+                elif field.many_to_one or (field.one_to_one and field.concrete) or field.many_to_many:
+                    relations[field.name] = field
+            cls._relations[model] = relations
+        return relations
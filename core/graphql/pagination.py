@@ -0,0 +1,131 @@
+# core/graphql/pagination.py
+import base64
+import json
+import logging
+from typing import Any, List, Optional, Sequence
+
+import graphene
+from django.conf import settings
+from django.db.models import Q
+from graphql import GraphQLError
+
+logger = logging.getLogger(__name__)
+
+
+def get_query_limits() -> dict:
+    """Ограничения запросов GraphQL: settings.GRAPHQL_QUERY_LIMITS поверх значений по умолчанию"""
+    limits = {
+        'MAX_DEPTH': 10,  # глубина вложенности полей
+        'MAX_COST': 5000,  # оценка количества объектов в ответе
+        'DEFAULT_LIST_SIZE': 20,  # оценка размера списка без аргумента first
+        'MAX_PAGE_SIZE': 500,  # максимум объектов в одном списке
+        'COUNT_LIMIT': 10000,  # totalCount точный только до этого значения
+    }
+    limits.update(getattr(settings, 'GRAPHQL_QUERY_LIMITS', None) or {})
+    return limits
+
+
+class CursorPageInfo(graphene.ObjectType):
+    end_cursor = graphene.String(description="Курсор последнего объекта страницы (аргумент after следующей)")
+    has_next_page = graphene.Boolean()
+    total_count = graphene.Int(description="Количество объектов (не больше COUNT_LIMIT)")
+    total_count_is_exact = graphene.Boolean(description="False - объектов больше, чем total_count")
+
+
+class CursorPage:
+    """Страница keyset-пагинации: items и page_info (CursorPageInfo)"""
+
+    def __init__(self, items: List, end_cursor: Optional[str], has_next_page: bool,
+                 total_count: Optional[int] = None, total_count_is_exact: bool = True):
+        self.items = items
+        self.page_info = {
+            'end_cursor': end_cursor,
+            'has_next_page': has_next_page,
+            'total_count': total_count,
+            'total_count_is_exact': total_count_is_exact,
+        }
+
+
+class CursorPaginator:
+    """
+    Keyset-пагинация QuerySet: следующая страница выбирается условием по полям сортировки
+    (WHERE (a, id) > (:a, :id)), а не смещением OFFSET, поэтому стоимость не растет с номером страницы.
+
+    ordering - поля сортировки с '-' для убывания; последнее поле должно быть уникальным (обычно 'id'),
+    поля не должны допускать NULL. Курсор - base64 JSON значений полей сортировки последнего объекта.
+    """
+
+    def __init__(self, queryset, ordering: Sequence[str]):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.model = queryset.model
+
+    def paginate(self, first: Optional[int] = None, after: Optional[str] = None,
+                 with_total_count: bool = False) -> CursorPage:
+        limits = get_query_limits()
+        page_size = self.page_size(first)
+
+        queryset = self.queryset.order_by(*self.ordering)
+        total_count, total_count_is_exact = None, True
+        if with_total_count:
+            count_limit = limits['COUNT_LIMIT']
+            # Ограниченный COUNT: подзапрос с LIMIT вместо полного подсчета больших выборок
+            total_count = queryset.values('pk')[:count_limit + 1].count()
+            if total_count > count_limit:
+                total_count, total_count_is_exact = count_limit, False
+
+        if after:
+            queryset = queryset.filter(self._after_condition(self.decode_cursor(after)))
+
+        items = list(queryset[:page_size + 1])
+        has_next_page = len(items) > page_size
+        items = items[:page_size]
+        end_cursor = self.encode_cursor(items[-1]) if items else None
+        return CursorPage(items, end_cursor, has_next_page, total_count, total_count_is_exact)
+
+    @staticmethod
+    def page_size(first: Optional[int]) -> int:
+        """Размер страницы: first, но не больше MAX_PAGE_SIZE"""
+        max_page_size = get_query_limits()['MAX_PAGE_SIZE']
+        if first is None:
+            return max_page_size
+        if first < 0:
+            raise GraphQLError("Аргумент first не может быть отрицательным")
+        return min(first, max_page_size)
+
+    def encode_cursor(self, instance) -> str:
+        values = []
+        for name in self.ordering:
+            value = getattr(instance, self._attname(name))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        raw = json.dumps(values, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, cursor: str) -> List[Any]:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError(cursor)
+            return [self._field(name).to_python(value) for name, value in zip(self.ordering, values)]
+        except Exception:
+            raise GraphQLError("Некорректный курсор after")
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    def _field(self, name):
+        return self.model._meta.get_field(name.lstrip('-'))
+
+    def _attname(self, name):
+        return self._field(name).attname
+
+    def _after_condition(self, values) -> Q:
+        # (a > :a) OR (a = :a AND b > :b) OR ... с учетом направления каждого поля
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            column = self._attname(name)
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            step = Q(**{f"{column}__{lookup}": values[index]})
+            for previous, value in zip(self.ordering[:index], values[:index]):
+                step &= Q(**{self._attname(previous): value})
+            condition |= step
+        return condition
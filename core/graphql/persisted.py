@@ -0,0 +1,126 @@
+# core/graphql/persisted.py
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+from core.services.request_metrics import RequestMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class PersistedQueryNotFound(Exception):
+    """Текст запроса по хешу неизвестен - клиент должен повторить запрос с текстом"""
+
+
+class PersistedQueryStore:
+    """
+    Сохраненные запросы GraphQL (Automatic Persisted Queries, как в Apollo).
+
+    Клиент передает extensions.persistedQuery.sha256Hash вместо текста запроса; если хеш
+    неизвестен - ошибка PersistedQueryNotFound, и клиент повторяет запрос вместе с текстом.
+    Для каждого хеша хранятся:
+        текст запроса - LRU процесса и общий кеш Django (settings.GRAPHQL_PERSISTED_QUERIES_CACHE_ALIAS)
+        разобранный и проверенный документ - LRU процесса, повторно parse/validate не выполняются
+    """
+    MAX_SIZE = 512
+    SHARED_TIMEOUT = 60 * 60 * 24 * 7
+
+    _queries = OrderedDict()
+    _documents = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def query_hash(query: str) -> str:
+        return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get_query(cls, query_hash: str) -> str:
+        """Текст запроса по хешу (PersistedQueryNotFound, если не сохранен)"""
+        query = cls._lru_get(cls._queries, query_hash)
+        if query is None:
+            shared = cls._shared_cache()
+            if shared is not None:
+                query = shared.get(cls._shared_key(query_hash))
+            if query is None:
+                raise PersistedQueryNotFound(query_hash)
+            cls._lru_put(cls._queries, query_hash, query)
+        return query
+
+    @classmethod
+    def save_query(cls, query: str, query_hash: Optional[str] = None) -> str:
+        """Сохранить текст запроса; переданный клиентом хеш должен совпадать с вычисленным"""
+        actual_hash = cls.query_hash(query)
+        if query_hash is not None and query_hash.lower() != actual_hash:
+            raise ValueError("Хеш sha256Hash не соответствует тексту запроса")
+        if cls._lru_get(cls._queries, actual_hash) is None:
+            cls._lru_put(cls._queries, actual_hash, query)
+            shared = cls._shared_cache()
+            if shared is not None:
+                shared.set(cls._shared_key(actual_hash), query, cls.SHARED_TIMEOUT)
+        return actual_hash
+
+    @classmethod
+    def get_document(cls, schema, query: str, validation_rules=None, max_errors=None) -> Tuple[object, List]:
+        """
+        Разобранный и проверенный документ запроса
+
+        Returns:
+            (document, errors): document - None при синтаксической ошибке,
+            errors - ошибки разбора или проверки по схеме
+        """
+        from graphql import parse, validate
+
+        key = (id(schema), cls.query_hash(query))
+        cached = cls._lru_get(cls._documents, key)
+        RequestMetrics.record_cache('graphql_document', cached is not None)
+        if cached is not None:
+            return cached
+
+        try:
+            document = parse(query)
+        except Exception as e:
+            # Синтаксические ошибки не кешируются
+            return None, [e]
+        errors = validate(schema, document, validation_rules, max_errors)
+        cls._lru_put(cls._documents, key, (document, errors))
+        return document, errors
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._queries.clear()
+            cls._documents.clear()
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    @classmethod
+    def _lru_get(cls, storage: OrderedDict, key):
+        with cls._lock:
+            value = storage.get(key)
+            if value is not None:
+                storage.move_to_end(key)
+            return value
+
+    @classmethod
+    def _lru_put(cls, storage: OrderedDict, key, value):
+        with cls._lock:
+            storage[key] = value
+            storage.move_to_end(key)
+            while len(storage) > cls.MAX_SIZE:
+                storage.popitem(last=False)
+
+    @staticmethod
+    def _shared_cache():
+        alias = getattr(settings, 'GRAPHQL_PERSISTED_QUERIES_CACHE_ALIAS', None)
+        if not alias:
+            return None
+        from django.core.cache import caches
+        return caches[alias]
+
+    @staticmethod
+    def _shared_key(query_hash):
+        return f"graphql:persisted:{query_hash}"
@@ -0,0 +1,204 @@
+# core/graphql/response_cache.py
+import fnmatch
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+from core.services.request_metrics import RequestMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class GraphQLResponseCache:
+    """
+    Кеш результатов запросов GraphQL только для чтения (по выбору в settings.GRAPHQL_RESPONSE_CACHE).
+
+    Кешируется операция query, все корневые поля которой подходят под шаблоны FIELDS.
+    Ключ - хеш документа, имя операции, переменные и версии приложений, от которых зависят поля.
+    Сигналы изменения моделей (core/signals.py) увеличивают версию приложения, поэтому
+    старые результаты перестают использоваться. Настройки:
+        FIELDS       - {шаблон корневого поля (fnmatch): [app_label, ...]}
+        RELATED_APPS - приложения моделей, которые могут встретиться во вложенных связях
+                       кешируемых полей (их изменение тоже сбрасывает результаты)
+        TIMEOUT      - время жизни результата, сек (страховка для изменений без сигналов)
+        ALIAS        - кеш Django (общий для процессов); None - только LRU процесса
+
+    Без ALIAS версии приложений хранятся в процессе: сигнал сбрасывает результаты только
+    в процессе, где изменена модель, остальные процессы (воркеры gunicorn) отдают старый
+    результат до истечения TIMEOUT. При нескольких процессах нужен общий кеш (ALIAS).
+    """
+    DEFAULT_TIMEOUT = 300
+    MAX_SIZE = 512
+
+    _responses = OrderedDict()
+    _versions: Dict[str, int] = {}
+    _lock = threading.Lock()
+
+    # ==================== ПУБЛИЧНЫЕ МЕТОДЫ ====================
+
+    @classmethod
+    def apps_for_operation(cls, schema, document, operation_ast) -> Optional[List[str]]:
+        """
+        Приложения, от которых зависит результат операции, или None - операция не кешируется.
+
+        Кроме приложений из FIELDS учитываются приложения всех моделей Django, типы которых
+        выбраны в документе (вложенные связи могут вести в другие приложения).
+        """
+        from graphql import OperationType
+        from graphql.language import FieldNode
+
+        fields = cls._config().get('FIELDS') or {}
+        if not fields or operation_ast is None or operation_ast.operation != OperationType.QUERY:
+            return None
+
+        apps = set()
+        for selection in operation_ast.selection_set.selections:
+            # Фрагменты и директивы на корневом уровне не разбираются - такие запросы не кешируются
+            if not isinstance(selection, FieldNode) or selection.directives:
+                return None
+            name = selection.name.value
+            if name == '__typename':
+                continue
+            matched = [app_labels for pattern, app_labels in fields.items() if fnmatch.fnmatchcase(name, pattern)]
+            if not matched:
+                return None
+            for app_labels in matched:
+                apps.update(app_labels)
+        if not apps:
+            return None
+        apps.update(cls._model_apps(schema, document))
+        return sorted(apps)
+
+    @classmethod
+    def make_key(cls, query_hash: str, operation_name: Optional[str], variables: Optional[Dict],
+                 apps: Iterable[str]) -> str:
+        versions = cls._get_versions(apps)
+        raw = json.dumps([query_hash, operation_name, variables or {}, versions], sort_keys=True, default=str)
+        return f"graphql:response:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    @classmethod
+    def get(cls, key: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with cls._lock:
+            cached = cls._responses.get(key)
+            if cached is not None:
+                if now - cached[0] < cls._timeout():
+                    cls._responses.move_to_end(key)
+                    RequestMetrics.record_cache('graphql_response', True)
+                    return cached[1]
+                del cls._responses[key]
+
+        shared = cls._shared_cache()
+        if shared is not None:
+            data = shared.get(key)
+            if data is not None:
+                cls._put_local(key, data, now)
+                RequestMetrics.record_cache('graphql_response', True)
+                return data
+        RequestMetrics.record_cache('graphql_response', False)
+        return None
+
+    @classmethod
+    def set(cls, key: str, data: Dict[str, Any]):
+        cls._put_local(key, data, time.monotonic())
+        shared = cls._shared_cache()
+        if shared is not None:
+            shared.set(key, data, cls._timeout())
+
+    @classmethod
+    def invalidate(cls, app_label: Optional[str] = None):
+        """Сбросить результаты, зависящие от приложения (или все)"""
+        with cls._lock:
+            if app_label is None:
+                cls._responses.clear()
+                cls._versions.clear()
+            else:
+                cls._versions[app_label] = cls._versions.get(app_label, 0) + 1
+
+        shared = cls._shared_cache()
+        if shared is not None and app_label is not None:
+            version_key = cls._version_key(app_label)
+            try:
+                shared.incr(version_key)
+            except ValueError:
+                shared.set(version_key, 1, None)
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(cls._config().get('FIELDS'))
+
+    @classmethod
+    def tracked_apps(cls) -> set:
+        """Приложения, изменение моделей которых сбрасывает результаты (FIELDS и RELATED_APPS)"""
+        config = cls._config()
+        if not config.get('FIELDS'):
+            return set()
+        apps = set(config.get('RELATED_APPS') or ())
+        for app_labels in config['FIELDS'].values():
+            apps.update(app_labels)
+        return apps
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    @staticmethod
+    def _model_apps(schema, document) -> set:
+        """app_label моделей DjangoObjectType, поля которых выбраны в документе"""
+        from graphql import TypeInfo, TypeInfoVisitor, Visitor, get_named_type, visit
+
+        type_info = TypeInfo(schema)
+        apps = set()
+
+        class ModelTypeVisitor(Visitor):
+            def enter_field(self, node, *args):
+                graphene_type = getattr(get_named_type(type_info.get_type()), 'graphene_type', None)
+                model = getattr(getattr(graphene_type, '_meta', None), 'model', None)
+                if model is not None:
+                    apps.add(model._meta.app_label)
+
+        visit(document, TypeInfoVisitor(type_info, ModelTypeVisitor()))
+        return apps
+
+    @staticmethod
+    def _config() -> Dict[str, Any]:
+        return getattr(settings, 'GRAPHQL_RESPONSE_CACHE', None) or {}
+
+    @classmethod
+    def _timeout(cls):
+        return cls._config().get('TIMEOUT', cls.DEFAULT_TIMEOUT)
+
+    @classmethod
+    def _shared_cache(cls):
+        alias = cls._config().get('ALIAS')
+        if not alias:
+            return None
+        from django.core.cache import caches
+        return caches[alias]
+
+    @staticmethod
+    def _version_key(app_label):
+        return f"graphql:response:version:{app_label}"
+
+    @classmethod
+    def _get_versions(cls, apps: Iterable[str]) -> Dict[str, int]:
+        """Версии приложений: из общего кеша, если он настроен (общие для всех процессов), иначе процесса"""
+        apps = list(apps)
+        shared = cls._shared_cache()
+        if shared is not None:
+            shared_versions = shared.get_many([cls._version_key(app) for app in apps])
+            return {app: shared_versions.get(cls._version_key(app), 0) for app in apps}
+        with cls._lock:
+            return {app: cls._versions.get(app, 0) for app in apps}
+
+    @classmethod
+    def _put_local(cls, key, data, now):
+        with cls._lock:
+            cls._responses[key] = (now, data)
+            cls._responses.move_to_end(key)
+            while len(cls._responses) > cls.MAX_SIZE:
+                cls._responses.popitem(last=False)
@@ -0,0 +1,61 @@
+# core/graphql/structured_data.py
+import json
+
+import graphene
+from django.apps import apps
+from graphene.types.generic import GenericScalar
+from graphql import GraphQLError
+
+from core.constants import DataFormat, DisplayView
+from core.services.json_stream import LenientJSONEncoder
+from .pagination import CursorPageInfo, CursorPaginator
+
+
+class StructuredDataPage(graphene.ObjectType):
+    """Страница данных StructuredDataMixin (get_compact_data / get_display_data / get_full_data)"""
+    items = graphene.List(GenericScalar)
+    page_info = graphene.Field(CursorPageInfo)
+
+
+def _get_structured_model(model):
+    from core.models import StructuredDataMixin
+
+    try:
+        model_class = apps.get_model(model)
+    except (ValueError, LookupError):
+        raise GraphQLError(f"Модель {model} не найдена")
+    if not issubclass(model_class, StructuredDataMixin):
+        raise GraphQLError(f"Модель {model} не поддерживает структурированные данные")
+    return model_class
+
+
+class StructuredDataQuery(graphene.ObjectType):
+    core_structured_data = graphene.Field(
+        StructuredDataPage,
+        model=graphene.String(required=True, description="app_label.ModelName"),
+        format=graphene.String(default_value=DataFormat.COMPACT, description="compact, display, full"),
+        view=graphene.String(default_value=DisplayView.LIST, description="Тип отображения для format=display"),
+        include=graphene.List(graphene.String, description="Включения для format=full"),
+        only_active=graphene.Boolean(default_value=True, description="Только is_active=True (если поле есть)"),
+        first=graphene.Int(),
+        after=graphene.String(),
+        with_total_count=graphene.Boolean(default_value=False),
+        description="Список объектов модели в формате StructuredDataMixin (связи - по плану модели)",
+    )
+
+    def resolve_core_structured_data(self, info, model, format, view, include=None, only_active=True,
+                                     first=None, after=None, with_total_count=False):
+        if format not in (DataFormat.COMPACT, DataFormat.DISPLAY, DataFormat.FULL):
+            raise GraphQLError(f"Неизвестный формат {format}")
+        model_class = _get_structured_model(model)
+
+        queryset = model_class._default_manager.all()
+        if only_active and any(field.name == 'is_active' for field in model_class._meta.concrete_fields):
+            queryset = queryset.filter(is_active=True)
+        queryset = model_class.with_prefetch_plan(queryset, format, view)
+
+        page = CursorPaginator(queryset, [model_class._meta.pk.name]).paginate(first, after, with_total_count)
+        items = [obj.get_structured_data(format, view, include) for obj in page.items]
+        # Данные содержат ленивые переводы, даты и объекты моделей, которые GraphQLView не сериализует
+        items = json.loads(json.dumps(items, cls=LenientJSONEncoder))
+        return StructuredDataPage(items=items, page_info=page.page_info)
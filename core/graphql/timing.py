@@ -0,0 +1,28 @@
+# core/graphql/timing.py
+import time
+
+from core.services.request_metrics import RequestMetrics
+
+
+class ResolverTimingMiddleware:
+    """
+    Middleware Graphene: время резолверов по полям 'Тип.поле' (core.services.RequestMetrics).
+
+    Работает, только когда запрос измеряется RequestMetricsMiddleware и включен
+    REQUEST_METRICS['RESOLVER_TIMING']. Время поля - только его резолвер: дочерние поля
+    разрешаются после возврата значения и учитываются отдельно.
+    Подключается в settings.GRAPHENE['MIDDLEWARE'].
+    """
+
+    def __init__(self):
+        self.enabled = RequestMetrics.is_enabled() and RequestMetrics.config()['RESOLVER_TIMING']
+
+    def resolve(self, next, root, info, **args):
+        if not self.enabled or RequestMetrics.current() is None:
+            return next(root, info, **args)
+        started_at = time.perf_counter()
+        try:
+            return next(root, info, **args)
+        finally:
+            RequestMetrics.record_resolver(f'{info.parent_type.name}.{info.field_name}',
+                                           time.perf_counter() - started_at)
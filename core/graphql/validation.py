@@ -0,0 +1,125 @@
+# core/graphql/validation.py
+import logging
+from typing import Any, Dict, Optional
+
+from graphene.validation import depth_limit_validator
+from graphql import GraphQLError, get_named_type, get_nullable_type, is_list_type
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode, VariableNode
+from graphql.validation import specified_rules
+
+from .pagination import get_query_limits
+
+logger = logging.getLogger(__name__)
+
+
+def get_validation_rules() -> list:
+    """Стандартные правила GraphQL и ограничение глубины (settings.GRAPHQL_QUERY_LIMITS['MAX_DEPTH'])"""
+    return [*specified_rules, depth_limit_validator(max_depth=get_query_limits()['MAX_DEPTH'])]
+
+
+class QueryCostEstimator:
+    """
+    Оценка стоимости операции - количества объектов в ответе.
+
+    Стоимость поля-объекта - 1, умноженная на размеры всех списков над ним. Размер списка -
+    аргумент first (значение переменной берется из запроса); first больше MAX_PAGE_SIZE
+    считается как MAX_PAGE_SIZE (так ограничивают резолверы), first: 0 - как 0. Если у поля
+    есть аргумент first, но он не указан, - значение аргумента по умолчанию из схемы, а без него
+    MAX_PAGE_SIZE (столько возвращает CursorPaginator.page_size без first); список без аргумента
+    first - DEFAULT_LIST_SIZE.
+    first на поле-странице (список items внутри) относится к первому списку под ним.
+    Служебные поля (__schema, __type, ...) не учитываются.
+    """
+
+    def __init__(self, schema, document, variables: Optional[Dict[str, Any]] = None):
+        limits = get_query_limits()
+        self.schema = schema
+        self.variables = variables or {}
+        self.max_cost = limits['MAX_COST']
+        self.default_list_size = limits['DEFAULT_LIST_SIZE']
+        self.max_page_size = limits['MAX_PAGE_SIZE']
+        self.fragments = {definition.name.value: definition for definition in document.definitions
+                          if definition.kind == 'fragment_definition'}
+
+    def estimate(self, operation_ast) -> int:
+        root_type = self.schema.get_root_type(operation_ast.operation)
+        if root_type is None:
+            return 0
+        return self._selection_cost(operation_ast.selection_set, root_type, 1, None, frozenset())
+
+    def check(self, operation_ast):
+        """GraphQLError, если стоимость операции превышает MAX_COST"""
+        cost = self.estimate(operation_ast)
+        if cost > self.max_cost:
+            logger.warning("Запрос GraphQL отклонен: стоимость %d > %d", cost, self.max_cost)
+            return GraphQLError(
+                f"Запрос слишком сложный: оценка {cost} объектов, допускается не более {self.max_cost}."
+                f" Уменьшите first или вложенность списков.", operation_ast)
+        return None
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    def _selection_cost(self, selection_set, parent_type, multiplier, pending_first, visited):
+        cost = 0
+        if selection_set is None or parent_type is None:
+            return cost
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost += self._field_cost(selection, parent_type, multiplier, pending_first, visited)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition is not None:
+                    fragment_type = self.schema.get_type(selection.type_condition.name.value)
+                cost += self._selection_cost(selection.selection_set, fragment_type, multiplier,
+                                             pending_first, visited)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in visited:
+                    continue
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                cost += self._selection_cost(fragment.selection_set, fragment_type, multiplier,
+                                             pending_first, visited | {name})
+        return cost
+
+    def _field_cost(self, node, parent_type, multiplier, pending_first, visited):
+        name = node.name.value
+        fields = getattr(get_named_type(parent_type), 'fields', None) or {}
+        if name.startswith('__') or name not in fields or node.selection_set is None:
+            return 0
+        field_type = fields[name].type
+
+        first = self._first_argument(node)
+        if first is None and 'first' in fields[name].args:
+            first = self._default_first(fields[name].args['first'])
+        if is_list_type(get_nullable_type(field_type)):
+            if first is None:
+                first = pending_first if pending_first is not None else self.default_list_size
+            multiplier *= first
+            pending_first = None
+        elif first is not None:
+            # Поле-страница: first относится к вложенному списку items
+            pending_first = first
+
+        return multiplier + self._selection_cost(node.selection_set, get_named_type(field_type), multiplier,
+                                                 pending_first, visited)
+
+    def _default_first(self, argument) -> int:
+        """Размер списка без first: значение по умолчанию аргумента, иначе MAX_PAGE_SIZE"""
+        if isinstance(argument.default_value, int):
+            return min(max(argument.default_value, 0), self.max_page_size)
+        return self.max_page_size
+
+    def _first_argument(self, node) -> Optional[int]:
+        for argument in node.arguments or ():
+            if argument.name.value != 'first':
+                continue
+            if isinstance(argument.value, VariableNode):
+                value = self.variables.get(argument.value.name.value)
+            else:
+                value = getattr(argument.value, 'value', None)
+            try:
+                return min(max(int(value), 0), self.max_page_size)
+            except (TypeError, ValueError):
+                return None
+        return None
@@ -0,0 +1,162 @@
+# core/graphql/views.py
+import json
+import logging
+
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.http.response import HttpResponseBadRequest
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, OperationType, execute, get_operation_ast, validate_schema
+
+from core.services.request_metrics import RequestMetrics
+
+from .persisted import PersistedQueryNotFound, PersistedQueryStore
+from .response_cache import GraphQLResponseCache
+from .validation import QueryCostEstimator, get_validation_rules
+
+logger = logging.getLogger(__name__)
+
+
+class CachedGraphQLView(GraphQLView):
+    """
+    GraphQLView с сохраненными запросами и кешем результатов.
+
+    - extensions.persistedQuery.sha256Hash (протокол Apollo APQ): запрос можно передавать хешем;
+    - разобранные и проверенные документы запоминаются по хешу (PersistedQueryStore);
+    - результаты запросов только для чтения кешируются по settings.GRAPHQL_RESPONSE_CACHE
+      (GraphQLResponseCache) и сбрасываются сигналами изменения моделей;
+    - запросы ограничены по глубине и оценке стоимости (settings.GRAPHQL_QUERY_LIMITS).
+    """
+
+    def __init__(self, *args, validation_rules=None, **kwargs):
+        super().__init__(*args, validation_rules=validation_rules or get_validation_rules(), **kwargs)
+
+    def get_graphql_params(self, request, data):
+        query, variables, operation_name, id = super().get_graphql_params(request, data)
+
+        persisted = self._persisted_query_extension(request, data)
+        if persisted is not None:
+            query_hash = persisted.get('sha256Hash')
+            if not query_hash:
+                raise HttpError(HttpResponseBadRequest("Не указан persistedQuery.sha256Hash"))
+            if query:
+                try:
+                    PersistedQueryStore.save_query(query, query_hash)
+                except ValueError as e:
+                    raise HttpError(HttpResponseBadRequest(str(e)))
+            else:
+                try:
+                    query = PersistedQueryStore.get_query(query_hash)
+                except PersistedQueryNotFound:
+                    # Клиент Apollo повторяет запрос с текстом при этой ошибке
+                    raise HttpError(HttpResponse(status=200), 'PersistedQueryNotFound')
+
+        return query, variables, operation_name, id
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        # Повторяет GraphQLView.execute_graphql_request; parse/validate заменены кешем документов,
+        # перед выполнением проверяется кеш результатов
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        document, validation_errors = PersistedQueryStore.get_document(
+            schema, query, self.validation_rules, graphene_settings.MAX_VALIDATION_ERRORS)
+        if document is None:
+            return ExecutionResult(errors=validation_errors)
+
+        operation_ast = get_operation_ast(document, operation_name)
+        if operation_ast is not None:
+            RequestMetrics.set_label(f"graphql:{operation_ast.operation.value}:{operation_name or 'anonymous'}")
+
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None
+
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    "Can only perform a {} operation from a POST request.".format(
+                        operation_ast.operation.value
+                    ),
+                )
+            )
+
+        if validation_errors:
+            return ExecutionResult(data=None, errors=validation_errors)
+
+        # Стоимость зависит от значений переменных (first: $n), поэтому проверяется при каждом запросе
+        if operation_ast is not None:
+            cost_error = QueryCostEstimator(schema, document, variables).check(operation_ast)
+            if cost_error is not None:
+                return ExecutionResult(data=None, errors=[cost_error])
+
+        cache_key = None
+        cache_apps = GraphQLResponseCache.apps_for_operation(schema, document, operation_ast)
+        if cache_apps:
+            cache_key = GraphQLResponseCache.make_key(
+                PersistedQueryStore.query_hash(query), operation_name, variables, cache_apps)
+            cached = GraphQLResponseCache.get(cache_key)
+            if cached is not None:
+                return ExecutionResult(data=cached)
+
+        try:
+            execute_options = {
+                "root_value": self.get_root_value(request),
+                "context_value": self.get_context(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                execute_options["execution_context_class"] = self.execution_context_class
+
+            if (
+                operation_ast is not None
+                and operation_ast.operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = execute(schema, document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            result = execute(schema, document, **execute_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+        # Внутри транзакции результат может содержать еще не зафиксированные изменения
+        if cache_key and not result.errors and result.data is not None and not connection.in_atomic_block:
+            GraphQLResponseCache.set(cache_key, result.data)
+        return result
+
+    @staticmethod
+    def _persisted_query_extension(request, data):
+        extensions = request.GET.get('extensions') or data.get('extensions')
+        if not extensions:
+            return None
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        if not isinstance(extensions, dict):
+            return None
+        return extensions.get('persistedQuery')
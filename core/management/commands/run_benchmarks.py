@@ -0,0 +1,81 @@
+# core/management/commands/run_benchmarks.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+from django.utils.module_loading import autodiscover_modules
+
+from core.services import BenchmarkSuite
+
+
+class Command(BaseCommand):
+    help = ('Бенчмарки горячих путей (<app>/benchmarks.py) на тестовой БД, заполненной фикстурами '
+            'и синтетическими данными; завершается с ошибкой при регрессии относительно базовой линии')
+
+    def add_arguments(self, parser):
+        config = BenchmarkSuite.config()
+        parser.add_argument('cases', nargs='*', help='Сценарии (по умолчанию - все)')
+        parser.add_argument('--list', action='store_true', help='Показать сценарии и завершиться')
+        parser.add_argument('--scale', type=int, default=config['SCALE'], help='Множитель синтетических данных')
+        parser.add_argument('--repeat', type=int, default=config['REPEAT'], help='Запусков на сценарий')
+        parser.add_argument('--baseline', default=str(config['BASELINE']), help='Файл базовой линии')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Записать результаты в базовую линию вместо сравнения')
+        parser.add_argument('--time-tolerance', type=float, default=config['TIME_TOLERANCE'],
+                            help='Допустимый рост времени (доля); отрицательное значение - не проверять')
+        parser.add_argument('--memory-tolerance', type=float, default=config['MEMORY_TOLERANCE'],
+                            help='Допустимый рост пика памяти (доля); отрицательное значение - не проверять')
+
+    def handle(self, *args, **options):
+        autodiscover_modules('benchmarks')
+        if options['list']:
+            for name, title in BenchmarkSuite.cases().items():
+                self.stdout.write(f'{name:45} {title}')
+            return
+
+        scale = max(1, options['scale'])
+        baseline = BenchmarkSuite.load_baseline(options['baseline'])
+        if baseline and not options['update_baseline'] and baseline.get('scale') != scale:
+            raise CommandError(f"Базовая линия записана для --scale {baseline.get('scale')}, запуск - {scale}")
+
+        # Тестовая БД без миграций (схема по моделям): данные создаются заново при каждом запуске
+        for alias in connections:
+            connections[alias].settings_dict.setdefault('TEST', {})['MIGRATE'] = False
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        try:
+            counts = BenchmarkSuite.seed(scale)
+            self.stdout.write('Данные: ' + ', '.join(f'{name} - {count}' for name, count in counts.items()))
+            try:
+                results = BenchmarkSuite.run(options['cases'], options['repeat'])
+            except ValueError as e:
+                raise CommandError(str(e))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        cases = (baseline or {}).get('cases', {})
+        self.stdout.write(f"{'Сценарий':45} {'мс':>10} {'пик, КБ':>10} {'SQL':>6}   базовая линия")
+        for result in results:
+            reference = cases.get(result['name'])
+            reference_text = (f"{reference['wall_ms']} мс / {reference['peak_kb']} КБ / {reference['queries']}"
+                              if reference else '-')
+            self.stdout.write(f"{result['name']:45} {result['wall_ms']:>10} {result['peak_kb']:>10} "
+                              f"{result['queries']:>6}   {reference_text}")
+
+        if options['update_baseline']:
+            BenchmarkSuite.save_baseline(options['baseline'], results, scale, options['repeat'], baseline)
+            self.stdout.write(self.style.SUCCESS(f"Базовая линия записана: {options['baseline']}"))
+            return
+        if baseline is None:
+            self.stdout.write(self.style.WARNING('Базовой линии нет - запустите с --update-baseline'))
+            return
+
+        regressions = BenchmarkSuite.compare(results, baseline, options['time_tolerance'],
+                                             options['memory_tolerance'])
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f'Регрессий: {len(regressions)}')
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
@@ -0,0 +1,61 @@
+# core/management/commands/run_job_worker.py
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.services import JobQueue, JobWorker
+
+
+def _run_worker(name, max_jobs, exit_when_idle):
+    """Процесс обработчика: завершает текущую задачу и останавливается по SIGTERM/SIGINT"""
+    worker = JobWorker(name)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: worker.stop())
+    return worker.run(max_jobs=max_jobs, exit_when_idle=exit_when_idle)
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчики очереди фоновых задач (core.models.BackgroundJob)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Число процессов-обработчиков')
+        parser.add_argument('--max-jobs', type=int, default=None,
+                            help='Остановить процесс после указанного числа задач')
+        parser.add_argument('--once', action='store_true', help='Выполнить поставленные задачи и завершиться')
+        parser.add_argument('--cleanup', action='store_true',
+                            help='Только удалить задачи с истекшим сроком хранения и завершиться')
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            removed = JobQueue.cleanup()
+            self.stdout.write(self.style.SUCCESS(f'Удалено задач: {removed}'))
+            return
+
+        job_types = JobQueue.job_types()
+        self.stdout.write(f"Типы задач: {', '.join(sorted(job_types)) or '-'}")
+        processes = max(1, options['processes'])
+        if processes == 1:
+            done = _run_worker(None, options['max_jobs'], options['once'])
+            self.stdout.write(self.style.SUCCESS(f'Выполнено задач: {done}'))
+            return
+
+        # Соединения с БД не должны наследоваться дочерними процессами
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        children = [context.Process(target=_run_worker, args=(None, options['max_jobs'], options['once']),
+                                    name=f'job-worker-{index}') for index in range(processes)]
+        for child in children:
+            child.start()
+
+        def stop_children(*args):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, stop_children)
+        for child in children:
+            child.join()
+        self.stdout.write(self.style.SUCCESS(f'Обработчики остановлены: {processes}'))
@@ -0,0 +1,56 @@
+# core/middleware.py
+from contextlib import ExitStack
+
+from django.db import connections
+
+from core.services.request_metrics import RequestMetrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Метрики запросов (core.services.RequestMetrics): число и время SQL, время Python,
+    попадания в кеши. Включается settings.REQUEST_METRICS['ENABLED'] (переменная окружения
+    REQUEST_METRICS_ENABLED); выключенный - не делает ничего. Ставится первым в MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = RequestMetrics.is_enabled()
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats = RequestMetrics.start(request.method, request.path)
+        wrappers = ExitStack()
+        for connection in connections.all():
+            wrappers.enter_context(connection.execute_wrapper(stats.sql_wrapper))
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            wrappers.close()
+            RequestMetrics.finish(stats, 500, self._label(request))
+            raise
+
+        if response.streaming:
+            # Тело потокового ответа (и его SQL) формируется уже после выхода из middleware
+            response.streaming_content = self._finish_after(
+                response.streaming_content, wrappers, stats, response.status_code, request)
+        else:
+            wrappers.close()
+            RequestMetrics.finish(stats, response.status_code, self._label(request))
+        return response
+
+    def _finish_after(self, content, wrappers, stats, status_code, request):
+        try:
+            yield from content
+        finally:
+            wrappers.close()
+            RequestMetrics.finish(stats, status_code, self._label(request))
+
+    @staticmethod
+    def _label(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unresolved'
+        return match.view_name or match._func_path
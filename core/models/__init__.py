@@ -18,6 +18,7 @@ from .mixins import (
     TimestampMixin ,
     SoftDeleteMixin ,
 )
+from .jobs import BackgroundJob
 
 # Экспортируем всё что нужно наружу
 __all__ = [
@@ -29,6 +30,9 @@ __all__ = [
     'TimestampMixin' ,
     'SoftDeleteMixin' ,
 
+    # Фоновые задачи
+    'BackgroundJob' ,
+
     # Утилиты
     'get_model_by_name' ,
     'get_all_models_with_mixin' ,
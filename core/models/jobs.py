@@ -0,0 +1,91 @@
+# core/models/jobs.py
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class BackgroundJob(models.Model):
+    """
+    Фоновая задача (импорт, экспорт, пакетная обработка).
+
+    Очередь хранится в БД: задачи ставит core.services.JobQueue.enqueue, выполняют процессы
+    manage.py run_job_worker. Обработчики задач регистрируются по job_type (core.services.register_job).
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, _('В очереди')),
+        (STATUS_RUNNING, _('Выполняется')),
+        (STATUS_SUCCEEDED, _('Выполнена')),
+        (STATUS_FAILED, _('Ошибка')),
+        (STATUS_CANCELLED, _('Отменена')),
+    ]
+    FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job_type = models.CharField(max_length=100, verbose_name=_('Тип задачи'))
+    title = models.CharField(max_length=255, blank=True, verbose_name=_('Описание'))
+    params = models.JSONField(default=dict, blank=True, verbose_name=_('Параметры'))
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED,
+                              verbose_name=_('Статус'))
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name=_('Выполнено, %'))
+    progress_message = models.CharField(max_length=255, blank=True, verbose_name=_('Текущий этап'))
+    cancel_requested = models.BooleanField(default=False, verbose_name=_('Запрошена отмена'))
+    result = models.JSONField(null=True, blank=True, verbose_name=_('Результат'))
+    result_file = models.FileField(upload_to='jobs/%Y/%m/', null=True, blank=True,
+                                   verbose_name=_('Файл результата'))
+    error = models.TextField(blank=True, verbose_name=_('Ошибка'))
+    worker = models.CharField(max_length=100, blank=True, verbose_name=_('Обработчик'))
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL,
+                                   related_name='background_jobs', verbose_name=_('Автор'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Создана'))
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Начата'))
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Последний сигнал обработчика'))
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Завершена'))
+    expires_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Хранить до'))
+
+    class Meta:
+        verbose_name = _('Фоновая задача')
+        verbose_name_plural = _('Фоновые задачи')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='core_job_status_created_idx'),
+            models.Index(fields=['expires_at'], name='core_job_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title or self.job_type} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in self.FINISHED_STATUSES
+
+    def is_visible_to(self, user) -> bool:
+        """Задача доступна автору и персоналу; задача без автора - только персоналу"""
+        if not user or not user.is_authenticated:
+            return False
+        return user.is_staff or (self.created_by_id is not None and user.pk == self.created_by_id)
+
+    def as_dict(self) -> dict:
+        """Состояние задачи для опроса (REST/GraphQL)"""
+        return {
+            'id': str(self.id),
+            'job_type': self.job_type,
+            'title': self.title,
+            'status': self.status,
+            'progress': self.progress,
+            'progress_message': self.progress_message,
+            'cancel_requested': self.cancel_requested,
+            'result': self.result,
+            'has_result_file': bool(self.result_file),
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+        }
@@ -3,7 +3,7 @@ from django.db import models
 from django.utils import timezone
 from django.utils.formats import date_format
 from django.utils.translation import gettext_lazy as _
-from typing import Dict , List , Optional , Any
+from typing import Any , Callable , Dict , Iterator , List , Optional
 from django.utils.html import escape
 from ..constants import DataFormat , DisplayView
 
@@ -28,6 +28,13 @@ class StructuredDataMixin :
     DETAIL = DisplayView.DETAIL
     BADGE = DisplayView.BADGE
 
+    # План загрузки связей для пакетной сериализации (serialize_queryset).
+    # Ключ - формат данных (COMPACT, DISPLAY, FULL) или пара (формат, тип отображения),
+    # пара имеет приоритет. Значение - {'select_related': [...], 'prefetch_related': [...]},
+    # в prefetch_related допустимы объекты Prefetch. План должен покрывать связи, которые
+    # читают get_*_data() самой модели и вложенных объектов.
+    STRUCTURED_DATA_PREFETCH: Dict[Any , Dict[str , List]] = {}
+
     def get_compact_data(self) -> Dict[str , Any] :
         """
         Минимальные данные для списков и таблиц.
@@ -71,6 +78,75 @@ class StructuredDataMixin :
             f"Модель {self.__class__.__name__} должна реализовать get_full_data()"
         )
 
+    def get_structured_data(self , data_format: str = COMPACT , view_type: str = DETAIL ,
+                            include: Optional[List[str]] = None) -> Dict[str , Any] :
+        """
+        Данные объекта в указанном формате (get_compact_data / get_display_data / get_full_data)
+        """
+        if data_format == self.DISPLAY :
+            return self.get_display_data(view_type)
+        if data_format == self.FULL :
+            return self.get_full_data(include)
+        return self.get_compact_data()
+
+    # ==================== ПАКЕТНАЯ СЕРИАЛИЗАЦИЯ ====================
+
+    @classmethod
+    def get_prefetch_plan(cls , data_format: str = COMPACT , view_type: Optional[str] = None) -> Dict[str , List] :
+        """
+        План загрузки связей для формата и типа отображения (STRUCTURED_DATA_PREFETCH)
+        """
+        plans = cls.STRUCTURED_DATA_PREFETCH
+        plan = plans.get((data_format , view_type)) if view_type else None
+        if plan is None :
+            plan = plans.get(data_format) or {}
+        return {
+            'select_related' : list(plan.get('select_related' , ())) ,
+            'prefetch_related' : list(plan.get('prefetch_related' , ())) ,
+        }
+
+    @classmethod
+    def with_prefetch_plan(cls , queryset=None , data_format: str = COMPACT , view_type: Optional[str] = None) :
+        """
+        QuerySet с примененным планом загрузки связей
+        """
+        if queryset is None :
+            queryset = cls._default_manager.all()
+        plan = cls.get_prefetch_plan(data_format , view_type)
+        if plan['select_related'] :
+            queryset = queryset.select_related(*plan['select_related'])
+        if plan['prefetch_related'] :
+            queryset = queryset.prefetch_related(*plan['prefetch_related'])
+        return queryset
+
+    @classmethod
+    def serialize_queryset(cls , queryset=None , data_format: str = COMPACT , view_type: str = LIST ,
+                           include: Optional[List[str]] = None , chunk_size: Optional[int] = 500 ,
+                           on_error: Optional[Callable[[Any , Exception] , Any]] = None ,
+                           with_objects: bool = False) -> Iterator[Any] :
+        """
+        Данные всех объектов QuerySet в указанном формате с примененным планом загрузки связей.
+
+        Число запросов не зависит от числа объектов: связи из плана загружаются пачками
+        по chunk_size (QuerySet.iterator), None - вся выборка одним списком.
+
+        Args:
+            on_error: обработчик ошибки сериализации объекта (obj, exc) -> данные вместо объекта;
+                      без него исключение пробрасывается
+            with_objects: отдавать пары (объект, данные)
+        """
+        queryset = cls.with_prefetch_plan(queryset , data_format , view_type)
+        objects = queryset.iterator(chunk_size=chunk_size) if chunk_size else queryset
+        for obj in objects :
+            if on_error is None :
+                data = obj.get_structured_data(data_format , view_type , include)
+            else :
+                try :
+                    data = obj.get_structured_data(data_format , view_type , include)
+                except Exception as e :
+                    data = on_error(obj , e)
+            yield (obj , data) if with_objects else data
+
     # Общие вспомогательные методы
     def _format_field(self , value , field_type: str = 'text' , **kwargs) -> Dict[str , Any] :
         """Форматирование поля с метаданными"""
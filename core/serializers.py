@@ -1,10 +1,31 @@
+import threading
+
 from rest_framework import serializers
 from django.apps import apps
 from django.utils.text import capfirst
 from django.db import models
 
 
+# Реестр сгенерированных сериализаторов: (модель, depth) -> класс. Классы не зависят от данных,
+# поэтому создаются один раз на процесс; ModelSerializer кеширует поля на экземпляре, а не на классе.
+_SERIALIZER_REGISTRY = {}
+_SERIALIZER_REGISTRY_LOCK = threading.Lock()
+
+
 def get_model_serializer(model, depth=0):
+    """Сериализатор для любой модели Django (создается при первом обращении и кешируется по (model, depth))."""
+    key = (model, depth)
+    serializer_class = _SERIALIZER_REGISTRY.get(key)
+    if serializer_class is None:
+        with _SERIALIZER_REGISTRY_LOCK:
+            serializer_class = _SERIALIZER_REGISTRY.get(key)
+            if serializer_class is None:
+                serializer_class = _build_model_serializer(model, depth)
+                _SERIALIZER_REGISTRY[key] = serializer_class
+    return serializer_class
+
+
+def _build_model_serializer(model, depth):
     """Динамически создает сериализатор для любой модели Django."""
     meta_attrs = {
         'model': model,
@@ -25,7 +46,6 @@ def get_model_serializer(model, depth=0):
 def get_model_field_info(model):
     """Возвращает метаданные полей модели."""
     field_info = []
-    print('get_model_field_info', model)
 
     for field in model._meta.get_fields():
         # Обработка значения по умолчанию
@@ -53,12 +73,14 @@ def get_model_field_info(model):
 
         # Для ForeignKey, OneToOne, ManyToMany
         if hasattr(field, 'related_model') and field.related_model:
+            on_delete = getattr(field, 'on_delete', None)
             field_data.update({
                 'type': 'Relation',
                 'related_model': field.related_model.__name__,
                 'related_app': field.related_model._meta.app_label,
                 'related_name': getattr(field, 'related_name', None),
-                'on_delete': str(getattr(field, 'on_delete', None)),
+                # Имя обработчика (CASCADE, SET_NULL...): str() функции содержит адрес в памяти процесса
+                'on_delete': getattr(on_delete, '__name__', str(on_delete)),
             })
         field_info.append(field_data)
     return field_info
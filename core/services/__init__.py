@@ -0,0 +1,29 @@
+from .excel_export import StreamingExcelExport, file_response, iter_rows, XLSX_CONTENT_TYPE
+from .staged_import import StagedImport, StagedImportStore
+from .jobs import JobQueue, JobContext, JobWorker, JobCancelled, register_job
+from .json_stream import iter_json_list, json_list_response, LenientJSONEncoder
+from .model_metadata import ModelMetadataRegistry
+from .request_metrics import RequestMetrics
+from .benchmarks import BenchmarkSuite, register_benchmark, register_benchmark_seed
+
+__all__ = [
+    'StreamingExcelExport',
+    'file_response',
+    'iter_rows',
+    'XLSX_CONTENT_TYPE',
+    'StagedImport',
+    'StagedImportStore',
+    'JobQueue',
+    'JobContext',
+    'JobWorker',
+    'JobCancelled',
+    'register_job',
+    'iter_json_list',
+    'json_list_response',
+    'LenientJSONEncoder',
+    'ModelMetadataRegistry',
+    'RequestMetrics',
+    'BenchmarkSuite',
+    'register_benchmark',
+    'register_benchmark_seed',
+]
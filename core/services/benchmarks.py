@@ -0,0 +1,264 @@
+# core/services/benchmarks.py
+import json
+import logging
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class BenchmarkSuite:
+    """
+    Бенчмарки горячих путей каталога (python manage.py run_benchmarks).
+
+    Сценарии и генераторы данных регистрируются в модулях <app>/benchmarks.py:
+
+        @register_benchmark_seed('valve_data')
+        def seed_valve_lines(scale): ...
+
+        @register_benchmark('valve_data.dimension_matrix', 'Таблицы ВГХ', setup=DimensionMatrixCache.invalidate)
+        def dimension_matrix(): ...
+
+    База заполняется фикстурами репозитория (settings.BENCHMARKS['FIXTURES']) и генераторами
+    с множителем scale. Для каждого сценария фиксируются медиана времени по repeat запускам,
+    пик памяти Python (tracemalloc) и количество SQL-запросов; setup выполняется перед каждым
+    запуском вне замера (например, сброс кешей процесса - замеряется холодный путь), teardown -
+    один раз после всех запусков сценария.
+    Результаты сравниваются с сохраненной базовой линией (settings.BENCHMARKS['BASELINE']).
+    """
+    # Поля старых фикстур -> текущие поля моделей (справочники params)
+    LEGACY_FIXTURE_FIELDS = {
+        'symbolic_code': 'code',
+        'text_description': 'description',
+        'symbolic_description': 'name',
+    }
+    # Рост меньше этих величин не считается регрессией (шум измерений)
+    TIME_FLOOR_MS = 5.0
+    MEMORY_FLOOR_KB = 256
+
+    _cases: Dict[str, Dict[str, Any]] = {}
+    _seeds: Dict[str, Callable] = {}
+
+    @staticmethod
+    def config() -> Dict[str, Any]:
+        """settings.BENCHMARKS поверх значений по умолчанию"""
+        config = {
+            'FIXTURES': [],
+            'BASELINE': os.path.join(settings.BASE_DIR, 'benchmarks_baseline.json'),
+            'SCALE': 1,
+            'REPEAT': 5,
+            'TIME_TOLERANCE': 0.5,
+            'MEMORY_TOLERANCE': 0.25,
+        }
+        config.update(getattr(settings, 'BENCHMARKS', None) or {})
+        return config
+
+    # ==================== РЕГИСТРАЦИЯ ====================
+
+    @classmethod
+    def register(cls, name: str, run: Callable, title: str = '', setup: Optional[Callable] = None,
+                 teardown: Optional[Callable] = None):
+        cls._cases[name] = {'run': run, 'title': title, 'setup': setup, 'teardown': teardown}
+
+    @classmethod
+    def register_seed(cls, name: str, seed: Callable):
+        cls._seeds[name] = seed
+
+    @classmethod
+    def cases(cls) -> Dict[str, str]:
+        """Зарегистрированные сценарии: имя -> описание"""
+        return {name: case['title'] for name, case in cls._cases.items()}
+
+    # ==================== ДАННЫЕ ====================
+
+    @classmethod
+    def load_fixtures(cls, paths: Iterable[str]) -> int:
+        """
+        Загрузить фикстуры JSON (формат dumpdata) с поправкой на изменения моделей:
+        старые имена полей переименовываются, отсутствующие поля и модели пропускаются.
+        """
+        from django.core import serializers
+
+        objects = []
+        for path in paths:
+            if not os.path.isabs(path):
+                path = os.path.join(settings.BASE_DIR, path)
+            with open(path, encoding='utf-8') as fixture:
+                for item in json.load(fixture):
+                    item['fields'] = {cls.LEGACY_FIXTURE_FIELDS.get(field, field): value
+                                      for field, value in item['fields'].items()}
+                    objects.append(item)
+
+        loaded = 0
+        # Ссылки проверяются после загрузки всех файлов: порядок объектов в фикстурах произвольный
+        with transaction.atomic():
+            with connection.constraint_checks_disabled():
+                for deserialized in serializers.deserialize('python', objects, ignorenonexistent=True):
+                    deserialized.save()
+                    loaded += 1
+            connection.check_constraints()
+        return loaded
+
+    @classmethod
+    def seed(cls, scale: int = 1) -> Dict[str, Any]:
+        """Фикстуры и синтетические данные генераторов; возвращает количество созданных записей"""
+        counts = {'fixtures': cls.load_fixtures(cls.config()['FIXTURES'])}
+        for name, seed in cls._seeds.items():
+            with transaction.atomic():
+                counts[name] = seed(scale)
+        return counts
+
+    # ==================== ЗАМЕРЫ ====================
+
+    @classmethod
+    def measure(cls, name: str, repeat: int = 5) -> Dict[str, Any]:
+        """
+        Замер сценария: прогрев, repeat запусков по времени и отдельный запуск
+        под tracemalloc со счетчиком SQL-запросов
+        """
+        case = cls._cases[name]
+        run, setup = case['run'], case['setup']
+        queries = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        try:
+            if setup:
+                setup()
+            run()
+
+            timings = []
+            for _ in range(max(1, repeat)):
+                if setup:
+                    setup()
+                started_at = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started_at) * 1000)
+
+            if setup:
+                setup()
+            tracemalloc.start()
+            try:
+                with connection.execute_wrapper(count_queries):
+                    run()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        finally:
+            if case['teardown']:
+                case['teardown']()
+
+        return {
+            'name': name,
+            'title': case['title'],
+            'wall_ms': round(statistics.median(timings), 2),
+            'min_ms': round(min(timings), 2),
+            'peak_kb': round(peak / 1024, 1),
+            'queries': queries[0],
+        }
+
+    @classmethod
+    def run(cls, names: Optional[Iterable[str]] = None, repeat: int = 5) -> List[Dict[str, Any]]:
+        names = list(names) if names else list(cls._cases)
+        unknown = [name for name in names if name not in cls._cases]
+        if unknown:
+            raise ValueError(f"Неизвестные сценарии: {', '.join(unknown)}")
+        return [cls.measure(name, repeat) for name in names]
+
+    # ==================== БАЗОВАЯ ЛИНИЯ ====================
+
+    @staticmethod
+    def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as baseline:
+            return json.load(baseline)
+
+    @staticmethod
+    def save_baseline(path: str, results: List[Dict[str, Any]], scale: int, repeat: int,
+                      previous: Optional[Dict[str, Any]] = None):
+        """Записать результаты в базовую линию (сценарии, которые не запускались, сохраняются)"""
+        cases = dict((previous or {}).get('cases', {}))
+        for result in results:
+            cases[result['name']] = {key: result[key] for key in ('wall_ms', 'peak_kb', 'queries')}
+        baseline = {
+            'scale': scale,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'recorded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'cases': dict(sorted(cases.items())),
+        }
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(baseline, output, ensure_ascii=False, indent=2)
+            output.write('\n')
+
+    @classmethod
+    def compare(cls, results: List[Dict[str, Any]], baseline: Dict[str, Any],
+                time_tolerance: float, memory_tolerance: float) -> List[str]:
+        """
+        Регрессии относительно базовой линии:
+            SQL-запросы - любое увеличение количества
+            время и память - рост больше допуска (доля) и больше TIME_FLOOR_MS / MEMORY_FLOOR_KB
+        """
+        regressions = []
+        cases = baseline.get('cases', {})
+        for result in results:
+            reference = cases.get(result['name'])
+            if reference is None:
+                continue
+            name = result['name']
+            if result['queries'] > reference['queries']:
+                regressions.append(f"{name}: SQL-запросов {result['queries']} (было {reference['queries']})")
+            wall_limit = max(reference['wall_ms'] * (1 + time_tolerance), reference['wall_ms'] + cls.TIME_FLOOR_MS)
+            if time_tolerance >= 0 and result['wall_ms'] > wall_limit:
+                regressions.append(f"{name}: время {result['wall_ms']} мс (было {reference['wall_ms']} мс)")
+            memory_limit = max(reference['peak_kb'] * (1 + memory_tolerance),
+                               reference['peak_kb'] + cls.MEMORY_FLOOR_KB)
+            if memory_tolerance >= 0 and result['peak_kb'] > memory_limit:
+                regressions.append(f"{name}: пик памяти {result['peak_kb']} КБ (было {reference['peak_kb']} КБ)")
+        return regressions
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    @staticmethod
+    def execute_graphql(query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Выполнить запрос к схеме /graphql/ с контекстом HTTP-запроса (загрузчики, кеши запроса)"""
+        from django.test import RequestFactory
+        from djangoProject1.graphql_api.schema import schema
+
+        request = RequestFactory().post('/graphql/')
+        result = schema.execute(query, variable_values=variables, context_value=request)
+        if result.errors:
+            raise RuntimeError(f"Ошибка GraphQL: {result.errors[0]}")
+        return result.data
+
+
+def register_benchmark(name: str, title: str = '', setup: Optional[Callable] = None,
+                       teardown: Optional[Callable] = None):
+    """Декоратор сценария бенчмарка: @register_benchmark('app.case', 'Описание', setup=...)"""
+
+    def decorator(run: Callable) -> Callable:
+        BenchmarkSuite.register(name, run, title, setup, teardown)
+        return run
+
+    return decorator
+
+
+def register_benchmark_seed(name: str):
+    """Декоратор генератора данных для бенчмарков: функция (scale) -> количество созданных записей"""
+
+    def decorator(seed: Callable) -> Callable:
+        BenchmarkSuite.register_seed(name, seed)
+        return seed
+
+    return decorator
@@ -0,0 +1,140 @@
+# core/services/excel_export.py
+import io
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import xlsxwriter
+from django.http import FileResponse
+
+logger = logging.getLogger(__name__)
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class _TemporaryExportFile(io.FileIO):
+    """Временный файл выгрузки, удаляется после отправки (FileResponse закрывает файл)"""
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            try:
+                os.remove(self.name)
+            except OSError:
+                pass
+
+
+class StreamingExcelExport:
+    """
+    Выгрузка Excel с постоянным расходом памяти.
+
+    Строки листов берутся из итераторов (QuerySet.iterator(), генераторы) и сразу пишутся
+    xlsxwriter в режиме constant_memory во временный файл; в памяти держится одна строка.
+    Ширина колонок подбирается по длине записанных значений (не больше MAX_COLUMN_WIDTH).
+
+        export = StreamingExcelExport()
+        export.add_sheet('Данные', ['DN', 'PN'], (row for row in ...))
+        return export.as_response('data.xlsx')
+    """
+    MAX_COLUMN_WIDTH = 50
+    HEADER_FORMAT = {'bold': True, 'font_color': '#FFFFFF', 'bg_color': '#366092'}
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix='export_', suffix='.xlsx')
+            os.close(handle)
+        self.path = path
+        self.workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+        self._header_format = None
+        self._closed = False
+
+    def add_sheet(self, name: str, headers: Optional[Sequence[Any]], rows: Iterable[Sequence[Any]],
+                  styled_header: bool = False, autofit: bool = True) -> int:
+        """
+        Записать лист; листы пишутся по одному и в порядке добавления
+
+        Returns:
+            int: количество записанных строк данных (без заголовка)
+        """
+        worksheet = self.workbook.add_worksheet(name)
+        widths: Dict[int, int] = {}
+        row_index = 0
+
+        if headers is not None:
+            header_format = self._get_header_format() if styled_header else None
+            self._write_row(worksheet, row_index, headers, widths, header_format)
+            row_index += 1
+
+        written = 0
+        for row in rows:
+            self._write_row(worksheet, row_index, row, widths)
+            row_index += 1
+            written += 1
+
+        if autofit:
+            for col, length in widths.items():
+                worksheet.set_column(col, col, min(length + 2, self.MAX_COLUMN_WIDTH))
+        return written
+
+    def close(self) -> str:
+        """Завершить файл, вернуть путь"""
+        if not self._closed:
+            self.workbook.close()
+            self._closed = True
+        return self.path
+
+    def discard(self):
+        """Удалить файл (при ошибке формирования)"""
+        try:
+            self.close()
+        except Exception:
+            pass
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def as_response(self, filename: str) -> FileResponse:
+        """Потоковый ответ с файлом; временный файл удаляется после отправки"""
+        return file_response(self.close(), filename)
+
+    @classmethod
+    def message_response(cls, message: str, filename: str, sheet_name: str = 'Ошибка') -> FileResponse:
+        """Файл из одной ячейки с сообщением (ошибка выгрузки)"""
+        export = cls()
+        export.add_sheet(sheet_name, [sheet_name], [[message]])
+        return export.as_response(filename)
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    def _get_header_format(self):
+        if self._header_format is None:
+            self._header_format = self.workbook.add_format(self.HEADER_FORMAT)
+        return self._header_format
+
+    @staticmethod
+    def _write_row(worksheet, row_index: int, values: Sequence[Any], widths: Dict[int, int], cell_format=None):
+        for col, value in enumerate(values):
+            if value is None or value == '':
+                if cell_format is not None:
+                    worksheet.write_blank(row_index, col, None, cell_format)
+                continue
+            worksheet.write(row_index, col, value, cell_format)
+            length = len(str(value))
+            if length > widths.get(col, 0):
+                widths[col] = length
+
+
+def file_response(path: str, filename: str, delete: bool = True,
+                  content_type: str = XLSX_CONTENT_TYPE) -> FileResponse:
+    """Потоковая отдача файла выгрузки (по частям, без чтения в память); delete - удалить после отправки"""
+    file = _TemporaryExportFile(path, 'rb') if delete else open(path, 'rb')
+    return FileResponse(file, as_attachment=True, filename=filename, content_type=content_type)
+
+
+def iter_rows(queryset, row_fn, chunk_size: int = 2000) -> Iterable[List[Any]]:
+    """Строки выгрузки из QuerySet без загрузки всей выборки (prefetch_related - по пачкам)"""
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield row_fn(obj)
@@ -0,0 +1,352 @@
+# core/services/jobs.py
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Задача отменена пользователем (поднимается из JobContext.check_cancelled)"""
+
+
+class JobContext:
+    """
+    Окружение выполняемой задачи для обработчика.
+
+    params - параметры задачи, input_path(name) - путь к загруженному при постановке файлу,
+    progress() - прогресс и текущий этап (запись в БД не чаще PROGRESS_INTERVAL секунд)
+    с проверкой отмены, save_result_file() - файл результата (хранится до expires_at).
+    """
+
+    def __init__(self, job, work_dir: str):
+        self.job = job
+        self.params = job.params or {}
+        self.work_dir = work_dir
+        self._last_progress_at = 0.0
+
+    def progress(self, done, total=None, message: str = '', force: bool = False):
+        """
+        Сохранить прогресс задачи и проверить отмену
+
+        Args:
+            done: выполнено (из total) или процент, если total не указан
+            total: общее количество шагов
+            message: текущий этап
+            force: записать сразу, без ограничения частоты
+        """
+        now = time.monotonic()
+        if not force and now - self._last_progress_at < JobQueue.setting('PROGRESS_INTERVAL'):
+            return
+        self._last_progress_at = now
+        percent = done * 100.0 / total if total else done
+        from core.models import BackgroundJob
+        BackgroundJob.objects.filter(pk=self.job.pk).update(
+            progress=max(0, min(100, int(percent))), progress_message=str(message)[:255],
+            heartbeat_at=timezone.now())
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        """JobCancelled, если пользователь запросил отмену"""
+        from core.models import BackgroundJob
+        if BackgroundJob.objects.filter(pk=self.job.pk, cancel_requested=True).exists():
+            raise JobCancelled()
+
+    def input_path(self, name: str) -> str:
+        """Локальный путь к входному файлу задачи (см. JobQueue.enqueue(files=...))"""
+        stored_name = (self.params.get('_files') or {}).get(name)
+        if not stored_name:
+            raise KeyError(f"У задачи нет входного файла '{name}'")
+        try:
+            return default_storage.path(stored_name)
+        except NotImplementedError:
+            # Удаленное хранилище - копия во временный каталог задачи
+            local_path = os.path.join(self.work_dir, os.path.basename(stored_name))
+            with default_storage.open(stored_name, 'rb') as source, open(local_path, 'wb') as target:
+                shutil.copyfileobj(source, target)
+            return local_path
+
+    def temp_path(self, filename: str) -> str:
+        """Путь во временном каталоге задачи (удаляется после выполнения)"""
+        return os.path.join(self.work_dir, os.path.basename(filename))
+
+    def save_result_file(self, filename: str, path: str):
+        """Сохранить файл результата задачи"""
+        with open(path, 'rb') as file:
+            self.job.result_file.save(os.path.basename(filename), File(file), save=False)
+        from core.models import BackgroundJob
+        BackgroundJob.objects.filter(pk=self.job.pk).update(result_file=self.job.result_file.name)
+
+
+class JobQueue:
+    """
+    Очередь фоновых задач в БД (core.models.BackgroundJob), без внешнего брокера.
+
+    Обработчик задачи - функция handler(context: JobContext), результат которой (JSON-совместимый)
+    сохраняется в BackgroundJob.result. Обработчики регистрируются декоратором register_job в модулях
+    <app>/jobs.py, которые загружаются при первой постановке задачи или запуске обработчика
+    (discover), а не в каждом процессе Django.
+
+    Захват задачи обработчиком - условный UPDATE status='queued' -> 'running', поэтому одну задачу
+    не выполнят два процесса. Отмена поставленной задачи - сразу, выполняемой - флагом
+    cancel_requested, который обработчик проверяет в progress()/check_cancelled().
+
+    Настройки - settings.BACKGROUND_JOBS (см. DEFAULTS).
+    """
+    DEFAULTS = {
+        'POLL_INTERVAL': 2,  # пауза обработчика при пустой очереди, с
+        'PROGRESS_INTERVAL': 1,  # минимальный интервал записи прогресса, с
+        'HEARTBEAT_INTERVAL': 30,  # интервал отметки "обработчик жив", с
+        'STALE_AFTER': 600,  # задача без отметок дольше - обработчик считается упавшим, с
+        'RESULT_TTL': 24 * 60 * 60,  # время хранения завершенных задач и файлов результата, с
+    }
+
+    _handlers: Dict[str, Callable] = {}
+    _titles: Dict[str, str] = {}
+    _discovered = False
+    _discover_lock = threading.Lock()
+
+    # ==================== РЕГИСТРАЦИЯ ====================
+
+    @classmethod
+    def register(cls, job_type: str, handler: Callable, title: str = ''):
+        cls._handlers[job_type] = handler
+        cls._titles[job_type] = title
+
+    @classmethod
+    def discover(cls):
+        """Загрузить модули <app>/jobs.py (один раз на процесс)"""
+        if cls._discovered:
+            return
+        with cls._discover_lock:
+            if not cls._discovered:
+                autodiscover_modules('jobs')
+                cls._discovered = True
+
+    @classmethod
+    def job_types(cls) -> Dict[str, str]:
+        """Зарегистрированные типы задач: job_type -> описание"""
+        cls.discover()
+        return dict(cls._titles)
+
+    # ==================== ПОСТАНОВКА И ОТМЕНА ====================
+
+    @classmethod
+    def enqueue(cls, job_type: str, params: Optional[Dict[str, Any]] = None, title: str = '', user=None,
+                files: Optional[Dict[str, Any]] = None):
+        """
+        Поставить задачу в очередь
+
+        Args:
+            job_type: зарегистрированный тип задачи
+            params: JSON-совместимые параметры
+            title: описание для списка задач (по умолчанию - описание типа)
+            user: автор задачи
+            files: входные файлы name -> загруженный файл (UploadedFile), доступны в JobContext.input_path
+
+        Raises:
+            ValueError: неизвестный тип задачи
+        """
+        from core.models import BackgroundJob
+
+        cls.discover()
+        if job_type not in cls._handlers:
+            raise ValueError(f"Неизвестный тип задачи '{job_type}'")
+        job = BackgroundJob(job_type=job_type, title=(title or cls._titles.get(job_type, ''))[:255],
+                            params=dict(params or {}),
+                            created_by=user if getattr(user, 'is_authenticated', False) else None)
+        if files:
+            job.params['_files'] = {
+                name: default_storage.save(f'jobs/input/{job.id.hex}_{os.path.basename(uploaded.name)}', uploaded)
+                for name, uploaded in files.items()
+            }
+        job.save()
+        logger.info("Задача поставлена в очередь: %s %s", job.job_type, job.id)
+        return job
+
+    @classmethod
+    def cancel(cls, job_id):
+        """Отменить задачу: поставленную - сразу, выполняемую - запросом отмены. None - задачи нет"""
+        from core.models import BackgroundJob
+
+        now = timezone.now()
+        if BackgroundJob.objects.filter(pk=job_id, status=BackgroundJob.STATUS_QUEUED).update(
+                status=BackgroundJob.STATUS_CANCELLED, cancel_requested=True, finished_at=now,
+                expires_at=now + timedelta(seconds=cls.setting('RESULT_TTL'))):
+            job = BackgroundJob.objects.get(pk=job_id)
+            cls._remove_input_files(job)
+            return job
+        BackgroundJob.objects.filter(pk=job_id, status=BackgroundJob.STATUS_RUNNING).update(cancel_requested=True)
+        return BackgroundJob.objects.filter(pk=job_id).first()
+
+    # ==================== ВЫПОЛНЕНИЕ ====================
+
+    @classmethod
+    def claim(cls, worker: str):
+        """Захватить самую старую поставленную задачу известного типа или None"""
+        from core.models import BackgroundJob
+
+        cls.discover()
+        queued = BackgroundJob.objects.filter(status=BackgroundJob.STATUS_QUEUED, job_type__in=list(cls._handlers))
+        for job_id in queued.order_by('created_at').values_list('id', flat=True)[:10]:
+            now = timezone.now()
+            if BackgroundJob.objects.filter(pk=job_id, status=BackgroundJob.STATUS_QUEUED).update(
+                    status=BackgroundJob.STATUS_RUNNING, worker=worker[:100], started_at=now, heartbeat_at=now):
+                return BackgroundJob.objects.get(pk=job_id)
+        return None
+
+    @classmethod
+    def run(cls, job):
+        """Выполнить захваченную задачу и сохранить итог"""
+        from core.models import BackgroundJob
+
+        work_dir = tempfile.mkdtemp(prefix=f'job_{job.pk}_')
+        heartbeat = _Heartbeat(job.pk, cls.setting('HEARTBEAT_INTERVAL'))
+        heartbeat.start()
+        values = {'progress': 100}
+        try:
+            context = JobContext(job, work_dir)
+            context.check_cancelled()
+            values['result'] = cls._handlers[job.job_type](context)
+            values['status'] = BackgroundJob.STATUS_SUCCEEDED
+        except JobCancelled:
+            values = {'status': BackgroundJob.STATUS_CANCELLED}
+        except Exception as e:
+            logger.exception("Ошибка задачи %s %s", job.job_type, job.pk)
+            values = {'status': BackgroundJob.STATUS_FAILED,
+                      'error': f"{type(e).__name__}: {e}"}
+        finally:
+            heartbeat.stop()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        now = timezone.now()
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            finished_at=now, heartbeat_at=now, expires_at=now + timedelta(seconds=cls.setting('RESULT_TTL')),
+            **values)
+        cls._remove_input_files(job)
+        logger.info("Задача %s %s завершена: %s", job.job_type, job.pk, values['status'])
+
+    @classmethod
+    def fail_stale(cls) -> int:
+        """Задачи, обработчик которых перестал отмечаться дольше STALE_AFTER, - в статус failed"""
+        from core.models import BackgroundJob
+
+        now = timezone.now()
+        stale = BackgroundJob.objects.filter(
+            status=BackgroundJob.STATUS_RUNNING, heartbeat_at__lt=now - timedelta(seconds=cls.setting('STALE_AFTER')))
+        count = stale.update(status=BackgroundJob.STATUS_FAILED, error='Обработчик задачи прекратил работу',
+                             finished_at=now, expires_at=now + timedelta(seconds=cls.setting('RESULT_TTL')))
+        if count:
+            logger.warning("Задач с остановившимся обработчиком: %d", count)
+        return count
+
+    @classmethod
+    def cleanup(cls) -> int:
+        """Удалить задачи с истекшим сроком хранения вместе с файлами, вернуть их количество"""
+        from core.models import BackgroundJob
+
+        expired = list(BackgroundJob.objects.filter(expires_at__lt=timezone.now()))
+        for job in expired:
+            if job.result_file:
+                job.result_file.delete(save=False)
+            cls._remove_input_files(job)
+        BackgroundJob.objects.filter(pk__in=[job.pk for job in expired]).delete()
+        if expired:
+            logger.info("Удалено завершенных задач: %d", len(expired))
+        return len(expired)
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    @classmethod
+    def setting(cls, name: str):
+        return (getattr(settings, 'BACKGROUND_JOBS', None) or {}).get(name, cls.DEFAULTS[name])
+
+    @staticmethod
+    def _remove_input_files(job):
+        for stored_name in ((job.params or {}).get('_files') or {}).values():
+            try:
+                default_storage.delete(stored_name)
+            except OSError:
+                continue
+
+
+class _Heartbeat:
+    """Поток, отмечающий задачу как живую, пока обработчик работает без вызовов progress()"""
+
+    def __init__(self, job_id, interval: float):
+        self.job_id = job_id
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'job-heartbeat-{job_id}', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        from core.models import BackgroundJob
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    BackgroundJob.objects.filter(pk=self.job_id).update(heartbeat_at=timezone.now())
+                except Exception as e:
+                    # Например, БД заблокирована транзакцией обработчика - отметимся в следующий раз
+                    logger.warning("Не удалось отметить задачу %s: %s", self.job_id, e)
+        finally:
+            connection.close()
+
+
+class JobWorker:
+    """Цикл обработчика очереди (один процесс manage.py run_job_worker выполняет задачи по одной)"""
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, max_jobs: Optional[int] = None, exit_when_idle: bool = False) -> int:
+        """Выполнять задачи, пока не вызван stop() (или до max_jobs / пустой очереди); вернуть их число"""
+        done = 0
+        logger.info("Обработчик задач %s запущен", self.name)
+        while not self._stop.is_set() and (max_jobs is None or done < max_jobs):
+            close_old_connections()
+            JobQueue.fail_stale()
+            job = JobQueue.claim(self.name)
+            if job is None:
+                JobQueue.cleanup()
+                if exit_when_idle:
+                    break
+                self._stop.wait(JobQueue.setting('POLL_INTERVAL'))
+                continue
+            JobQueue.run(job)
+            done += 1
+        logger.info("Обработчик задач %s остановлен, выполнено задач: %d", self.name, done)
+        return done
+
+
+def register_job(job_type: str, title: str = ''):
+    """Декоратор обработчика фоновой задачи: @register_job('app.action', 'Описание')"""
+
+    def decorator(handler: Callable) -> Callable:
+        JobQueue.register(job_type, handler, title)
+        return handler
+
+    return decorator
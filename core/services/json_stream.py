@@ -0,0 +1,71 @@
+# core/services/json_stream.py
+import itertools
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+class LenientJSONEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder, остальные объекты (модели в данных StructuredDataMixin) - строкой"""
+
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return str(o)
+
+
+def iter_json_list(envelope: Dict[str, Any], items: Iterable[Any], list_key: str = 'data',
+                   count_key: Optional[str] = 'count', buffer_size: int = 100) -> Iterator[str]:
+    """
+    JSON-объект envelope со списком items по ключу list_key, по частям.
+
+    Элементы кодируются по мере получения из итератора (QuerySet.iterator(), генераторы) и отдаются
+    пачками по buffer_size; количество элементов count_key пишется после списка.
+
+    Ошибка до первой отданной пачки пробрасывается (ответ еще не начат). Ошибка после нее
+    записывается в лог, список закрывается и в объект добавляется ключ error - JSON остается целым.
+    """
+    encoder = LenientJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    head = encoder.encode({key: value for key, value in envelope.items() if key not in (list_key, count_key)})
+    # '{...}' -> '{...,"data":[' (или '{"data":[' для пустого envelope)
+    head = head[:-1] + (',' if len(head) > 2 else '') + f'{json.dumps(list_key)}:['
+    buffer = [head]
+    count = 0
+    started = False
+    tail = ']'
+    try:
+        for item in items:
+            buffer.append((',' if count else '') + encoder.encode(item))
+            count += 1
+            if len(buffer) >= buffer_size:
+                chunk, buffer = ''.join(buffer), []
+                started = True
+                yield chunk
+    except Exception:
+        if not started:
+            raise
+        logger.exception("Потоковый список прерван после %d элементов", count)
+        tail += ',"error":"Response truncated: server error"'
+    if count_key:
+        tail += f',{json.dumps(count_key)}:{count}'
+    buffer.append(tail + '}')
+    yield ''.join(buffer)
+
+
+def json_list_response(envelope: Dict[str, Any], items: Iterable[Any], list_key: str = 'data',
+                       count_key: Optional[str] = 'count', status: int = 200) -> StreamingHttpResponse:
+    """
+    Потоковый JSON-ответ со списком: в памяти не держится ни выборка, ни весь ответ.
+    Первая пачка строится до создания ответа - ошибка запроса или первых элементов
+    дает обычный ответ с ошибкой, а не обрезанный JSON со статусом 200.
+    """
+    chunks = iter_json_list(envelope, items, list_key, count_key)
+    first = next(chunks)
+    return StreamingHttpResponse(itertools.chain([first], chunks),
+                                 status=status, content_type='application/json; charset=utf-8')
@@ -0,0 +1,122 @@
+# core/services/model_metadata.py
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import translation
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+
+class ModelMetadataRegistry:
+    """
+    Метаданные моделей для UniversalAPIView (action=form-structure, action=model-meta, ?app=...).
+
+    Структура моделей не меняется во время работы процесса, поэтому описания полей собираются
+    один раз (при первом обращении к get_instance), а готовые ответы хранятся как JSON с ETag
+    по каждому языку и строятся при первом запросе (warm() - подготовить все заранее).
+
+        body, etag = ModelMetadataRegistry.get_instance().get_blob('form-structure', 'producers.brands')
+    """
+    FORM_STRUCTURE = 'form-structure'
+    MODEL_META = 'model-meta'
+    APP_MODELS = 'app-models'
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        from core.serializers import get_app_models, get_model_field_info
+
+        self._payloads: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for model in apps.get_models():
+            fields = get_model_field_info(model)
+            label = model._meta.label_lower
+            self._payloads[(self.FORM_STRUCTURE, label)] = {
+                'success': True,
+                'model': model.__name__,
+                'app': model._meta.app_label,
+                'fields': fields,
+            }
+            self._payloads[(self.MODEL_META, label)] = {
+                'success': True,
+                'data': {
+                    'model': model.__name__,
+                    'app': model._meta.app_label,
+                    'verbose_name': model._meta.verbose_name,
+                    'verbose_name_plural': model._meta.verbose_name_plural,
+                    'db_table': model._meta.db_table,
+                    'abstract': model._meta.abstract,
+                    'fields': fields,
+                    'has_structured_data': hasattr(model, 'get_compact_data'),
+                },
+            }
+        for app_config in apps.get_app_configs():
+            self._payloads[(self.APP_MODELS, app_config.label)] = {
+                'success': True,
+                'app': app_config.label,
+                'models': get_app_models(app_config.label),
+            }
+        self._blobs: Dict[Tuple[str, str, str], Tuple[bytes, str]] = {}
+        self._blobs_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'ModelMetadataRegistry':
+        """Реестр для текущего процесса (строится при первом обращении)"""
+        instance = cls._instance
+        if instance is not None:
+            return instance
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def invalidate(cls):
+        """Сбросить реестр - следующий get_instance построит его заново"""
+        cls._instance = None
+
+    def warm(self, language: Optional[str] = None) -> int:
+        """Подготовить ответы всех моделей и приложений для языка (по умолчанию LANGUAGE_CODE)"""
+        language = language or settings.LANGUAGE_CODE
+        for kind, key in list(self._payloads):
+            self.get_blob(kind, key, language)
+        return len(self._payloads)
+
+    def get_blob(self, kind: str, key: str, language: Optional[str] = None) -> Optional[Tuple[bytes, str]]:
+        """
+        Готовый JSON-ответ и его ETag
+
+        Args:
+            kind: FORM_STRUCTURE, MODEL_META или APP_MODELS
+            key: 'app_label.modelname' (без учета регистра имени модели) или метка приложения
+            language: язык подписей (по умолчанию - текущий активный)
+
+        Returns:
+            (body, etag) или None, если модель/приложение не найдены
+        """
+        if kind != self.APP_MODELS:
+            key = key.lower()
+        language = language or translation.get_language() or settings.LANGUAGE_CODE
+        cache_key = (kind, key, language)
+        blob = self._blobs.get(cache_key)
+        if blob is not None:
+            return blob
+        payload = self._payloads.get((kind, key))
+        if payload is None:
+            return None
+        with translation.override(language):
+            body = json.dumps(payload, cls=JSONEncoder, ensure_ascii=False).encode('utf-8')
+        blob = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        with self._blobs_lock:
+            self._blobs[cache_key] = blob
+        return blob
+
+    def labels(self, kind: str) -> List[str]:
+        """Ключи, для которых есть метаданные вида kind"""
+        return sorted(key for payload_kind, key in self._payloads if payload_kind == kind)
@@ -0,0 +1,241 @@
+# core/services/request_metrics.py
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+
+class RequestStats:
+    """Показатели одного запроса: SQL, кеши, резолверы GraphQL"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.label: Optional[str] = None
+        self.started_at = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.cache_hits: Dict[str, int] = {}
+        self.cache_misses: Dict[str, int] = {}
+        self.resolvers: Dict[str, List[float]] = {}  # 'Type.field' -> [вызовы, секунды]
+        self.token = None
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        """connection.execute_wrapper: время и количество SQL-запросов"""
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started_at
+            self.queries += 1
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Метрики запросов процесса (включаются settings.REQUEST_METRICS['ENABLED']).
+
+    По метке запроса (имя представления или операция GraphQL) копятся количество, время
+    ответа (с гистограммой), время SQL и Python, число SQL-запросов, ошибки 5xx; отдельно -
+    попадания в кеши и время резолверов GraphQL. Запросы дольше SLOW_REQUEST_MS попадают
+    в кольцевой буфер медленных запросов (DebugAPIView). Метрики отдаются в текстовом формате
+    Prometheus (RequestMetricsView). Значения свои у каждого процесса.
+    """
+    PREFIX = 'dproject'
+    DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    OTHER_LABEL = 'other'
+
+    _lock = threading.Lock()
+    _views: Dict[str, Dict[str, Any]] = {}
+    _caches: Dict[str, List[int]] = {}  # имя кеша -> [попадания, промахи]
+    _resolvers: Dict[str, List[float]] = {}
+    _slow_requests: deque = deque(maxlen=100)
+
+    @staticmethod
+    def config() -> Dict[str, Any]:
+        """settings.REQUEST_METRICS поверх значений по умолчанию"""
+        config = {
+            'ENABLED': False,
+            'SLOW_REQUEST_MS': 500,
+            'SLOW_BUFFER_SIZE': 100,
+            'RESOLVER_TIMING': True,
+            'MAX_LABELS': 300,
+            'TOKEN': None,
+        }
+        config.update(getattr(settings, 'REQUEST_METRICS', None) or {})
+        return config
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(cls.config()['ENABLED'])
+
+    # ==================== ТЕКУЩИЙ ЗАПРОС ====================
+
+    @staticmethod
+    def start(method: str, path: str) -> RequestStats:
+        stats = RequestStats(method, path)
+        stats.token = _current_stats.set(stats)
+        return stats
+
+    @staticmethod
+    def current() -> Optional[RequestStats]:
+        return _current_stats.get()
+
+    @staticmethod
+    def set_label(label: str):
+        """Метка текущего запроса (например, операция GraphQL вместо имени представления)"""
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.label = label
+
+    @staticmethod
+    def record_cache(name: str, hit: bool):
+        """Обращение к кешу name в текущем запросе"""
+        stats = _current_stats.get()
+        if stats is not None:
+            counters = stats.cache_hits if hit else stats.cache_misses
+            counters[name] = counters.get(name, 0) + 1
+
+    @staticmethod
+    def record_resolver(field: str, seconds: float):
+        stats = _current_stats.get()
+        if stats is not None:
+            entry = stats.resolvers.setdefault(field, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    @classmethod
+    def finish(cls, stats: RequestStats, status_code: int, default_label: str):
+        """Закрыть запрос: перенести показатели в метрики процесса"""
+        try:
+            _current_stats.reset(stats.token)
+        except ValueError:
+            # Потоковый ответ дочитан в другом контексте (ASGI)
+            _current_stats.set(None)
+        duration = time.perf_counter() - stats.started_at
+        config = cls.config()
+        with cls._lock:
+            label = stats.label or default_label
+            if label not in cls._views and len(cls._views) >= config['MAX_LABELS']:
+                label = cls.OTHER_LABEL
+            view = cls._views.get(label)
+            if view is None:
+                view = cls._views[label] = {
+                    'requests': 0, 'errors': 0, 'duration': 0.0, 'sql_time': 0.0, 'queries': 0,
+                    'buckets': [0] * len(cls.DURATION_BUCKETS),
+                }
+            view['requests'] += 1
+            view['errors'] += status_code >= 500
+            view['duration'] += duration
+            view['sql_time'] += stats.sql_time
+            view['queries'] += stats.queries
+            for index, bound in enumerate(cls.DURATION_BUCKETS):
+                if duration <= bound:
+                    view['buckets'][index] += 1
+            for name, count in stats.cache_hits.items():
+                cls._caches.setdefault(name, [0, 0])[0] += count
+            for name, count in stats.cache_misses.items():
+                cls._caches.setdefault(name, [0, 0])[1] += count
+            for field, (calls, seconds) in stats.resolvers.items():
+                entry = cls._resolvers.setdefault(field, [0, 0.0])
+                entry[0] += calls
+                entry[1] += seconds
+
+            if duration * 1000 >= config['SLOW_REQUEST_MS']:
+                if cls._slow_requests.maxlen != config['SLOW_BUFFER_SIZE']:
+                    cls._slow_requests = deque(cls._slow_requests, maxlen=config['SLOW_BUFFER_SIZE'])
+                top_resolvers = sorted(stats.resolvers.items(), key=lambda item: -item[1][1])[:10]
+                cls._slow_requests.append({
+                    'label': label,
+                    'method': stats.method,
+                    'path': stats.path,
+                    'status': status_code,
+                    'finished_at': time.time(),
+                    'duration_ms': round(duration * 1000, 1),
+                    'sql_ms': round(stats.sql_time * 1000, 1),
+                    'python_ms': round((duration - stats.sql_time) * 1000, 1),
+                    'queries': stats.queries,
+                    'cache_hits': sum(stats.cache_hits.values()),
+                    'cache_misses': sum(stats.cache_misses.values()),
+                    'resolvers': [{'field': field, 'calls': calls, 'ms': round(seconds * 1000, 1)}
+                                  for field, (calls, seconds) in top_resolvers],
+                })
+
+    # ==================== ОТЧЕТЫ ====================
+
+    @classmethod
+    def slow_requests(cls, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Медленные запросы из кольцевого буфера, самые долгие первыми"""
+        with cls._lock:
+            requests = sorted(cls._slow_requests, key=lambda item: -item['duration_ms'])
+        return requests[:limit] if limit else requests
+
+    @classmethod
+    def prometheus_text(cls) -> str:
+        """Метрики процесса в текстовом формате Prometheus 0.0.4"""
+        prefix = cls.PREFIX
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+
+        with cls._lock:
+            views = {label: dict(values, buckets=list(values['buckets'])) for label, values in cls._views.items()}
+            caches = {name: list(values) for name, values in cls._caches.items()}
+            resolvers = {field: list(values) for field, values in cls._resolvers.items()}
+
+        family('requests_total', 'counter', 'Requests by view or GraphQL operation')
+        for label, values in sorted(views.items()):
+            lines.append(f'{prefix}_requests_total{{view="{_escape(label)}"}} {values["requests"]}')
+        family('request_errors_total', 'counter', 'Responses with status 5xx')
+        for label, values in sorted(views.items()):
+            lines.append(f'{prefix}_request_errors_total{{view="{_escape(label)}"}} {values["errors"]}')
+        family('request_duration_seconds', 'histogram', 'Response time')
+        for label, values in sorted(views.items()):
+            view = _escape(label)
+            for bound, count in zip(cls.DURATION_BUCKETS, values['buckets']):
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {values["requests"]}')
+            lines.append(f'{prefix}_request_duration_seconds_sum{{view="{view}"}} {values["duration"]:.6f}')
+            lines.append(f'{prefix}_request_duration_seconds_count{{view="{view}"}} {values["requests"]}')
+        family('request_sql_seconds_total', 'counter', 'Time spent in SQL')
+        for label, values in sorted(views.items()):
+            lines.append(f'{prefix}_request_sql_seconds_total{{view="{_escape(label)}"}} {values["sql_time"]:.6f}')
+        family('request_python_seconds_total', 'counter', 'Response time outside SQL')
+        for label, values in sorted(views.items()):
+            python_time = values['duration'] - values['sql_time']
+            lines.append(f'{prefix}_request_python_seconds_total{{view="{_escape(label)}"}} {python_time:.6f}')
+        family('request_sql_queries_total', 'counter', 'SQL queries')
+        for label, values in sorted(views.items()):
+            lines.append(f'{prefix}_request_sql_queries_total{{view="{_escape(label)}"}} {values["queries"]}')
+        family('cache_hits_total', 'counter', 'Cache hits')
+        for name, (hits, misses) in sorted(caches.items()):
+            lines.append(f'{prefix}_cache_hits_total{{cache="{_escape(name)}"}} {hits}')
+        family('cache_misses_total', 'counter', 'Cache misses')
+        for name, (hits, misses) in sorted(caches.items()):
+            lines.append(f'{prefix}_cache_misses_total{{cache="{_escape(name)}"}} {misses}')
+        family('graphql_resolver_calls_total', 'counter', 'GraphQL resolver calls')
+        for field, (calls, seconds) in sorted(resolvers.items()):
+            lines.append(f'{prefix}_graphql_resolver_calls_total{{field="{_escape(field)}"}} {int(calls)}')
+        family('graphql_resolver_seconds_total', 'counter', 'GraphQL resolver time (child fields counted separately)')
+        for field, (calls, seconds) in sorted(resolvers.items()):
+            lines.append(f'{prefix}_graphql_resolver_seconds_total{{field="{_escape(field)}"}} {seconds:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._views = {}
+            cls._caches = {}
+            cls._resolvers = {}
+            cls._slow_requests = deque(maxlen=cls.config()['SLOW_BUFFER_SIZE'])
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,150 @@
+# core/services/staged_import.py
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StagedImport:
+    """Подготовленный импорт: прочитанный лист и данные для шага подтверждения"""
+
+    def __init__(self, import_id: str, frame: pd.DataFrame, meta: Dict[str, Any]):
+        self.import_id = import_id
+        self.frame = frame
+        self.meta = meta
+
+
+class StagedImportStore:
+    """
+    Хранилище подготовленных импортов на диске (вместо файла в сессии).
+
+    Лист, прочитанный и сопоставленный со справочниками на первом шаге, сохраняется по
+    столбцам в .npz: числовые столбцы - массивами numpy, остальные - JSON (без pickle).
+    В сессии остается только import_id. Файлы старше TTL удаляются при сохранении новых.
+
+    Настройки - settings.STAGED_IMPORTS: DIR (None - подкаталог временного каталога), TTL (секунды).
+    """
+    DEFAULT_TTL = 60 * 60
+    _ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+    _META_KEY = '__meta__'
+
+    # ==================== ПУБЛИЧНЫЕ МЕТОДЫ ====================
+
+    @classmethod
+    def stage(cls, frame: pd.DataFrame, meta: Optional[Dict[str, Any]] = None) -> str:
+        """Сохранить лист и данные импорта (meta - JSON-совместимый словарь), вернуть import_id"""
+        cls.cleanup()
+        import_id = uuid.uuid4().hex
+        arrays = {}
+        columns = []
+        for index, (name, series) in enumerate(frame.items()):
+            key = f'c{index}'
+            if series.dtype.kind in 'biuf':
+                arrays[key] = series.to_numpy()
+                columns.append({'name': str(name), 'kind': 'array'})
+            else:
+                values = [None if cls._is_missing(value) else cls._to_json_value(value) for value in series]
+                arrays[key] = np.array(json.dumps(values, ensure_ascii=False, default=str))
+                columns.append({'name': str(name), 'kind': 'json'})
+        arrays[cls._META_KEY] = np.array(json.dumps({'columns': columns, 'meta': meta or {}}, ensure_ascii=False))
+
+        path = cls._path(import_id)
+        # Запись во временный файл и переименование - load() не увидит недописанный файл
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            np.savez_compressed(file, **arrays)
+        os.replace(temp_path, path)
+        logger.debug("Импорт подготовлен: %s (%d строк)", import_id, len(frame))
+        return import_id
+
+    @classmethod
+    def load(cls, import_id: str) -> Optional[StagedImport]:
+        """Подготовленный импорт или None (неизвестный, удаленный или устаревший import_id)"""
+        if not cls._is_valid_id(import_id):
+            return None
+        path = cls._path(import_id)
+        try:
+            if time.time() - os.path.getmtime(path) > cls._ttl():
+                cls.discard(import_id)
+                return None
+            with np.load(path, allow_pickle=False) as data:
+                header = json.loads(str(data[cls._META_KEY]))
+                frame = pd.DataFrame({
+                    column['name']: data[f'c{index}'] if column['kind'] == 'array'
+                    else pd.Series(json.loads(str(data[f'c{index}'])), dtype=object)
+                    for index, column in enumerate(header['columns'])
+                })
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Не удалось прочитать подготовленный импорт %s: %s", import_id, e)
+            return None
+        return StagedImport(import_id, frame, header['meta'])
+
+    @classmethod
+    def discard(cls, import_id: str):
+        """Удалить подготовленный импорт"""
+        if not cls._is_valid_id(import_id):
+            return
+        try:
+            os.remove(cls._path(import_id))
+        except OSError:
+            pass
+
+    @classmethod
+    def cleanup(cls) -> int:
+        """Удалить устаревшие подготовленные импорты, вернуть их количество"""
+        directory = cls._directory()
+        expire_before = time.time() - cls._ttl()
+        removed = 0
+        for entry in os.scandir(directory):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < expire_before:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info("Удалено устаревших подготовленных импортов: %d", removed)
+        return removed
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    @staticmethod
+    def _settings() -> Dict[str, Any]:
+        return getattr(settings, 'STAGED_IMPORTS', {}) or {}
+
+    @classmethod
+    def _ttl(cls) -> int:
+        return cls._settings().get('TTL', cls.DEFAULT_TTL)
+
+    @classmethod
+    def _directory(cls) -> str:
+        directory = cls._settings().get('DIR') or os.path.join(tempfile.gettempdir(), 'staged_imports')
+        os.makedirs(directory, exist_ok=True)
+        return str(directory)
+
+    @classmethod
+    def _path(cls, import_id: str) -> str:
+        return os.path.join(cls._directory(), f'{import_id}.npz')
+
+    @classmethod
+    def _is_valid_id(cls, import_id) -> bool:
+        return isinstance(import_id, str) and bool(cls._ID_PATTERN.match(import_id))
+
+    @staticmethod
+    def _is_missing(value) -> bool:
+        return value is None or (np.ndim(value) == 0 and bool(pd.isna(value)))
+
+    @staticmethod
+    def _to_json_value(value):
+        # numpy-скаляры (np.int64 и т.п.) -> значения Python
+        return value.item() if isinstance(value, np.generic) else value
@@ -0,0 +1,44 @@
+# core/signals.py
+import logging
+
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+logger = logging.getLogger(__name__)
+
+
+def invalidate_graphql_response_cache(sender, **kwargs):
+    """Сбрасывает кешированные результаты GraphQL, зависящие от приложения измененной модели"""
+    from core.graphql import GraphQLResponseCache
+
+    meta = getattr(sender, '_meta', None)
+    if meta is None:
+        return
+    if meta.auto_created:
+        # Промежуточная модель ManyToMany (m2m_changed) - приложение модели, в которой объявлено поле
+        meta = meta.auto_created._meta
+    if GraphQLResponseCache.is_enabled():
+        GraphQLResponseCache.invalidate(meta.app_label)
+        logger.debug("Кеш результатов GraphQL сброшен: %s.%s", meta.app_label, meta.model_name)
+
+
+def connect_graphql_response_cache_signals():
+    """
+    Подключает сброс кеша результатов GraphQL только к моделям приложений, от которых
+    зависят кешируемые поля (GraphQLResponseCache.tracked_apps()), - сессии, миграции
+    и фоновые задачи кеш не сбрасывают. Вызывается из CoreConfig.ready().
+    """
+    from django.apps import apps
+    from core.graphql.response_cache import GraphQLResponseCache
+
+    tracked_apps = GraphQLResponseCache.tracked_apps()
+    if not tracked_apps:
+        return
+    for model in apps.get_models(include_auto_created=True):
+        if model._meta.app_label not in tracked_apps:
+            continue
+        dispatch_uid = f'graphql_response_cache_{model._meta.label_lower}'
+        if model._meta.auto_created:
+            m2m_changed.connect(invalidate_graphql_response_cache, sender=model, dispatch_uid=dispatch_uid)
+        else:
+            post_save.connect(invalidate_graphql_response_cache, sender=model, dispatch_uid=dispatch_uid)
+            post_delete.connect(invalidate_graphql_response_cache, sender=model, dispatch_uid=dispatch_uid)
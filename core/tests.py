@@ -1,3 +1,456 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils.module_loading import autodiscover_modules
+from graphql import GraphQLError, parse
+
+from core.graphql import GraphQLResponseCache, PersistedQueryNotFound, PersistedQueryStore
+from core.graphql.pagination import CursorPaginator
+from core.graphql.validation import QueryCostEstimator
+from core.models import BackgroundJob
+from core.services import (
+    BenchmarkSuite, JobQueue, JobWorker, ModelMetadataRegistry, StagedImportStore, iter_json_list,
+    json_list_response,
+)
+from djangoProject1.graphql_api.schema import schema
+
+
+class BenchmarkBaselineTests(TransactionTestCase):
+    """
+    Сценарии run_benchmarks на данных базовой линии: количество SQL-запросов каждого сценария
+    должно совпадать с benchmarks_baseline.json. Время и память проверяет только run_benchmarks -
+    они зависят от машины. После намеренного изменения запросов базовую линию нужно перезаписать
+    (manage.py run_benchmarks --update-baseline).
+
+    TransactionTestCase: внутри транзакции TestCase блоки atomic сценариев выполняют
+    дополнительные SAVEPOINT, и количество запросов расходится с run_benchmarks.
+    """
+    serialized_rollback = True
+
+    def test_query_counts_match_baseline(self):
+        autodiscover_modules('benchmarks')
+        baseline = BenchmarkSuite.load_baseline(str(BenchmarkSuite.config()['BASELINE']))
+        self.assertIsNotNone(baseline, 'Нет базовой линии бенчмарков')
+        self.assertEqual(sorted(BenchmarkSuite.cases()), sorted(baseline['cases']),
+                         'Сценарии и базовая линия расходятся - перезапишите базовую линию')
+
+        BenchmarkSuite.seed(baseline['scale'])
+        results = BenchmarkSuite.run(repeat=1)
+        for result in results:
+            with self.subTest(case=result['name']):
+                self.assertEqual(result['queries'], baseline['cases'][result['name']]['queries'])
+        self.assertEqual(BenchmarkSuite.compare(results, baseline, -1, -1), [])
+
+
+class BenchmarkCompareTests(SimpleTestCase):
+    BASELINE = {'cases': {'case': {'wall_ms': 100.0, 'peak_kb': 1000.0, 'queries': 5}}}
+
+    @staticmethod
+    def result(wall_ms=100.0, peak_kb=1000.0, queries=5):
+        return [{'name': 'case', 'wall_ms': wall_ms, 'peak_kb': peak_kb, 'queries': queries}]
+
+    def test_any_extra_query_is_regression(self):
+        self.assertEqual(len(BenchmarkSuite.compare(self.result(queries=6), self.BASELINE, 0.5, 0.25)), 1)
+        self.assertEqual(BenchmarkSuite.compare(self.result(queries=4), self.BASELINE, 0.5, 0.25), [])
+
+    def test_time_and_memory_tolerance(self):
+        self.assertEqual(BenchmarkSuite.compare(self.result(wall_ms=149, peak_kb=1249), self.BASELINE, 0.5, 0.25), [])
+        self.assertEqual(len(BenchmarkSuite.compare(self.result(wall_ms=151, peak_kb=1300), self.BASELINE,
+                                                    0.5, 0.25)), 2)
+
+    def test_negative_tolerance_disables_check(self):
+        self.assertEqual(BenchmarkSuite.compare(self.result(wall_ms=1000, peak_kb=9000), self.BASELINE, -1, -1), [])
+
+    def test_unknown_case_is_skipped(self):
+        result = [{'name': 'new', 'wall_ms': 1.0, 'peak_kb': 1.0, 'queries': 100}]
+        self.assertEqual(BenchmarkSuite.compare(result, self.BASELINE, 0.5, 0.25), [])
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        for i in range(7):
+            User.objects.create(username=f'user{i}', is_staff=bool(i % 2))
+            Group.objects.create(name=f'group{i}')
+
+    def collect(self, queryset, ordering, first):
+        items, after = [], None
+        while True:
+            page = CursorPaginator(queryset, ordering).paginate(first=first, after=after)
+            items += page.items
+            if not page.page_info['has_next_page']:
+                return items
+            after = page.page_info['end_cursor']
+
+    def test_pages_cover_queryset_in_order(self):
+        groups = Group.objects.all()
+        self.assertEqual(self.collect(groups, ['name', 'id'], 3), list(groups.order_by('name', 'id')))
+        self.assertEqual(self.collect(groups, ['-name', 'id'], 2), list(groups.order_by('-name', 'id')))
+
+    def test_ties_in_leading_field(self):
+        users = get_user_model().objects.all()
+        self.assertEqual(self.collect(users, ['-is_staff', 'id'], 2), list(users.order_by('-is_staff', 'id')))
+
+    def test_last_page(self):
+        page = CursorPaginator(Group.objects.all(), ['id']).paginate(first=7)
+        self.assertEqual(len(page.items), 7)
+        self.assertFalse(page.page_info['has_next_page'])
+        empty = CursorPaginator(Group.objects.all(), ['id']).paginate(first=3, after=page.page_info['end_cursor'])
+        self.assertEqual(empty.items, [])
+        self.assertIsNone(empty.page_info['end_cursor'])
+
+    @override_settings(GRAPHQL_QUERY_LIMITS={'MAX_PAGE_SIZE': 5, 'COUNT_LIMIT': 4})
+    def test_limits(self):
+        self.assertEqual(CursorPaginator.page_size(None), 5)
+        self.assertEqual(CursorPaginator.page_size(100), 5)
+        self.assertEqual(CursorPaginator.page_size(0), 0)
+        page = CursorPaginator(Group.objects.all(), ['id']).paginate(first=2, with_total_count=True)
+        self.assertEqual(page.page_info['total_count'], 4)
+        self.assertFalse(page.page_info['total_count_is_exact'])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(GraphQLError):
+            CursorPaginator.page_size(-1)
+        with self.assertRaises(GraphQLError):
+            CursorPaginator(Group.objects.all(), ['name', 'id']).paginate(first=2, after='not-a-cursor')
+
+
+class QueryCostEstimatorTests(SimpleTestCase):
+    def estimate(self, query, variables=None):
+        document = parse(query)
+        estimator = QueryCostEstimator(schema.graphql_schema, document, variables)
+        return estimator.estimate(document.definitions[0])
+
+    def test_list_without_first_uses_default_size(self):
+        self.assertEqual(self.estimate('{ eaAllElectricActuatorData { id modelLine { id } } }'), 20 + 20)
+
+    def test_first_on_page_applies_to_items(self):
+        query = '{ valveLinesPage(first: 50) { items { id } pageInfo { hasNextPage } } }'
+        self.assertEqual(self.estimate(query), 1 + 50 + 1)
+
+    def test_first_from_variables(self):
+        query = 'query ($n: Int) { valveLinesPage(first: $n) { items { id } } }'
+        self.assertEqual(self.estimate(query, {'n': 10}), 1 + 10)
+
+    @override_settings(GRAPHQL_QUERY_LIMITS={'MAX_COST': 100})
+    def test_check_rejects_expensive_operation(self):
+        document = parse('{ valveLinesPage(first: 200) { items { id } } }')
+        estimator = QueryCostEstimator(schema.graphql_schema, document)
+        self.assertIsInstance(estimator.check(document.definitions[0]), GraphQLError)
+        document = parse('{ valveLinesPage(first: 10) { items { id } } }')
+        self.assertIsNone(QueryCostEstimator(schema.graphql_schema, document).check(document.definitions[0]))
+
+
+class PersistedQueryTests(TestCase):
+    QUERY = '{ __typename }'
+
+    def setUp(self):
+        PersistedQueryStore.clear()
+
+    def post(self, payload):
+        return self.client.post('/graphql/', json.dumps(payload), content_type='application/json')
+
+    def test_store(self):
+        query_hash = PersistedQueryStore.save_query(self.QUERY)
+        self.assertEqual(query_hash, PersistedQueryStore.query_hash(self.QUERY))
+        self.assertEqual(PersistedQueryStore.get_query(query_hash), self.QUERY)
+        with self.assertRaises(PersistedQueryNotFound):
+            PersistedQueryStore.get_query('0' * 64)
+        with self.assertRaises(ValueError):
+            PersistedQueryStore.save_query(self.QUERY, '0' * 64)
+
+    def test_document_is_parsed_once(self):
+        document, _ = PersistedQueryStore.get_document(schema.graphql_schema, self.QUERY)
+        self.assertIs(PersistedQueryStore.get_document(schema.graphql_schema, self.QUERY)[0], document)
+        document, errors = PersistedQueryStore.get_document(schema.graphql_schema, '{ unknownField }')
+        self.assertIsNotNone(document)
+        self.assertTrue(errors)
+
+    def test_apollo_protocol(self):
+        extensions = {'persistedQuery': {'version': 1, 'sha256Hash': PersistedQueryStore.query_hash(self.QUERY)}}
+
+        response = self.post({'extensions': extensions})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['errors'][0]['message'], 'PersistedQueryNotFound')
+
+        response = self.post({'query': self.QUERY, 'extensions': extensions})
+        self.assertEqual(response.json(), {'data': {'__typename': 'Query'}})
+        response = self.post({'extensions': extensions})
+        self.assertEqual(response.json(), {'data': {'__typename': 'Query'}})
+
+    def test_hash_mismatch(self):
+        response = self.post({'query': self.QUERY, 'extensions': {'persistedQuery': {'sha256Hash': '0' * 64}}})
+        self.assertEqual(response.status_code, 400)
+
+
+class GraphQLResponseCacheTests(TransactionTestCase):
+    """TransactionTestCase: результаты внутри транзакции не кешируются (CachedGraphQLView)"""
+    QUERY = '{ paramsIpOptions { id code } }'
+    serialized_rollback = True
+
+    def setUp(self):
+        GraphQLResponseCache.invalidate()
+
+    def post(self, query):
+        return self.client.post('/graphql/', json.dumps({'query': query}), content_type='application/json')
+
+    def test_operation_apps(self):
+        def apps(query):
+            document = parse(query)
+            return GraphQLResponseCache.apps_for_operation(schema.graphql_schema, document, document.definitions[0])
+
+        self.assertEqual(apps(self.QUERY), ['params'])
+        self.assertIsNone(apps('{ eaAllModelLines { id } }'))
+        self.assertIsNone(apps('{ paramsIpOptions { id } eaAllModelLines { id } }'))
+        self.assertIn('params', GraphQLResponseCache.tracked_apps())
+
+    def test_repeated_query_is_served_from_cache(self):
+        first = self.post(self.QUERY).json()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.post(self.QUERY).json(), first)
+
+    def test_model_change_invalidates_cached_result(self):
+        from params.models import IpOption
+
+        self.post(self.QUERY)
+        key = GraphQLResponseCache.make_key('hash', None, None, ['params'])
+        option = IpOption.objects.create(name='IP99', code='ip99', ip_rank=99)
+        self.assertNotEqual(GraphQLResponseCache.make_key('hash', None, None, ['params']), key)
+        codes = [item['code'] for item in self.post(self.QUERY).json()['data']['paramsIpOptions']]
+        self.assertIn(option.code, codes)
+
+
+class StagedImportStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.settings_override = override_settings(STAGED_IMPORTS={'DIR': self.directory, 'TTL': 60})
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_round_trip(self):
+        frame = pd.DataFrame({
+            'id': [1, 2, 3],
+            'value': [1.5, np.nan, 3.0],
+            'name': ['a', None, 'в'],
+            'mixed': [np.int64(7), 'x', None],
+        })
+        import_id = StagedImportStore.stage(frame, {'table_id': 5, 'delete': [[1, 2]]})
+
+        staged = StagedImportStore.load(import_id)
+        self.assertEqual(staged.meta, {'table_id': 5, 'delete': [[1, 2]]})
+        self.assertEqual(list(staged.frame.columns), ['id', 'value', 'name', 'mixed'])
+        self.assertEqual(staged.frame['id'].tolist(), [1, 2, 3])
+        self.assertTrue(np.isnan(staged.frame['value'][1]))
+        self.assertEqual(staged.frame['name'].tolist(), ['a', None, 'в'])
+        self.assertEqual(staged.frame['mixed'].tolist(), [7, 'x', None])
+
+    def test_discard_and_invalid_id(self):
+        import_id = StagedImportStore.stage(pd.DataFrame({'a': [1]}))
+        StagedImportStore.discard(import_id)
+        self.assertIsNone(StagedImportStore.load(import_id))
+        self.assertIsNone(StagedImportStore.load('../../etc/passwd'))
+        self.assertIsNone(StagedImportStore.load(None))
+
+    def test_expired_import(self):
+        import_id = StagedImportStore.stage(pd.DataFrame({'a': [1]}))
+        with override_settings(STAGED_IMPORTS={'DIR': self.directory, 'TTL': -1}):
+            self.assertIsNone(StagedImportStore.load(import_id))
+            self.assertEqual(StagedImportStore.cleanup(), 0)
+        self.assertIsNone(StagedImportStore.load(import_id))
+
+
+class JobQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        JobQueue.discover()
+        JobQueue.register('core.tests.echo', lambda context: {'echo': context.params.get('value')})
+        JobQueue.register('core.tests.fail', cls.fail_job)
+        JobQueue.register('core.tests.progress', cls.progress_job)
+
+    @classmethod
+    def tearDownClass(cls):
+        for job_type in ('core.tests.echo', 'core.tests.fail', 'core.tests.progress'):
+            JobQueue._handlers.pop(job_type, None)
+            JobQueue._titles.pop(job_type, None)
+        super().tearDownClass()
+
+    @staticmethod
+    def fail_job(context):
+        raise ValueError('boom')
+
+    @staticmethod
+    def progress_job(context):
+        BackgroundJob.objects.filter(pk=context.job.pk).update(cancel_requested=True)
+        context.progress(50, 100, 'half', force=True)
+        return {'finished': True}
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.author = User.objects.create(username='author')
+        cls.other = User.objects.create(username='other')
+        cls.staff = User.objects.create(username='staff', is_staff=True)
+
+    def test_unknown_job_type(self):
+        with self.assertRaises(ValueError):
+            JobQueue.enqueue('core.tests.unknown')
+
+    def test_claim_and_run(self):
+        job = JobQueue.enqueue('core.tests.echo', params={'value': 42}, user=self.author)
+        claimed = JobQueue.claim('worker-1')
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, BackgroundJob.STATUS_RUNNING)
+        self.assertIsNone(JobQueue.claim('worker-2'))
+
+        JobQueue.run(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_SUCCEEDED)
+        self.assertEqual(job.result, {'echo': 42})
+        self.assertEqual(job.worker, 'worker-1')
+        self.assertIsNotNone(job.expires_at)
+
+    def test_failed_job(self):
+        job = JobQueue.enqueue('core.tests.fail')
+        with self.assertLogs('core.services.jobs', 'ERROR'):
+            JobQueue.run(JobQueue.claim('worker'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_FAILED)
+        self.assertEqual(job.error, 'ValueError: boom')
+
+    def test_cancel_queued_job(self):
+        job = JobQueue.enqueue('core.tests.echo')
+        self.assertEqual(JobQueue.cancel(job.pk).status, BackgroundJob.STATUS_CANCELLED)
+        self.assertIsNone(JobQueue.claim('worker'))
+
+    def test_cancel_running_job(self):
+        job = JobQueue.enqueue('core.tests.progress')
+        claimed = JobQueue.claim('worker')
+        self.assertEqual(JobQueue.cancel(job.pk).status, BackgroundJob.STATUS_RUNNING)
+        JobQueue.run(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_CANCELLED)
+        self.assertIsNone(job.result)
+
+    def test_worker_runs_queued_jobs(self):
+        for value in range(3):
+            JobQueue.enqueue('core.tests.echo', params={'value': value})
+        self.assertEqual(JobWorker('test').run(exit_when_idle=True), 3)
+        self.assertEqual(BackgroundJob.objects.filter(status=BackgroundJob.STATUS_SUCCEEDED).count(), 3)
+
+    def test_visibility(self):
+        job = JobQueue.enqueue('core.tests.echo', user=self.author)
+        self.assertTrue(job.is_visible_to(self.author))
+        self.assertTrue(job.is_visible_to(self.staff))
+        self.assertFalse(job.is_visible_to(self.other))
+
+        anonymous_job = JobQueue.enqueue('core.tests.echo')
+        self.assertTrue(anonymous_job.is_visible_to(self.staff))
+        self.assertFalse(anonymous_job.is_visible_to(self.author))
+
+    def test_status_api(self):
+        job = JobQueue.enqueue('core.tests.echo', user=self.author)
+        url = f'/api/core/jobs/{job.pk}/'
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.post(f'{url}cancel/').status_code, 404)
+
+        self.client.force_login(self.author)
+        self.assertEqual(self.client.get(url).json()['status'], BackgroundJob.STATUS_QUEUED)
+        self.assertEqual(self.client.post(f'{url}cancel/').json()['status'], BackgroundJob.STATUS_CANCELLED)
+
+
+class ModelMetadataTests(TestCase):
+    URL = '/api/core/?model=producers.Brands&action=form-structure'
+
+    def test_etag_and_not_modified(self):
+        response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['model'], 'Brands')
+        etag = response['ETag']
+        self.assertEqual(ModelMetadataRegistry.get_instance().get_blob('form-structure', 'producers.brands')[1],
+                         etag)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_app_models(self):
+        response = self.client.get('/api/core/?app=producers')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['app'], 'producers')
+        self.assertEqual(self.client.get('/api/core/?app=unknown_app').status_code, 404)
+        self.assertIsNone(ModelMetadataRegistry.get_instance().get_blob('model-meta', 'producers.unknown'))
+
+
+class UniversalAPIListTests(TestCase):
+    URL = '/api/core/?model=auth.Group'
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            Group.objects.create(name=f'group{i}')
+
+    def test_stream_without_limit(self):
+        response = self.client.get(self.URL)
+        self.assertTrue(response.streaming)
+        payload = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(payload['count'], 5)
+        self.assertEqual([item['name'] for item in payload['data']], [f'group{i}' for i in range(5)])
+
+    def test_pages(self):
+        names, after = [], ''
+        while True:
+            payload = self.client.get(f'{self.URL}&limit=2&after={after}').json()
+            names += [item['name'] for item in payload['data']]
+            if not payload['has_next']:
+                break
+            after = payload['next_cursor']
+        self.assertEqual(names, [f'group{i}' for i in range(5)])
+
+    def test_invalid_limit(self):
+        for limit in ('0', '-1', 'abc'):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.client.get(f'{self.URL}&limit={limit}').status_code, 400)
+
+
+class JsonStreamTests(SimpleTestCase):
+    def test_envelope_and_count(self):
+        chunks = list(iter_json_list({'success': True}, ({'n': i} for i in range(250)), buffer_size=100))
+        self.assertGreater(len(chunks), 1)
+        payload = json.loads(''.join(chunks))
+        self.assertEqual(payload['success'], True)
+        self.assertEqual(payload['count'], 250)
+        self.assertEqual(payload['data'][-1], {'n': 249})
+
+    def test_empty_envelope(self):
+        self.assertEqual(json.loads(''.join(iter_json_list({}, []))), {'data': [], 'count': 0})
+
+    def test_error_after_first_chunk_keeps_json_valid(self):
+        def items():
+            for i in range(150):
+                yield i
+            raise RuntimeError('db error')
+
+        with self.assertLogs('core.services.json_stream', 'ERROR'):
+            payload = json.loads(''.join(iter_json_list({}, items(), buffer_size=100)))
+        self.assertEqual(payload['count'], 150)
+        self.assertIn('error', payload)
+
+    def test_error_before_response_is_raised(self):
+        def items():
+            raise RuntimeError('db error')
+            yield
+
+        with self.assertRaises(RuntimeError):
+            json_list_response({}, items())
@@ -1,8 +1,15 @@
 #core/urls.py
 from django.urls import path
-from .views import UniversalAPIView, DebugAPIView
+from .views import UniversalAPIView, DebugAPIView, JobStatusAPIView, JobCancelAPIView, JobResultFileAPIView, \
+    RequestMetricsView
 
 urlpatterns = [
     path('', UniversalAPIView.as_view(), name='universal_api'),  # Изменил name тоже
 path('debug/', DebugAPIView.as_view(), name='debug_api'),  # для теста
-]
\ No newline at end of file
+    # Метрики запросов в формате Prometheus (REQUEST_METRICS)
+    path('metrics/', RequestMetricsView.as_view(), name='request_metrics'),
+    # Фоновые задачи: состояние, отмена, файл результата
+    path('jobs/<uuid:job_id>/', JobStatusAPIView.as_view(), name='job_status'),
+    path('jobs/<uuid:job_id>/cancel/', JobCancelAPIView.as_view(), name='job_cancel'),
+    path('jobs/<uuid:job_id>/result/', JobResultFileAPIView.as_view(), name='job_result'),
+]
@@ -2,12 +2,37 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.apps import apps
+from django.conf import settings
 from django.db.models import Q
-from .serializers import get_model_serializer , get_model_field_info , get_app_models
+from django.http import Http404 , HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views import View
+from django.utils.cache import get_conditional_response
+from graphql import GraphQLError
+
+from .graphql.pagination import CursorPaginator
+from .serializers import get_model_serializer
+from .services.json_stream import json_list_response
+from .services.model_metadata import ModelMetadataRegistry
+from .services.request_metrics import RequestMetrics
 
 import logging
 
 logger = logging.getLogger(__name__)
+
+
+def get_universal_api_settings() -> dict :
+    """Параметры UniversalAPIView: settings.UNIVERSAL_API поверх значений по умолчанию"""
+    options = {
+        'DEFAULT_LIMIT' : None ,  # размер страницы без параметра limit (None - весь список потоком)
+        'MAX_LIMIT' : 500 ,  # максимум объектов на странице
+        'CHUNK_SIZE' : 500 ,  # размер пачки QuerySet.iterator() при потоковой отдаче
+        'MAX_DEPTH' : 5 ,  # максимальная глубина вложенности сериализатора
+    }
+    options.update(getattr(settings , 'UNIVERSAL_API' , None) or {})
+    return options
+
+
 class UniversalAPIView(APIView) :
     """
     Универсальная вьюха для работы с любыми моделями.
@@ -22,43 +47,29 @@ class UniversalAPIView(APIView) :
     - view: list, card, detail, badge (только для format=display)
     - depth: глубина вложенности сериализатора
     - include: список включений для full формата (form,metadata,related,certificates)
+    - limit: размер страницы списка (keyset-пагинация по первичному ключу)
+    - after: курсор следующей страницы (next_cursor из предыдущего ответа)
     - filter_field=value: фильтрация по полям
 
+    Список без limit отдается потоком (StreamingHttpResponse) - объекты читаются из БД пачками
+    и сразу кодируются в JSON, count пишется после data.
+
     Примеры запросов:
     GET /api/core/?model=pneumatic_actuators.PneumaticActuatorModelLine&id=1&format=compact
     GET /api/core/?model=pneumatic_actuators.PneumaticActuatorModelLine&format=display&view=card
     GET /api/core/?model=pneumatic_actuators.PneumaticActuatorModelLine&action=form-structure
+    GET /api/core/?model=producers.Brands&limit=50&after=<next_cursor>
     GET /api/core/?app=pneumatic_actuators
     """
-    def get(self , request) :
-
-
-        # Логируем ВСЕ параметры
-        logger.info(f"=== REQUEST PARAMS ===")
-        for key , value in request.query_params.items() :
-            logger.info(f"Key-Value:  {key}: {value}")
-
-        model_param = request.query_params.get('model')
-        logger.info(f"model param raw: '{model_param}'")
-
-        if model_param :
-            logger.info(f"model param type: {type(model_param)}")
-            logger.info(f"'.' in model_param: {'.' in model_param}")
-
-            if '.' in model_param :
-                try :
-                    app_name , model_name = model_param.split('.')
-                    logger.info(f"Split: app='{app_name}', model='{model_name}'")
+    # Служебные параметры запроса (остальные считаются фильтрами)
+    RESERVED_PARAMS = {'model' , 'app' , 'action' , 'id' , 'format' , 'view' , 'depth' , 'include' ,
+                       'limit' , 'after'}
+    # Модели, список которых по умолчанию отдается в формате compact
+    COMPACT_LIST_MODELS = {'PneumaticActuatorModelLine'}
 
-                    # Пробуем получить модель
-                    model = apps.get_model(app_name , model_name)
-                    logger.info(f"✅ Model found: {model}")
-                    logger.info(f"Objects count: {model.objects.count()}")
-
-                except Exception as e :
-                    logger.error(f"❌ Error: {str(e)}")
-                    import traceback
-                    logger.error(traceback.format_exc())
+    def get(self , request) :
+        options = get_universal_api_settings()
+        logger.debug("UniversalAPIView params: %s" , dict(request.query_params))
 
         model_name = request.query_params.get('model')
         app_name = request.query_params.get('app')
@@ -66,16 +77,11 @@ class UniversalAPIView(APIView) :
         data_format = request.query_params.get('format' , 'serializer')
         view_type = request.query_params.get('view' , 'detail')
         obj_id = request.query_params.get('id')
-        depth = int(request.query_params.get('depth' , 0))
-
-        logger.info(f"=== PROCESSING REQUEST ===")
-        logger.info(f"model_name: {model_name}")
-        logger.info(f"app_name: {app_name}")
-        logger.info(f"obj_id: {obj_id}")
-        logger.info(f"data_format: {data_format}")
-        logger.info(f"view_type: {view_type}")
-        logger.info(f"action: {action}")
-
+        try :
+            depth = min(max(int(request.query_params.get('depth' , 0)) , 0) , options['MAX_DEPTH'])
+        except ValueError :
+            return Response({'success' : False , 'error' : 'Parameter depth must be an integer'} ,
+                            status=status.HTTP_400_BAD_REQUEST)
 
         if not model_name and not app_name :
             return Response(
@@ -99,17 +105,13 @@ class UniversalAPIView(APIView) :
             )
         # Если запрошен список моделей приложения
         if app_name and not model_name :
-            models_list = get_app_models(app_name)
-            if models_list is None :
+            response = self._metadata_response(request , ModelMetadataRegistry.APP_MODELS , app_name)
+            if response is None :
                 return Response(
                     {"error" : f"App '{app_name}' not found"} ,
                     status=status.HTTP_404_NOT_FOUND ,
                 )
-            return Response({
-                "success" : True ,
-                "app" : app_name ,
-                "models" : models_list
-            })
+            return response
 
         if not model_name :
             return Response(
@@ -125,61 +127,15 @@ class UniversalAPIView(APIView) :
                 {"error" : f"Model {model_name} not found. Error: {str(e)}"} ,
                 status=status.HTTP_404_NOT_FOUND ,
             )
-        if model.__name__ == 'PneumaticActuatorModelLine' and not obj_id :
-            queryset = model.objects.all()
-            data = []
-            for obj in queryset :
-                try :
-                    data.append(obj.get_compact_data())
-                except Exception as e :
-                    data.append({'id' : obj.id , 'error' : str(e)})
 
-            return Response({
-                'test' : True ,
-                'count' : len(data) ,
-                'data' : data ,
-            })
+        # Методы StructuredDataMixin проверяются на классе, без создания экземпляра модели
+        has_structured_data = hasattr(model , 'get_compact_data')
+        if not obj_id and 'format' not in request.query_params and model.__name__ in self.COMPACT_LIST_MODELS :
+            data_format = 'compact'
 
-        logger.info(f"Model class: {model.__name__}")
-        logger.info(f"Model has get_compact_data: {hasattr(model() , 'get_compact_data')}")
-
-        # Если нет obj_id (список)
-        if not obj_id :
-            logger.info(f"Processing LIST request")
-            logger.info(f"data_format: {data_format}")
-
-            if data_format == 'compact' and hasattr(model() , 'get_compact_data') :
-                logger.info(f"Using get_compact_data() for list")
-                # ... твой код
-            else :
-                logger.info(f"Using serializer for list")
-
-
-        # Если запрошена мета-информация модели
-        if action == 'model-meta' :
-            meta_info = {
-                'model' : model.__name__ ,
-                'app' : model._meta.app_label ,
-                'verbose_name' : model._meta.verbose_name ,
-                'verbose_name_plural' : model._meta.verbose_name_plural ,
-                'db_table' : model._meta.db_table ,
-                'abstract' : model._meta.abstract ,
-                'fields' : get_model_field_info(model) ,
-                'has_structured_data' : hasattr(model() , 'get_compact_data') ,
-            }
-            return Response({
-                'success' : True ,
-                'data' : meta_info
-            })
-
-        # Если запрошена структура формы
-        if action == 'form-structure' :
-            return Response({
-                'success' : True ,
-                'model' : model.__name__ ,
-                'app' : app_name ,
-                'fields' : get_model_field_info(model) ,
-            })
+        # Мета-информация и структура формы - готовые ответы реестра (с ETag)
+        if action in (ModelMetadataRegistry.MODEL_META , ModelMetadataRegistry.FORM_STRUCTURE) :
+            return self._metadata_response(request , action , model._meta.label_lower)
 
         # Если запрошен один объект
         if obj_id :
@@ -252,18 +208,8 @@ class UniversalAPIView(APIView) :
             'format' : data_format ,
         }
 
-        # Фильтрация
-        filters = {}
-        exclude_filters = {'model' , 'app' , 'action' , 'id' , 'format' , 'view' , 'depth' , 'include'}
-
-        for key , value in request.query_params.items() :
-            if key not in exclude_filters :
-                # Поддержка сложных фильтров: field__contains, field__in и т.д.
-                if '__' in key :
-                    filters[key] = value
-                else :
-                    # Простые фильтры
-                    filters[key] = value
+        # Фильтрация: все параметры, кроме служебных (поддерживаются field__contains, field__in и т.д.)
+        filters = {key : value for key , value in request.query_params.items() if key not in self.RESERVED_PARAMS}
 
         # Базовый queryset
         if hasattr(model , 'is_active') :
@@ -282,44 +228,95 @@ class UniversalAPIView(APIView) :
                     'filters' : filters
                 } , status=status.HTTP_400_BAD_REQUEST)
 
-        # Используем методы StructuredDataMixin для списка если доступно
-        if data_format == 'compact' and hasattr(model() , 'get_compact_data') :
-            data = []
-            for obj in queryset :
-                data.append(obj.get_compact_data())
-
-            response_data['count'] = len(data)
-            response_data['data'] = data
-
-        elif data_format == 'display' and hasattr(model() , 'get_display_data') :
-            data = []
-            for obj in queryset :
-                display_data = obj.get_display_data('list')  # Для списков используем 'list' view
-                if isinstance(display_data , dict) and 'fields' in display_data :
-                    # Преобразуем fields в плоскую структуру для таблиц
-                    flat_data = {'id' : obj.id}
-                    for field_name , field_data in display_data['fields'].items() :
-                        flat_data[field_name] = field_data.get('formatted' , field_data.get('value'))
-                    data.append(flat_data)
-                else :
-                    data.append(display_data)
-
-            response_data['count'] = len(data)
-            response_data['data'] = data
+        # Используем методы StructuredDataMixin для списка если доступно:
+        # связи загружаются по плану модели (STRUCTURED_DATA_PREFETCH), а не по объекту
+        structured_view = None
+        if data_format == 'compact' and has_structured_data :
+            structured_view = 'list'
+            postprocess = None
+        elif data_format == 'display' and hasattr(model , 'get_display_data') :
+            structured_view = 'list'  # Для списков используем 'list' view
+            postprocess = self._flatten_display_data
             response_data['view'] = 'list'
-
         else :
-            # Стандартный сериализатор
-            serializer_class = get_model_serializer(model , depth=depth)
-            serializer = serializer_class(queryset , many=True)
-
-            response_data['count'] = len(serializer.data)
-            response_data['data'] = serializer.data
+            # Стандартный сериализатор: один экземпляр на весь список (поля строятся один раз)
+            serialize = get_model_serializer(model , depth=depth)().to_representation
             response_data[
                 'format'] = 'serializer' if data_format == 'serializer' else f'serializer (requested: {data_format})'
 
+        limit = request.query_params.get('limit') or options['DEFAULT_LIMIT']
+        if limit is None :
+            if structured_view :
+                pairs = model.serialize_queryset(queryset , data_format , structured_view ,
+                                                 chunk_size=options['CHUNK_SIZE'] , on_error=self._item_error ,
+                                                 with_objects=True)
+                items = (postprocess(obj , item) if postprocess else item for obj , item in pairs)
+            else :
+                items = (serialize(obj) for obj in queryset.iterator(chunk_size=options['CHUNK_SIZE']))
+            return json_list_response(response_data , items)
+
+        # Страница keyset-пагинации по первичному ключу
+        if structured_view :
+            queryset = model.with_prefetch_plan(queryset , data_format , structured_view)
+        try :
+            limit = min(int(limit) , options['MAX_LIMIT'])
+            if limit < 1 :
+                raise ValueError('limit must be a positive integer')
+            page = CursorPaginator(queryset , [model._meta.pk.name]).paginate(
+                first=limit , after=request.query_params.get('after'))
+        except (ValueError , GraphQLError) as e :
+            return Response({
+                'success' : False ,
+                'error' : f'Pagination error: {e}' ,
+            } , status=status.HTTP_400_BAD_REQUEST)
+
+        if structured_view :
+            data = []
+            for obj in page.items :
+                try :
+                    item = obj.get_structured_data(data_format , structured_view)
+                except Exception as e :
+                    item = self._item_error(obj , e)
+                data.append(postprocess(obj , item) if postprocess else item)
+        else :
+            data = [serialize(obj) for obj in page.items]
+        response_data['data'] = data
+        response_data['count'] = len(data)
+        response_data['limit'] = limit
+        response_data['next_cursor'] = page.page_info['end_cursor'] if page.page_info['has_next_page'] else None
+        response_data['has_next'] = page.page_info['has_next_page']
         return Response(response_data)
 
+    @staticmethod
+    def _metadata_response(request , kind , key) :
+        # Повторный запрос с If-None-Match получает 304 без тела
+        blob = ModelMetadataRegistry.get_instance().get_blob(kind , key)
+        if blob is None :
+            return None
+        body , etag = blob
+        response = get_conditional_response(request , etag=etag)
+        if response is None :
+            response = HttpResponse(body , content_type='application/json; charset=utf-8')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    @staticmethod
+    def _item_error(obj , exc) :
+        # Ошибка одного объекта не должна обрывать потоковый ответ
+        logger.warning("Structured data failed for %s pk=%s: %s" , type(obj).__name__ , obj.pk , exc)
+        return {'id' : obj.pk , 'error' : str(exc)}
+
+    @staticmethod
+    def _flatten_display_data(obj , display_data) :
+        if isinstance(display_data , dict) and 'fields' in display_data :
+            # Преобразуем fields в плоскую структуру для таблиц
+            flat_data = {'id' : obj.pk}
+            for field_name , field_data in display_data['fields'].items() :
+                flat_data[field_name] = field_data.get('formatted' , field_data.get('value'))
+            return flat_data
+        return display_data
+
 
 class DebugAPIView(APIView) :
     """Endpoint для диагностики"""
@@ -368,4 +365,91 @@ class DebugAPIView(APIView) :
                 except Exception as e :
                     response['model_error'] = str(e)
 
-        return Response(response)
\ No newline at end of file
+        # Самые медленные запросы процесса (при включенных REQUEST_METRICS)
+        response['request_metrics'] = {
+            'enabled' : RequestMetrics.is_enabled() ,
+            'slow_request_ms' : RequestMetrics.config()['SLOW_REQUEST_MS'] ,
+            'slow_requests' : RequestMetrics.slow_requests() ,
+        }
+
+        return Response(response)
+
+
+class RequestMetricsView(View) :
+    """
+    Метрики запросов процесса в текстовом формате Prometheus
+
+    GET /api/core/metrics/ - персоналу (сессия) или с заголовком Authorization: Bearer <token>
+    при заданном REQUEST_METRICS['TOKEN']
+    """
+
+    def get(self , request) :
+        if not RequestMetrics.is_enabled() :
+            raise Http404('Request metrics are disabled')
+        token = RequestMetrics.config()['TOKEN']
+        has_token = bool(token) and constant_time_compare(request.headers.get('Authorization' , '') ,
+                                                          f'Bearer {token}')
+        user = getattr(request , 'user' , None)
+        if not has_token and not (user and user.is_authenticated and user.is_staff) :
+            return HttpResponse(status=403 if user and user.is_authenticated else 401)
+        return HttpResponse(RequestMetrics.prometheus_text() , content_type='text/plain; version=0.0.4; charset=utf-8')
+
+class JobAccessMixin :
+    """Поиск задачи с проверкой доступа (BackgroundJob.is_visible_to)"""
+
+    @staticmethod
+    def get_job(request , job_id) :
+        from core.models import BackgroundJob
+
+        job = BackgroundJob.objects.filter(pk=job_id).first()
+        if job is None or not job.is_visible_to(request.user) :
+            return None
+        return job
+
+
+class JobStatusAPIView(JobAccessMixin , APIView) :
+    """
+    Состояние фоновой задачи для опроса
+
+    GET /api/core/jobs/<id>/
+    """
+
+    def get(self , request , job_id) :
+        job = self.get_job(request , job_id)
+        if job is None :
+            return Response({'error' : 'Job not found'} , status=status.HTTP_404_NOT_FOUND)
+        return Response(job.as_dict())
+
+
+class JobCancelAPIView(JobAccessMixin , APIView) :
+    """
+    Отмена фоновой задачи
+
+    POST /api/core/jobs/<id>/cancel/
+    """
+
+    def post(self , request , job_id) :
+        from core.services import JobQueue
+
+        job = self.get_job(request , job_id)
+        if job is None :
+            return Response({'error' : 'Job not found'} , status=status.HTTP_404_NOT_FOUND)
+        return Response(JobQueue.cancel(job.pk).as_dict())
+
+
+class JobResultFileAPIView(JobAccessMixin , APIView) :
+    """
+    Файл результата фоновой задачи
+
+    GET /api/core/jobs/<id>/result/
+    """
+
+    def get(self , request , job_id) :
+        import os
+        from django.http import FileResponse
+
+        job = self.get_job(request , job_id)
+        if job is None or not job.result_file :
+            return Response({'error' : 'Result file not found'} , status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(job.result_file.open('rb') , as_attachment=True ,
+                            filename=os.path.basename(job.result_file.name))
@@ -5,6 +5,8 @@ import importlib
 from graphql import extend_schema
 
 from cable_glands.graphql.schema import cableGlandsSchema
+from core.graphql.jobs import JobQuery, JobMutation
+from core.graphql.structured_data import StructuredDataQuery
 from client_requests.graphql.schema import clientRequestsSchema
 from clients.graphql.schema import clientsSchema
 from params.graphql.schema import paramsSchema
@@ -36,6 +38,8 @@ class Query(
     eaSchema.Query,
     valveDataSchema.Query,
     mediaLibrarySchema.MediaLibraryQuery,
+    JobQuery,
+    StructuredDataQuery,
     graphene.ObjectType
 ):
     pass
@@ -49,6 +53,7 @@ class Mutation(
     eaSchema.Mutation,
     valveDataSchema.Mutation,
     mediaLibrarySchema.MediaLibraryMutations,
+    JobMutation,
     graphene.ObjectType
 ):
     pass
@@ -122,6 +122,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Метрики запросов (SQL, время, кеши); без REQUEST_METRICS['ENABLED'] ничего не делает
+    'core.middleware.RequestMetricsMiddleware' ,
     'django.middleware.security.SecurityMiddleware' ,
     'django.contrib.sessions.middleware.SessionMiddleware' ,
     'django.middleware.common.CommonMiddleware' ,
@@ -159,7 +161,11 @@ ROOT_URLCONF = 'djangoProject1.urls'
 
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS' : 'rest_framework.pagination.PageNumberPagination' ,
-    'PAGE_SIZE' : 15
+    'PAGE_SIZE' : 15 ,
+    # Частота запросов для вью с throttle_scope (ScopedRateThrottle)
+    'DEFAULT_THROTTLE_RATES' : {
+        'tender_sizing' : '30/min' ,  # пакетный подбор пневмоприводов (до 5000 строк)
+    } ,
 }
 TEMPLATES = [
     {
@@ -208,6 +214,10 @@ AUTH_PASSWORD_VALIDATORS = [
     } ,
 ]
 
+# Файл отладочного лога пишется только при заданном DJANGO_DEBUG_LOG_FILE (путь к файлу)
+DEBUG_LOG_FILE = os.getenv('DJANGO_DEBUG_LOG_FILE') or None
+LOG_HANDLERS = ['console', 'file'] if DEBUG_LOG_FILE else ['console']
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -226,34 +236,34 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
         },
-        'file': {
+        **({'file': {
             'class': 'logging.FileHandler',
-            'filename': 'django_debug.log',
+            'filename': DEBUG_LOG_FILE,
             'formatter': 'verbose',
-        },
+        }} if DEBUG_LOG_FILE else {}),
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': LOG_HANDLERS,
         'level': 'INFO',
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': LOG_HANDLERS,
             'level': 'INFO',
             'propagate': False,
         },
         'valve_data': {
-            'handlers': ['console', 'file'],
+            'handlers': LOG_HANDLERS,
             'level': 'DEBUG',  # ВКЛЮЧАЕМ DEBUG для нашего приложения
             'propagate': False,
         },
         'core': {
-            'handlers': ['console', 'file'],
+            'handlers': LOG_HANDLERS,
             'level': 'DEBUG',  # ВКЛЮЧАЕМ DEBUG для нашего приложения
             'propagate': False,
         },
         'storage_manager': {
-                    'handlers': ['console', 'file'],
+                    'handlers': LOG_HANDLERS,
                     'level': 'DEBUG',  # ВКЛЮЧАЕМ DEBUG для нашего приложения
                     'propagate': False,
                 },
@@ -263,6 +273,12 @@ LOGGING = {
 GRAPHENE = {
     'SCHEMA' : 'djangoProject1.graphql.schema.schema' ,
     # 'MIDDLEWARE': 'graphql_jwt.middleware.JSONWebTokenMiddleware',  # Отключите аутентификацию на время тестов
+    # Пакетная загрузка связей узлов в рамках запроса (core.graphql.loaders)
+    'MIDDLEWARE' : [
+        'core.graphql.DataLoaderMiddleware' ,
+        # Время резолверов для метрик запросов (REQUEST_METRICS)
+        'core.graphql.ResolverTimingMiddleware' ,
+    ] ,
 }
 # Internationalization
 # https://docs.djangoproject.com/en/4.1/topics/i18n/
@@ -279,3 +295,100 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Общий кеш скомпилированных таблиц моментов (pneumatic_actuators.services.TorqueMatrixCache).
+# None - только кеш в памяти процесса; например 'default' - дополнительно кеш Django из CACHES
+TORQUE_MATRIX_CACHE_ALIAS = None
+
+# Общий кеш скомпилированных таблиц ВГХ (valve_data.services.DimensionMatrixCache); None - только память процесса
+DIMENSION_MATRIX_CACHE_ALIAS = None
+
+# Подготовленные импорты Excel до подтверждения (core.services.StagedImportStore):
+# DIR - каталог (None - подкаталог временного каталога системы), TTL - время хранения, секунды
+STAGED_IMPORTS = {
+    'DIR' : None ,
+    'TTL' : 60 * 60 ,
+}
+
+# Фоновые задачи (core.services.JobQueue, обработчики - manage.py run_job_worker): пауза при пустой очереди,
+# интервалы записи прогресса и отметки обработчика, время до признания обработчика упавшим и время хранения
+# завершенных задач с файлами результатов, секунды
+BACKGROUND_JOBS = {
+    'POLL_INTERVAL' : 2 ,
+    'PROGRESS_INTERVAL' : 1 ,
+    'HEARTBEAT_INTERVAL' : 30 ,
+    'STALE_AFTER' : 600 ,
+    'RESULT_TTL' : 24 * 60 * 60 ,
+}
+
+# Сохраненные запросы GraphQL (persistedQuery.sha256Hash): текст запроса дополнительно хранится в кеше Django
+GRAPHQL_PERSISTED_QUERIES_CACHE_ALIAS = None
+
+# Кеш результатов запросов GraphQL только для чтения (core.graphql.GraphQLResponseCache).
+# FIELDS: шаблон корневого поля -> приложения, изменение моделей которых сбрасывает результат;
+# RELATED_APPS: приложения моделей во вложенных связях этих полей.
+# ALIAS None - сброс по сигналам действует только в своем процессе: при нескольких воркерах
+# остальные отдают старый результат до TIMEOUT, для них нужен общий кеш Django (ALIAS)
+GRAPHQL_RESPONSE_CACHE = {
+    'ALIAS' : None ,
+    'TIMEOUT' : 300 ,
+    'RELATED_APPS' : [] ,  # вложенные типы кешируемых полей - из приложений FIELDS
+    'FIELDS' : {
+        'params*' : ['params'] ,
+        'producers*' : ['producers'] ,
+        'mediaCategor*' : ['media_library'] ,
+        'mediaTag*' : ['media_library'] ,
+        'valveSizing*' : ['valve_data' , 'materials' , 'params'] ,
+    } ,
+}
+
+# Ограничения запросов GraphQL (core.graphql.get_query_limits): глубина, оценка числа объектов
+# в ответе, размер страницы списков и предел точного totalCount
+GRAPHQL_QUERY_LIMITS = {
+    'MAX_DEPTH' : 10 ,
+    'MAX_COST' : 5000 ,
+    'DEFAULT_LIST_SIZE' : 20 ,
+    'MAX_PAGE_SIZE' : 500 ,
+    'COUNT_LIMIT' : 10000 ,
+}
+
+# Универсальный API (core.views.UniversalAPIView): размер страницы без limit (None - весь список потоком),
+# максимальный limit, размер пачки чтения из БД при потоковой отдаче и предел depth сериализатора
+UNIVERSAL_API = {
+    'DEFAULT_LIMIT' : None ,
+    'MAX_LIMIT' : 500 ,
+    'CHUNK_SIZE' : 500 ,
+    'MAX_DEPTH' : 5 ,
+}
+
+# Метрики запросов (core.services.RequestMetrics): включаются без изменения кода переменной окружения
+# REQUEST_METRICS_ENABLED=1. Запросы дольше SLOW_REQUEST_MS (мс) попадают в буфер медленных запросов
+# (SLOW_BUFFER_SIZE последних, /api/core/debug/), RESOLVER_TIMING - время резолверов GraphQL,
+# MAX_LABELS - предел числа меток (операций GraphQL), TOKEN - Bearer-токен для /api/core/metrics/ (без токена - только персонал)
+REQUEST_METRICS = {
+    'ENABLED' : os.getenv('REQUEST_METRICS_ENABLED' , '0') == '1' ,
+    'SLOW_REQUEST_MS' : int(os.getenv('REQUEST_METRICS_SLOW_MS' , '500')) ,
+    'SLOW_BUFFER_SIZE' : 100 ,
+    'RESOLVER_TIMING' : True ,
+    'MAX_LABELS' : 300 ,
+    'TOKEN' : os.getenv('REQUEST_METRICS_TOKEN') or None ,
+}
+
+# Бенчмарки горячих путей (python manage.py run_benchmarks, core.services.BenchmarkSuite):
+# FIXTURES - фикстуры для наполнения тестовой БД (пути от BASE_DIR), BASELINE - файл базовой линии,
+# SCALE - множитель синтетических данных, REPEAT - запусков на сценарий (берется медиана),
+# TIME_TOLERANCE/MEMORY_TOLERANCE - допустимый рост времени/пика памяти (доля) до регрессии
+BENCHMARKS = {
+    'FIXTURES' : [
+        'producers-02-26.json' ,
+        'params-02-26.json' ,
+        'cable_glands-02-26.json' ,
+        'electric_actuators-02-26.json' ,
+        'ett-02-26.json' ,
+    ] ,
+    'BASELINE' : BASE_DIR / 'benchmarks_baseline.json' ,
+    'SCALE' : 1 ,
+    'REPEAT' : 5 ,
+    'TIME_TOLERANCE' : 0.5 ,
+    'MEMORY_TOLERANCE' : 0.25 ,
+}
@@ -19,7 +19,7 @@ from django.template.defaulttags import url
 from django.urls import path, include
 from data_processor.views import StringProcessorView
 from .views import GetUrlByNameAPIView
-from graphene_django.views import GraphQLView
+from core.graphql.views import CachedGraphQLView
 from .graphql_api.schema import schema  # Импорт вашей GraphQL-схемы
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
@@ -43,7 +43,7 @@ path('api/test/', UniversalAPIView.as_view(), name='test_api'),  # Прямой
     # path('api/client_requests/', include('client_requests.urls')),
     path('api/pneumatic_actuators/', include('pneumatic_actuators.urls')),
     # GraphQL
-    path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True, schema=schema))),
+    path('graphql/', csrf_exempt(CachedGraphQLView.as_view(graphiql=True, schema=schema))),
 ]
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
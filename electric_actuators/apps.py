@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ElectricActuatorsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'electric_actuators'
+
+    def ready(self):
+        # Импортируем сигналы
+        import electric_actuators.signals  # noqa
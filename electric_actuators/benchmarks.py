@@ -0,0 +1,41 @@
+# electric_actuators/benchmarks.py
+"""Бенчмарки электроприводов (core.services.BenchmarkSuite): списки GraphQL и подбор по моменту"""
+from core.services import BenchmarkSuite, register_benchmark, register_benchmark_seed
+from electric_actuators.services import ElectricActuatorSelector
+
+
+@register_benchmark_seed('electric_actuators')
+def seed_electric_actuators(scale):
+    """Копии моделей из фикстуры (scale - 1 копий каждой модели)"""
+    from electric_actuators.models import ElectricActuatorData
+
+    originals = list(ElectricActuatorData.objects.order_by('id'))
+    copies = []
+    for copy_number in range(1, scale):
+        for original in originals:
+            original.pk = original.id = None
+            original.name = f'{original.name}-{copy_number}'
+            copies.append(ElectricActuatorData(**{field.attname: getattr(original, field.attname)
+                                                  for field in ElectricActuatorData._meta.concrete_fields}))
+    ElectricActuatorData.objects.bulk_create(copies, batch_size=1000)
+    return len(copies)
+
+
+@register_benchmark('electric_actuators.graphql_actuators', 'GraphQL: все модели электроприводов с сериями и корпусами')
+def graphql_actuators():
+    BenchmarkSuite.execute_graphql("""
+        query {
+            eaAllElectricActuatorData {
+                id name torqueMin torqueMax weight
+                modelLine { id name }
+                modelBody { id name }
+            }
+        }
+    """)
+
+
+@register_benchmark('electric_actuators.selection', 'Подбор электроприводов для 500 требований по моменту',
+                    setup=ElectricActuatorSelector.invalidate)
+def selection():
+    ElectricActuatorSelector.get_instance().select_many(
+        [{'torque': 10 + (i * 7) % 2000} for i in range(500)], limit=5)
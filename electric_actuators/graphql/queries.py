@@ -1,12 +1,18 @@
 # electric_actuators/query.py
+import uuid
+
 import graphene
+from graphql import GraphQLError
 
+from core.graphql import CursorPaginator
 from electric_actuators.graphql.types import (
-    CableGlandHolesSetNode, ModelLineNode, ModelBodyNode, ElectricActuatorDataNode
+    CableGlandHolesSetNode, ModelLineNode, ModelBodyNode, ElectricActuatorDataNode,
+    ElectricActuatorSelectionInput, ElectricActuatorSelectionNode
 )
 from electric_actuators.models import (
     CableGlandHolesSet, ModelLine, ModelBody, ElectricActuatorData
 )
+from electric_actuators.services import ElectricActuatorSelector
 
 from params.graphql.types import (
     ThreadSizeNode, IpOptionNode, BodyCoatingOptionNode, ExdOptionNode, BlinkerOptionNode,
@@ -91,3 +97,59 @@ class Query(graphene.ObjectType):
 
     def resolve_ea_models_by_model_line(self, info, model_line_id):
         return ElectricActuatorData.objects.filter(model_line_id=model_line_id)
+
+    ea_select_actuators = graphene.List(
+        ElectricActuatorSelectionNode,
+        requirements=graphene.List(graphene.NonNull(ElectricActuatorSelectionInput), required=True),
+        safety_factor=graphene.Float(default_value=1.0, description="Коэффициент запаса по моменту"),
+        voltage_id=graphene.ID(description="Напряжение питания по умолчанию для всех требований"),
+        first=graphene.Int(default_value=ElectricActuatorSelector.DEFAULT_LIMIT,
+                           description="Не больше first вариантов на требование"),
+        description="Пакетный подбор моделей электроприводов по моменту, времени и опциям (ElectricActuatorSelector)"
+    )
+
+    def resolve_ea_select_actuators(self, info, requirements, safety_factor=1.0, voltage_id=None,
+                                    first=ElectricActuatorSelector.DEFAULT_LIMIT):
+        if len(requirements) > ElectricActuatorSelector.MAX_REQUIREMENTS:
+            raise GraphQLError(f"Слишком много требований, максимум {ElectricActuatorSelector.MAX_REQUIREMENTS}")
+
+        # Время открытия и опции требований запросов клиентов - одним запросом
+        errors = {}
+        requirement_ids = {}
+        for index, requirement in enumerate(requirements):
+            if requirement.requirement_id:
+                try:
+                    requirement_ids[index] = uuid.UUID(str(requirement.requirement_id))
+                except ValueError:
+                    errors[index] = f"Некорректный requirementId: {requirement.requirement_id}"
+        loaded = ElectricActuatorSelector.load_requirements(requirement_ids.values()) if requirement_ids else {}
+
+        points = []
+        for index, requirement in enumerate(requirements):
+            point = dict(loaded.get(requirement_ids.get(index), {}))
+            if index in requirement_ids and requirement_ids[index] not in loaded:
+                errors[index] = f"Требование {requirement.requirement_id} не найдено"
+            point.update({key: value for key, value in requirement.items()
+                          if value is not None and key not in ('ref', 'requirement_id')})
+            point.setdefault('voltage_id', voltage_id)
+            point['safety_factor'] = safety_factor
+            points.append(point)
+
+        solutions = ElectricActuatorSelector.get_instance().select_many(
+            [point if index not in errors else {} for index, point in enumerate(points)],
+            limit=CursorPaginator.page_size(first), errors=errors)
+
+        # Модели результатов - одним запросом
+        models = ElectricActuatorData.objects.select_related('model_line', 'model_body', 'voltage').in_bulk(
+            {candidate['electric_actuator_data_id'] for candidates in solutions for candidate in candidates})
+        results = []
+        for index, (requirement, candidates) in enumerate(zip(requirements, solutions)):
+            for candidate in candidates:
+                candidate['electric_actuator_data'] = models.get(candidate['electric_actuator_data_id'])
+            results.append({
+                'ref': requirement.ref,
+                'requirement_id': requirement.requirement_id,
+                'error': errors.get(index),
+                'candidates': candidates,
+            })
+        return results
@@ -1,6 +1,7 @@
 # electric_actuators/types.py
 import graphene
 from graphene_django import DjangoObjectType
+from core.graphql import get_loaders
 from electric_actuators.models import (
     CableGlandHolesSet, ModelLine, ModelBody, ElectricActuatorData
 )
@@ -38,37 +39,37 @@ class ModelLineNode(DjangoObjectType):
     allowed_operating_mode = graphene.List(OperatingModeOptionNode)
 
     def resolve_allowed_ip(self, info):
-        return self.allowed_ip.all()
+        return get_loaders(info).related_list(ModelLine, 'allowed_ip').load(self)
 
     def resolve_allowed_body_coating(self, info):
-        return self.allowed_body_coating.all()
+        return get_loaders(info).related_list(ModelLine, 'allowed_body_coating').load(self)
 
     def resolve_allowed_exd(self, info):
-        return self.allowed_exd.all()
+        return get_loaders(info).related_list(ModelLine, 'allowed_exd').load(self)
 
     def resolve_allowed_end_switches(self, info):
-        return self.allowed_end_switches.all()
+        return get_loaders(info).related_list(ModelLine, 'allowed_end_switches').load(self)
 
     def resolve_allowed_way_switches(self, info):
-        return self.allowed_way_switches.all()
+        return get_loaders(info).related_list(ModelLine, 'allowed_way_switches').load(self)
 
     def resolve_allowed_torque_switches(self, info):
-        return self.allowed_torque_switches.all()
+        return get_loaders(info).related_list(ModelLine, 'allowed_torque_switches').load(self)
 
     def resolve_allowed_temperature(self, info):
-        return self.allowed_temperature.all()
+        return get_loaders(info).related_list(ModelLine, 'allowed_temperature').load(self)
 
     def resolve_allowed_control_unit_installed(self, info):
-        return self.allowed_control_unit_installed.all()
+        return get_loaders(info).related_list(ModelLine, 'allowed_control_unit_installed').load(self)
 
     def resolve_allowed_hand_wheel(self, info):
-        return self.allowed_hand_wheel.all()
+        return get_loaders(info).related_list(ModelLine, 'allowed_hand_wheel').load(self)
 
     def resolve_allowed_mechanical_indicator(self, info):
-        return self.allowed_mechanical_indicator.all()
+        return get_loaders(info).related_list(ModelLine, 'allowed_mechanical_indicator').load(self)
 
     def resolve_allowed_operating_mode(self, info):
-        return self.allowed_operating_mode.all()
+        return get_loaders(info).related_list(ModelLine, 'allowed_operating_mode').load(self)
 
 
 class ModelBodyNode(DjangoObjectType):
@@ -80,13 +81,46 @@ class ModelBodyNode(DjangoObjectType):
     mounting_plate = graphene.List(MountingPlateTypesNode)  # Используем импортированный тип
 
     def resolve_allowed_cable_glands_holes(self, info):
-        return self.allowed_cable_glands_holes.all()
+        return get_loaders(info).related_list(ModelBody, 'allowed_cable_glands_holes').load(self)
 
     def resolve_mounting_plate(self, info):
-        return self.mounting_plate.all()
+        return get_loaders(info).related_list(ModelBody, 'mounting_plate').load(self)
 
 
 class ElectricActuatorDataNode(DjangoObjectType):
     class Meta:
         model = ElectricActuatorData
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+
+class ElectricActuatorSelectionInput(graphene.InputObjectType):
+    """Требование для подбора электропривода (ea_select_actuators)"""
+    ref = graphene.String(description="Идентификатор строки (возвращается как есть)")
+    requirement_id = graphene.ID(description="ElectricActuatorRequirement: время открытия и опции IP/Exd/температуры")
+    torque = graphene.Float(description="Требуемый момент, Нм")
+    max_time_to_open = graphene.Float(description="Максимальное время открытия, с")
+    voltage_id = graphene.ID()
+    ip_id = graphene.ID()
+    exd_id = graphene.ID()
+    temperature_id = graphene.ID()
+    model_line_ids = graphene.List(graphene.ID)
+
+
+class ElectricActuatorCandidateNode(graphene.ObjectType):
+    """Модель электропривода, найденная подбором (ea_select_actuators)"""
+    electric_actuator_data = graphene.Field(ElectricActuatorDataNode)
+    electric_actuator_data_id = graphene.ID()
+    name = graphene.String()
+    model_line_id = graphene.ID()
+    torque_min = graphene.Float()
+    torque_max = graphene.Float()
+    time_to_open = graphene.Float(description="Время открытия, с")
+    required_torque = graphene.Float(description="Требуемый момент с учетом запаса, Нм")
+    margin = graphene.Float(description="Запас по моменту: torqueMax / requiredTorque - 1")
+
+
+class ElectricActuatorSelectionNode(graphene.ObjectType):
+    """Результат подбора по одному требованию"""
+    ref = graphene.String()
+    requirement_id = graphene.ID()
+    error = graphene.String()
+    candidates = graphene.List(ElectricActuatorCandidateNode)
@@ -0,0 +1,5 @@
+from .actuator_selection import ElectricActuatorSelector
+
+__all__ = [
+    'ElectricActuatorSelector',
+]
@@ -0,0 +1,331 @@
+# electric_actuators/services/actuator_selection.py
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ElectricActuatorSelector:
+    """
+    Подбор моделей электроприводов (ElectricActuatorData) по требованиям.
+
+    Таблица моделей загружается один раз в массивы NumPy, отсортированные по torque_max
+    (затем по времени открытия и id), - интервальный индекс диапазонов момента:
+        модель подходит, если torque_min <= требуемый момент <= torque_max;
+        кандидаты - хвост массива от searchsorted(torque_max, момент), поэтому результат
+        сразу упорядочен по запасу (torque_max / требуемый момент - 1).
+    Опции проверяются по разрешенным (allowed_*) и стандартным (default_*) опциям серии ModelLine,
+    заранее сведенным в матрицы [серия, опция]:
+        ip - есть исполнение с ip_rank не ниже требуемого
+        exd - требуемый вид взрывозащиты
+        temperature - есть температурное исполнение, покрывающее требуемый диапазон
+    Если у серии нет ни одной опции нужного вида, требование к ней не выполняется.
+
+    Время открытия хранится в секундах (ед.изм. time_to_open_measure_unit по коду, без ед.изм. -
+    секунды). Модели без времени открытия подходят только к требованиям без max_time_to_open.
+
+    Экземпляр кешируется на уровне процесса (get_instance) и сбрасывается сигналами
+    (electric_actuators/signals.py).
+    """
+    TIME_UNIT_SECONDS = {'sec': 1.0, 'min': 60.0, 'hour': 3600.0}
+    MAX_REQUIREMENTS = 5000
+    DEFAULT_LIMIT = 10  # вариантов на требование в GraphQL без first
+    CACHE_TTL_SECONDS = 300  # страховка для других процессов, которые не получили сигнал
+
+    _instance = None
+    _instance_built_at = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self):
+        from electric_actuators.models import ElectricActuatorData, ModelLine
+        from params.models import EnvTempParameters, ExdOption, IpOption
+
+        rows = list(ElectricActuatorData.objects.filter(
+            model_line__isnull=False, torque_min__isnull=False, torque_max__isnull=False
+        ).values_list('id', 'name', 'model_line_id', 'model_body_id', 'voltage_id', 'torque_min', 'torque_max',
+                      'time_to_open', 'time_to_open_measure_unit__code'))
+        time_to_open = [self._time_or_none(row[7], row[8]) for row in rows]
+        order = sorted(range(len(rows)), key=lambda i: (
+            float(rows[i][6]), np.inf if time_to_open[i] is None else time_to_open[i], rows[i][0]))
+        rows = [rows[i] for i in order]
+        time_to_open = [time_to_open[i] for i in order]
+
+        # Модели
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.names = [row[1] for row in rows]
+        self.model_line_ids = np.array([row[2] for row in rows], dtype=np.int64)
+        self.model_body_ids = [row[3] for row in rows]
+        self.voltage_ids = np.array([row[4] if row[4] is not None else -1 for row in rows], dtype=np.int64)
+        self.torque_min = np.array([float(row[5]) for row in rows], dtype=float)
+        self.torque_max = np.array([float(row[6]) for row in rows], dtype=float)
+        self.time_to_open = np.array([np.nan if t is None else t for t in time_to_open], dtype=float)
+
+        # Серии и их опции
+        model_lines = list(ModelLine.objects.order_by('id').values_list(
+            'id', 'default_ip_id', 'default_exd_id', 'default_temperature_id'))
+        self.line_index = {line[0]: i for i, line in enumerate(model_lines)}
+        self.row_lines = np.array([self.line_index[line_id] for line_id in self.model_line_ids.tolist()],
+                                  dtype=np.int64)
+
+        ip_options = list(IpOption.objects.order_by('id').values_list('id', 'ip_rank'))
+        exd_options = list(ExdOption.objects.order_by('id').values_list('id', flat=True))
+        temperatures = list(EnvTempParameters.objects.order_by('id').values_list('id', 'min_temp', 'max_temp'))
+        self.ip_index = {ip_id: i for i, (ip_id, _) in enumerate(ip_options)}
+        self.exd_index = {exd_id: i for i, exd_id in enumerate(exd_options)}
+        self.temperature_index = {temperature[0]: i for i, temperature in enumerate(temperatures)}
+
+        line_ip = self._line_options(ModelLine, 'allowed_ip', model_lines, 1)
+        line_exd = self._line_options(ModelLine, 'allowed_exd', model_lines, 2)
+        line_temperature = self._line_options(ModelLine, 'allowed_temperature', model_lines, 3)
+
+        ip_rank = np.array([rank for _, rank in ip_options], dtype=float)
+        line_ip_rank = np.full(len(model_lines), -np.inf)
+        for line, ip_ids in line_ip.items():
+            ranks = [ip_rank[self.ip_index[ip_id]] for ip_id in ip_ids if ip_id in self.ip_index]
+            if ranks:
+                line_ip_rank[line] = max(ranks)
+        self.ip_ok = line_ip_rank[:, None] >= ip_rank[None, :]
+
+        self.exd_ok = np.zeros((len(model_lines), len(exd_options)), dtype=bool)
+        for line, exd_ids in line_exd.items():
+            self.exd_ok[line, [self.exd_index[exd_id] for exd_id in exd_ids if exd_id in self.exd_index]] = True
+
+        temperature_min = np.array([t[1] for t in temperatures], dtype=float)
+        temperature_max = np.array([t[2] for t in temperatures], dtype=float)
+        covers = ((temperature_min[:, None] <= temperature_min[None, :]) &
+                  (temperature_max[:, None] >= temperature_max[None, :]))  # [исполнение серии, требуемое]
+        self.temperature_ok = np.zeros((len(model_lines), len(temperatures)), dtype=bool)
+        for line, temperature_ids in line_temperature.items():
+            positions = [self.temperature_index[t] for t in temperature_ids if t in self.temperature_index]
+            if positions:
+                self.temperature_ok[line] = covers[positions].any(axis=0)
+
+        logger.debug("ElectricActuatorSelector: загружено %d моделей, серий %d", len(self.ids), len(model_lines))
+
+    @classmethod
+    def _time_or_none(cls, value, unit_code) -> Optional[float]:
+        try:
+            return cls.to_seconds(value, unit_code)
+        except ValueError:
+            logger.warning("ElectricActuatorSelector: неизвестная единица времени '%s'", unit_code)
+            return None
+
+    @staticmethod
+    def _line_options(model, field_name, model_lines, default_position) -> Dict[int, set]:
+        """Позиция серии -> id разрешенных опций (m2m allowed_* и стандартная опция default_*)"""
+        field = model._meta.get_field(field_name)
+        through = field.remote_field.through
+        source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+        line_index = {line[0]: i for i, line in enumerate(model_lines)}
+        options = defaultdict(set)
+        for line_id, option_id in through.objects.values_list(f'{source}_id', f'{target}_id'):
+            options[line_index[line_id]].add(option_id)
+        for i, line in enumerate(model_lines):
+            if line[default_position] is not None:
+                options[i].add(line[default_position])
+        return options
+
+    # ==================== КЕШ ====================
+
+    @classmethod
+    def get_instance(cls) -> 'ElectricActuatorSelector':
+        """Индекс для текущего процесса (строится при первом обращении)"""
+        instance = cls._instance
+        if instance is not None and time.monotonic() - cls._instance_built_at < cls.CACHE_TTL_SECONDS:
+            return instance
+        with cls._lock:
+            if cls._instance is None or time.monotonic() - cls._instance_built_at >= cls.CACHE_TTL_SECONDS:
+                cls._instance = cls()
+                cls._instance_built_at = time.monotonic()
+            return cls._instance
+
+    @classmethod
+    def invalidate(cls):
+        """Сбросить индекс - следующий get_instance перечитает таблицу моделей"""
+        cls._instance = None
+
+    # ==================== ПОДБОР ====================
+
+    def select(self, torque, max_time_to_open=None, voltage_id=None, ip_id=None, exd_id=None,
+               temperature_id=None, safety_factor=1.0, model_line_ids=None, limit=None) -> List[Dict[str, Any]]:
+        """
+        Подобрать модели электроприводов для одного требования
+
+        Args:
+            torque: требуемый момент, Нм
+            max_time_to_open: максимальное время открытия, с
+            voltage_id: напряжение питания (PowerSupplies)
+            ip_id, exd_id, temperature_id: требуемые опции (IpOption, ExdOption, EnvTempParameters)
+            safety_factor: коэффициент запаса по моменту (1.25 = +25%)
+            model_line_ids: ограничить подбор сериями (опционально)
+            limit: вернуть не больше limit лучших вариантов
+
+        Returns:
+            Список вариантов, отсортированный по запасу (сначала наименьший достаточный)
+        """
+        return self.select_many([{
+            'torque': torque,
+            'max_time_to_open': max_time_to_open,
+            'voltage_id': voltage_id,
+            'ip_id': ip_id,
+            'exd_id': exd_id,
+            'temperature_id': temperature_id,
+            'safety_factor': safety_factor,
+            'model_line_ids': model_line_ids,
+        }], limit=limit)[0]
+
+    def select_many(self, requirements: Iterable[Dict[str, Any]], limit=None,
+                    errors: Optional[Dict[int, str]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Пакетный подбор для списка требований
+
+        Маска моделей по напряжению/опциям/времени/сериям строится один раз для каждого
+        уникального набора этих условий, по моменту - бинарным поиском в отсортированном torque_max.
+
+        Args:
+            requirements: список словарей с ключами torque, max_time_to_open, voltage_id, ip_id,
+                exd_id, temperature_id, safety_factor, model_line_ids (см. select)
+            limit: вернуть не больше limit лучших вариантов для каждого требования
+            errors: если передан, ошибки требований записываются в него (индекс -> текст),
+                а для таких требований возвращается пустой список
+
+        Returns:
+            Список (по числу требований) списков вариантов
+
+        Raises:
+            ValueError: неизвестная опция или нечисловое значение (если errors не передан)
+        """
+        masks = {}
+        results = []
+        for index, requirement in enumerate(requirements):
+            try:
+                required_torque = self._required_torque(requirement)
+                key = self._condition_key(requirement)
+            except (TypeError, ValueError) as e:
+                if errors is None:
+                    raise ValueError(str(e)) from e
+                errors.setdefault(index, str(e))
+                results.append([])
+                continue
+            if not len(self.ids):
+                results.append([])
+                continue
+            mask = masks.get(key)
+            if mask is None:
+                mask = masks[key] = self._condition_mask(*key)
+
+            start = int(np.searchsorted(self.torque_max, required_torque, side='left'))
+            positions = start + np.flatnonzero(mask[start:] & (self.torque_min[start:] <= required_torque))
+            if limit is not None:
+                positions = positions[:limit]
+            results.append([self._candidate(position, required_torque) for position in positions])
+        return results
+
+    def _required_torque(self, requirement) -> float:
+        torque = self._as_float(requirement.get('torque'), None)
+        if torque is None or not torque > 0:
+            raise ValueError('Не указан требуемый момент (torque)')
+        return torque * self._as_float(requirement.get('safety_factor'), 1.0)
+
+    def _condition_key(self, requirement) -> tuple:
+        max_time = self._as_float(requirement.get('max_time_to_open'), None)
+        model_line_ids = requirement.get('model_line_ids')
+        return (
+            self._as_id(requirement.get('voltage_id')),
+            self._position(self.ip_index, requirement.get('ip_id'), 'IP'),
+            self._position(self.exd_index, requirement.get('exd_id'), 'Exd'),
+            self._position(self.temperature_index, requirement.get('temperature_id'), 'температурное исполнение'),
+            max_time,
+            None if model_line_ids is None else tuple(sorted({int(i) for i in model_line_ids})),
+        )
+
+    def _condition_mask(self, voltage_id, ip, exd, temperature, max_time, model_line_ids) -> np.ndarray:
+        """Маска моделей, удовлетворяющих всем условиям, кроме момента"""
+        mask = np.ones(len(self.ids), dtype=bool)
+        if voltage_id is not None:
+            mask &= self.voltage_ids == voltage_id
+        if ip is not None:
+            mask &= self.ip_ok[self.row_lines, ip]
+        if exd is not None:
+            mask &= self.exd_ok[self.row_lines, exd]
+        if temperature is not None:
+            mask &= self.temperature_ok[self.row_lines, temperature]
+        if max_time is not None:
+            mask &= self.time_to_open <= max_time
+        if model_line_ids is not None:
+            mask &= np.isin(self.model_line_ids, np.array(model_line_ids, dtype=np.int64))
+        return mask
+
+    def _candidate(self, position, required_torque) -> Dict[str, Any]:
+        time_to_open = self.time_to_open[position]
+        return {
+            'electric_actuator_data_id': int(self.ids[position]),
+            'name': self.names[position],
+            'model_line_id': int(self.model_line_ids[position]),
+            'model_body_id': self.model_body_ids[position],
+            'voltage_id': int(self.voltage_ids[position]) if self.voltage_ids[position] >= 0 else None,
+            'torque_min': float(self.torque_min[position]),
+            'torque_max': float(self.torque_max[position]),
+            'time_to_open': None if np.isnan(time_to_open) else float(time_to_open),
+            'required_torque': float(required_torque),
+            'margin': float(self.torque_max[position] / required_torque - 1),
+        }
+
+    # ==================== ТРЕБОВАНИЯ ЗАПРОСОВ КЛИЕНТОВ ====================
+
+    @classmethod
+    def load_requirements(cls, requirement_ids) -> Dict[Any, Dict[str, Any]]:
+        """
+        Условия подбора из ElectricActuatorRequirement одним запросом: id -> словарь для select_many
+
+        В требовании нет момента и напряжения - их нужно добавить в словарь перед подбором.
+        """
+        from client_requests.models import ElectricActuatorRequirement
+
+        return {
+            pk: {
+                'max_time_to_open': cls.to_seconds(time_to_open, unit_code),
+                'ip_id': ip_id,
+                'exd_id': exd_id,
+                'temperature_id': temperature_id,
+            }
+            for pk, time_to_open, unit_code, ip_id, exd_id, temperature_id in
+            ElectricActuatorRequirement.objects.filter(id__in=set(requirement_ids)).values_list(
+                'id', 'time_to_open', 'time_to_open_measure_unit__code', 'ip_id', 'exd_id', 'temperature_id')
+        }
+
+    @classmethod
+    def to_seconds(cls, value, unit_code=None) -> Optional[float]:
+        """Время в секундах; неизвестная единица измерения - ValueError"""
+        if value is None:
+            return None
+        if unit_code is None:
+            return float(value)
+        factor = cls.TIME_UNIT_SECONDS.get(str(unit_code).lower())
+        if factor is None:
+            raise ValueError(f"Неизвестная единица измерения времени '{unit_code}'")
+        return float(value) * factor
+
+    @staticmethod
+    def _position(index, option_id, label) -> Optional[int]:
+        if option_id in (None, ''):
+            return None
+        position = index.get(int(option_id))
+        if position is None:
+            raise ValueError(f"Неизвестная опция {label}: {option_id}")
+        return position
+
+    @staticmethod
+    def _as_id(value) -> Optional[int]:
+        return None if value in (None, '') else int(value)
+
+    @staticmethod
+    def _as_float(value, default) -> float:
+        if value is None or value == '':
+            return default
+        return float(value)
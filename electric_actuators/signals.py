@@ -0,0 +1,32 @@
+# electric_actuators/signals.py
+import logging
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from electric_actuators.models import ElectricActuatorData, ModelLine
+from params.models import IpOption, ExdOption, EnvTempParameters, MeasureUnits
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=ElectricActuatorData)
+@receiver(post_delete, sender=ElectricActuatorData)
+@receiver(post_save, sender=ModelLine)
+@receiver(post_delete, sender=ModelLine)
+@receiver(m2m_changed, sender=ModelLine.allowed_ip.through)
+@receiver(m2m_changed, sender=ModelLine.allowed_exd.through)
+@receiver(m2m_changed, sender=ModelLine.allowed_temperature.through)
+@receiver(post_save, sender=IpOption)
+@receiver(post_delete, sender=IpOption)
+@receiver(post_save, sender=ExdOption)
+@receiver(post_delete, sender=ExdOption)
+@receiver(post_save, sender=EnvTempParameters)
+@receiver(post_delete, sender=EnvTempParameters)
+@receiver(post_save, sender=MeasureUnits)
+@receiver(post_delete, sender=MeasureUnits)
+def invalidate_electric_actuator_selector(sender, action=None, **kwargs):
+    """Сбрасывает загруженную в память таблицу моделей электроприводов при изменении данных"""
+    if action is not None and not action.startswith('post_'):
+        return
+    from electric_actuators.services import ElectricActuatorSelector
+    ElectricActuatorSelector.invalidate()
@@ -0,0 +1,78 @@
+from django.test import TestCase
+
+from core.services import BenchmarkSuite
+from electric_actuators.models import ElectricActuatorData
+from electric_actuators.services import ElectricActuatorSelector
+
+
+class ElectricActuatorSelectorTests(TestCase):
+    """Подбор по моделям из фикстур репозитория сравнивается с прямым перебором таблицы"""
+
+    @classmethod
+    def setUpTestData(cls):
+        BenchmarkSuite.load_fixtures(BenchmarkSuite.config()['FIXTURES'])
+
+    def setUp(self):
+        ElectricActuatorSelector.invalidate()
+
+    @staticmethod
+    def expected_ids(torque, **filters):
+        return {
+            actuator.id for actuator in ElectricActuatorData.objects.filter(
+                model_line__isnull=False, torque_min__isnull=False, torque_max__isnull=False, **filters)
+            if actuator.torque_min <= torque <= actuator.torque_max
+        }
+
+    def test_matches_full_scan(self):
+        selector = ElectricActuatorSelector.get_instance()
+        self.assertTrue(len(selector.ids))
+        for torque in (10, 50, 120, 400, 1500, 10 ** 6):
+            with self.subTest(torque=torque):
+                candidates = selector.select(torque)
+                self.assertEqual({c['electric_actuator_data_id'] for c in candidates}, self.expected_ids(torque))
+                margins = [c['margin'] for c in candidates]
+                self.assertEqual(margins, sorted(margins))
+
+    def test_safety_factor_and_limit(self):
+        selector = ElectricActuatorSelector.get_instance()
+        candidates = selector.select(100, safety_factor=1.5)
+        self.assertEqual({c['electric_actuator_data_id'] for c in candidates}, self.expected_ids(150))
+        self.assertTrue(all(c['required_torque'] == 150 for c in candidates))
+        self.assertEqual(selector.select(100, safety_factor=1.5, limit=2), candidates[:2])
+
+    def test_voltage_filter(self):
+        actuator = ElectricActuatorData.objects.filter(model_line__isnull=False, voltage__isnull=False,
+                                                       torque_max__isnull=False).first()
+        candidates = ElectricActuatorSelector.get_instance().select(actuator.torque_max, voltage_id=actuator.voltage_id)
+        self.assertIn(actuator.id, [c['electric_actuator_data_id'] for c in candidates])
+        self.assertTrue(all(c['voltage_id'] == actuator.voltage_id for c in candidates))
+
+    def test_invalid_requirements(self):
+        selector = ElectricActuatorSelector.get_instance()
+        with self.assertRaises(ValueError):
+            selector.select(0)
+        with self.assertRaises(ValueError):
+            selector.select(100, ip_id=-1)
+
+        errors = {}
+        results = selector.select_many([{'torque': 100}, {'torque': 'abc'}, {}], errors=errors)
+        self.assertEqual(sorted(errors), [1, 2])
+        self.assertEqual(results[1:], [[], []])
+        self.assertEqual({c['electric_actuator_data_id'] for c in results[0]}, self.expected_ids(100))
+
+    def test_model_change_resets_selector(self):
+        selector = ElectricActuatorSelector.get_instance()
+        actuator = ElectricActuatorData.objects.filter(model_line__isnull=False, torque_min__gt=1).first()
+        self.assertNotIn(actuator.id, [c['electric_actuator_data_id'] for c in selector.select(1)])
+        actuator.torque_min = 1
+        actuator.save()
+        self.assertIsNot(ElectricActuatorSelector.get_instance(), selector)
+        self.assertIn(actuator.id, [c['electric_actuator_data_id']
+                                    for c in ElectricActuatorSelector.get_instance().select(1)])
+
+    def test_time_units(self):
+        self.assertEqual(ElectricActuatorSelector.to_seconds(2, 'min'), 120.0)
+        self.assertEqual(ElectricActuatorSelector.to_seconds(30), 30.0)
+        self.assertIsNone(ElectricActuatorSelector.to_seconds(None, 'sec'))
+        with self.assertRaises(ValueError):
+            ElectricActuatorSelector.to_seconds(1, 'day')
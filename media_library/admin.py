@@ -96,6 +96,7 @@ class MediaLibraryItemAdmin(admin.ModelAdmin) :
     ]
     list_editable = ['is_active']
     filter_horizontal = ['tags']
+    actions = ['recreate_previews_action']
 
     fieldsets = (
         (_("Основная информация") , {
@@ -577,6 +578,18 @@ class MediaLibraryItemAdmin(admin.ModelAdmin) :
         from .views import replace_file_view
         return replace_file_view(request , object_id)
 
+    @admin.action(description=_("Пересоздать превью (фоновая задача)"))
+    def recreate_previews_action(self , request , queryset) :
+        """Пересоздание превью выбранных элементов в фоновой задаче"""
+        from core.services import JobQueue
+        from django.shortcuts import redirect
+
+        ids = [str(pk) for pk in queryset.values_list('pk' , flat=True)]
+        job = JobQueue.enqueue('media_library.recreate_previews' , params={'ids' : ids} ,
+                               title=f"Пересоздание превью: {len(ids)} шт." , user=request.user)
+        self.message_user(request , _("Задача поставлена в очередь") , level='success')
+        return redirect('admin:core_backgroundjob_change' , job.pk)
+
 @admin.register(MediaCategory)
 class MediaCategoryAdmin(admin.ModelAdmin) :
     list_display = [
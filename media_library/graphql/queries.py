@@ -3,9 +3,28 @@ import graphene
 # from graphene_django import DjangoObjectType
 # from graphene_django.filters import DjangoFilterConnectionField
 from django.db.models import Q
+from core.graphql import CursorPaginator , CursorPageInfo
 from ..models import MediaCategory , MediaTag , MediaLibraryItem
 from .types import MediaCategoryType , MediaTagType , MediaLibraryItemType
 
+# Аргументы фильтрации списка элементов медиабиблиотеки
+MEDIA_LIBRARY_ITEM_FILTERS = dict(
+    id=graphene.ID() ,
+    title=graphene.String() ,
+    category_id=graphene.ID() ,
+    tag_id=graphene.ID() ,
+    is_active=graphene.Boolean() ,
+    is_public=graphene.Boolean() ,
+    is_image=graphene.Boolean() ,
+    search=graphene.String()
+)
+
+
+class MediaLibraryItemPage(graphene.ObjectType) :
+    """Страница элементов медиабиблиотеки при keyset-пагинации"""
+    items = graphene.List(MediaLibraryItemType)
+    page_info = graphene.Field(CursorPageInfo)
+
 
 class MediaLibraryQuery(graphene.ObjectType) :
     # MediaCategory queries
@@ -40,14 +59,16 @@ class MediaLibraryQuery(graphene.ObjectType) :
     # MediaLibraryItem queries
     media_library_items = graphene.List(
         MediaLibraryItemType ,
-        id=graphene.ID() ,
-        title=graphene.String() ,
-        category_id=graphene.ID() ,
-        tag_id=graphene.ID() ,
-        is_active=graphene.Boolean() ,
-        is_public=graphene.Boolean() ,
-        is_image=graphene.Boolean() ,
-        search=graphene.String()
+        first=graphene.Int() ,
+        **MEDIA_LIBRARY_ITEM_FILTERS
+    )
+
+    media_library_items_page = graphene.Field(
+        MediaLibraryItemPage ,
+        first=graphene.Int() ,
+        after=graphene.String() ,
+        with_total_count=graphene.Boolean(default_value=True) ,
+        **MEDIA_LIBRARY_ITEM_FILTERS
     )
 
     media_library_item = graphene.Field(
@@ -104,7 +125,22 @@ class MediaLibraryQuery(graphene.ObjectType) :
             return None
 
     # Resolvers for MediaLibraryItem
-    def resolve_media_library_items(self , info , **kwargs) :
+    # Сортировка списка: новые первыми, id - для однозначного порядка при равных created_at
+    MEDIA_LIBRARY_ITEMS_ORDERING = ('-created_at' , '-id')
+
+    def resolve_media_library_items(self , info , first=None , **kwargs) :
+        # Без first список ограничен MAX_PAGE_SIZE
+        queryset = MediaLibraryQuery._media_library_items_queryset(kwargs)
+        return queryset.order_by(*MediaLibraryQuery.MEDIA_LIBRARY_ITEMS_ORDERING)[:CursorPaginator.page_size(first)]
+
+    def resolve_media_library_items_page(self , info , first=None , after=None , with_total_count=True , **kwargs) :
+        paginator = CursorPaginator(
+            MediaLibraryQuery._media_library_items_queryset(kwargs) , MediaLibraryQuery.MEDIA_LIBRARY_ITEMS_ORDERING
+        )
+        return paginator.paginate(first , after , with_total_count)
+
+    @staticmethod
+    def _media_library_items_queryset(kwargs) :
         queryset = MediaLibraryItem.objects.select_related(
             'category' , 'created_by'
         ).prefetch_related('tags')
@@ -142,7 +178,7 @@ class MediaLibraryQuery(graphene.ObjectType) :
                 Q(tags__name__icontains=kwargs['search'])
             ).distinct()
 
-        return queryset.order_by('-created_at')
+        return queryset
 
     def resolve_media_library_item(self , info , id) :
         try :
@@ -1,6 +1,7 @@
 import graphene
 from graphene_django import DjangoObjectType
 from django.utils.translation import gettext_lazy as _
+from core.graphql import get_loaders
 from ..models import MediaCategory , MediaTag , MediaLibraryItem
 
 
@@ -21,10 +22,11 @@ class MediaCategoryType(DjangoObjectType) :
         return self.is_user_defined
 
     def resolve_can_delete(self , info) :
-        return self.can_delete
+        # MediaCategory.can_delete без запроса на каждую категорию
+        return not self.is_predefined and not get_loaders(info).count(MediaCategory , 'media_items').load(self)
 
     def resolve_media_items_count(self , info) :
-        return self.media_items_count
+        return get_loaders(info).count(MediaCategory , 'media_items').load(self)
 
 
 class MediaTagType(DjangoObjectType) :
@@ -35,7 +37,7 @@ class MediaTagType(DjangoObjectType) :
         fields = ('id' , 'name' , 'is_active' , 'created_at' , 'updated_at')
 
     def resolve_media_items_count(self , info) :
-        return self.media_items.count()
+        return get_loaders(info).count(MediaTag , 'media_items').load(self)
 
 
 class MediaLibraryItemType(DjangoObjectType) :
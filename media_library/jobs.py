@@ -0,0 +1,27 @@
+# media_library/jobs.py
+"""Фоновые задачи медиабиблиотеки (core.services.JobQueue)"""
+from core.services import register_job
+
+
+@register_job('media_library.recreate_previews', 'Пересоздание превью изображений')
+def recreate_previews(context):
+    """Пересоздать превью. params: ids - элементы медиабиблиотеки (по умолчанию - все)"""
+    from media_library.models import MediaLibraryItem
+
+    items = MediaLibraryItem.objects.order_by('pk')
+    if context.params.get('ids'):
+        items = items.filter(pk__in=context.params['ids'])
+    ids = list(items.values_list('pk', flat=True))
+
+    created, failed = 0, []
+    for index, pk in enumerate(ids):
+        context.progress(index, len(ids), f'Превью {index + 1} из {len(ids)}')
+        item = MediaLibraryItem.objects.filter(pk=pk).first()
+        if item is None or not item.is_image():
+            continue
+        success, message = item.recreate_preview()
+        if success:
+            created += 1
+        else:
+            failed.append({'id': str(pk), 'message': message})
+    return {'total': len(ids), 'created': created, 'failed': failed}
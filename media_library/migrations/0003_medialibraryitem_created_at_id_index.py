@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_library', '0002_alter_medialibraryitem_media_file_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='medialibraryitem',
+            name='media_libra_created_2a2e36_idx',
+        ),
+        migrations.AddIndex(
+            model_name='medialibraryitem',
+            index=models.Index(fields=['created_at', 'id'], name='media_libra_created_766bd1_idx'),
+        ),
+    ]
@@ -272,7 +272,8 @@ class MediaLibraryItem(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['category', 'is_active']),
-            models.Index(fields=['created_at']),
+            # Сортировка и keyset-пагинация списка (-created_at, -id)
+            models.Index(fields=['created_at', 'id']),
             models.Index(fields=['is_public', 'is_active']),
         ]
 
@@ -158,6 +158,9 @@ class BaseThroughOption(models.Model) :
     @property
     def default_option(self) -> Optional[models.Model] :
         """Стандартная опция для родительского объекта"""
+        # Значение, заранее найденное при пакетной загрузке опций (см. OptionCatalog)
+        if '_default_option_cache' in self.__dict__ :
+            return self._default_option_cache
         parent = self._get_parent_object()
         if not parent :
             return None
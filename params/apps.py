@@ -8,3 +8,7 @@ def get_this_app_name():
 class ParamsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = get_this_app_name()
+
+    def ready(self):
+        # Сигналы сброса индексов справочников (params.services)
+        from . import signals  # noqa
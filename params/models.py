@@ -1001,7 +1001,9 @@ class DnVariety(models.Model):
     @classmethod
     def find_dn(cls , search_value) :
         """
-        Ищет DN по различным полям: name, code, diameter_metric (точные совпадения)
+        Ищет DN по различным полям: code, name, diameter_metric (точные совпадения)
+
+        Поиск в индексе справочника в памяти (params.services.DnVarietyIndex), без запросов к БД.
 
         Args:
             search_value: строка или число для поиска
@@ -1009,33 +1011,8 @@ class DnVariety(models.Model):
         Returns:
             DnVariety object или None если не найден
         """
-        if search_value is None :
-            return None
-
-        search_value = str(search_value).strip()
-
-        # Пробуем найти в разных полях (точные совпадения)
-        try :
-            # Поиск по code (точное совпадение)
-            if cls.objects.filter(code=search_value , is_active=True).exists() :
-                return cls.objects.get(code=search_value , is_active=True)
-
-            # Поиск по name (точное совпадение)
-            if cls.objects.filter(name=search_value , is_active=True).exists() :
-                return cls.objects.get(name=search_value , is_active=True)
-
-            # Поиск по diameter_metric (числовое сравнение)
-            try :
-                diameter_value = int(search_value)
-                if cls.objects.filter(diameter_metric=diameter_value , is_active=True).exists() :
-                    return cls.objects.get(diameter_metric=diameter_value , is_active=True)
-            except (ValueError , TypeError) :
-                pass
-
-        except cls.DoesNotExist :
-            pass
-
-        return None
+        from params.services import DnVarietyIndex
+        return DnVarietyIndex.get_instance().resolve(search_value)
 
     @classmethod
     def get_dn_objects(cls , dn_input) :
@@ -1076,10 +1053,14 @@ class DnVariety(models.Model):
 
         # Обработка списка значений
         else :
+            # Строки и числа ищутся в индексе одним пакетом
+            from params.services import DnVarietyIndex
+            found = iter(DnVarietyIndex.get_instance().resolve_many(
+                [dn_val for dn_val in dn_input if isinstance(dn_val , (str , int))]))
             for i , dn_val in enumerate(dn_input) :
                 if isinstance(dn_val , (str , int)) :
                     # Строка или число в списке
-                    dn_obj = cls.find_dn(dn_val)
+                    dn_obj = next(found)
                     if dn_obj :
                         dn_objects.append(dn_obj)
                     else :
@@ -1121,7 +1102,9 @@ class PnVariety(models.Model):
     @classmethod
     def find_pn(cls , search_value) :
         """
-        Ищет PN по различным полям: name, code, pressure_bar (точные совпадения)
+        Ищет PN по различным полям: code, name, pressure_bar (точные совпадения)
+
+        Поиск в индексе справочника в памяти (params.services.PnVarietyIndex), без запросов к БД.
 
         Args:
             search_value: строка или число для поиска
@@ -1129,33 +1112,8 @@ class PnVariety(models.Model):
         Returns:
             PnVariety object или None если не найден
         """
-        if search_value is None :
-            return None
-
-        search_value = str(search_value).strip()
-
-        # Пробуем найти в разных полях (точные совпадения)
-        try :
-            # Поиск по code (точное совпадение)
-            if cls.objects.filter(code=search_value , is_active=True).exists() :
-                return cls.objects.get(code=search_value , is_active=True)
-
-            # Поиск по name (точное совпадение)
-            if cls.objects.filter(name=search_value , is_active=True).exists() :
-                return cls.objects.get(name=search_value , is_active=True)
-
-            # Поиск по pressure_bar (числовое сравнение)
-            try :
-                pressure_value = float(search_value)
-                if cls.objects.filter(pressure_bar=pressure_value , is_active=True).exists() :
-                    return cls.objects.get(pressure_bar=pressure_value , is_active=True)
-            except (ValueError , TypeError) :
-                pass
-
-        except cls.DoesNotExist :
-            pass
-
-        return None
+        from params.services import PnVarietyIndex
+        return PnVarietyIndex.get_instance().resolve(search_value)
 
     @classmethod
     def get_pn_objects(cls , pn_input) :
@@ -1196,10 +1154,14 @@ class PnVariety(models.Model):
 
         # Обработка списка значений
         else :
+            # Строки и числа ищутся в индексе одним пакетом
+            from params.services import PnVarietyIndex
+            found = iter(PnVarietyIndex.get_instance().resolve_many(
+                [pn_val for pn_val in pn_input if isinstance(pn_val , (str , int , float))]))
             for i , pn_val in enumerate(pn_input) :
                 if isinstance(pn_val , (str , int , float)) :
                     # Строка или число в списке
-                    pn_obj = cls.find_pn(pn_val)
+                    pn_obj = next(found)
                     if pn_obj :
                         pn_objects.append(pn_obj)
                     else :
@@ -1371,6 +1333,15 @@ class PneumaticAirSupplyPressure(models.Model) :
                                     help_text=_('Активно свойство или нет'))
     pressure_bar = models.DecimalField(max_digits=4 , decimal_places=1 , verbose_name=_("Давление в бар"))
 
+    # Единица измерения -> значение 1 бар в этой единице
+    CONVERSION_RATES = {
+        'bar' : 1.0 ,  # бар
+        'mpa' : 0.1 ,  # мегапаскали (1 бар = 0.1 МПа)
+        'kpa' : 100.0 ,  # килопаскали (1 бар = 100 кПа)
+        'atm' : 0.986923 ,  # атмосферы (1 бар ≈ 0.987 атм)
+        'psi' : 14.5038 ,  # фунты на кв. дюйм (1 бар ≈ 14.5 psi)
+    }
+
     class Meta :
         ordering = ['sorting_order']
         verbose_name = _('Давление питания в пневмосистеме')
@@ -1392,13 +1363,7 @@ class PneumaticAirSupplyPressure(models.Model) :
         unit = unit.lower()
         pressure_bar = float(self.pressure_bar)
 
-        conversion_rates = {
-            'bar' : 1.0 ,  # бар
-            'mpa' : 0.1 ,  # мегапаскали (1 бар = 0.1 МПа)
-            'kpa' : 100.0 ,  # килопаскали (1 бар = 100 кПа)
-            'atm' : 0.986923 ,  # атмосферы (1 бар ≈ 0.987 атм)
-            'psi' : 14.5038 ,  # фунты на кв. дюйм (1 бар ≈ 14.5 psi)
-        }
+        conversion_rates = self.CONVERSION_RATES
 
         if unit in conversion_rates :
             return round(pressure_bar * conversion_rates[unit] , 4)
@@ -1433,6 +1398,9 @@ class PneumaticAirSupplyPressure(models.Model) :
         """
         Ищет объект давления по значению в указанных единицах
 
+        Ближайшее активное давление в пределах 0.05 бар, поиск в индексе справочника
+        в памяти (params.services.AirSupplyPressureIndex).
+
         Args:
             pressure_value (float): значение давления
             unit (str): единица измерения входного значения
@@ -1440,24 +1408,8 @@ class PneumaticAirSupplyPressure(models.Model) :
         Returns:
             PneumaticAirSupplyPressure or None: найденный объект или None
         """
-        try :
-            # Конвертируем в бар для поиска
-            if unit != 'bar' :
-                temp_obj = cls(pressure_bar=1.0)  # Временный объект для конвертации
-                conversion_rate = temp_obj.get_pressure_in_units(unit)
-                pressure_value_bar = pressure_value / conversion_rate
-            else :
-                pressure_value_bar = pressure_value
-
-            # Ищем ближайшее значение (с учетом погрешности)
-            return cls.objects.filter(
-                pressure_bar__gte=pressure_value_bar - 0.05 ,
-                pressure_bar__lte=pressure_value_bar + 0.05 ,
-                is_active=True
-            ).first()
-
-        except (ValueError , TypeError) :
-            return None
+        from params.services import AirSupplyPressureIndex
+        return AirSupplyPressureIndex.get_instance().find_by_pressure(pressure_value , unit)
 
 class PneumaticConnection(models.Model) :
     """
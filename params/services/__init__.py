@@ -0,0 +1,8 @@
+from .reference_index import ReferenceIndex, DnVarietyIndex, PnVarietyIndex, AirSupplyPressureIndex
+
+__all__ = [
+    'ReferenceIndex',
+    'DnVarietyIndex',
+    'PnVarietyIndex',
+    'AirSupplyPressureIndex',
+]
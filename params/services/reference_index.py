@@ -0,0 +1,177 @@
+# params/services/reference_index.py
+import logging
+import threading
+import time
+from decimal import Context
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.apps import apps
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceIndex:
+    """
+    Индекс небольшого справочника в памяти процесса.
+
+    Активные записи загружаются одним запросом (по sorting_order) и сбрасываются сигналами
+    (params/signals.py). Поиск:
+        resolve / resolve_many - по псевдонимам ALIASES: (поле, преобразование) в порядке
+            приоритета, преобразование применяется к значению поля и к тексту запроса;
+            при совпадении у нескольких записей - первая по sorting_order
+        nearest / in_range - ближайшее значение VALUE_FIELD / диапазон значений (бинарный поиск
+            по отсортированному массиву)
+    Объекты индекса общие для всех вызовов - их нельзя изменять.
+    """
+    MODEL = None
+    ALIASES: Sequence[Tuple[str, Callable[[Any], Any]]] = ()
+    VALUE_FIELD = None
+    CACHE_TTL_SECONDS = 300  # страховка для других процессов, которые не получили сигнал
+
+    _instance = None
+    _instance_built_at = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self):
+        model = apps.get_model(self.MODEL)
+        self.objects = list(model.objects.filter(is_active=True).order_by('sorting_order', 'id'))
+        self.by_id = {obj.id: obj for obj in self.objects}
+
+        self._aliases: Dict[str, Dict[Any, Any]] = {field: {} for field, _ in self.ALIASES}
+        for obj in self.objects:
+            for field, convert in self.ALIASES:
+                key = self._key(convert, getattr(obj, field))
+                if key is not None:
+                    self._aliases[field].setdefault(key, obj)
+
+        valued = sorted(
+            ((float(getattr(obj, self.VALUE_FIELD)), obj) for obj in self.objects
+             if self.VALUE_FIELD and getattr(obj, self.VALUE_FIELD) is not None),
+            key=lambda item: item[0])
+        self.values = np.array([value for value, _ in valued], dtype=float)
+        self._value_objects = [obj for _, obj in valued]
+
+        logger.debug("%s: загружено %d записей", type(self).__name__, len(self.objects))
+
+    @classmethod
+    def get_instance(cls):
+        """Индекс для текущего процесса (строится при первом обращении)"""
+        instance = cls._instance
+        if instance is not None and time.monotonic() - cls._instance_built_at < cls.CACHE_TTL_SECONDS:
+            return instance
+        with cls._lock:
+            if cls._instance is None or time.monotonic() - cls._instance_built_at >= cls.CACHE_TTL_SECONDS:
+                cls._instance = cls()
+                cls._instance_built_at = time.monotonic()
+            return cls._instance
+
+    @classmethod
+    def invalidate(cls):
+        """Сбросить индекс - следующий get_instance перечитает справочник"""
+        cls._instance = None
+
+    # ==================== ПОИСК ====================
+
+    def resolve(self, value) -> Optional[Any]:
+        """Запись по коду/названию/числовому значению или None"""
+        if value is None:
+            return None
+        text = str(value).strip()
+        for field, convert in self.ALIASES:
+            key = self._key(convert, text)
+            if key is not None:
+                obj = self._aliases[field].get(key)
+                if obj is not None:
+                    return obj
+        return None
+
+    def resolve_many(self, values: Iterable) -> List[Optional[Any]]:
+        """Пакетный resolve: записи в порядке values (None - не найдено)"""
+        resolved: Dict[Any, Any] = {}
+        result = []
+        for value in values:
+            key = value if isinstance(value, (str, int, float)) else str(value)
+            if key not in resolved:
+                resolved[key] = self.resolve(value)
+            result.append(resolved[key])
+        return result
+
+    def nearest(self, value, tolerance: Optional[float] = None) -> Optional[Any]:
+        """Запись с ближайшим значением VALUE_FIELD (tolerance - максимальное отклонение)"""
+        try:
+            value = float(value)
+        except (ValueError, TypeError):
+            return None
+        if tolerance is not None:
+            return self._nearest_of(self.in_range(value - tolerance, value + tolerance), value)
+        if not len(self.values):
+            return None
+        position = int(np.searchsorted(self.values, value))
+        return self._nearest_of(self._value_objects[max(position - 1, 0):position + 1], value)
+
+    def in_range(self, low, high) -> List[Any]:
+        """Записи со значением VALUE_FIELD в [low, high], по возрастанию значения"""
+        start = int(np.searchsorted(self.values, float(low), side='left'))
+        end = int(np.searchsorted(self.values, float(high), side='right'))
+        return self._value_objects[start:end]
+
+    def _nearest_of(self, candidates, value) -> Optional[Any]:
+        # При равном отклонении - первая по sorting_order
+        if not candidates:
+            return None
+        return min(candidates, key=lambda obj: (abs(float(getattr(obj, self.VALUE_FIELD)) - value),
+                                                obj.sorting_order, obj.id))
+
+    @staticmethod
+    def _key(convert, value):
+        if value is None:
+            return None
+        try:
+            return convert(value)
+        except (ValueError, TypeError, ArithmeticError):
+            return None
+
+
+class DnVarietyIndex(ReferenceIndex):
+    """DnVariety: код -> название -> диаметр, мм (как DnVariety.find_dn)"""
+    MODEL = 'params.DnVariety'
+    ALIASES = (('code', str), ('name', str), ('diameter_metric', int))
+    VALUE_FIELD = 'diameter_metric'
+
+
+class PnVarietyIndex(ReferenceIndex):
+    """PnVariety: код -> название -> давление, бар (как PnVariety.find_pn)"""
+    MODEL = 'params.PnVariety'
+    ALIASES = (('code', str), ('name', str), ('pressure_bar', float))
+    VALUE_FIELD = 'pressure_bar'
+
+
+class AirSupplyPressureIndex(ReferenceIndex):
+    """PneumaticAirSupplyPressure: код -> название -> давление; поиск по давлению в любых единицах"""
+    MODEL = 'params.PneumaticAirSupplyPressure'
+    ALIASES = (('code', str), ('name', str), ('pressure_bar', float))
+    VALUE_FIELD = 'pressure_bar'
+    PRESSURE_TOLERANCE_BAR = 0.05
+
+    def find_by_pressure(self, pressure_value, unit='bar') -> Optional[Any]:
+        """
+        Давление питания, ближайшее к значению в единицах unit, не дальше PRESSURE_TOLERANCE_BAR.
+        Границы диапазона округляются до max_digits значащих цифр pressure_bar, как при запросе к БД
+        (DecimalField.to_python).
+        """
+        model = apps.get_model(self.MODEL)
+        rate = model.CONVERSION_RATES.get(str(unit).lower())
+        if rate is None:
+            return None
+        try:
+            pressure_value_bar = float(pressure_value) / round(rate, 4)
+        except (ValueError, TypeError, ZeroDivisionError):
+            return None
+        context = Context(prec=model._meta.get_field(self.VALUE_FIELD).max_digits)
+        low, high = (
+            context.create_decimal_from_float(bound)
+            for bound in (pressure_value_bar - self.PRESSURE_TOLERANCE_BAR,
+                          pressure_value_bar + self.PRESSURE_TOLERANCE_BAR)
+        )
+        return self._nearest_of(self.in_range(low, high), pressure_value_bar)
@@ -0,0 +1,29 @@
+# params/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import DnVariety, PnVariety, PneumaticAirSupplyPressure
+
+
+@receiver(post_save, sender=DnVariety)
+@receiver(post_delete, sender=DnVariety)
+def invalidate_dn_variety_index(sender, **kwargs):
+    """Сбрасывает индекс DN в памяти процесса"""
+    from .services import DnVarietyIndex
+    DnVarietyIndex.invalidate()
+
+
+@receiver(post_save, sender=PnVariety)
+@receiver(post_delete, sender=PnVariety)
+def invalidate_pn_variety_index(sender, **kwargs):
+    """Сбрасывает индекс PN в памяти процесса"""
+    from .services import PnVarietyIndex
+    PnVarietyIndex.invalidate()
+
+
+@receiver(post_save, sender=PneumaticAirSupplyPressure)
+@receiver(post_delete, sender=PneumaticAirSupplyPressure)
+def invalidate_air_supply_pressure_index(sender, **kwargs):
+    """Сбрасывает индекс давлений питания в памяти процесса"""
+    from .services import AirSupplyPressureIndex
+    AirSupplyPressureIndex.invalidate()
@@ -11,7 +11,6 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-from pneumatic_actuators.models import BodyThrustTorqueTable
 from pneumatic_actuators.models.pa_body import (
     PneumaticActuatorBodyTable ,
     PneumaticActuatorBody , PneumaticCloseTimeParameter , PneumaticWeightParameter
@@ -66,13 +65,11 @@ class PneumaticActuatorBodyTableAdmin(admin.ModelAdmin) :
 
     def export_torque_data(self , request , object_id) :
         """
-        Экспорт данных моментов/усилий для корпусов этой таблицы
+        Экспорт данных моментов/усилий для корпусов этой таблицы - фоновой задачей
+        (файл скачивается со страницы задачи)
         """
-        from django.http import HttpResponse
         from django.shortcuts import redirect
-        from pneumatic_actuators.models.pa_body import PneumaticActuatorBody
-        import os
-        from datetime import datetime
+        from core.services import JobQueue
 
         # Получаем таблицу корпусов
         body_table = self.get_object(request , object_id)
@@ -81,52 +78,26 @@ class PneumaticActuatorBodyTableAdmin(admin.ModelAdmin) :
             self.message_user(request , _("Таблица корпусов не найдена") , level='error')
             return redirect('admin:pneumatic_actuators_pneumaticactuatorbodytable_changelist')
 
-        # Получаем все корпуса этой таблицы
-        bodies = body_table.model_body_body_table.filter(is_active=True)
-
-        if not bodies :
+        if not body_table.model_body_body_table.filter(is_active=True).exists() :
             self.message_user(request , _("Нет корпусов для экспорта в этой таблице") , level='error')
             return redirect('admin:pneumatic_actuators_pneumaticactuatorbodytable_changelist')
 
-        try :
-            # Экспортируем данные используя статический метод из модели BodyThrustTorqueTable
-            output_path = BodyThrustTorqueTable.export_table_template(
-                pressure_min=2.5 ,
-                pressure_max=8.0 ,
-                springs_min=5 ,
-                springs_max=12 ,
-                output_path=f"torque_export_{body_table.code}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            )
-
-            # Читаем файл и возвращаем как HTTP response
-            with open(output_path , 'rb') as f :
-                response = HttpResponse(
-                    f.read() ,
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                response['Content-Disposition'] = f'attachment; filename="{os.path.basename(output_path)}"'
-
-            # Удаляем временный файл
-            os.unlink(output_path)
-
-            self.message_user(
-                request ,
-                _(f"Данные моментов/усилий для таблицы '{body_table.name}' успешно экспортированы") ,
-                level='success'
-            )
-            return response
-
-        except Exception as e :
-            logger.error(f"Error in export_torque_data: {e}")
-            self.message_user(request , _(f"Ошибка при экспорте: {str(e)}") , level='error')
-            return redirect('admin:pneumatic_actuators_pneumaticactuatorbodytable_change' , object_id=object_id)
+        job = JobQueue.enqueue(
+            'pneumatic_actuators.export_torque' ,
+            params={'pressure_min' : 2.5 , 'pressure_max' : 8.0 , 'springs_min' : 5 , 'springs_max' : 12 ,
+                    'code' : body_table.code} ,
+            title=f"Экспорт моментов/усилий: {body_table.name}" ,
+            user=request.user ,
+        )
+        return self._redirect_to_job(request , job)
 
     def import_torque_data(self , request) :
         """
-        Импорт данных моментов/усилий из Excel
+        Импорт данных моментов/усилий из Excel - фоновой задачей
         """
         from django import forms
         from django.shortcuts import render
+        from core.services import JobQueue
 
         class ImportForm(forms.Form) :
             excel_file = forms.FileField(label='Excel файл')
@@ -134,34 +105,13 @@ class PneumaticActuatorBodyTableAdmin(admin.ModelAdmin) :
         if request.method == 'POST' :
             form = ImportForm(request.POST , request.FILES)
             if form.is_valid() :
-                try :
-                    # Сохраняем временный файл
-                    import tempfile
-                    import os
-
-                    with tempfile.NamedTemporaryFile(delete=False , suffix='.xlsx') as tmp_file :
-                        for chunk in request.FILES['excel_file'].chunks() :
-                            tmp_file.write(chunk)
-                        tmp_path = tmp_file.name
-
-                    # Импортируем данные
-                    imported_count , errors = BodyThrustTorqueTable.import_from_excel(tmp_path)
-
-                    # Удаляем временный файл
-                    os.unlink(tmp_path)
-
-                    if errors :
-                        for error in errors :
-                            self.message_user(request , error , level='error')
-
-                    self.message_user(
-                        request ,
-                        f"Импорт завершен. Успешно импортировано записей: {imported_count}" ,
-                        level='success' if not errors else 'warning'
-                    )
-
-                except Exception as e :
-                    self.message_user(request , f"Ошибка при импорте: {str(e)}" , level='error')
+                job = JobQueue.enqueue(
+                    'pneumatic_actuators.import_torque' ,
+                    title=f"Импорт моментов/усилий: {request.FILES['excel_file'].name}" ,
+                    user=request.user ,
+                    files={'excel_file' : request.FILES['excel_file']} ,
+                )
+                return self._redirect_to_job(request , job)
         else :
             form = ImportForm()
 
@@ -170,6 +120,17 @@ class PneumaticActuatorBodyTableAdmin(admin.ModelAdmin) :
             'title' : 'Импорт данных моментов/усилий'
         })
 
+    def _redirect_to_job(self , request , job) :
+        """Страница поставленной задачи: прогресс, результат и файл"""
+        from django.shortcuts import redirect
+
+        self.message_user(
+            request ,
+            _("Задача поставлена в очередь. Состояние и результат - на этой странице (обновите ее позже)") ,
+            level='success'
+        )
+        return redirect('admin:core_backgroundjob_change' , job.pk)
+
     def get_urls(self) :
         """Добавляем URL для экспорта и импорта данных"""
         from django.urls import path
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django import forms
 from django.utils.html import format_html
 from django.urls import path
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
 from django.db.models import Prefetch
 import json
 
@@ -21,8 +21,9 @@ class PneumaticActuatorSelectedAdmin(admin.ModelAdmin) :
         'name' , 'code' , 'selected_model_display' ,
         'safety_position_display' , 'springs_qty_display' ,
         'temperature_display' , 'ip_display' , 'exd_display' ,
-        'body_coating_display' , 'sorting_order' , 'is_active'
+        'body_coating_display' , 'weight_display' , 'time_display' , 'sorting_order' , 'is_active'
     ]
+    actions = ['export_specification']
     list_filter = [
         'is_active' , 'selected_model' ,
         'selected_safety_position__safety_position' ,
@@ -201,7 +202,8 @@ class PneumaticActuatorSelectedAdmin(admin.ModelAdmin) :
 
     def get_queryset(self , request) :
         return super().get_queryset(request).select_related(
-            'selected_model' ,
+            'selected_model__body' ,
+            'selected_model__pneumatic_actuator_variety' ,
             'selected_safety_position__safety_position' ,
             'selected_springs_qty__springs_qty' ,
             'selected_temperature__model_line' ,
@@ -244,4 +246,62 @@ class PneumaticActuatorSelectedAdmin(admin.ModelAdmin) :
     def body_coating_display(self , obj) :
         return obj.selected_body_coating.body_coating_option if obj.selected_body_coating else "-"
 
-    body_coating_display.short_description = "Покрытие"
\ No newline at end of file
+    body_coating_display.short_description = "Покрытие"
+
+    def weight_display(self , obj) :
+        # Вес берется из ActuatorParameterIndex без запросов к БД на строку
+        weight = obj.calculated_weight
+        return f"{weight} кг" if weight is not None else "-"
+
+    weight_display.short_description = "Вес"
+
+    def time_display(self , obj) :
+        time_open , time_close = obj.calculated_time_open , obj.calculated_time_close
+        if time_open is None and time_close is None :
+            return "-"
+        return f"{time_open or '-'}/{time_close or '-'} сек"
+
+    time_display.short_description = "Время откр/закр"
+
+    def export_specification(self , request , queryset) :
+        """Экспорт спецификации выбранных приводов в Excel"""
+        from io import BytesIO
+        from openpyxl import Workbook
+        from openpyxl.styles import Font
+
+        actuators = list(queryset.select_related(
+            'selected_model' , 'selected_springs_qty__springs_qty' , 'selected_safety_position__safety_position'
+        ))
+        parameters = PneumaticActuatorSelected.resolve_parameters(queryset)
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Спецификация"
+        ws.append(['Код' , 'Название' , 'Модель' , 'Положение безопасности' , 'Кол-во пружин' ,
+                   'Вес, кг' , 'Время открытия, сек' , 'Время закрытия, сек'])
+        for cell in ws[1] :
+            cell.font = Font(bold=True)
+
+        for actuator in actuators :
+            resolved = parameters.get(actuator.pk , {})
+            ws.append([
+                actuator.code ,
+                actuator.name ,
+                actuator.selected_model.name if actuator.selected_model else None ,
+                str(actuator.selected_safety_position.safety_position) if actuator.selected_safety_position else None ,
+                str(actuator.selected_springs_qty.springs_qty) if actuator.selected_springs_qty else None ,
+                resolved.get('weight') ,
+                resolved.get('time_open') ,
+                resolved.get('time_close') ,
+            ])
+
+        output = BytesIO()
+        wb.save(output)
+        response = HttpResponse(
+            output.getvalue() ,
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+        response['Content-Disposition'] = 'attachment; filename="pneumatic_actuators_specification.xlsx"'
+        return response
+
+    export_specification.short_description = "Экспорт спецификации в Excel"
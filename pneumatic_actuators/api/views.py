@@ -1,6 +1,11 @@
 # pneumatic_actuators/api/views.py
 from django.http import JsonResponse
 from django.views import View
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
 
 import logging
 logger = logging.getLogger(__name__)
@@ -23,4 +28,62 @@ class OptionAPIView(View):
             return JsonResponse(options)
 
         except PneumaticActuatorModelLineItem.DoesNotExist:
-            return JsonResponse({'error': 'Model PneumaticActuatorModelLineItem not found'}, status=404)
\ No newline at end of file
+            return JsonResponse({'error': 'Model PneumaticActuatorModelLineItem not found'}, status=404)
+
+class TenderSizingAPIView(APIView):
+    """
+    Пакетный подбор пневмоприводов для строк тендера.
+
+    POST JSON:
+        {
+            "lines": [{"ref": "1", "torque_open": 120, "torque_close": 90}, ...],
+            "defaults": {"pressure_min": 5.5, "pressure_max": 7, "safety_position": "nc",
+                         "safety_factor": 1.25},
+            "model_line_ids": [1, 2]   # необязательно, ограничить подбор сериями
+        }
+
+    Только для авторизованных пользователей; частота запросов ограничена
+    (REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['tender_sizing']).
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'tender_sizing'
+
+    def post(self, request):
+        from pneumatic_actuators.services import TenderSizingService
+
+        lines = request.data.get('lines')
+        if not isinstance(lines, list) or not lines:
+            return Response({'error': 'lines required'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(lines) > TenderSizingService.MAX_LINES:
+            return Response({'error': f'Too many lines, max {TenderSizingService.MAX_LINES}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not all(isinstance(line, dict) for line in lines):
+            return Response({'error': 'Each line must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+
+        defaults = request.data.get('defaults') or {}
+        if not isinstance(defaults, dict):
+            return Response({'error': 'defaults must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+        if defaults.get('safety_factor') not in (None, ''):
+            try:
+                safety_factor = float(defaults['safety_factor'])
+            except (TypeError, ValueError):
+                safety_factor = None
+            if safety_factor is None or not safety_factor > 0:
+                return Response({'error': 'defaults.safety_factor must be a positive number'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        model_line_ids = request.data.get('model_line_ids') or None
+        if model_line_ids is not None:
+            try:
+                model_line_ids = [int(model_line_id) for model_line_id in model_line_ids]
+            except (TypeError, ValueError):
+                return Response({'error': 'model_line_ids must be a list of integers'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        service = TenderSizingService(model_line_ids=model_line_ids)
+        results = service.size_lines(lines, defaults=defaults)
+
+        return Response({
+            'count': len(results),
+            'found': sum(1 for result in results if result['status'] == 'ok'),
+            'results': results,
+        })
@@ -13,4 +13,5 @@ class PneumaticActuatorConfig(AppConfig) :
         import pneumatic_actuators.models.pa_model_line  # noqa
         import pneumatic_actuators.models.pa_techdata  # noqa
         import pneumatic_actuators.models.pa_techdata_drawing_item  # noqa
-        import pneumatic_actuators.models.pa_torque  # noqa
\ No newline at end of file
+        import pneumatic_actuators.models.pa_torque  # noqa
+        import pneumatic_actuators.signals  # noqa
@@ -0,0 +1,165 @@
+# pneumatic_actuators/benchmarks.py
+"""Бенчмарки пневмоприводов (core.services.BenchmarkSuite): таблицы моментов и опции моделей"""
+from decimal import Decimal
+
+from core.services import BenchmarkSuite, register_benchmark, register_benchmark_seed
+from pneumatic_actuators.models.py_options_constants import (
+    ACTUATOR_VARIETY_RP_DEFAULT_CODE, PRESSURE_SPRING_DEFAULT_CODE, SAFETY_POSITION_NC_DEFAULT_CODE,
+    SAFETY_POSITION_NO_DEFAULT_CODE, SPRINGS_DA_DEFAULT_CODE, SPRINGS_SR_DEFAULT_CODE,
+)
+from pneumatic_actuators.services import OptionCatalog, TorqueMatrixCache
+
+BODIES_PER_SCALE = 12
+PRESSURES_BAR = ('2.5', '3', '3.5', '4', '4.5', '5', '5.5', '6', '7', '8')
+SPRING_CODES = ('05', '06', '07', '08', '09', '10', '11', '12')
+
+
+def _reference(model, code, **defaults):
+    """Справочник по коду: из фикстур или новый"""
+    obj = model.objects.filter(code=code).first()
+    if obj is None:
+        obj = model.objects.create(code=code, **defaults)
+    return obj
+
+
+@register_benchmark_seed('pneumatic_actuators')
+def seed_pneumatic_actuators(scale):
+    """Корпуса с полными таблицами моментов DA/SR, серии, модели и их опции"""
+    from params.models import (
+        BodyCoatingOption, ExdOption, IpOption, PneumaticAirSupplyPressure, SafetyPositionOption,
+    )
+    from pneumatic_actuators.models import (
+        BodyThrustTorqueTable, PneumaticActuatorBody, PneumaticActuatorBodyTable,
+        PneumaticActuatorConstructionVariety, PneumaticActuatorModelLine, PneumaticActuatorModelLineItem,
+        PneumaticActuatorSpringsQty, PneumaticActuatorVariety,
+    )
+    from pneumatic_actuators.models.pa_options import (
+        PneumaticBodyCoatingOption, PneumaticExdOption, PneumaticIpOption, PneumaticSafetyPositionOption,
+        PneumaticSpringsQtyOption, PneumaticTemperatureOption,
+    )
+
+    spring_pressure = _reference(PneumaticAirSupplyPressure, PRESSURE_SPRING_DEFAULT_CODE,
+                                 name='SPRING', pressure_bar=0, sorting_order=0)
+    pressures = [_reference(PneumaticAirSupplyPressure, bar, name=bar, pressure_bar=Decimal(bar), sorting_order=i)
+                 for i, bar in enumerate(PRESSURES_BAR, start=1)]
+    da_springs = _reference(PneumaticActuatorSpringsQty, SPRINGS_DA_DEFAULT_CODE, name='DA', description='')
+    sr_springs = [_reference(PneumaticActuatorSpringsQty, code, name=f'{code} пружин', description='',
+                             sorting_order=i) for i, code in enumerate(SPRING_CODES, start=1)]
+    varieties = {code: _reference(PneumaticActuatorVariety, code, name=code, description='')
+                 for code in (SPRINGS_DA_DEFAULT_CODE, SPRINGS_SR_DEFAULT_CODE)}
+    construction = _reference(PneumaticActuatorConstructionVariety, ACTUATOR_VARIETY_RP_DEFAULT_CODE,
+                              name='Шестерня-рейка', description='')
+    safety_positions = [_reference(SafetyPositionOption, code, name=code, description='')
+                        for code in ('none', SAFETY_POSITION_NO_DEFAULT_CODE, SAFETY_POSITION_NC_DEFAULT_CODE)]
+
+    body_table = PneumaticActuatorBodyTable.objects.create(name='BENCH', code='BENCH', description='')
+    bodies = PneumaticActuatorBody.objects.bulk_create([
+        PneumaticActuatorBody(name=f'BP{i}', code=f'BP{i}', description='', body_table=body_table, sorting_order=i,
+                              min_pressure_bar=Decimal('2.5'), max_pressure_bar=Decimal('8'))
+        for i in range(1, BODIES_PER_SCALE * scale + 1)
+    ])
+
+    rows = []
+    for body_number, body in enumerate(bodies, start=1):
+        for pressure in pressures:
+            torque = round(body_number * 10 * float(pressure.pressure_bar), 1)
+            rows.append(BodyThrustTorqueTable(body=body, pressure=pressure, spring_qty=da_springs,
+                                              bto=torque, rto=0, eto=torque))
+        for spring_number, springs in enumerate(sr_springs, start=5):
+            spring_torque = round(body_number * spring_number * 1.7, 1)
+            rows.append(BodyThrustTorqueTable(body=body, pressure=spring_pressure, spring_qty=springs,
+                                              bto=spring_torque, rto=0, eto=round(spring_torque * 1.4, 1)))
+            for pressure in pressures:
+                air_torque = body_number * 10 * float(pressure.pressure_bar)
+                if air_torque <= spring_torque * 1.5:
+                    continue
+                rows.append(BodyThrustTorqueTable(body=body, pressure=pressure, spring_qty=springs,
+                                                  bto=round(air_torque - spring_torque, 1), rto=0,
+                                                  eto=round(air_torque - spring_torque * 1.4, 1)))
+    BodyThrustTorqueTable.objects.bulk_create(rows, batch_size=1000)
+
+    model_lines = PneumaticActuatorModelLine.objects.bulk_create([
+        PneumaticActuatorModelLine(name=f'BENCH {code}', code=code, description='',
+                                   pneumatic_actuator_construction_variety=construction)
+        for code in ('BA', 'BB')
+    ])
+    items = PneumaticActuatorModelLineItem.objects.bulk_create([
+        PneumaticActuatorModelLineItem(name=f'{model_line.code}{body.code}-{variety_code}', code=body.code,
+                                       description='', model_line=model_line, body=body,
+                                       pneumatic_actuator_variety=varieties[variety_code])
+        for model_line in model_lines for body in bodies
+        for variety_code in (SPRINGS_DA_DEFAULT_CODE, SPRINGS_SR_DEFAULT_CODE)
+    ])
+
+    options = []
+    for item in items:
+        options += [PneumaticSafetyPositionOption(model_line_item=item, safety_position=position,
+                                                  encoding=position.code.upper(), description='',
+                                                  is_default=position.code == SAFETY_POSITION_NC_DEFAULT_CODE)
+                    for position in safety_positions]
+    PneumaticSafetyPositionOption.objects.bulk_create(options)
+    PneumaticSpringsQtyOption.objects.bulk_create([
+        PneumaticSpringsQtyOption(model_line_item=item, springs_qty=springs, encoding=springs.code, description='',
+                                  is_default=springs.code == SPRING_CODES[0])
+        for item in items if item.pneumatic_actuator_variety_id == varieties[SPRINGS_SR_DEFAULT_CODE].id
+        for springs in sr_springs
+    ])
+    for model_line in model_lines:
+        PneumaticTemperatureOption.objects.bulk_create([
+            PneumaticTemperatureOption(model_line=model_line, encoding=encoding, description='', is_default=not i,
+                                       work_temp_min=temp_min, work_temp_max=temp_max)
+            for i, (encoding, temp_min, temp_max) in enumerate((('T1', -20, 80), ('T2', -40, 80), ('T3', -20, 150)))
+        ])
+        PneumaticIpOption.objects.bulk_create([
+            PneumaticIpOption(model_line=model_line, ip_option=option, encoding=option.code or str(option.pk),
+                              description='', is_default=not i)
+            for i, option in enumerate(IpOption.objects.order_by('id'))
+        ])
+        PneumaticExdOption.objects.bulk_create([
+            PneumaticExdOption(model_line=model_line, exd_option=option, encoding=option.code or str(option.pk),
+                               description='', is_default=not i)
+            for i, option in enumerate(ExdOption.objects.order_by('id'))
+        ])
+        PneumaticBodyCoatingOption.objects.bulk_create([
+            PneumaticBodyCoatingOption(model_line=model_line, body_coating_option=option,
+                                       encoding=option.code or str(option.pk), description='', is_default=not i)
+            for i, option in enumerate(BodyCoatingOption.objects.order_by('id'))
+        ])
+    return len(bodies) + len(rows) + len(items) + len(options)
+
+
+def _body_ids():
+    from pneumatic_actuators.models import PneumaticActuatorBody
+    return list(PneumaticActuatorBody.objects.order_by('id').values_list('id', flat=True))
+
+
+@register_benchmark('pneumatic_actuators.torque_tables', 'Таблицы моментов всех корпусов (NC и NO, таблица и Markdown)',
+                    setup=TorqueMatrixCache.invalidate)
+def torque_tables():
+    from pneumatic_actuators.models import BodyThrustTorqueTable
+
+    for body_id in _body_ids():
+        for ncno in (SAFETY_POSITION_NC_DEFAULT_CODE, SAFETY_POSITION_NO_DEFAULT_CODE):
+            formatted = TorqueMatrixCache.get_torque_thrust_values(body_id, ncno_code=ncno)
+            BodyThrustTorqueTable.format_for_markdown(formatted)
+
+
+@register_benchmark('pneumatic_actuators.option_catalog', 'Опции всех моделей серий пневмоприводов',
+                    setup=OptionCatalog.invalidate)
+def option_catalog():
+    from pneumatic_actuators.models import PneumaticActuatorModelLineItem
+
+    OptionCatalog.get_many(PneumaticActuatorModelLineItem.objects.all())
+
+
+@register_benchmark('pneumatic_actuators.graphql_model_lines', 'GraphQL: серии пневмоприводов (coreStructuredData)')
+def graphql_model_lines():
+    BenchmarkSuite.execute_graphql("""
+        query {
+            coreStructuredData(model: "pneumatic_actuators.PneumaticActuatorModelLine", format: "display",
+                               first: 100) {
+                items
+                pageInfo { hasNextPage endCursor }
+            }
+        }
+    """)
@@ -0,0 +1,34 @@
+# pneumatic_actuators/jobs.py
+"""Фоновые задачи пневмоприводов (core.services.JobQueue)"""
+from datetime import datetime
+
+from core.services import register_job
+
+
+@register_job('pneumatic_actuators.export_torque', 'Экспорт таблицы моментов/усилий')
+def export_torque_table(context):
+    """Шаблон таблицы моментов в Excel. params: pressure_min, pressure_max, springs_min, springs_max, code"""
+    from pneumatic_actuators.models import BodyThrustTorqueTable
+
+    params = context.params
+    filename = f"torque_export_{params.get('code') or 'all'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    context.progress(0, message='Формирование файла', force=True)
+    output_path = BodyThrustTorqueTable.export_table_template(
+        pressure_min=params.get('pressure_min', 2.5),
+        pressure_max=params.get('pressure_max', 8.0),
+        springs_min=params.get('springs_min', 5),
+        springs_max=params.get('springs_max', 12),
+        output_path=context.temp_path(filename),
+    )
+    context.save_result_file(filename, output_path)
+    return {'file_name': filename}
+
+
+@register_job('pneumatic_actuators.import_torque', 'Импорт таблицы моментов/усилий')
+def import_torque_table(context):
+    """Импорт таблицы моментов из Excel (входной файл excel_file)"""
+    from pneumatic_actuators.models import BodyThrustTorqueTable
+
+    context.progress(0, message='Импорт файла', force=True)
+    imported_count, errors = BodyThrustTorqueTable.import_from_excel(context.input_path('excel_file'))
+    return {'imported_count': imported_count, 'errors': errors}
@@ -16,7 +16,7 @@ logger = logging.getLogger(__name__)
 
 from pneumatic_actuators.models import PneumaticActuatorModelLineItem
 from .py_options_constants import SAFETY_POSITION_NC_DEFAULT_CODE , \
-    ACTUATOR_VARIETY_RP_DEFAULT_CODE
+    ACTUATOR_VARIETY_RP_DEFAULT_CODE, SPRINGS_DA_DEFAULT_CODE
 
 import subprocess
 import sys
@@ -149,7 +149,9 @@ class PneumaticActuatorSelected(models.Model):
             'selected_options': {},
             'body_specs': {},  # ПОЛЕ ДЛЯ ХАРАКТЕРИСТИК КОРПУСА
             'calculated_parameters': {  # НОВОЕ ПОЛЕ ДЛЯ РАСЧЕТНЫХ ПАРАМЕТРОВ
-                'weight': float(self.calculated_weight) if self.calculated_weight else None
+                'weight': float(self.calculated_weight) if self.calculated_weight else None,
+                'time_open': float(self.calculated_time_open) if self.calculated_time_open else None,
+                'time_close': float(self.calculated_time_close) if self.calculated_time_close else None,
             },
             'torque_thrust_table': None,
             'cert_data' : None
@@ -233,7 +235,6 @@ class PneumaticActuatorSelected(models.Model):
                 )
 
                 data['torque_thrust_table'] = torque_data
-                print(f"data['torque_thrust_table'] {data['torque_thrust_table']}")
             except Exception as e:
                 logger.error(f"Error getting torque/thrust table data: {e}")
                 data['torque_thrust_table'] = {
@@ -602,6 +603,8 @@ class PneumaticActuatorSelected(models.Model):
                            self.selected_model.pneumatic_actuator_variety.code == 'DA')
             if is_da_model:
                 self.selected_safety_position = None
+        # Опции могли измениться - вес и время пересчитываются заново
+        self._resolved_parameters = None
         # Автозаполнение
         if self.selected_model:
             self.name = self.generated_model_item_code
@@ -810,215 +813,96 @@ class PneumaticActuatorSelected(models.Model):
         return str(self.selected_body_coating) if self.selected_body_coating else "-"
 
     def get_available_options(self) -> Dict[str, List[Dict]]:
-        """Получить все доступные опции для выбранной модели"""
-        from pneumatic_actuators.models.pa_options import (
-            PneumaticSafetyPositionOption, PneumaticSpringsQtyOption,
-            PneumaticTemperatureOption, PneumaticIpOption,
-            PneumaticExdOption, PneumaticBodyCoatingOption
-        )
-        #
-        # print(f"=== DEBUG get_available_options ===")
-        # print(f"Selected actuator ID: {self.id}")
-        # print(f"Selected model: {self.selected_model}")
-        # print(f"Selected model ID: {self.selected_model.id if self.selected_model else 'None'}")
-        # print(f"Selected model name: {self.selected_model.name if self.selected_model else 'None'}")
+        """
+        Получить все доступные опции для выбранной модели.
+
+        Опции берутся из OptionCatalog: загрузка фиксированным числом запросов,
+        результат запоминается по модели серии.
+        """
+        from pneumatic_actuators.services import OptionCatalog
 
         if not self.selected_model:
-            # print("=== DEBUG: No selected model - returning empty options")
             return self._get_empty_options()
 
         try:
-            # Опции через model_line_item
-            safety_options = PneumaticSafetyPositionOption.objects.filter(
-                model_line_item=self.selected_model,
-                is_active=True
-            ).select_related('safety_position')
-
-            springs_options = PneumaticSpringsQtyOption.objects.filter(
-                model_line_item=self.selected_model,
-                is_active=True
-            ).select_related('springs_qty')
-            #
-            # print(f"Safety options SQL: {safety_options.query}")
-            # print(f"Springs options SQL: {springs_options.query}")
-            # print(f"Safety options count: {safety_options.count()}")
-            # print(f"Springs options count: {springs_options.count()}")
-
-            # # Выводим найденные опции
-            # for i , opt in enumerate(safety_options) :
-            #     print(f"Safety option {i + 1}: {opt.id} - {opt.safety_position.name} - encoding: '{opt.encoding}'")
-            #
-            # for i , opt in enumerate(springs_options) :
-            #     print(f"Springs option {i + 1}: {opt.id} - {opt.springs_qty.name} - encoding: '{opt.encoding}'")
-
-            # Опции через model_line
-            temperature_options = []
-            ip_options = []
-            exd_options = []
-            body_coating_options = []
-
-            if self.selected_model.model_line:
-                # print(f"Model line: {self.selected_model.model_line}")
-
-                temperature_options = PneumaticTemperatureOption.objects.filter(
-                    model_line=self.selected_model.model_line,
-                    is_active=True
-                )
-                # ДИАГНОСТИКА temperature_options
-                print(f"🔧 MODEL temperature_options count: {temperature_options.count()}")
-                for opt in temperature_options:
-                    print(f"🔧   id={opt.id}, encoding={opt.encoding}")
-
-                ip_options = PneumaticIpOption.objects.filter(
-                    model_line=self.selected_model.model_line,
-                    is_active=True
-                )
-
-                exd_options = PneumaticExdOption.objects.filter(
-                    model_line=self.selected_model.model_line,
-                    is_active=True
-                )
-
-                body_coating_options = PneumaticBodyCoatingOption.objects.filter(
-                    model_line=self.selected_model.model_line,
-                    is_active=True
-                )
-
-                # print(f"Temperature options count: {temperature_options.count()}")
-                # print(f"IP options count: {ip_options.count()}")
-                # print(f"Exd options count: {exd_options.count()}")
-                # print(f"Coating options count: {body_coating_options.count()}")
-
-            result = {
-                'safety_positions': [
-                    {
-                        'id': opt.id,
-                        'encoding': opt.encoding,
-                        'name': opt.safety_position.name,
-                        'description': opt.description,
-                        'is_default': opt.is_default
-                    } for opt in safety_options
-                ],
-                'springs_qty': [
-                    {
-                        'id': opt.id,
-                        'encoding': opt.encoding,
-                        'name': opt.springs_qty.name,
-                        'description': opt.description,
-                        'is_default': opt.is_default
-                    } for opt in springs_options
-                ],
-                'temperature_options': [
-                    {
-                        'id': opt.id,
-                        'encoding': opt.encoding,
-                        'name': opt.get_display_name(),
-                        'description': opt.description,
-                        'is_default': opt.is_default
-                    } for opt in temperature_options
-                ],
-                'ip_options': [
-                    {
-                        'id': opt.id,
-                        'encoding': opt.encoding,
-                        'name': str(opt),
-                        'description': opt.description,
-                        'is_default': opt.is_default
-                    } for opt in ip_options
-                ],
-                'exd_options': [
-                    {
-                        'id': opt.id,
-                        'encoding': opt.encoding,
-                        'name': str(opt),
-                        'description': opt.description,
-                        'is_default': opt.is_default
-                    } for opt in exd_options
-                ],
-                'body_coating_options': [
-                    {
-                        'id': opt.id,
-                        'encoding': opt.encoding,
-                        'name': str(opt),
-                        'description': opt.description,
-                        'is_default': opt.is_default
-                    } for opt in body_coating_options
-                ]
-            }
-
-            # print(f"=== DEBUG: Final result structure ===")
-            for key, value in result.items():
-                # print(f"=== DEBUG get_available_options: {key}: {len(value)} items")
-                for item in value[:5]:  # Покажем первые 2 элемента каждого типа
-                    print(f"  - {item}")
-
-            return result
-
+            return OptionCatalog.get_options(self.selected_model)
         except Exception as e:
-            print(f"=== DEBUG: Error in get_available_options: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"Error in get_available_options: {e}", exc_info=True)
             return self._get_empty_options()
 
     def _get_empty_options(self):
         """Пустые опции"""
-        return {
-            'safety_positions': [], 'springs_qty': [],
-            'temperature_options': [], 'ip_options': [],
-            'exd_options': [], 'body_coating_options': []
-        }
-
-    def get_weight(self) -> Optional[Decimal]:
-        """Рассчитать вес привода"""
-        from pneumatic_actuators.models import PneumaticWeightParameter
-        if not self.selected_model or not self.selected_model.body:
-            return None
-
-        body = self.selected_model.body
+        from pneumatic_actuators.services import OptionCatalog
+        return OptionCatalog.empty_options()
+
+    def _parameter_key(self) -> Tuple[Optional[int], Optional[str]]:
+        """(корпус, код пружин) для таблиц веса и времени; для DA код пружин - DA"""
+        if not self.selected_model or not self.selected_model.body_id:
+            return None, None
+        variety = self.selected_model.pneumatic_actuator_variety
+        if variety and variety.code == SPRINGS_DA_DEFAULT_CODE:
+            return self.selected_model.body_id, SPRINGS_DA_DEFAULT_CODE
+        if not self.selected_springs_qty:
+            return self.selected_model.body_id, None
+        return self.selected_model.body_id, self.selected_springs_qty.springs_qty.code
+
+    @classmethod
+    def resolve_parameters(cls, actuators) -> Dict[int, Dict[str, Optional[Decimal]]]:
+        """
+        Вес и время открытия/закрытия для набора выбранных приводов.
 
-        try:
-            # Для приводов DA
-            if (self.selected_model.pneumatic_actuator_variety and
-                    self.selected_model.pneumatic_actuator_variety.code == 'DA'):
-                da_weight = PneumaticWeightParameter.objects.filter(
-                    body=body,
-                    spring_qty__code='DA'
-                ).first()
-                return da_weight.weight if da_weight else None
-
-            # Для приводов SR
-            if not self.selected_springs_qty:
-                return None
-
-            # Получаем вес для максимального количества пружин
-            max_springs_qty = PneumaticWeightParameter.objects.filter(
-                body=body
-            ).exclude(spring_qty__code='DA').order_by('-spring_qty__code').first()
-
-            if not max_springs_qty:
-                return None
-
-            # Если выбрано максимальное количество пружин
-            if self.selected_springs_qty.springs_qty.code == max_springs_qty.spring_qty.code:
-                return max_springs_qty.weight
-
-            # Вычисляем разницу в количестве пружин
-            try:
-                selected_springs = int(self.selected_springs_qty.springs_qty.code)
-                max_springs = int(max_springs_qty.spring_qty.code)
+        Args:
+            actuators: QuerySet (один запрос values_list) или список экземпляров
+                (данные модели/пружин берутся из select_related, результат запоминается в экземплярах)
 
-                spring_difference = max_springs - selected_springs
+        Returns:
+            {pk: {'weight': ..., 'time_open': ..., 'time_close': ...}}
+        """
+        from pneumatic_actuators.services import ActuatorParameterIndex
+        index = ActuatorParameterIndex.get_instance()
+
+        if isinstance(actuators, models.QuerySet):
+            rows = actuators.values_list('pk', 'selected_model__body_id',
+                                         'selected_model__pneumatic_actuator_variety__code',
+                                         'selected_springs_qty__springs_qty__code')
+            keys = {
+                pk: (body_id, SPRINGS_DA_DEFAULT_CODE if variety_code == SPRINGS_DA_DEFAULT_CODE else spring_code)
+                for pk, body_id, variety_code, spring_code in rows
+            }
+            instances = {}
+        else:
+            instances = {actuator.pk: actuator for actuator in actuators}
+            keys = {pk: actuator._parameter_key() for pk, actuator in instances.items()}
+
+        resolved = {}
+        for pk, (body_id, spring_code) in keys.items():
+            time_open, time_close = index.get_times(body_id, spring_code)
+            resolved[pk] = {
+                'weight': index.get_weight(body_id, spring_code),
+                'time_open': time_open,
+                'time_close': time_close,
+            }
+            if pk in instances:
+                instances[pk]._resolved_parameters = resolved[pk]
+        return resolved
 
-                # Вычисляем вес с учетом разницы пружин
-                if body.weight_spring and spring_difference > 0:
-                    return max_springs_qty.weight - (spring_difference * body.weight_spring)
-                else:
-                    return max_springs_qty.weight
+    def get_resolved_parameters(self) -> Dict[str, Optional[Decimal]]:
+        """Вес и время открытия/закрытия привода (запоминается в экземпляре)"""
+        resolved = getattr(self, '_resolved_parameters', None)
+        if resolved is None:
+            resolved = self.resolve_parameters([self])[self.pk]
+        return resolved
 
-            except (ValueError, TypeError):
-                # Если не удалось преобразовать в числа
-                return max_springs_qty.weight
+    def get_weight(self) -> Optional[Decimal]:
+        """
+        Рассчитать вес привода.
 
+        DA - вес из строки DA. SR - вес для максимального количества пружин за вычетом
+        веса недостающих пружин.
+        Количество пружин сравнивается как число (см. ActuatorParameterIndex).
+        """
+        try:
+            return self.get_resolved_parameters()['weight']
         except Exception:
             return None
 
@@ -1026,3 +910,13 @@ class PneumaticActuatorSelected(models.Model):
     def calculated_weight(self) -> Optional[Decimal]:
         """Рассчитанный вес (property)"""
         return self.get_weight()
+
+    @property
+    def calculated_time_open(self) -> Optional[Decimal]:
+        """Время открытия, сек (property)"""
+        return self.get_resolved_parameters()['time_open']
+
+    @property
+    def calculated_time_close(self) -> Optional[Decimal]:
+        """Время закрытия, сек (property)"""
+        return self.get_resolved_parameters()['time_close']
@@ -73,6 +73,24 @@ class PneumaticActuatorModelLine(StructuredDataMixin , models.Model) :
         return self.name
 
     # ==================== StructuredDataMixin методы ====================
+
+    # Связи, которые читают get_*_data() (в т.ч. get_compact_data() бренда и сертификатов)
+    STRUCTURED_DATA_PREFETCH = {
+        'compact' : {
+            'select_related' : ['brand' , 'pneumatic_actuator_construction_variety' , 'default_output_type'] ,
+            'prefetch_related' : ['cert_data_model_line__cert_data__cert_variety' ,
+                                  'cert_data_model_line__cert_data__media_item'] ,
+        } ,
+        'display' : {
+            'select_related' : ['brand' , 'pneumatic_actuator_construction_variety' , 'default_output_type' ,
+                                'default_hand_wheel'] ,
+        } ,
+        'full' : {
+            'select_related' : ['brand' , 'pneumatic_actuator_construction_variety' , 'default_output_type' ,
+                                'default_hand_wheel'] ,
+        } ,
+    }
+
     def _get_metadata(self) -> Dict[str , Any] :
         """
         Метаданные для форм
@@ -159,7 +177,7 @@ class PneumaticActuatorModelLine(StructuredDataMixin , models.Model) :
             'sorting_order' : self.sorting_order ,
         })
 
-        # Сертификаты берем прямо через связь
+        # Сертификаты берем прямо через связь (all() - чтобы использовать prefetch_related из плана)
         if hasattr(self , 'cert_data_model_line') :
             data['cert_data_list'] = [
                 {
@@ -167,8 +185,8 @@ class PneumaticActuatorModelLine(StructuredDataMixin , models.Model) :
                     'relation_sorting_order' : relation.sorting_order ,
                     'relation_is_active' : relation.is_active ,
                 }
-                for relation in self.cert_data_model_line.filter(is_active=True)
-                if relation.cert_data.is_active
+                for relation in self.cert_data_model_line.all()
+                if relation.is_active and relation.cert_data.is_active
             ]
         return data
 
@@ -1032,5 +1050,19 @@ class PneumaticActuatorModelLineCertRelation(AbstractCertRelation) :
         verbose_name_plural = _("Связи сертификатов с сериями пневмоприводов")
         unique_together = ['cert_data' , 'model_line']
 
+    # К данным сертификата добавляется get_compact_data() серии (get_related_object)
+    _MODEL_LINE_COMPACT_PREFETCH = {
+        'select_related' : ['cert_data__cert_variety' , 'cert_data__media_item' , 'cert_data__brand' ,
+                            'model_line__brand' , 'model_line__pneumatic_actuator_construction_variety' ,
+                            'model_line__default_output_type'] ,
+        'prefetch_related' : ['model_line__cert_data_model_line__cert_data__cert_variety' ,
+                              'model_line__cert_data_model_line__cert_data__media_item'] ,
+    }
+    STRUCTURED_DATA_PREFETCH = {
+        **AbstractCertRelation.STRUCTURED_DATA_PREFETCH ,
+        'compact' : _MODEL_LINE_COMPACT_PREFETCH ,
+        'full' : _MODEL_LINE_COMPACT_PREFETCH ,
+    }
+
     def get_related_object(self) :
         return self.model_line
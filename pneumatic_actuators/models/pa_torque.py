@@ -59,9 +59,10 @@ class BodyThrustTorqueTable(models.Model):
             Второй стобец данных - spring_qty.code
             дальнейшие столбцы содержат данные из полей bto, rto, eto этой модели, отобранные в соответствии с заголовками
             т.е. какие поля брать и в каком порядке выводить.
-        find_body_for_pressure_thrust_or_torque(pressure_min, pressure_max, thrust_or_torque, tolerance, PneumaticActuatorVariety)
-            если PneumaticActuatorVariety.code='DA' то  возвращает список моделей, у которых
-                есть pressure меньше или равно pressure_min, и значение bto
+        Подбор корпуса/пружин по моменту и давлению - TorqueSizingEngine.solve / solve_many
+            (pneumatic_actuators/services/torque_sizing.py): все комбинации корпус/пружины, у которых
+            момент при давлении не выше pressure_min (и момент пружин для SR) не меньше требуемого
+            с запасом, по возрастанию запаса.
         """
     body = models.ForeignKey(PneumaticActuatorBody, on_delete=models.SET_NULL,
                              null=True, blank=True,  # ← ДОБАВЬТЕ ЭТО
@@ -131,31 +132,27 @@ class BodyThrustTorqueTable(models.Model):
         Основной метод получения данных таблицы моментов/усилий
 
         Args:
-            current_body: список объектов PneumaticActuatorBody или их ID
+            current_body: объект PneumaticActuatorBody или его ID
             pressure_list: список объектов PneumaticAirSupplyPressure или их ID (опционально)
             spring_qty_list: список объектов PneumaticActuatorSpringsQty или их ID (опционально)
             ncno_code: 'NO' или 'NC' - тип привода
             construction_variety_code: код конструкции - шестерня-рейка или кулисный
 
         Returns:
-            Dict или  в зависимости от формата
+            Dict в формате TorqueMatrixCache.render. Результат кешируется по
+            (корпус, ncno, конструкция, DA/SR) и сбрасывается при изменении таблицы моментов.
         """
-        logger = logging.getLogger(__name__)
-        # print(f"get_torque_thrust_values {current_body}")
+        from pneumatic_actuators.services import TorqueMatrixCache
         try:
-
-            # Базовый запрос
-            queryset = cls._get_base_queryset(current_body, pressure_list, spring_qty_list)
-            structured_data = cls._format_structured_simple(queryset, ncno=ncno_code,
-                                                            construction_variety_code=construction_variety_code,
-                                                            da_sr_code=da_sr_code)
-            print(f"structured_data {structured_data}")
-            return structured_data
+            # Скомпилированная таблица корпуса из кеша (см. TorqueMatrixCache)
+            return TorqueMatrixCache.get_torque_thrust_values(
+                current_body, pressure_list=pressure_list, spring_qty_list=spring_qty_list,
+                ncno_code=ncno_code, construction_variety_code=construction_variety_code, da_sr_code=da_sr_code)
         except Exception as e:
             logger.error(f"Error in get_torque_thrust_values: {e}", exc_info=True)
             return {
                 'error': str(e),
-                'format': format,
+                'format': 'error',
                 'data': [],
                 'metadata': {}
             }
@@ -185,31 +182,6 @@ class BodyThrustTorqueTable(models.Model):
             'count' : 0
         }
 
-    @classmethod
-    def _error_optimized_response(cls , error , ncno='nc') :
-        """Ответ с ошибкой в оптимизированном формате"""
-        return {
-            'format' : 'optimized' ,
-            'error' : str(error) ,
-            'body' : None ,
-            'data' : {'by_spring' : {}} ,
-            'table_config' : {
-                'visible_fields' : [] ,
-                'pressure_order' : [] ,
-                'spring_order' : [] ,
-                'field_descriptions' : {} ,
-                'pressure_info' : {} ,
-                'spring_info' : {} ,
-                'format' : {
-                    'torque' : {'unit' : 'Нм' , 'precision' : 1} ,
-                    'pressure' : {'spring' : 'SPRING' , 'default_template' : '{value} бар'}
-                }
-            } ,
-            'ncno' : ncno ,
-            'construction_variety' : 'RP' ,
-            'count' : 0
-        }
-
     @classmethod
     def _spring_sort_key(cls , spring_code) :
         """Ключ для сортировки кодов пружин"""
@@ -251,154 +223,6 @@ class BodyThrustTorqueTable(models.Model):
                 ('eto', 'ETO' if ncno == SAFETY_POSITION_NC_DEFAULT_CODE else 'ETC')
             ]
 
-    @classmethod
-    def _format_structured_simple(cls , queryset , ncno='nc' , construction_variety_code='RP', da_sr_code=SPRINGS_SR_DEFAULT_CODE) :
-        """
-        Упрощенная версия для одного корпуса
-        """
-        try :
-            all_data = queryset.select_related('body' , 'pressure' , 'spring_qty').order_by(
-                'spring_qty__sorting_order' , 'pressure__sorting_order'
-            )
-
-            if not all_data :
-                return cls._empty_optimized_response()
-
-            # Получаем информацию о корпусе из первого элемента
-            first_item = all_data[0]
-            body = {
-                'id' : first_item.body.id ,
-                'code' : first_item.body.code ,
-                'name' : first_item.body.name ,
-            }
-
-            # Инициализируем структуры
-            by_spring = {}
-            visible_fields = set()
-            pressure_info = {}
-            spring_info = {}
-            available_pressures = set()
-            available_springs = set()
-            # Определяем поля моментов
-            torque_fields = cls._get_torque_fields_for_construction(
-                construction_variety_code, da_sr_code, ncno)
-
-            for item in all_data :
-                if not item.body or not item.spring_qty or not item.pressure :
-                    continue
-
-                spring_code = item.spring_qty.code
-
-                # Инициализируем данные для пружин
-                if spring_code not in by_spring :
-                    by_spring[spring_code] = {
-                        'pressures' : {} ,
-                        'meta' : {
-                            'id' : item.spring_qty.id ,
-                            'code' : spring_code ,
-                            'name' : item.spring_qty.name
-                        }
-                    }
-                    spring_info[spring_code] = {
-                        'id' : item.spring_qty.id ,
-                        'name' : item.spring_qty.name ,
-                        'sorting_order' : getattr(item.spring_qty , 'sorting_order' , 0)
-                    }
-                    available_springs.add(spring_code)
-
-
-
-                # Формируем значения для данного давления
-                pressure_code = item.pressure.code
-                pressure_values = {}
-
-                for field_name , display_name in torque_fields :
-                    value = getattr(item , field_name , None)
-                    if value is not None :
-                        try :
-                            pressure_values[field_name] = float(value)
-                            visible_fields.add(field_name)
-                        except (TypeError , ValueError) :
-                            pressure_values[field_name] = None
-
-                by_spring[spring_code]['pressures'][pressure_code] = pressure_values
-
-                # Сохраняем информацию о давлении
-                if pressure_code not in pressure_info :
-                    pressure_info[pressure_code] = {
-                        'id' : item.pressure.id ,
-                        'code' : pressure_code ,
-                        'name' : str(item.pressure) ,
-                        'sorting_order' : getattr(item.pressure , 'sorting_order' , 0)
-                    }
-                    available_pressures.add(pressure_code)
-
-            # Сортируем
-            sorted_springs = sorted(
-                available_springs ,
-                key=lambda x : spring_info[x].get('sorting_order' , cls._spring_sort_key(x))
-            )
-
-            sorted_pressures = sorted(
-                available_pressures ,
-                key=lambda x : pressure_info[x].get('sorting_order' , 0)
-            )
-
-            # Стандартный порядок полей
-            field_order = ['bto' , 'eto' , 'rto' , 'to']
-            sorted_fields = [f for f in field_order if f in visible_fields]
-
-            # Сортируем by_spring
-            sorted_by_spring = {}
-            for spring_code in sorted_springs :
-                spring_data = by_spring[spring_code]
-                # Сортируем давления внутри пружины
-                sorted_pressures_data = {}
-                for pressure_code in sorted_pressures :
-                    if pressure_code in spring_data['pressures'] :
-                        sorted_pressures_data[pressure_code] = spring_data['pressures'][pressure_code]
-                spring_data['pressures'] = sorted_pressures_data
-                sorted_by_spring[spring_code] = spring_data
-
-            return {
-                'format' : 'optimized' ,
-                'body' : body ,
-                'data' : {
-                    'by_spring' : sorted_by_spring
-                } ,
-                'table_config' : {
-                    'visible_fields' : sorted_fields ,
-                    'pressure_order' : sorted_pressures ,
-                    'spring_order' : sorted_springs ,
-                    'field_descriptions' : {
-                        'bto' : 'BTO (Break to Open)' ,
-                        'eto' : 'ETO (End to Open)' ,
-                        'rto' : 'RTO (Return to Open)' ,
-                        'to' : 'TO (Torque)'
-                    } ,
-                    'pressure_info' : pressure_info ,
-                    'spring_info' : spring_info ,
-                    'format' : {
-                        'torque' : {
-                            'unit' : 'Нм' ,
-                            'precision' : 1 ,
-                            'template' : '{value:.1f} {unit}'
-                        } ,
-                        'pressure' : {
-                            'spring' : 'SPRING' ,
-                            'default_template' : '{value} бар'
-                        }
-                    }
-                } ,
-                'ncno' : ncno ,
-                'construction_variety' : construction_variety_code ,
-                'count' : len(sorted_by_spring)
-            }
-
-        except Exception as e :
-            logger.error(f"Error in _format_structured_simple: {e}")
-            return cls._error_optimized_response(e , ncno)
-
     # Вспомогательные методы для работы с данными
 
     @classmethod
@@ -594,32 +418,6 @@ class BodyThrustTorqueTable(models.Model):
         return "\n".join(markdown_lines)
     # ==================== ДОПОЛНИТЕЛЬНЫЕ МЕТОДЫ ====================
 
-    @classmethod
-    def find_body_for_pressure_thrust_or_torque(cls, pressure_min, pressure_max,
-                                                thrust_or_torque, tolerance,
-                                                pneumatic_actuator_variety):
-        """
-        Поиск подходящих корпусов по давлению и моменту/усилию
-        """
-        queryset = cls.objects.select_related('body', 'pressure', 'spring_qty')
-
-        # Фильтрация по давлению
-        if pressure_min is not None:
-            # Нужно адаптировать под вашу модель PneumaticAirSupplyPressure
-            pass
-
-        # Для DA приводов
-        if pneumatic_actuator_variety.code == SPRINGS_DA_DEFAULT_CODE:
-            queryset = queryset.filter(
-                spring_qty__code=SPRINGS_DA_DEFAULT_CODE,
-                bto__gte=thrust_or_torque - tolerance,
-                bto__lte=thrust_or_torque + tolerance
-            )
-
-        # TODO: Добавить логику для других типов приводов
-
-        return queryset.values_list('body', flat=True).distinct()
-
     @classmethod
     def get_min_max_pressure_list_for_body(cls, body, min_pressure, max_pressure):
         """
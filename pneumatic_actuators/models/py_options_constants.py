@@ -6,4 +6,5 @@ ACTUATOR_VARIETY_RP_DEFAULT_CODE = 'RP'
 ACTUATOR_VARIETY_SY_DEFAULT_CODE = 'SY'
 
 SPRINGS_DA_DEFAULT_CODE = 'DA'
-SPRINGS_SR_DEFAULT_CODE = 'SR'
\ No newline at end of file
+SPRINGS_SR_DEFAULT_CODE = 'SR'
+PRESSURE_SPRING_DEFAULT_CODE = 'spring'
@@ -0,0 +1,14 @@
+from .torque_sizing import TorqueSizingEngine
+from .torque_matrix import TorqueMatrix, TorqueMatrixCache
+from .actuator_parameters import ActuatorParameterIndex
+from .tender_sizing import TenderSizingService
+from .option_catalog import OptionCatalog
+
+__all__ = [
+    'TorqueSizingEngine',
+    'TorqueMatrix',
+    'TorqueMatrixCache',
+    'ActuatorParameterIndex',
+    'TenderSizingService',
+    'OptionCatalog',
+]
@@ -0,0 +1,116 @@
+# pneumatic_actuators/services/actuator_parameters.py
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from pneumatic_actuators.models.py_options_constants import SPRINGS_DA_DEFAULT_CODE
+
+logger = logging.getLogger(__name__)
+
+
+class ActuatorParameterIndex:
+    """
+    Индекс (корпус, пружины) -> вес и время открытия/закрытия пневмопривода.
+
+    Таблицы PneumaticWeightParameter и PneumaticCloseTimeParameter загружаются целиком
+    двумя запросами. Правила расчета:
+        вес DA - строка с пружинами DA
+        вес SR - вес для максимального количества пружин за вычетом веса недостающих пружин
+            (PneumaticActuatorBody.weight_spring); строки для остальных количеств не используются
+        время - точная строка, для SR при ее отсутствии - строка с максимальным количеством пружин
+    Количество пружин сравнивается как число, а не как строка ("10" больше "9").
+    """
+    CACHE_TTL_SECONDS = 300
+
+    _instance = None
+    _instance_built_at = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self):
+        from pneumatic_actuators.models import PneumaticActuatorBody, PneumaticWeightParameter, \
+            PneumaticCloseTimeParameter
+
+        self.weights: Dict[Tuple[int, str], Decimal] = {}
+        self.times: Dict[Tuple[int, str], Tuple[Decimal, Decimal]] = {}
+        self.max_spring_weight: Dict[int, Tuple[int, Decimal]] = {}
+        self.max_spring_time: Dict[int, Tuple[int, Tuple[Decimal, Decimal]]] = {}
+
+        self.weight_spring = dict(PneumaticActuatorBody.objects.values_list('id', 'weight_spring'))
+
+        for body_id, spring_code, weight in PneumaticWeightParameter.objects.filter(
+                spring_qty__isnull=False).values_list('body_id', 'spring_qty__code', 'weight'):
+            self.weights[(body_id, spring_code)] = weight
+            springs = self.spring_count(spring_code)
+            if springs is not None and springs > self.max_spring_weight.get(body_id, (-1, None))[0]:
+                self.max_spring_weight[body_id] = (springs, weight)
+
+        for body_id, spring_code, time_open, time_close in PneumaticCloseTimeParameter.objects.filter(
+                spring_qty__isnull=False).values_list('body_id', 'spring_qty__code', 'time_open', 'time_close'):
+            self.times[(body_id, spring_code)] = (time_open, time_close)
+            springs = self.spring_count(spring_code)
+            if springs is not None and springs > self.max_spring_time.get(body_id, (-1, None))[0]:
+                self.max_spring_time[body_id] = (springs, (time_open, time_close))
+
+        logger.debug("ActuatorParameterIndex: весов %d, времен %d", len(self.weights), len(self.times))
+
+    @classmethod
+    def get_instance(cls) -> 'ActuatorParameterIndex':
+        """Экземпляр индекса для текущего процесса (строится при первом обращении)"""
+        instance = cls._instance
+        if instance is not None and time.monotonic() - cls._instance_built_at < cls.CACHE_TTL_SECONDS:
+            return instance
+        with cls._lock:
+            if cls._instance is None or time.monotonic() - cls._instance_built_at >= cls.CACHE_TTL_SECONDS:
+                cls._instance = cls()
+                cls._instance_built_at = time.monotonic()
+            return cls._instance
+
+    @classmethod
+    def invalidate(cls):
+        """Сбросить кешированный индекс"""
+        cls._instance = None
+
+    @staticmethod
+    def spring_count(spring_code) -> Optional[int]:
+        """Количество пружин из кода ('08' -> 8), None для DA и нечисловых кодов"""
+        if spring_code is None or spring_code == SPRINGS_DA_DEFAULT_CODE:
+            return None
+        try:
+            return int(spring_code)
+        except (ValueError, TypeError):
+            return None
+
+    def get_weight(self, body_id, spring_code) -> Optional[Decimal]:
+        """Вес привода для корпуса и кода пружин (DA или количество пружин)"""
+        if body_id is None or spring_code is None:
+            return None
+        if spring_code == SPRINGS_DA_DEFAULT_CODE:
+            return self.weights.get((body_id, spring_code))
+
+        max_row = self.max_spring_weight.get(body_id)
+        if not max_row:
+            return None
+        max_springs, max_weight = max_row
+        selected_springs = self.spring_count(spring_code)
+        if selected_springs is None:
+            return max_weight
+
+        spring_difference = max_springs - selected_springs
+        weight_spring = self.weight_spring.get(body_id)
+        if weight_spring and spring_difference > 0:
+            return max_weight - (spring_difference * weight_spring)
+        return max_weight
+
+    def get_times(self, body_id, spring_code) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+        """Время открытия и закрытия, сек: (time_open, time_close)"""
+        if body_id is None or spring_code is None:
+            return None, None
+        exact = self.times.get((body_id, spring_code))
+        if exact is not None:
+            return exact
+        if spring_code == SPRINGS_DA_DEFAULT_CODE:
+            return None, None
+        max_row = self.max_spring_time.get(body_id)
+        return max_row[1] if max_row else (None, None)
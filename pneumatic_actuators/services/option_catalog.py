@@ -0,0 +1,148 @@
+# pneumatic_actuators/services/option_catalog.py
+import copy
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+class OptionCatalog:
+    """
+    Каталог доступных опций моделей пневмоприводов (PneumaticActuatorSelected.get_available_options).
+
+    Шесть семейств опций загружаются фиксированным числом запросов для любого количества моделей:
+        через model_line_item - положение безопасности, количество пружин
+        через model_line - температура, IP, взрывозащита, покрытие корпуса
+    Сериализованный результат запоминается по модели серии и сбрасывается сигналами
+    при изменении through-моделей pa_options (pneumatic_actuators/signals.py).
+    """
+    CACHE_TTL_SECONDS = 300  # страховка для других процессов, которые не получили сигнал
+
+    _items: Dict[int, tuple] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_options(cls, model_line_item) -> Dict[str, List[Dict]]:
+        """Опции одной модели серии (объект или ID)"""
+        item_id = getattr(model_line_item, 'pk', model_line_item)
+        return cls.get_many([model_line_item])[item_id]
+
+    @classmethod
+    def get_many(cls, model_line_items: Iterable) -> Dict[int, Dict[str, List[Dict]]]:
+        """
+        Опции набора моделей серии
+
+        Args:
+            model_line_items: объекты PneumaticActuatorModelLineItem или их ID
+
+        Returns:
+            {model_line_item_id: {'safety_positions': [...], 'springs_qty': [...], ...}}
+        """
+        now = time.monotonic()
+        result, missing = {}, {}
+        for model_line_item in model_line_items:
+            item_id = getattr(model_line_item, 'pk', model_line_item)
+            cached = cls._items.get(item_id)
+            if cached is not None and now - cached[0] < cls.CACHE_TTL_SECONDS:
+                result[item_id] = copy.deepcopy(cached[1])
+            else:
+                missing[item_id] = model_line_item
+
+        if missing:
+            loaded = cls._load(missing)
+            with cls._lock:
+                for item_id, options in loaded.items():
+                    cls._items[item_id] = (now, options)
+            for item_id, options in loaded.items():
+                result[item_id] = copy.deepcopy(options)
+        return result
+
+    @classmethod
+    def invalidate(cls, model_line_item_id=None):
+        """Сбросить опции модели серии (или все, если модель не указана)"""
+        with cls._lock:
+            if model_line_item_id is None:
+                cls._items.clear()
+            else:
+                cls._items.pop(model_line_item_id, None)
+
+    @staticmethod
+    def empty_options() -> Dict[str, List[Dict]]:
+        return {
+            'safety_positions': [], 'springs_qty': [],
+            'temperature_options': [], 'ip_options': [],
+            'exd_options': [], 'body_coating_options': []
+        }
+
+    @staticmethod
+    def _serialize(option, name) -> Dict[str, Any]:
+        return {
+            'id': option.id,
+            'encoding': option.encoding,
+            'name': name,
+            'description': option.description,
+            'is_default': option.is_default
+        }
+
+    @classmethod
+    def _load(cls, model_line_items: Dict[int, Any]) -> Dict[int, Dict[str, List[Dict]]]:
+        """Загрузить опции моделей: не более 7 запросов независимо от количества моделей"""
+        from pneumatic_actuators.models import PneumaticActuatorModelLineItem
+        from pneumatic_actuators.models.pa_options import (
+            PneumaticSafetyPositionOption, PneumaticSpringsQtyOption,
+            PneumaticTemperatureOption, PneumaticIpOption,
+            PneumaticExdOption, PneumaticBodyCoatingOption
+        )
+
+        # Серия модели: из переданного объекта или одним запросом для ID
+        item_lines = {item_id: item.model_line_id for item_id, item in model_line_items.items()
+                      if hasattr(item, 'model_line_id')}
+        unknown = [item_id for item_id in model_line_items if item_id not in item_lines]
+        if unknown:
+            item_lines.update(PneumaticActuatorModelLineItem.objects.filter(
+                id__in=unknown).values_list('id', 'model_line_id'))
+
+        item_ids = list(model_line_items)
+        line_ids = {line_id for line_id in item_lines.values() if line_id}
+        result = {item_id: cls.empty_options() for item_id in item_ids}
+
+        for option in PneumaticSafetyPositionOption.objects.filter(
+                model_line_item_id__in=item_ids, is_active=True).select_related('safety_position'):
+            result[option.model_line_item_id]['safety_positions'].append(
+                cls._serialize(option, option.safety_position.name))
+
+        for option in PneumaticSpringsQtyOption.objects.filter(
+                model_line_item_id__in=item_ids, is_active=True).select_related('springs_qty'):
+            result[option.model_line_item_id]['springs_qty'].append(
+                cls._serialize(option, option.springs_qty.name))
+
+        if line_ids:
+            by_line = {line_id: cls.empty_options() for line_id in line_ids}
+            families = (
+                ('temperature_options', PneumaticTemperatureOption.objects.all(), lambda o: o.get_display_name()),
+                ('ip_options', PneumaticIpOption.objects.select_related('ip_option'), str),
+                ('exd_options', PneumaticExdOption.objects.select_related('exd_option'), str),
+                ('body_coating_options', PneumaticBodyCoatingOption.objects.select_related('body_coating_option'),
+                 str),
+            )
+            for key, queryset, name in families:
+                options = list(queryset.filter(model_line_id__in=line_ids, is_active=True))
+                # Название опции зависит от наличия стандартной опции у серии (default_option)
+                defaults = {}
+                for option in options:
+                    if option.is_default:
+                        defaults.setdefault(option.model_line_id, option)
+                for option in options:
+                    option._default_option_cache = defaults.get(option.model_line_id)
+                    by_line[option.model_line_id][key].append(cls._serialize(option, name(option)))
+
+            for item_id in item_ids:
+                line_options = by_line.get(item_lines.get(item_id))
+                if line_options:
+                    for key, _, _ in families:
+                        result[item_id][key] = copy.deepcopy(line_options[key])
+
+        logger.debug("OptionCatalog: загружены опции моделей %s", item_ids)
+        return result
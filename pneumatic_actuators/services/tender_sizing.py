@@ -0,0 +1,205 @@
+# pneumatic_actuators/services/tender_sizing.py
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from pneumatic_actuators.models.py_options_constants import SAFETY_POSITION_NC_DEFAULT_CODE, \
+    SAFETY_POSITION_NO_DEFAULT_CODE, SPRINGS_DA_DEFAULT_CODE, SPRINGS_SR_DEFAULT_CODE
+from .actuator_parameters import ActuatorParameterIndex
+from .torque_sizing import TorqueSizingEngine
+
+logger = logging.getLogger(__name__)
+
+
+class TenderSizingService:
+    """
+    Пакетный подбор пневмоприводов для всех строк тендера.
+
+    Все строки используют общие предзагруженные таблицы:
+        TorqueSizingEngine - моменты корпусов/пружин
+        ActuatorParameterIndex - вес и время открытия/закрытия
+        модели серий (PneumaticActuatorModelLineItem) с доступными опциями пружин
+    Количество запросов к БД не зависит от числа строк.
+    """
+    MAX_LINES = 5000
+    NUMERIC_KEYS = ('torque_open', 'torque_close', 'pressure_min', 'pressure_max', 'safety_factor')
+
+    def __init__(self, model_line_ids=None):
+        from pneumatic_actuators.models import PneumaticActuatorModelLineItem
+        from pneumatic_actuators.models.pa_options import PneumaticSpringsQtyOption
+
+        self.engine = TorqueSizingEngine.get_instance()
+        self.parameters = ActuatorParameterIndex.get_instance()
+
+        items = PneumaticActuatorModelLineItem.objects.filter(is_active=True, body__isnull=False)
+        if model_line_ids:
+            items = items.filter(model_line_id__in=model_line_ids)
+
+        # (body_id, is_da) -> модели серий в порядке сортировки
+        self.items_by_body = defaultdict(list)
+        for item_id, code, name, body_id, model_line_id, variety_code in items.order_by(
+                'sorting_order', 'id').values_list('id', 'code', 'name', 'body_id', 'model_line_id',
+                                                   'pneumatic_actuator_variety__code'):
+            item = {'id': item_id, 'code': code, 'name': name, 'model_line_id': model_line_id}
+            self.items_by_body[(body_id, variety_code == SPRINGS_DA_DEFAULT_CODE)].append(item)
+
+        # Модель серии -> доступные количества пружин
+        self.item_springs = defaultdict(set)
+        for item_id, springs_qty_id in PneumaticSpringsQtyOption.objects.filter(
+                is_active=True, model_line_item__in=items).values_list('model_line_item_id', 'springs_qty_id'):
+            self.item_springs[item_id].add(springs_qty_id)
+
+        self.body_ids = {body_id for body_id, _ in self.items_by_body}
+
+    def size_lines(self, lines: List[Dict[str, Any]], defaults: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """
+        Подобрать привод для каждой строки
+
+        Args:
+            lines: список строк тендера. Ключи строки:
+                ref - идентификатор строки (возвращается как есть)
+                valve_model_data_id - ValveLineModelData, из которой берутся моменты открытия/закрытия
+                torque_open, torque_close - моменты, Нм (имеют приоритет над valve_model_data_id)
+                pressure_min, pressure_max - давление питания, бар
+                safety_position - 'nc', 'no' или 'DA' (привод двойного действия)
+                safety_factor - коэффициент запаса
+            defaults: значения по умолчанию для тех же ключей
+
+        Returns:
+            Список результатов в порядке строк
+        """
+        defaults = defaults or {}
+        torques = self._load_valve_torques(lines)
+
+        points, errors = [], {}
+        for index, line in enumerate(lines):
+            try:
+                points.append(self._line_point(line, defaults, torques))
+            except ValueError as e:
+                errors[index] = str(e)
+                # Строка с ошибкой в подборе не участвует - нейтральная точка сохраняет порядок строк
+                points.append({'torque_open': 0, 'da_sr_code': SPRINGS_SR_DEFAULT_CODE,
+                               'ncno_code': SAFETY_POSITION_NC_DEFAULT_CODE})
+
+        try:
+            solutions = self.engine.solve_many(points, body_ids=self.body_ids)
+        except (TypeError, ValueError) as e:
+            logger.warning("Ошибка пакетного подбора: %s", e)
+            return [self._error_result(line, str(e)) for line in lines]
+
+        results = []
+        for index, (line, point, candidates) in enumerate(zip(lines, points, solutions)):
+            if index in errors:
+                results.append(self._error_result(line, errors[index]))
+                continue
+            results.append(self._pick(line, point, candidates))
+        return results
+
+    @classmethod
+    def _line_point(cls, line, defaults, torques) -> Dict[str, Any]:
+        """
+        Точка подбора для строки: значения строки поверх defaults, числа приводятся к float
+
+        Raises:
+            ValueError: значение строки некорректно (сообщение - для результата строки)
+        """
+        values = {}
+        for key in (*cls.NUMERIC_KEYS, 'safety_position'):
+            value = cls._line_value(line, defaults, key)
+            if key in cls.NUMERIC_KEYS and value is not None:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Некорректное число в поле {key}: {value!r}")
+            values[key] = value
+
+        torque_open, torque_close = values['torque_open'], values['torque_close']
+        valve_model_data_id = line.get('valve_model_data_id')
+        if torque_open is None and valve_model_data_id not in (None, ''):
+            try:
+                valve_model_data_id = int(valve_model_data_id)
+            except (TypeError, ValueError):
+                raise ValueError(f"Некорректный valve_model_data_id: {valve_model_data_id!r}")
+            torque_open, valve_close = torques.get(valve_model_data_id, (None, None))
+            torque_close = torque_close if torque_close is not None else valve_close
+
+        safety_position = str(values['safety_position'] or SAFETY_POSITION_NC_DEFAULT_CODE)
+        is_da = safety_position.upper() == SPRINGS_DA_DEFAULT_CODE
+        if torque_open is None:
+            raise ValueError('Не указан момент открытия (torque_open или valve_model_data_id)')
+        if values['pressure_min'] is None:
+            raise ValueError('Не указано минимальное давление питания (pressure_min)')
+        if values['safety_factor'] is not None and not values['safety_factor'] > 0:
+            raise ValueError(f"Коэффициент запаса должен быть больше 0: {values['safety_factor']}")
+        if not is_da and safety_position.lower() not in (SAFETY_POSITION_NC_DEFAULT_CODE,
+                                                         SAFETY_POSITION_NO_DEFAULT_CODE):
+            raise ValueError(f"Неизвестное положение безопасности '{safety_position}'")
+
+        return {
+            'torque_open': torque_open,
+            'torque_close': torque_close,
+            'safety_factor': values['safety_factor'] if values['safety_factor'] is not None else 1.0,
+            'pressure_min': values['pressure_min'],
+            'pressure_max': values['pressure_max'],
+            'ncno_code': None if is_da else safety_position.lower(),
+            'da_sr_code': SPRINGS_DA_DEFAULT_CODE if is_da else SPRINGS_SR_DEFAULT_CODE,
+        }
+
+    @staticmethod
+    def _line_value(line, defaults, key):
+        """Значение строки; пустое (None или '') - значение по умолчанию"""
+        value = line.get(key)
+        return value if value not in (None, '') else defaults.get(key)
+
+    def _pick(self, line, point, candidates) -> Dict[str, Any]:
+        """Первый по запасу вариант, для которого есть модель серии с таким количеством пружин"""
+        is_da = point['da_sr_code'] == SPRINGS_DA_DEFAULT_CODE
+        for candidate in candidates:
+            for item in self.items_by_body.get((candidate['body_id'], is_da), []):
+                springs = self.item_springs.get(item['id'])
+                if springs and candidate['spring_qty_id'] not in springs:
+                    continue
+                weight = self.parameters.get_weight(candidate['body_id'], candidate['spring_qty_code'])
+                time_open, time_close = self.parameters.get_times(candidate['body_id'],
+                                                                  candidate['spring_qty_code'])
+                return {
+                    'ref': line.get('ref'),
+                    'status': 'ok',
+                    'model_line_item': item,
+                    'body': {'id': candidate['body_id'], 'code': candidate['body_code']},
+                    'spring_qty': {'id': candidate['spring_qty_id'], 'code': candidate['spring_qty_code']},
+                    'weight': float(weight) if weight is not None else None,
+                    'time_open': float(time_open) if time_open is not None else None,
+                    'time_close': float(time_close) if time_close is not None else None,
+                    'pressure_code': candidate['pressure_code'],
+                    'air_torque': candidate['air_torque'],
+                    'spring_torque': candidate['spring_torque'],
+                    'required_air_torque': candidate['required_air_torque'],
+                    'required_spring_torque': candidate['required_spring_torque'],
+                    'margin': candidate['margin'],
+                }
+        return {'ref': line.get('ref'), 'status': 'not_found', 'error': 'Подходящий привод не найден'}
+
+    @staticmethod
+    def _error_result(line, error) -> Dict[str, Any]:
+        return {'ref': line.get('ref'), 'status': 'error', 'error': error}
+
+    @staticmethod
+    def _load_valve_torques(lines) -> Dict[int, tuple]:
+        """Моменты открытия/закрытия ValveLineModelData одним запросом"""
+        from valve_data.models import ValveLineModelData
+
+        ids = set()
+        for line in lines:
+            try:
+                if line.get('valve_model_data_id') is not None:
+                    ids.add(int(line['valve_model_data_id']))
+            except (TypeError, ValueError):
+                continue
+        if not ids:
+            return {}
+        return {
+            pk: (torque_open, torque_close)
+            for pk, torque_open, torque_close in ValveLineModelData.objects.filter(id__in=ids).values_list(
+                'id', 'valve_model_torque_to_open', 'valve_model_torque_to_close')
+        }
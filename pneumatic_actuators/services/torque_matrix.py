@@ -0,0 +1,306 @@
+# pneumatic_actuators/services/torque_matrix.py
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TorqueMatrix:
+    """
+    Скомпилированная таблица моментов одного корпуса.
+
+    values[spring, pressure, field] - моменты bto, rto, eto (NaN - значение не задано)
+    present[spring, pressure] - в таблице есть строка для пары пружины/давление
+    Пружины и давления упорядочены по sorting_order, при равенстве - в порядке первого
+    появления в таблице.
+    """
+    FIELDS = ('bto', 'rto', 'eto')
+
+    def __init__(self, body, springs, pressures, values, present):
+        self.body = body
+        self.springs = springs
+        self.pressures = pressures
+        self.values = values
+        self.present = present
+
+    @classmethod
+    def build(cls, body_id) -> Optional['TorqueMatrix']:
+        """Построить таблицу корпуса одним запросом, None - строк нет"""
+        from pneumatic_actuators.models import BodyThrustTorqueTable
+
+        rows = list(BodyThrustTorqueTable.objects.filter(
+            body_id=body_id, spring_qty__isnull=False, pressure__isnull=False
+        ).order_by('spring_qty__sorting_order', 'pressure__sorting_order').values_list(
+            'body__code', 'body__name',
+            'spring_qty_id', 'spring_qty__code', 'spring_qty__name', 'spring_qty__sorting_order',
+            'pressure_id', 'pressure__code', 'pressure__name', 'pressure__sorting_order',
+            'bto', 'rto', 'eto'))
+        if not rows:
+            return None
+
+        springs, pressures = {}, {}
+        for row in rows:
+            springs.setdefault(row[3], {'id': row[2], 'code': row[3], 'name': row[4], 'sorting_order': row[5]})
+            pressures.setdefault(row[7], {'id': row[6], 'code': row[7], 'name': f"{row[8]} бар",
+                                          'sorting_order': row[9]})
+        spring_list = sorted(springs.values(), key=lambda s: s['sorting_order'])
+        pressure_list = sorted(pressures.values(), key=lambda p: p['sorting_order'])
+        spring_index = {s['code']: i for i, s in enumerate(spring_list)}
+        pressure_index = {p['code']: i for i, p in enumerate(pressure_list)}
+
+        values = np.full((len(spring_list), len(pressure_list), len(cls.FIELDS)), np.nan)
+        present = np.zeros((len(spring_list), len(pressure_list)), dtype=bool)
+        for row in rows:
+            s, p = spring_index[row[3]], pressure_index[row[7]]
+            present[s, p] = True
+            values[s, p] = [np.nan if v is None else float(v) for v in row[10:13]]
+
+        body = {'id': body_id, 'code': rows[0][0], 'name': rows[0][1]}
+        return cls(body, spring_list, pressure_list, values, present)
+
+    def subset(self, spring_qty_ids=None, pressure_ids=None) -> Optional['TorqueMatrix']:
+        """Таблица, ограниченная списками пружин/давлений (по id)"""
+        spring_mask = np.ones(len(self.springs), dtype=bool)
+        pressure_mask = np.ones(len(self.pressures), dtype=bool)
+        if spring_qty_ids:
+            spring_mask = np.array([s['id'] in spring_qty_ids for s in self.springs], dtype=bool)
+        if pressure_ids:
+            pressure_mask = np.array([p['id'] in pressure_ids for p in self.pressures], dtype=bool)
+        present = self.present[np.ix_(spring_mask, pressure_mask)]
+        # Пружины и давления без строк в выборке не показываются
+        keep_springs = present.any(axis=1)
+        keep_pressures = present.any(axis=0)
+        if not keep_springs.any():
+            return None
+        springs = [s for s, keep in zip([s for s, m in zip(self.springs, spring_mask) if m], keep_springs) if keep]
+        pressures = [p for p, keep in zip([p for p, m in zip(self.pressures, pressure_mask) if m], keep_pressures)
+                     if keep]
+        values = self.values[np.ix_(spring_mask, pressure_mask)][np.ix_(keep_springs, keep_pressures)]
+        return TorqueMatrix(self.body, springs, pressures, values, present[np.ix_(keep_springs, keep_pressures)])
+
+
+class TorqueMatrixCache:
+    """
+    Кеш скомпилированных таблиц моментов для BodyThrustTorqueTable.get_torque_thrust_values.
+
+    Два уровня:
+        LRU в памяти процесса - TorqueMatrix по корпусу и готовые ответы
+            по ключу (корпус, ncno, конструкция, DA/SR)
+        общий кеш Django (необязательно) - settings.TORQUE_MATRIX_CACHE_ALIAS, например 'default'
+    Записи корпуса сбрасываются сигналами при изменении BodyThrustTorqueTable
+    (pneumatic_actuators/signals.py). В общем кеше вместо удаления ключей увеличивается
+    версия корпуса, поэтому старые записи других процессов перестают использоваться;
+    запись LRU помнит версию, с которой построена, и при ее изменении не используется.
+    Без общего кеша записи LRU живут не дольше CACHE_TTL_SECONDS (сигналы доходят только
+    до процесса, изменившего таблицу, например обработчика фоновых задач).
+    """
+    MAX_SIZE = 256
+    SHARED_TIMEOUT = 60 * 60
+    CACHE_TTL_SECONDS = 300  # страховка для других процессов, которые не получили сигнал
+
+    _matrices = OrderedDict()
+    _responses = OrderedDict()
+    _lock = threading.Lock()
+
+    # ==================== ПУБЛИЧНЫЕ МЕТОДЫ ====================
+
+    @classmethod
+    def get_torque_thrust_values(cls, body, pressure_list=None, spring_qty_list=None, ncno_code='nc',
+                                 construction_variety_code='RP', da_sr_code='SR') -> Dict[str, Any]:
+        """Ответ в формате render (таблица моментов корпуса для отображения и Markdown)"""
+        from pneumatic_actuators.models import BodyThrustTorqueTable
+
+        body_id = cls._pk(body)
+        spring_qty_ids = {cls._pk(s) for s in spring_qty_list} if spring_qty_list else None
+        pressure_ids = {cls._pk(p) for p in pressure_list} if pressure_list else None
+        filtered = bool(spring_qty_ids or pressure_ids)
+
+        key = (body_id, ncno_code, construction_variety_code, da_sr_code)
+        version = cls._current_version(body_id)
+        if not filtered:
+            response = cls._lru_get(cls._responses, key, version)
+            if response is not None:
+                return copy.deepcopy(response)
+
+        matrix = cls.get_matrix(body_id, version)
+        if matrix is not None and filtered:
+            matrix = matrix.subset(spring_qty_ids, pressure_ids)
+        if matrix is None:
+            return BodyThrustTorqueTable._empty_optimized_response()
+
+        response = cls.render(matrix, ncno_code, construction_variety_code, da_sr_code)
+        if not filtered:
+            cls._lru_put(cls._responses, key, response, version)
+            response = copy.deepcopy(response)
+        return response
+
+    @classmethod
+    def get_matrix(cls, body_id, version=None) -> Optional[TorqueMatrix]:
+        """
+        Скомпилированная таблица корпуса: LRU процесса -> общий кеш -> БД
+
+        version - ключ общего кеша, уже полученный вызывающим (_current_version)
+        """
+        if version is None:
+            version = cls._current_version(body_id)
+        matrix = cls._lru_get(cls._matrices, body_id, version)
+        if matrix is not None:
+            return matrix
+
+        shared = cls._shared_cache() if version else None
+        if shared is not None:
+            matrix = shared.get(version)
+        if matrix is None:
+            matrix = TorqueMatrix.build(body_id)
+            if matrix is None:
+                return None
+            if shared is not None:
+                shared.set(version, matrix, cls.SHARED_TIMEOUT)
+
+        cls._lru_put(cls._matrices, body_id, matrix, version)
+        return matrix
+
+    @classmethod
+    def invalidate(cls, body_id=None):
+        """Сбросить кеш корпуса (или весь кеш, если корпус не указан)"""
+        with cls._lock:
+            if body_id is None:
+                cls._matrices.clear()
+                cls._responses.clear()
+            else:
+                cls._matrices.pop(body_id, None)
+                for key in [key for key in cls._responses if key[0] == body_id]:
+                    del cls._responses[key]
+
+        shared = cls._shared_cache()
+        if shared is not None:
+            version_key = cls._version_key(body_id)
+            try:
+                shared.incr(version_key)
+            except ValueError:
+                shared.set(version_key, 1, None)
+
+    @classmethod
+    def render(cls, matrix: TorqueMatrix, ncno='nc', construction_variety_code='RP',
+               da_sr_code='SR') -> Dict[str, Any]:
+        """Сформировать ответ из скомпилированной таблицы"""
+        from pneumatic_actuators.models import BodyThrustTorqueTable
+
+        torque_fields = BodyThrustTorqueTable._get_torque_fields_for_construction(
+            construction_variety_code, da_sr_code, ncno)
+        field_indexes = [(name, TorqueMatrix.FIELDS.index(name)) for name, _ in torque_fields
+                         if name in TorqueMatrix.FIELDS]
+
+        by_spring, visible_fields = {}, set()
+        for s, spring in enumerate(matrix.springs):
+            pressures = {}
+            for p, pressure in enumerate(matrix.pressures):
+                if not matrix.present[s, p]:
+                    continue
+                pressure_values = {}
+                for name, index in field_indexes:
+                    value = matrix.values[s, p, index]
+                    if not np.isnan(value):
+                        pressure_values[name] = float(value)
+                        visible_fields.add(name)
+                pressures[pressure['code']] = pressure_values
+            by_spring[spring['code']] = {
+                'pressures': pressures,
+                'meta': {'id': spring['id'], 'code': spring['code'], 'name': spring['name']},
+            }
+
+        field_order = ['bto', 'eto', 'rto', 'to']
+        return {
+            'format': 'optimized',
+            'body': dict(matrix.body),
+            'data': {
+                'by_spring': by_spring
+            },
+            'table_config': {
+                'visible_fields': [f for f in field_order if f in visible_fields],
+                'pressure_order': [p['code'] for p in matrix.pressures],
+                'spring_order': [s['code'] for s in matrix.springs],
+                'field_descriptions': {
+                    'bto': 'BTO (Break to Open)',
+                    'eto': 'ETO (End to Open)',
+                    'rto': 'RTO (Return to Open)',
+                    'to': 'TO (Torque)'
+                },
+                'pressure_info': {p['code']: dict(p) for p in matrix.pressures},
+                'spring_info': {s['code']: {'id': s['id'], 'name': s['name'], 'sorting_order': s['sorting_order']}
+                                for s in matrix.springs},
+                'format': {
+                    'torque': {
+                        'unit': 'Нм',
+                        'precision': 1,
+                        'template': '{value:.1f} {unit}'
+                    },
+                    'pressure': {
+                        'spring': 'SPRING',
+                        'default_template': '{value} бар'
+                    }
+                }
+            },
+            'ncno': ncno,
+            'construction_variety': construction_variety_code,
+            'count': len(by_spring)
+        }
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    @staticmethod
+    def _pk(value):
+        return getattr(value, 'pk', value)
+
+    @classmethod
+    def _lru_get(cls, storage: OrderedDict, key, version):
+        """Значение LRU, если оно построено с той же версией и не старше CACHE_TTL_SECONDS"""
+        with cls._lock:
+            entry = storage.get(key)
+            if entry is None:
+                return None
+            value, entry_version, stored_at = entry
+            if entry_version != version or time.monotonic() - stored_at >= cls.CACHE_TTL_SECONDS:
+                del storage[key]
+                return None
+            storage.move_to_end(key)
+            return value
+
+    @classmethod
+    def _lru_put(cls, storage: OrderedDict, key, value, version):
+        with cls._lock:
+            storage[key] = (value, version, time.monotonic())
+            storage.move_to_end(key)
+            while len(storage) > cls.MAX_SIZE:
+                storage.popitem(last=False)
+
+    @staticmethod
+    def _shared_cache():
+        alias = getattr(settings, 'TORQUE_MATRIX_CACHE_ALIAS', None)
+        if not alias:
+            return None
+        from django.core.cache import caches
+        return caches[alias]
+
+    @staticmethod
+    def _version_key(body_id):
+        return f"torque_matrix:version:{body_id if body_id is not None else 'all'}"
+
+    @classmethod
+    def _current_version(cls, body_id) -> Optional[str]:
+        """Ключ таблицы корпуса в общем кеше с текущими версиями, None - общий кеш не настроен"""
+        shared = cls._shared_cache()
+        return cls._shared_key(shared, body_id) if shared is not None else None
+
+    @classmethod
+    def _shared_key(cls, shared, body_id):
+        versions = shared.get_many([cls._version_key(None), cls._version_key(body_id)])
+        return "torque_matrix:{}:{}:{}".format(
+            body_id, versions.get(cls._version_key(None), 0), versions.get(cls._version_key(body_id), 0))
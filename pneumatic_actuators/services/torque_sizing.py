@@ -0,0 +1,274 @@
+# pneumatic_actuators/services/torque_sizing.py
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+from pneumatic_actuators.models.py_options_constants import SAFETY_POSITION_NC_DEFAULT_CODE, \
+    SPRINGS_DA_DEFAULT_CODE, SPRINGS_SR_DEFAULT_CODE, PRESSURE_SPRING_DEFAULT_CODE
+
+logger = logging.getLogger(__name__)
+
+
+class TorqueSizingEngine:
+    """
+    Подбор пневмоприводов по требуемому моменту арматуры.
+
+    Вся таблица BodyThrustTorqueTable загружается один раз в массивы NumPy:
+        air_torque[body, spring_qty, pressure, field] - ход от воздуха при давлении питания
+        spring_torque[body, spring_qty, field] - ход от пружин (строки с давлением 'spring')
+        field - bto, rto, eto
+    Для каждой комбинации корпус/пружины рабочим считается минимальное положительное значение
+    из bto, rto, eto (rto заполнен только у кулисных приводов).
+
+    Расчет для привода SR:
+        NC - воздух открывает (момент открытия), пружины закрывают (момент закрытия)
+        NO - воздух закрывает (момент закрытия), пружины открывают (момент открытия)
+    Для привода DA - воздух в обе стороны, требуемый момент - максимальный из открытия/закрытия.
+    Момент от воздуха берется при ближайшем табличном давлении, не превышающем минимальное давление
+    питания: при таком выборе результат всегда в запас.
+
+    Экземпляр кешируется на уровне процесса (get_instance) и сбрасывается сигналами
+    при изменении таблицы моментов и справочников (pneumatic_actuators/signals.py).
+    """
+    FIELDS = ('bto', 'rto', 'eto')
+    CACHE_TTL_SECONDS = 300  # страховка для других процессов, которые не получили сигнал
+
+    _instance = None
+    _instance_built_at = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self):
+        from pneumatic_actuators.models import BodyThrustTorqueTable, PneumaticActuatorBody, \
+            PneumaticActuatorSpringsQty
+        from params.models import PneumaticAirSupplyPressure
+
+        bodies = list(PneumaticActuatorBody.objects.filter(is_active=True).order_by('sorting_order', 'id').values_list(
+            'id', 'code', 'name', 'sorting_order', 'min_pressure_bar', 'max_pressure_bar'))
+        springs = list(PneumaticActuatorSpringsQty.objects.order_by('sorting_order', 'id').values_list(
+            'id', 'code', 'name'))
+        pressures = list(PneumaticAirSupplyPressure.objects.order_by('pressure_bar', 'id').values_list(
+            'id', 'code', 'pressure_bar'))
+        rows = BodyThrustTorqueTable.objects.filter(
+            body__isnull=False, pressure__isnull=False, spring_qty__isnull=False
+        ).values_list('body_id', 'pressure_id', 'spring_qty_id', 'bto', 'rto', 'eto')
+
+        # Корпуса
+        self.body_ids = np.array([b[0] for b in bodies], dtype=np.int64)
+        self.body_codes = [b[1] for b in bodies]
+        self.body_names = [b[2] for b in bodies]
+        self.body_sorting = np.array([b[3] for b in bodies], dtype=np.int64)
+        self.body_min_pressure = self._to_float_array([b[4] for b in bodies])
+        self.body_max_pressure = self._to_float_array([b[5] for b in bodies])
+        body_index = {body_id: i for i, body_id in enumerate(self.body_ids.tolist())}
+
+        # Пружины (DA - отдельный столбец)
+        self.spring_ids = np.array([s[0] for s in springs], dtype=np.int64)
+        self.spring_codes = [s[1] for s in springs]
+        self.spring_names = [s[2] for s in springs]
+        self.spring_is_da = np.array([s[1] == SPRINGS_DA_DEFAULT_CODE for s in springs], dtype=bool)
+        spring_index = {spring_id: i for i, spring_id in enumerate(self.spring_ids.tolist())}
+
+        # Давления питания по возрастанию, без псевдодавления 'spring'
+        spring_pressure_ids = {p[0] for p in pressures if p[1] == PRESSURE_SPRING_DEFAULT_CODE}
+        air_pressures = [p for p in pressures if p[0] not in spring_pressure_ids]
+        self.pressure_ids = np.array([p[0] for p in air_pressures], dtype=np.int64)
+        self.pressure_codes = [p[1] for p in air_pressures]
+        self.pressure_bar = self._to_float_array([p[2] for p in air_pressures])
+        pressure_index = {pressure_id: i for i, pressure_id in enumerate(self.pressure_ids.tolist())}
+
+        shape = (len(self.body_ids), len(self.spring_ids))
+        self.air_torque = np.full(shape + (len(self.pressure_ids), len(self.FIELDS)), np.nan)
+        self.spring_torque = np.full(shape + (len(self.FIELDS),), np.nan)
+
+        rows_count = 0
+        for body_id, pressure_id, spring_qty_id, bto, rto, eto in rows:
+            b = body_index.get(body_id)
+            s = spring_index.get(spring_qty_id)
+            if b is None or s is None:
+                continue
+            values = [float(v) if v is not None else np.nan for v in (bto, rto, eto)]
+            if pressure_id in spring_pressure_ids:
+                self.spring_torque[b, s, :] = values
+            else:
+                p = pressure_index.get(pressure_id)
+                if p is None:
+                    continue
+                self.air_torque[b, s, p, :] = values
+            rows_count += 1
+
+        # Рабочий момент - минимум положительных значений полей (NaN, если данных нет)
+        self.air_min = np.fmin.reduce(np.where(self.air_torque > 0, self.air_torque, np.nan), axis=-1)
+        self.spring_min = np.fmin.reduce(np.where(self.spring_torque > 0, self.spring_torque, np.nan), axis=-1)
+
+        logger.debug("TorqueSizingEngine: загружено %d строк, корпусов %d, пружин %d, давлений %d",
+                     rows_count, len(self.body_ids), len(self.spring_ids), len(self.pressure_ids))
+
+    @staticmethod
+    def _to_float_array(values) -> np.ndarray:
+        return np.array([float(v) if v is not None else np.nan for v in values], dtype=float)
+
+    # ==================== КЕШ ====================
+
+    @classmethod
+    def get_instance(cls) -> 'TorqueSizingEngine':
+        """Экземпляр движка для текущего процесса (строится при первом обращении)"""
+        instance = cls._instance
+        if instance is not None and time.monotonic() - cls._instance_built_at < cls.CACHE_TTL_SECONDS:
+            return instance
+        with cls._lock:
+            if cls._instance is None or time.monotonic() - cls._instance_built_at >= cls.CACHE_TTL_SECONDS:
+                cls._instance = cls()
+                cls._instance_built_at = time.monotonic()
+            return cls._instance
+
+    @classmethod
+    def invalidate(cls):
+        """Сбросить кешированный экземпляр - следующий вызов get_instance перечитает таблицу"""
+        cls._instance = None
+
+    # ==================== ПОДБОР ====================
+
+    def solve(self, required_torque, safety_factor=1.0, pressure_min=None, pressure_max=None,
+              ncno_code=SAFETY_POSITION_NC_DEFAULT_CODE, da_sr_code=SPRINGS_SR_DEFAULT_CODE,
+              required_torque_close=None, body_ids=None, limit=None) -> List[Dict[str, Any]]:
+        """
+        Подобрать все достаточные комбинации корпус/пружины для одной рабочей точки
+
+        Args:
+            required_torque: момент арматуры на открытие, Нм
+            safety_factor: коэффициент запаса (1.25 = +25%)
+            pressure_min: минимальное давление питания, бар
+            pressure_max: максимальное давление питания, бар (по умолчанию = pressure_min)
+            ncno_code: 'nc' или 'no' - положение безопасности (для SR)
+            da_sr_code: 'DA' или 'SR'
+            required_torque_close: момент на закрытие, Нм (по умолчанию = required_torque)
+            body_ids: ограничить подбор списком корпусов (опционально)
+            limit: вернуть не больше limit лучших вариантов
+
+        Returns:
+            Список вариантов, отсортированный по запасу (сначала наименьший достаточный)
+        """
+        return self.solve_many([{
+            'torque_open': required_torque,
+            'torque_close': required_torque_close,
+            'safety_factor': safety_factor,
+            'pressure_min': pressure_min,
+            'pressure_max': pressure_max,
+            'ncno_code': ncno_code,
+            'da_sr_code': da_sr_code,
+            'body_ids': body_ids,
+        }], limit=limit)[0]
+
+    def solve_many(self, duty_points: Iterable[Dict[str, Any]], limit=None,
+                   body_ids=None) -> List[List[Dict[str, Any]]]:
+        """
+        Пакетный подбор для списка рабочих точек за один проход по массивам
+
+        Args:
+            duty_points: список словарей с ключами torque_open, torque_close, safety_factor,
+                pressure_min, pressure_max, ncno_code, da_sr_code, body_ids (см. solve)
+            limit: вернуть не больше limit лучших вариантов для каждой точки
+            body_ids: общее для всех точек ограничение по корпусам (опционально)
+
+        Returns:
+            Список (по числу точек) списков вариантов
+        """
+        points = list(duty_points)
+        if not points:
+            return []
+        if not len(self.body_ids) or not len(self.spring_ids) or not len(self.pressure_ids):
+            return [[] for _ in points]
+
+        torque_open = np.array([self._as_float(p.get('torque_open'), 0.0) for p in points])
+        torque_close = np.array([self._as_float(p.get('torque_close'), None) for p in points], dtype=float)
+        torque_close = np.where(np.isnan(torque_close), torque_open, torque_close)
+        safety_factor = np.array([self._as_float(p.get('safety_factor'), 1.0) for p in points])
+        pressure_min = np.array([self._as_float(p.get('pressure_min'), None) for p in points], dtype=float)
+        pressure_max = np.array([self._as_float(p.get('pressure_max'), None) for p in points], dtype=float)
+        pressure_max = np.where(np.isnan(pressure_max), pressure_min, pressure_max)
+        is_da = np.array([self._is_da(p.get('da_sr_code')) for p in points], dtype=bool)
+        is_nc = np.array([(p.get('ncno_code') or SAFETY_POSITION_NC_DEFAULT_CODE).lower()
+                          == SAFETY_POSITION_NC_DEFAULT_CODE for p in points], dtype=bool)
+
+        # Требуемые моменты хода от воздуха и от пружин
+        required_air = np.where(is_da, np.maximum(torque_open, torque_close),
+                                np.where(is_nc, torque_open, torque_close)) * safety_factor
+        required_spring = np.where(is_da, 0.0, np.where(is_nc, torque_close, torque_open)) * safety_factor
+
+        # Индекс табличного давления: наибольшее давление <= pressure_min
+        pressure_idx = np.searchsorted(self.pressure_bar, pressure_min + 1e-9, side='right') - 1
+        pressure_known = ~np.isnan(pressure_min) & (pressure_idx >= 0)
+
+        # (B, S, N)
+        air = self.air_min[:, :, np.clip(pressure_idx, 0, None)]
+        air = np.where(pressure_known[None, None, :], air, np.nan)
+        spring = self.spring_min[:, :, None]
+
+        body_ok = (np.isnan(self.body_max_pressure)[:, None] |
+                   (self.body_max_pressure[:, None] >= pressure_max[None, :] - 1e-9) |
+                   np.isnan(pressure_max)[None, :])
+        body_ok &= (np.isnan(self.body_min_pressure)[:, None] |
+                    (self.body_min_pressure[:, None] <= pressure_min[None, :] + 1e-9))
+        body_ok &= self._body_filter_mask(points)
+        if body_ids is not None:
+            body_ok &= np.isin(self.body_ids, np.fromiter((int(i) for i in body_ids), dtype=np.int64))[:, None]
+
+        variety_ok = self.spring_is_da[:, None] == is_da[None, :]  # (S, N)
+        air_ok = air >= required_air[None, None, :]
+        spring_ok = is_da[None, None, :] | (spring >= required_spring[None, None, :])
+        ok = air_ok & spring_ok & body_ok[:, None, :] & variety_ok[None, :, :]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            air_margin = np.where(required_air[None, None, :] > 0, air / required_air[None, None, :] - 1, np.inf)
+            spring_margin = np.where(is_da[None, None, :] | (required_spring[None, None, :] <= 0), np.inf,
+                                     spring / required_spring[None, None, :] - 1)
+        margin = np.minimum(air_margin, spring_margin)
+
+        results = []
+        for n in range(len(points)):
+            b_idx, s_idx = np.nonzero(ok[:, :, n])
+            order = np.lexsort((self.body_sorting[b_idx], margin[b_idx, s_idx, n]))
+            if limit:
+                order = order[:limit]
+            pressure_code = self.pressure_codes[pressure_idx[n]] if pressure_known[n] else None
+            candidates = []
+            for k in order:
+                b, s = b_idx[k], s_idx[k]
+                candidates.append({
+                    'body_id': int(self.body_ids[b]),
+                    'body_code': self.body_codes[b],
+                    'body_name': self.body_names[b],
+                    'spring_qty_id': int(self.spring_ids[s]),
+                    'spring_qty_code': self.spring_codes[s],
+                    'pressure_code': pressure_code,
+                    'air_torque': float(air[b, s, n]),
+                    'spring_torque': None if is_da[n] else float(self.spring_min[b, s]),
+                    'required_air_torque': float(required_air[n]),
+                    'required_spring_torque': None if is_da[n] else float(required_spring[n]),
+                    'margin': float(margin[b, s, n]) if np.isfinite(margin[b, s, n]) else None,
+                })
+            results.append(candidates)
+        return results
+
+    def _body_filter_mask(self, points) -> np.ndarray:
+        """Маска (B, N) допустимых корпусов по body_ids каждой точки"""
+        mask = np.ones((len(self.body_ids), len(points)), dtype=bool)
+        for n, point in enumerate(points):
+            body_ids = point.get('body_ids')
+            if body_ids is not None:
+                mask[:, n] = np.isin(self.body_ids, np.fromiter((int(i) for i in body_ids), dtype=np.int64))
+        return mask
+
+    @staticmethod
+    def _is_da(da_sr_code) -> bool:
+        code = getattr(da_sr_code, 'code', da_sr_code)
+        return code == SPRINGS_DA_DEFAULT_CODE
+
+    @staticmethod
+    def _as_float(value, default) -> float:
+        if value is None or value == '':
+            return np.nan if default is None else default
+        return float(value)
@@ -0,0 +1,92 @@
+# pneumatic_actuators/signals.py
+import logging
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from params.models import PneumaticAirSupplyPressure
+from pneumatic_actuators.models import PneumaticActuatorModelLineItem, BodyThrustTorqueTable, PneumaticActuatorBody, PneumaticActuatorSpringsQty, \
+    PneumaticWeightParameter, PneumaticCloseTimeParameter
+from pneumatic_actuators.models.pa_options import PneumaticSafetyPositionOption, PneumaticSpringsQtyOption, \
+    PneumaticTemperatureOption, PneumaticIpOption, PneumaticExdOption, PneumaticBodyCoatingOption
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=BodyThrustTorqueTable)
+@receiver(post_delete, sender=BodyThrustTorqueTable)
+@receiver(post_save, sender=PneumaticActuatorBody)
+@receiver(post_delete, sender=PneumaticActuatorBody)
+@receiver(post_save, sender=PneumaticActuatorSpringsQty)
+@receiver(post_delete, sender=PneumaticActuatorSpringsQty)
+@receiver(post_save, sender=PneumaticAirSupplyPressure)
+@receiver(post_delete, sender=PneumaticAirSupplyPressure)
+def invalidate_torque_sizing_engine(sender, **kwargs):
+    """Сбрасывает загруженную в память таблицу моментов при изменении данных"""
+    from pneumatic_actuators.services import TorqueSizingEngine
+    TorqueSizingEngine.invalidate()
+
+
+@receiver(post_save, sender=PneumaticWeightParameter)
+@receiver(post_delete, sender=PneumaticWeightParameter)
+@receiver(post_save, sender=PneumaticCloseTimeParameter)
+@receiver(post_delete, sender=PneumaticCloseTimeParameter)
+@receiver(post_save, sender=PneumaticActuatorBody)
+@receiver(post_delete, sender=PneumaticActuatorBody)
+@receiver(post_save, sender=PneumaticActuatorSpringsQty)
+@receiver(post_delete, sender=PneumaticActuatorSpringsQty)
+def invalidate_actuator_parameter_index(sender, **kwargs):
+    """Сбрасывает индекс веса и времени открытия/закрытия при изменении данных"""
+    from pneumatic_actuators.services import ActuatorParameterIndex
+    ActuatorParameterIndex.invalidate()
+
+
+@receiver(post_save, sender=BodyThrustTorqueTable)
+@receiver(post_delete, sender=BodyThrustTorqueTable)
+def invalidate_torque_matrix_body(sender, instance, **kwargs):
+    """Сбрасывает скомпилированную таблицу моментов корпуса строки"""
+    from pneumatic_actuators.services import TorqueMatrixCache
+    TorqueMatrixCache.invalidate(instance.body_id)
+
+
+@receiver(post_save, sender=PneumaticActuatorBody)
+@receiver(post_delete, sender=PneumaticActuatorBody)
+@receiver(post_save, sender=PneumaticActuatorSpringsQty)
+@receiver(post_delete, sender=PneumaticActuatorSpringsQty)
+@receiver(post_save, sender=PneumaticAirSupplyPressure)
+@receiver(post_delete, sender=PneumaticAirSupplyPressure)
+def invalidate_torque_matrix_all(sender, **kwargs):
+    """Названия и сортировка корпусов/пружин/давлений входят в таблицы всех корпусов"""
+    from pneumatic_actuators.services import TorqueMatrixCache
+    TorqueMatrixCache.invalidate()
+
+
+@receiver(post_save, sender=PneumaticSafetyPositionOption)
+@receiver(post_delete, sender=PneumaticSafetyPositionOption)
+@receiver(post_save, sender=PneumaticSpringsQtyOption)
+@receiver(post_delete, sender=PneumaticSpringsQtyOption)
+def invalidate_option_catalog_item(sender, instance, **kwargs):
+    """Опции модели серии изменились - сбрасываем ее закешированный каталог опций"""
+    from pneumatic_actuators.services import OptionCatalog
+    OptionCatalog.invalidate(instance.model_line_item_id)
+
+
+@receiver(post_save, sender=PneumaticActuatorModelLineItem)
+@receiver(post_delete, sender=PneumaticActuatorModelLineItem)
+def invalidate_option_catalog_model_line_item(sender, instance, **kwargs):
+    """Модель могла перейти в другую серию"""
+    from pneumatic_actuators.services import OptionCatalog
+    OptionCatalog.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=PneumaticTemperatureOption)
+@receiver(post_delete, sender=PneumaticTemperatureOption)
+@receiver(post_save, sender=PneumaticIpOption)
+@receiver(post_delete, sender=PneumaticIpOption)
+@receiver(post_save, sender=PneumaticExdOption)
+@receiver(post_delete, sender=PneumaticExdOption)
+@receiver(post_save, sender=PneumaticBodyCoatingOption)
+@receiver(post_delete, sender=PneumaticBodyCoatingOption)
+def invalidate_option_catalog_model_line(sender, **kwargs):
+    """Опции серии действуют на все ее модели"""
+    from pneumatic_actuators.services import OptionCatalog
+    OptionCatalog.invalidate()
@@ -0,0 +1,228 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from params.models import PneumaticAirSupplyPressure
+from pneumatic_actuators.models import (
+    BodyThrustTorqueTable, PneumaticActuatorBody, PneumaticActuatorBodyTable, PneumaticActuatorModelLine,
+    PneumaticActuatorModelLineItem, PneumaticActuatorSpringsQty, PneumaticActuatorVariety, PneumaticCloseTimeParameter,
+    PneumaticWeightParameter,
+)
+from pneumatic_actuators.services import ActuatorParameterIndex, TorqueMatrixCache, TorqueSizingEngine
+
+
+class PneumaticTestData(TestCase):
+    """
+    Два корпуса с таблицами моментов (справочники давлений и пружин - из миграций):
+        B1: DA 4 бар - 40, 6 бар - 60; SR 05 пружин: пружины bto 20/eto 15, воздух 6 бар bto 35/eto 30
+        B2: DA 4 бар - 80, 6 бар - 120; SR 05 пружин: пружины bto 40/eto 30, воздух 6 бар bto 70/eto 60
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.pressure = {code: PneumaticAirSupplyPressure.objects.get(code=code) for code in ('spring', '4', '6')}
+        cls.springs = {code: PneumaticActuatorSpringsQty.objects.get(code=code)
+                       for code in ('DA', '05', '08', '09', '10')}
+        body_table = PneumaticActuatorBodyTable.objects.create(name='TEST', code='TEST', description='')
+        cls.b1, cls.b2 = [
+            PneumaticActuatorBody.objects.create(name=code, code=code, description='', body_table=body_table,
+                                                 sorting_order=i, weight_spring=Decimal('0.25'),
+                                                 min_pressure_bar=Decimal('2.5'), max_pressure_bar=Decimal('8'))
+            for i, code in enumerate(('B1', 'B2'), start=1)
+        ]
+        for body, scale in ((cls.b1, 1), (cls.b2, 2)):
+            for pressure, torque in (('4', 40), ('6', 60)):
+                cls.torque_row(body, pressure, 'DA', torque * scale, torque * scale)
+            cls.torque_row(body, 'spring', '05', 20 * scale, 15 * scale)
+            cls.torque_row(body, '6', '05', 35 * scale, 30 * scale)
+
+    @classmethod
+    def torque_row(cls, body, pressure, springs, bto, eto):
+        return BodyThrustTorqueTable.objects.create(body=body, pressure=cls.pressure[pressure],
+                                                    spring_qty=cls.springs[springs], bto=bto, rto=0, eto=eto)
+
+    def setUp(self):
+        TorqueSizingEngine.invalidate()
+        TorqueMatrixCache.invalidate()
+        ActuatorParameterIndex.invalidate()
+
+
+class TorqueSizingEngineTests(PneumaticTestData):
+    def solve(self, torque, **kwargs):
+        return [(c['body_code'], c['spring_qty_code']) for c in TorqueSizingEngine.get_instance().solve(
+            torque, **kwargs)]
+
+    def test_da_sorted_by_margin(self):
+        candidates = TorqueSizingEngine.get_instance().solve(50, pressure_min=6, da_sr_code='DA')
+        self.assertEqual([c['body_code'] for c in candidates], ['B1', 'B2'])
+        self.assertEqual(candidates[0]['air_torque'], 60)
+        self.assertAlmostEqual(candidates[0]['margin'], 0.2)
+        self.assertIsNone(candidates[0]['spring_torque'])
+
+    def test_pressure_rounds_down_to_table_value(self):
+        candidates = TorqueSizingEngine.get_instance().solve(50, pressure_min=4.3, da_sr_code='DA')
+        self.assertEqual([c['body_code'] for c in candidates], ['B2'])
+        self.assertEqual(candidates[0]['pressure_code'], '4')
+        self.assertEqual(self.solve(50, pressure_min=3, da_sr_code='DA'), [])
+
+    def test_safety_factor_and_closing_torque(self):
+        self.assertEqual(self.solve(50, pressure_min=6, da_sr_code='DA', safety_factor=1.25), [('B2', 'DA')])
+        self.assertEqual(self.solve(10, pressure_min=6, da_sr_code='DA', required_torque_close=70),
+                         [('B2', 'DA')])
+
+    def test_sr_normally_closed(self):
+        # Воздух открывает (25 <= 30), пружины закрывают (10 <= 15)
+        candidates = TorqueSizingEngine.get_instance().solve(25, pressure_min=6, required_torque_close=10)
+        self.assertEqual([(c['body_code'], c['spring_qty_code']) for c in candidates], [('B1', '05'), ('B2', '05')])
+        self.assertEqual(candidates[0]['spring_torque'], 15)
+        self.assertAlmostEqual(candidates[0]['margin'], 0.2)
+
+    def test_sr_normally_open(self):
+        # Пружины открывают: у B1 15 < 25
+        self.assertEqual(self.solve(25, pressure_min=6, required_torque_close=10, ncno_code='no'), [('B2', '05')])
+
+    def test_body_filters(self):
+        self.assertEqual(self.solve(10, pressure_min=6, da_sr_code='DA', body_ids=[self.b2.pk]), [('B2', 'DA')])
+        self.assertEqual(self.solve(10, pressure_min=6, da_sr_code='DA', limit=1), [('B1', 'DA')])
+
+    def test_body_change_resets_engine(self):
+        engine = TorqueSizingEngine.get_instance()
+        self.b1.max_pressure_bar = Decimal('5')
+        self.b1.save()
+        self.assertIsNot(TorqueSizingEngine.get_instance(), engine)
+        self.assertEqual(self.solve(10, pressure_min=4, pressure_max=6, da_sr_code='DA'), [('B2', 'DA')])
+
+    def test_solve_many_keeps_order(self):
+        results = TorqueSizingEngine.get_instance().solve_many([
+            {'torque_open': 100, 'pressure_min': 6, 'da_sr_code': 'DA'},
+            {'torque_open': 10, 'pressure_min': 6, 'da_sr_code': 'DA'},
+            {'torque_open': 1000, 'pressure_min': 6, 'da_sr_code': 'DA'},
+        ])
+        self.assertEqual([[c['body_code'] for c in candidates] for candidates in results], [['B2'], ['B1', 'B2'], []])
+
+
+class TorqueMatrixCacheTests(PneumaticTestData):
+    def test_sr_table(self):
+        data = TorqueMatrixCache.get_torque_thrust_values(self.b1.pk)
+        by_spring = data['data']['by_spring']
+        self.assertEqual(by_spring['05']['pressures']['6'], {'bto': 35.0, 'eto': 30.0})
+        self.assertEqual(by_spring['05']['pressures']['spring'], {'bto': 20.0, 'eto': 15.0})
+        self.assertEqual(by_spring['DA']['pressures']['4'], {'bto': 40.0, 'eto': 40.0})
+        self.assertEqual(data['table_config']['visible_fields'], ['bto', 'eto'])
+
+    def test_cached_response_is_a_copy(self):
+        data = TorqueMatrixCache.get_torque_thrust_values(self.b1.pk)
+        data['data']['by_spring'].clear()
+        with self.assertNumQueries(0):
+            data = TorqueMatrixCache.get_torque_thrust_values(self.b1.pk)
+        self.assertIn('05', data['data']['by_spring'])
+
+    def test_filtered_table(self):
+        data = TorqueMatrixCache.get_torque_thrust_values(self.b1.pk, pressure_list=[self.pressure['6']],
+                                                          spring_qty_list=[self.springs['05']])
+        self.assertEqual(list(data['data']['by_spring']), ['05'])
+        self.assertEqual(list(data['data']['by_spring']['05']['pressures']), ['6'])
+
+    def test_row_change_resets_body(self):
+        TorqueMatrixCache.get_torque_thrust_values(self.b1.pk)
+        row = BodyThrustTorqueTable.objects.get(body=self.b1, pressure=self.pressure['6'], spring_qty=self.springs['05'])
+        row.bto = 36
+        row.save()
+        data = TorqueMatrixCache.get_torque_thrust_values(self.b1.pk)
+        self.assertEqual(data['data']['by_spring']['05']['pressures']['6']['bto'], 36.0)
+
+    def test_unknown_body(self):
+        self.assertEqual(TorqueMatrixCache.get_torque_thrust_values(0)['count'], 0)
+
+
+class ActuatorParameterIndexTests(PneumaticTestData):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for code, weight in (('DA', '5.00'), ('05', '6.00'), ('09', '7.00'), ('10', '7.50')):
+            PneumaticWeightParameter.objects.create(body=cls.b1, spring_qty=cls.springs[code], weight=Decimal(weight))
+        for code, time_open, time_close in (('05', '1.00', '2.00'), ('10', '1.50', '2.50')):
+            PneumaticCloseTimeParameter.objects.create(body=cls.b1, spring_qty=cls.springs[code],
+                                                       time_open=Decimal(time_open), time_close=Decimal(time_close))
+
+    def test_weight(self):
+        index = ActuatorParameterIndex.get_instance()
+        self.assertEqual(index.get_weight(self.b1.pk, 'DA'), Decimal('5.00'))
+        # SR: вес для 10 пружин (максимум как число, не как строка) минус недостающие пружины,
+        # строки для меньшего количества пружин не используются
+        self.assertEqual(index.get_weight(self.b1.pk, '10'), Decimal('7.50'))
+        self.assertEqual(index.get_weight(self.b1.pk, '08'), Decimal('7.00'))
+        self.assertEqual(index.get_weight(self.b1.pk, '05'), Decimal('6.25'))
+        self.assertIsNone(index.get_weight(self.b2.pk, '05'))
+
+    def test_times(self):
+        index = ActuatorParameterIndex.get_instance()
+        self.assertEqual(index.get_times(self.b1.pk, '05'), (Decimal('1.00'), Decimal('2.00')))
+        self.assertEqual(index.get_times(self.b1.pk, '08'), (Decimal('1.50'), Decimal('2.50')))
+        self.assertEqual(index.get_times(self.b1.pk, 'DA'), (None, None))
+
+    def test_parameter_change_resets_index(self):
+        index = ActuatorParameterIndex.get_instance()
+        PneumaticWeightParameter.objects.filter(body=self.b1, spring_qty=self.springs['DA']).first().delete()
+        self.assertIsNot(ActuatorParameterIndex.get_instance(), index)
+        self.assertIsNone(ActuatorParameterIndex.get_instance().get_weight(self.b1.pk, 'DA'))
+
+
+class TenderSizingAPITests(PneumaticTestData):
+    URL = '/api/pneumatic_actuators/size-tender/'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # bulk_create: save() серии создает стандартные опции, для теста они не нужны
+        model_line, = PneumaticActuatorModelLine.objects.bulk_create([
+            PneumaticActuatorModelLine(name='TEST', code='T', description='')])
+        PneumaticActuatorModelLineItem.objects.bulk_create([
+            PneumaticActuatorModelLineItem(name=f'T{body.code}-{variety.code}', code=f'T{body.code}{variety.code}',
+                                           description='', model_line=model_line, body=body,
+                                           pneumatic_actuator_variety=variety)
+            for body in (cls.b1, cls.b2) for variety in PneumaticActuatorVariety.objects.filter(code__in=('DA', 'SR'))
+        ])
+        cls.user = get_user_model().objects.create(username='engineer')
+
+    def post(self, payload):
+        return self.client.post(self.URL, json.dumps(payload), content_type='application/json')
+
+    def test_requires_authentication(self):
+        response = self.post({'lines': [{'torque_open': 50}], 'defaults': {'pressure_min': 6}})
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_invalid_safety_factor(self):
+        self.client.force_login(self.user)
+        for safety_factor in (0, -1, 'abc'):
+            with self.subTest(safety_factor=safety_factor):
+                response = self.post({'lines': [{'torque_open': 50}],
+                                      'defaults': {'pressure_min': 6, 'safety_factor': safety_factor}})
+                self.assertEqual(response.status_code, 400)
+
+    def test_size_lines(self):
+        self.client.force_login(self.user)
+        response = self.post({
+            'lines': [
+                {'ref': 'da', 'torque_open': 50, 'safety_position': 'DA'},
+                {'ref': 'nc', 'torque_open': 25, 'torque_close': 10},
+                {'ref': 'big', 'torque_open': 1000, 'safety_position': 'DA'},
+                {'ref': 'bad', 'torque_open': 25, 'safety_factor': 0},
+                {'ref': 'default-pressure', 'torque_open': 25, 'pressure_min': ''},
+            ],
+            'defaults': {'pressure_min': 6, 'safety_position': 'nc'},
+        })
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload['count'], 5)
+        self.assertEqual(payload['found'], 3)
+
+        results = {result['ref']: result for result in payload['results']}
+        self.assertEqual(results['da']['model_line_item']['code'], 'TB1DA')
+        self.assertEqual(results['nc']['model_line_item']['code'], 'TB1SR')
+        self.assertEqual(results['nc']['spring_qty']['code'], '05')
+        self.assertEqual(results['big']['status'], 'not_found')
+        self.assertEqual(results['bad']['status'], 'error')
+        self.assertEqual(results['default-pressure']['status'], 'ok')
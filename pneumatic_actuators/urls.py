@@ -1,9 +1,10 @@
 # pneumatic_actuators/urls.py
 from django.urls import path
-from .api.views import OptionAPIView
+from .api.views import OptionAPIView, TenderSizingAPIView
 
 urlpatterns = [
     path('options/', OptionAPIView.as_view(), name='get_options'),
+    path('size-tender/', TenderSizingAPIView.as_view(), name='size_tender'),
     # Убираем ModelLineDetailView - он не нужен!
     # Убираем все остальные маршруты, которые покрываются UniversalAPIView
 ]
\ No newline at end of file
@@ -283,6 +283,13 @@ class Producer(StructuredDataMixin , models.Model) :
 
     # ==================== StructuredDataMixin методы ====================
 
+    # Бренды нужны во всех форматах (количество, список, id для формы)
+    STRUCTURED_DATA_PREFETCH = {
+        'compact' : {'prefetch_related' : ['brands']} ,
+        'display' : {'prefetch_related' : ['brands']} ,
+        'full' : {'prefetch_related' : ['brands']} ,
+    }
+
     def get_compact_data(self) -> Dict[str , Any] :
         """
         Минимальные данные для списков и таблиц
@@ -421,7 +428,7 @@ class Producer(StructuredDataMixin , models.Model) :
                 'organization' : self.organization ,
                 'sorting_order' : self.sorting_order ,
                 'is_active' : self.is_active ,
-                'brands_ids' : list(self.brands.values_list('id' , flat=True)) if hasattr(self , 'brands') else [] ,
+                'brands_ids' : [brand.id for brand in self.brands.all()] if hasattr(self , 'brands') else [] ,
             }
 
         if 'metadata' in include :
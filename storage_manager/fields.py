@@ -25,20 +25,17 @@ class ManagedFileField(models.FileField) :
         """
         Генерирует имя файла с использованием менеджера хранилища
         """
-        logger.info(f"🔍 ManagedFileField.generate_filename вызван:")
-        logger.info(f"   - instance: {instance}")
-        logger.info(f"   - filename: {filename}")
-        logger.info(f"   - self.category: {self.category}")  # ← СМОТРИМ КАКАЯ КАТЕГОРИЯ У ПОЛЯ
-        logger.debug(
-            f"ManagedFileField.generate_filename: instance={instance}, filename={filename}, category={self.category}")
+        # Ленивое форматирование: str(instance) может обращаться к БД
+        logger.debug("ManagedFileField.generate_filename: instance=%s, filename=%s, category=%s" ,
+                     instance , filename , self.category)
 
         try :
             if callable(self.upload_to) :
                 filename = self.upload_to(instance , filename)
-                logger.debug(f"Использована callable upload_to: {filename}")
+                logger.debug("Использована callable upload_to: %s" , filename)
             else :
                 filename = self.storage.generate_filename(instance , filename , self.category)
-                logger.debug(f"Сгенерировано хранилищем: {filename}")
+                logger.debug("Сгенерировано хранилищем: %s" , filename)
 
             return filename
 
@@ -21,17 +21,17 @@ class FileService :
         """
         Загрузка файла через менеджер хранилища
         """
-        logger.info(f"FileService.upload_file начат")
-        logger.debug(f"instance: {instance}, file_obj: {file_obj}, category: {category}")
+        logger.debug("FileService.upload_file начат")
+        logger.debug("instance: %s, file_obj: %s, category: %s" , instance , file_obj , category)
 
         try :
             # Генерируем имя файла через storage
             filename = self.storage.generate_filename(instance , file_obj.name , category)
-            logger.debug(f"Сгенерировано имя файла: {filename}")
+            logger.debug("Сгенерировано имя файла: %s" , filename)
 
             # Сохраняем файл
             result = self.storage.save(filename , file_obj)
-            logger.info(f"Файл успешно загружен: {result}")
+            logger.debug("Файл успешно загружен: %s" , result)
             return result
 
         except Exception as e :
@@ -42,11 +42,11 @@ class FileService :
         """
         Получение полной информации о файле
         """
-        logger.info(f"Запрос информации о файле: {file_path}")
+        logger.debug("Запрос информации о файле: %s" , file_path)
 
         try :
             if not file_path or not self.file_exists(file_path) :
-                logger.debug(f"Файл не существует или путь пустой: {file_path}")
+                logger.debug("Файл не существует или путь пустой: %s" , file_path)
                 return None
 
             info = {
@@ -58,7 +58,7 @@ class FileService :
                 'hash' : self.calculate_file_hash(file_path) ,
             }
 
-            logger.debug(f"Информация о файле: {info}")
+            logger.debug("Информация о файле: %s" , info)
             return info
 
         except Exception as e :
@@ -69,11 +69,11 @@ class FileService :
         """
         Получение URL файла
         """
-        logger.debug(f"Запрос URL для файла: {file_path}")
+        logger.debug("Запрос URL для файла: %s" , file_path)
 
         try :
             url = self.storage.url(file_path)
-            logger.debug(f"Получен URL: {url}")
+            logger.debug("Получен URL: %s" , url)
             return url
         except Exception as e :
             logger.error(f"Ошибка при получении URL для файла {file_path}: {str(e)}")
@@ -83,12 +83,12 @@ class FileService :
         """
         Удаление файла
         """
-        logger.info(f"Попытка удаления файла: {file_path}")
+        logger.debug("Попытка удаления файла: %s" , file_path)
 
         try :
             if self.file_exists(file_path) :
                 self.storage.delete(file_path)
-                logger.info(f"Файл успешно удален: {file_path}")
+                logger.debug("Файл успешно удален: %s" , file_path)
                 return True
             else :
                 logger.warning(f"Файл не существует, удаление невозможно: {file_path}")
@@ -105,11 +105,11 @@ class FileService :
         if not file_path :
             return False
 
-        logger.debug(f"Проверка существования файла: {file_path}")
+        logger.debug("Проверка существования файла: %s" , file_path)
 
         try :
             exists = self.storage.exists(file_path)
-            logger.debug(f"Файл {file_path} существует: {exists}")
+            logger.debug("Файл %s существует: %s" , file_path , exists)
             return exists
         except Exception as e :
             logger.error(f"Ошибка при проверке существования файла {file_path}: {str(e)}")
@@ -119,12 +119,12 @@ class FileService :
         """
         Получение размера файла в байтах
         """
-        logger.debug(f"Запрос размера файла: {file_path}")
+        logger.debug("Запрос размера файла: %s" , file_path)
 
         try :
             if self.file_exists(file_path) :
                 size = self.storage.size(file_path)
-                logger.debug(f"Размер файла {file_path}: {size} байт")
+                logger.debug("Размер файла %s: %s байт" , file_path , size)
                 return size
             else :
                 logger.warning(f"Файл не существует, размер недоступен: {file_path}")
@@ -159,7 +159,7 @@ class FileService :
         """
         Копирование файла с генерацией нового имени
         """
-        logger.info(f"Копирование файла: {source_path} -> {target_category}")
+        logger.debug("Копирование файла: %s -> %s" , source_path , target_category)
 
         try :
             if not self.file_exists(source_path) :
@@ -174,7 +174,7 @@ class FileService :
 
                 # Загружаем как новый файл с генерацией имени
                 result = self.upload_file(target_instance , django_file , target_category)
-                logger.info(f"Файл успешно скопирован: {source_path} -> {result}")
+                logger.debug("Файл успешно скопирован: %s -> %s" , source_path , result)
                 return result
 
         except Exception as e :
@@ -185,12 +185,12 @@ class FileService :
         """
         Перемещение файла с последующим удалением оригинала
         """
-        logger.info(f"Перемещение файла: {source_path} -> {target_category}")
+        logger.debug("Перемещение файла: %s -> %s" , source_path , target_category)
 
         try :
             new_path = self.copy_file(source_path , target_instance , target_category)
             self.delete_file(source_path)
-            logger.info(f"Файл успешно перемещен: {source_path} -> {new_path}")
+            logger.debug("Файл успешно перемещен: %s -> %s" , source_path , new_path)
             return new_path
         except Exception as e :
             logger.error(f"Ошибка при перемещении файла {source_path}: {str(e)}")
@@ -200,7 +200,7 @@ class FileService :
         """
         Очистка неиспользуемых файлов
         """
-        logger.info(f"Очистка orphaned файлов, префикс: {storage_prefix}")
+        logger.debug("Очистка orphaned файлов, префикс: %s" , storage_prefix)
 
         try :
             # Для локального хранилища
@@ -213,7 +213,7 @@ class FileService :
                     if self.delete_file(file_path) :
                         deleted_count += 1
 
-                logger.info(f"Удалено orphaned файлов: {deleted_count}")
+                logger.debug("Удалено orphaned файлов: %s" , deleted_count)
                 return deleted_count
 
             return 0
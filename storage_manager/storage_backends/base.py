@@ -47,10 +47,8 @@ class BaseStorage(Storage , ABC) :
         """
         Генерирует оптимальное имя файла с хешированием
         """
-        logger.info(f"🔍 BaseStorage.generate_filename вызван:")
-        logger.info(f"   - instance: {instance.__class__.__name__} (id: {getattr(instance , 'id' , 'new')})")
-        logger.info(f"   - filename: {filename}")
-        logger.info(f"   - category: {category}")  # ← СМОТРИМ КАКАЯ КАТЕГОРИЯ ПРИХОДИТ
+        logger.debug("BaseStorage.generate_filename: instance=%s (id: %s), filename=%s, category=%s" ,
+                     instance.__class__.__name__ , getattr(instance , 'id' , 'new') , filename , category)
         # Извлекаем информацию о модели
         model_name = instance.__class__.__name__.lower()
         instance_id = getattr(instance , 'id' , 'temp')
@@ -19,6 +19,7 @@ from valve_data.models.dimensions import (
     DimensionTableDrawingItem
 )
 from valve_data.services.dimension_services import DimensionDataService
+from core.services import JobQueue, file_response
 
 
 class ExcelImportForm(forms.Form):
@@ -133,22 +134,15 @@ class ValveDimensionTableAdmin(admin.ModelAdmin):
             form = ExcelImportForm(request.POST, request.FILES)
             if form.is_valid():
                 try:
-                    excel_file = request.FILES['excel_file']
-                    imported_count, errors = DimensionDataService.import_data_to_table(
-                        dimension_table, excel_file
+                    # Импорт выполняет фоновая задача: количество и ошибки - на странице задачи
+                    job = JobQueue.enqueue(
+                        'valve_data.import_dimensions',
+                        params={'dimension_table_id': dimension_table.id},
+                        title=f'Импорт ВГХ {dimension_table.code}: {request.FILES["excel_file"].name}',
+                        user=request.user,
+                        files={'excel_file': request.FILES['excel_file']},
                     )
-
-                    if errors:
-                        for error in errors:
-                            messages.error(request, error)
-
-                    if imported_count > 0:
-                        messages.success(
-                            request,
-                            f'Успешно импортировано {imported_count} значений данных ВГХ'
-                        )
-                    else:
-                        messages.warning(request, 'Не удалось импортировать данные')
+                    return self._redirect_to_job(request, job)
 
                 except Exception as e:
                     logger.error("Import exception: %s", str(e), exc_info=True)
@@ -177,29 +171,26 @@ class ValveDimensionTableAdmin(admin.ModelAdmin):
             dn_list = request.GET.getlist('dn')
             pn_list = request.GET.getlist('pn')
 
-            # Используем метод для экспорта в Excel
-            excel_path = DimensionDataService.export_to_excel(
-                dimension_table ,
-                dn_list=dn_list if dn_list else None ,
-                pn_list=pn_list if pn_list else None ,
-                output_path=None
+            # Файл формирует фоновая задача, результат - на странице задачи
+            job = JobQueue.enqueue(
+                'valve_data.export_dimensions' ,
+                params={'dimension_table_id' : dimension_table.id , 'dn_list' : dn_list , 'pn_list' : pn_list} ,
+                title=f'Выгрузка ВГХ {dimension_table.code}' ,
+                user=request.user ,
             )
-
-            with open(excel_path , 'rb') as f :
-                response = HttpResponse(
-                    f.read() ,
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                response['Content-Disposition'] = f'attachment; filename="vgx_export_{dimension_table.code}.xlsx"'
-
-            messages.success(request , 'Данные успешно экспортированы в Excel')
-            return response
+            return self._redirect_to_job(request , job)
 
         except Exception as e :
             logger.error("Error exporting to Excel: %s" , str(e))
             messages.error(request , f'Ошибка при экспорте в Excel: {str(e)}')
             return redirect('admin:valve_data_valvedimensiontable_change' , object_id)
 
+    def _redirect_to_job(self , request , job) :
+        """Страница поставленной задачи: прогресс, результат и файл"""
+        self.message_user(request , _("Задача поставлена в очередь. Состояние и результат - на этой странице "
+                                      "(обновите ее позже)") , level='success')
+        return redirect('admin:core_backgroundjob_change' , job.pk)
+
     def export_template_view(self , request , object_id) :
         """Экспорт пустого шаблона Excel для заполнения"""
         dimension_table = self.get_object(request , object_id)
@@ -208,12 +199,7 @@ class ValveDimensionTableAdmin(admin.ModelAdmin):
             # Используем метод для создания пустого шаблона
             template_path = DimensionDataService.create_empty_template(dimension_table)
 
-            with open(template_path , 'rb') as f :
-                response = HttpResponse(
-                    f.read() ,
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                response['Content-Disposition'] = f'attachment; filename="vgx_template_{dimension_table.code}.xlsx"'
+            response = file_response(template_path , f"vgx_template_{dimension_table.code}.xlsx")
 
             messages.success(request , 'Шаблон успешно скачан')
             return response
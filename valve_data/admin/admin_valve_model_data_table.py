@@ -4,8 +4,9 @@ from django.shortcuts import render , redirect
 from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
 
+from core.services import JobQueue
 from params.models import DnVariety , PnVariety
-from valve_data.utils.valve_line_data_table_import_export import export_valve_line_data_table_to_excel , import_valve_line_data_table_from_excel
+from valve_data.utils.valve_line_data_table_import_export import import_valve_line_data_table_from_excel
 
 from valve_data.models import ValveModelDataTable , ValveLineModelData
 
@@ -87,10 +88,12 @@ class ValveModelDataTableAdmin(admin.ModelAdmin) :
         try :
             valve_line_data_table = ValveModelDataTable.objects.get(id=object_id)
 
-            response = export_valve_line_data_table_to_excel(valve_line_data_table)
-
-            # ВАЖНО: возвращаем response!
-            return response
+            # Файл формирует фоновая задача, результат - на странице задачи
+            job = JobQueue.enqueue('valve_data.export_model_data' ,
+                                   params={'valve_model_data_table_id' : valve_line_data_table.id} ,
+                                   title=f"Выгрузка таблицы моделей {valve_line_data_table.code}" ,
+                                   user=request.user)
+            return self._redirect_to_job(request , job)
 
         except ValveModelDataTable.DoesNotExist :
             from django.contrib import messages
@@ -101,6 +104,12 @@ class ValveModelDataTableAdmin(admin.ModelAdmin) :
             messages.error(request , _("Ошибка при экспорте: {}").format(str(e)))
             return redirect('..')
 
+    def _redirect_to_job(self , request , job) :
+        """Страница поставленной задачи: прогресс, результат и файл"""
+        self.message_user(request , _("Задача поставлена в очередь. Состояние и результат - на этой странице "
+                                      "(обновите ее позже)") , level='success')
+        return redirect('admin:core_backgroundjob_change' , job.pk)
+
     def import_model_data_table(self , request , object_id) :
         """Импорт моделей арматуры для конкретного ValveLine"""
         try :
@@ -167,6 +176,8 @@ class ValveModelDataTableAdmin(admin.ModelAdmin) :
                         'opts' : self.model._meta ,
                         'title' : _('Подтверждение удаления')
                     })
+                elif result_type == 'queued' :
+                    return self._redirect_to_job(request , result_data)
                 elif result_type == 'success' :
                     print("DEBUG: Import successful")
                     messages.success(request , _("Данные успешно импортированы"))
@@ -10,6 +10,7 @@ from django.urls import path , reverse
 from django.shortcuts import render , redirect
 from django import forms
 
+from core.services import StreamingExcelExport
 from params.models import DnVariety
 from valve_data.models import ValveModelKvDataTable, ValveLineModelKvData
 
@@ -76,54 +77,40 @@ class ValveModelKvDataTableAdmin(admin.ModelAdmin) :
 
             # Получаем все данные Kv для выбранного шаблона
             kv_data = ValveLineModelKvData.objects.filter(
-                valve_model_kv_data_table=valve_model
-            ).select_related('valve_model_dn' , 'valve_model_pn')
+                valve_model_kv_data_table=valve_model , valve_model_dn__isnull=False
+            )
 
             if not kv_data.exists() :
                 messages.error(request , _("Нет данных Kvs для экспорта"))
                 # ИСПРАВЛЕННЫЙ URL - используем reverse
                 return redirect(reverse('admin:valve_data_valvemodelkvdatatable_change' , args=[object_id]))
 
-            # Собираем уникальные углы открытия
-            angles = sorted(set([float(data.valve_model_openinig_angle) for data in kv_data if
-                                 data.valve_model_openinig_angle is not None]))
-
-            # Собираем уникальные DN
-            dns = sorted(set([data.valve_model_dn for data in kv_data if data.valve_model_dn]) ,
-                         key=lambda x : x.diameter_metric)
-
-            # Создаем DataFrame
-            df_data = []
-            for dn in dns :
-                row = {'DN' : dn.diameter_metric}
-                # Для каждого угла находим соответствующее значение Kv
-                for angle in angles :
-                    kv_value = next((data.valve_model_kv for data in kv_data
-                                     if data.valve_model_dn == dn and
-                                     float(data.valve_model_openinig_angle) == angle) , None)
-                    row[str(angle)] = float(kv_value) if kv_value is not None else ''
-                df_data.append(row)
-
-            df = pd.DataFrame(df_data)
-
-            # Создаем Excel файл
-            output = BytesIO()
-            with pd.ExcelWriter(output , engine='openpyxl') as writer :
-                df.to_excel(writer , sheet_name='Kv Data' , index=False)
-
-                # Форматирование
-                worksheet = writer.sheets['Kv Data']
-                for col_num , value in enumerate(df.columns.values , 1) :
-                    worksheet.cell(row=1 , column=col_num).value = value
-
-            output.seek(0)
-
-            # Создаем HTTP response
-            response = HttpResponse(
-                output.getvalue() ,
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = f'attachment; filename="kv_data_{valve_model.code}.xlsx"'
+            # Уникальные углы открытия - колонки таблицы
+            angles = sorted({float(angle) for angle in kv_data.filter(
+                valve_model_openinig_angle__isnull=False
+            ).order_by().values_list('valve_model_openinig_angle' , flat=True).distinct()})
+
+            def kv_rows() :
+                # Строки по DN (по возрастанию диаметра), значения читаются потоком
+                current_dn , row_values = None , {}
+                values = kv_data.filter(valve_model_openinig_angle__isnull=False).order_by(
+                    'valve_model_dn__diameter_metric' , 'valve_model_dn_id' , 'valve_model_pn' , 'id'
+                ).values_list('valve_model_dn_id' , 'valve_model_dn__diameter_metric' ,
+                              'valve_model_openinig_angle' , 'valve_model_kv')
+                for dn_id , diameter , angle , kv in values.iterator() :
+                    if current_dn is not None and dn_id != current_dn[0] :
+                        yield [current_dn[1]] + [row_values.get(a , '') for a in angles]
+                        row_values = {}
+                    current_dn = (dn_id , diameter)
+                    # Первое значение для DN и угла
+                    row_values.setdefault(float(angle) , float(kv) if kv is not None else '')
+                if current_dn is not None :
+                    yield [current_dn[1]] + [row_values.get(a , '') for a in angles]
+
+            # Создаем Excel файл (потоково, во временный файл)
+            export = StreamingExcelExport()
+            export.add_sheet('Kv Data' , ['DN'] + [str(angle) for angle in angles] , kv_rows())
+            response = export.as_response(f"kv_data_{valve_model.code}.xlsx")
 
             messages.success(request , _("Данные Kvs успешно экспортированы"))
             return response
@@ -144,44 +131,25 @@ class ValveModelKvDataTableAdmin(admin.ModelAdmin) :
             standard_angles = [0 , 10 , 15 , 20 , 30 , 45 , 60 , 75 , 80 , 90]
 
             # Получаем все значения диаметров из DnVariety
-            dn_varieties = DnVariety.objects.all().order_by('diameter_metric')
-
-            # Создаем DataFrame
-            df_data = []
-            for dn in dn_varieties :
-                row = {'DN' : dn.diameter_metric}
-                for angle in standard_angles :
-                    row[str(angle)] = ''  # Пустые значения для заполнения
-                df_data.append(row)
-
-            df = pd.DataFrame(df_data)
-
-            # Создаем Excel файл
-            output = BytesIO()
-            with pd.ExcelWriter(output , engine='openpyxl') as writer :
-                df.to_excel(writer , sheet_name='Kv Template' , index=False)
-
-                # Добавляем инструкции
-                instructions = [
-                    "ИНСТРУКЦИЯ ПО ЗАПОЛНЕНИЮ:" ,
-                    "1. Не изменяйте структуру таблицы (первую строку с углами и первый столбец с DN)" ,
-                    "2. Заполняйте значения Kv в соответствующих ячейках" ,
-                    "3. Убедитесь, что значения DN соответствуют существующим в системе" ,
-                    "4. Углы открытия должны быть в диапазоне 0-90 градусов" ,
-                    "5. Для импорта используйте соответствующую кнопку в админке"
-                ]
-
-                instructions_df = pd.DataFrame(instructions)
-                instructions_df.to_excel(writer , sheet_name='Инструкция' , index=False , header=False)
-
-            output.seek(0)
-
-            # Создаем HTTP response
-            response = HttpResponse(
-                output.getvalue() ,
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = f'attachment; filename="kv_template_{valve_model.code}.xlsx"'
+            dn_diameters = DnVariety.objects.all().order_by('diameter_metric').values_list(
+                'diameter_metric' , flat=True)
+
+            # Инструкции по заполнению
+            instructions = [
+                "ИНСТРУКЦИЯ ПО ЗАПОЛНЕНИЮ:" ,
+                "1. Не изменяйте структуру таблицы (первую строку с углами и первый столбец с DN)" ,
+                "2. Заполняйте значения Kv в соответствующих ячейках" ,
+                "3. Убедитесь, что значения DN соответствуют существующим в системе" ,
+                "4. Углы открытия должны быть в диапазоне 0-90 градусов" ,
+                "5. Для импорта используйте соответствующую кнопку в админке"
+            ]
+
+            # Создаем Excel файл: DN и пустые значения для заполнения
+            export = StreamingExcelExport()
+            export.add_sheet('Kv Template' , ['DN'] + [str(angle) for angle in standard_angles] ,
+                             ([diameter] for diameter in dn_diameters.iterator()))
+            export.add_sheet('Инструкция' , None , ([line] for line in instructions))
+            response = export.as_response(f"kv_template_{valve_model.code}.xlsx")
 
             messages.success(request , _("Шаблон таблицы Kvs успешно экспортирован"))
             return response
@@ -348,6 +316,10 @@ class ValveModelKvDataTableAdmin(admin.ModelAdmin) :
                 if records_to_create :
                     ValveLineModelKvData.objects.bulk_create(records_to_create)
                     print(f"Создано новых записей: {len(records_to_create)}")
+                    # bulk_create не отправляет сигналы - сбрасываем скомпилированные данные Kv
+                    from valve_data.services import KvCurveCache , ValveSizingIndex
+                    KvCurveCache.invalidate(valve_model.pk)
+                    ValveSizingIndex.invalidate()
                     return True , _(f"Успешно импортировано {len(records_to_create)} записей Kvs")
                 else :
                     print("Нет данных для импорта")
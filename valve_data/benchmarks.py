@@ -0,0 +1,234 @@
+# valve_data/benchmarks.py
+"""Бенчмарки арматуры (core.services.BenchmarkSuite): эффективные значения серий, ВГХ, GraphQL, Excel"""
+import os
+import tempfile
+from decimal import Decimal
+
+from core.services import BenchmarkSuite, register_benchmark, register_benchmark_seed
+from valve_data.services import DimensionMatrixCache
+
+BASE_LINES_PER_SCALE = 6
+DN_SIZES = (15, 20, 25, 32, 40, 50, 65, 80, 100, 125, 150, 200, 250, 300, 350, 400, 450, 500, 600)
+PN_BARS = (6, 10, 16, 25, 40)
+DIMENSION_PARAMETERS = (
+    ('L', 'Строительная длина', 'L-face-to-face-length'),
+    ('L0', 'Габаритная длина', 'L0-overall-length'),
+    ('H', 'Высота', 'H-height'),
+    ('H1', 'Высота до оси', 'H1-axis-height'),
+    ('D1', 'Диаметр диска', 'D1-disc-diameter'),
+    ('D2', 'Межосевое расстояние отверстий', 'D2-bolt-circle'),
+    ('n', 'Количество отверстий', 'n-holes'),
+    ('M', 'Масса, кг', 'WEIGHT'),
+)
+# Серия -> наследники (пустые поля берутся из original_valve_line) -> наследник второго уровня
+CHILDREN_PER_LINE = 3
+
+
+@register_benchmark_seed('valve_data')
+def seed_valve_data(scale):
+    """Серии с наследниками, таблицы моделей DN x PN и таблицы ВГХ"""
+    from params.models import DnVariety, MountingPlateTypes, PnVariety, StemSize
+    from producers.models import Brands, Producer
+    from valve_data.models import (
+        DimensionTableParameter, ValveDimensionData, ValveDimensionTable, ValveLine, ValveLineModelData,
+        ValveModelDataTable, ValveVariety, WeightDimensionParameterVariety,
+    )
+    from valve_data.services import ValveLineResolver
+
+    dns = DnVariety.objects.bulk_create([
+        DnVariety(name=str(dn), code=str(dn), diameter_metric=dn, diameter_inches='', sorting_order=dn)
+        for dn in DN_SIZES
+    ])
+    pns = PnVariety.objects.bulk_create([
+        PnVariety(name=str(pn), code=f'bar-{pn:03d}', pressure_bar=pn, sorting_order=pn) for pn in PN_BARS
+    ])
+    varieties = ValveVariety.objects.bulk_create([
+        ValveVariety(symbolic_code='ЗД', actuator_gearbox_combinations='Q', text_description='Затвор дисковый'),
+        ValveVariety(symbolic_code='КШ', actuator_gearbox_combinations='Q', text_description='Кран шаровый'),
+    ])
+    parameter_varieties = WeightDimensionParameterVariety.objects.bulk_create([
+        WeightDimensionParameterVariety(name=name, code=code, description='')
+        for _, name, code in DIMENSION_PARAMETERS
+    ])
+    brands = list(Brands.objects.order_by('id'))
+    producers = list(Producer.objects.order_by('id'))
+    stems = list(StemSize.objects.order_by('id'))
+    plates = list(MountingPlateTypes.objects.order_by('id'))
+
+    created = len(dns) + len(pns)
+    for number in range(1, BASE_LINES_PER_SCALE * scale + 1):
+        code = f'BV{number:03d}'
+        variety = varieties[number % len(varieties)]
+        brand = brands[number % len(brands)] if brands else None
+
+        data_table = ValveModelDataTable.objects.create(name=f'Модели {code}', code=code, valve_brand=brand,
+                                                        valve_variety=variety)
+        models = ValveLineModelData.objects.bulk_create([
+            ValveLineModelData(
+                name=f'{code}-{dn.code}-{pn.code}', valve_model_data_table=data_table,
+                valve_model_dn=dn, valve_model_pn=pn,
+                valve_model_torque_to_open=Decimal(dn.diameter_metric * pn.pressure_bar) / 10,
+                valve_model_torque_to_close=Decimal(dn.diameter_metric * pn.pressure_bar) / 12,
+                valve_model_stem_size=stems[i % len(stems)] if stems else None,
+                valve_model_stem_height=Decimal(dn.diameter_metric) / 2,
+                valve_model_construction_length=Decimal(dn.diameter_metric) + 40,
+            )
+            for i, (dn, pn) in enumerate((dn, pn) for dn in dns for pn in pns)
+        ])
+        if plates:
+            through = ValveLineModelData.valve_model_mounting_plate.through
+            through.objects.bulk_create([
+                through(valvelinemodeldata_id=model.id, mountingplatetypes_id=plates[i % len(plates)].id)
+                for i, model in enumerate(models)
+            ])
+
+        dimension_table = ValveDimensionTable.objects.create(name=f'ВГХ {code}', code=code, description='',
+                                                             valve_brand=brand, valve_variety=variety)
+        parameters = DimensionTableParameter.objects.bulk_create([
+            DimensionTableParameter(dimension_table=dimension_table, name=name, legend=legend,
+                                    parameter_variety=parameter_variety, sorting_order=i)
+            for i, ((legend, name, _), parameter_variety) in enumerate(zip(DIMENSION_PARAMETERS, parameter_varieties))
+        ])
+        dimension_data = ValveDimensionData.objects.bulk_create([
+            ValveDimensionData(dn=dn, pn=pn, parameter=parameter,
+                               value=Decimal(dn.diameter_metric * (i + 1) + pn.pressure_bar), text_value='')
+            for i, parameter in enumerate(parameters) for dn in dns for pn in pns
+        ], batch_size=1000)
+
+        base_line = ValveLine.objects.create(
+            name=f'Серия {code}', code=code, description=f'Серия арматуры {code}', features_text='',
+            application_text='', valve_brand=brand,
+            valve_producer=producers[number % len(producers)] if producers else None,
+            valve_variety=variety, work_temp_min=-20, work_temp_max=120, temp_min=-40, temp_max=150,
+            valve_model_data_table=data_table, valve_model_dimension_data_table=dimension_table,
+        )
+        lines = [base_line]
+        for child_number in range(1, CHILDREN_PER_LINE + 1):
+            child = ValveLine.objects.create(name=f'Серия {code}.{child_number}', code=f'{code}.{child_number}',
+                                             description='', features_text='', application_text='',
+                                             original_valve_line=base_line, work_temp_max=100 + child_number)
+            grandchild = ValveLine.objects.create(name=f'Серия {code}.{child_number}.1',
+                                                  code=f'{code}.{child_number}.1', description='',
+                                                  features_text='', application_text='', original_valve_line=child)
+            lines += [child, grandchild]
+        created += len(models) + len(parameters) + len(dimension_data) + len(lines)
+
+    ValveLineResolver.refresh()
+    return created
+
+
+def _valve_lines():
+    from valve_data.models import ValveLine, ValveLineResolved
+    return ValveLine.objects.select_related(*ValveLineResolved.select_related_paths()).order_by('id')
+
+
+@register_benchmark('valve_data.effective_fields', 'Эффективные значения всех полей всех серий')
+def effective_fields():
+    from valve_data.models import ValveLineResolved
+
+    for valve_line in _valve_lines():
+        for field_name in ValveLineResolved.FIELDS:
+            valve_line.get_field_value_with_fallback(field_name)
+
+
+@register_benchmark('valve_data.dimension_matrices', 'Таблицы ВГХ всех серий (отображение и экспортный формат)',
+                    setup=DimensionMatrixCache.invalidate)
+def dimension_matrices():
+    from valve_data.models import ValveDimensionTable
+    from valve_data.services.dimension_services import DimensionDataService
+
+    for dimension_table in ValveDimensionTable.objects.select_related('valve_brand', 'valve_variety'):
+        DimensionDataService.get_dimensions_display_data(dimension_table)
+        DimensionDataService.get_dimensions_display_data(dimension_table, export=True)
+
+
+@register_benchmark('valve_data.graphql_valve_lines', 'GraphQL: страница серий с эффективными значениями')
+def graphql_valve_lines():
+    BenchmarkSuite.execute_graphql("""
+        query {
+            valveLinesPage(first: 100) {
+                items {
+                    id name code
+                    effectiveValveBrand effectiveValveProducer effectiveValveVariety
+                    effectiveWorkTempMin effectiveWorkTempMax
+                    basicInfo { key value }
+                    temperatureInfo { key value }
+                }
+                pageInfo { hasNextPage endCursor totalCount }
+            }
+        }
+    """)
+
+
+@register_benchmark('valve_data.excel_export', 'Выгрузка в Excel таблиц моделей и таблиц ВГХ')
+def excel_export():
+    from valve_data.models import ValveDimensionTable, ValveModelDataTable
+    from valve_data.services.dimension_services import DimensionDataService
+    from valve_data.utils.valve_line_data_table_import_export import export_valve_line_data_table_to_excel
+
+    for data_table in ValveModelDataTable.objects.order_by('id'):
+        response = export_valve_line_data_table_to_excel(data_table)
+        for _ in response.streaming_content:
+            pass
+        response.close()
+    for dimension_table in ValveDimensionTable.objects.order_by('id'):
+        os.remove(DimensionDataService.export_to_excel(dimension_table))
+
+
+# Файлы для сценария импорта: таблица -> путь
+_import_files = {}
+
+
+def _prepare_import_files():
+    """
+    Файлы импорта (вне замера, один раз на сценарий): выгрузка таблиц моделей
+    и таблицы ВГХ в формате шаблона импорта (DimensionDataService.create_empty_template)
+    """
+    from core.services import StreamingExcelExport
+    from valve_data.models import ValveDimensionTable, ValveModelDataTable
+    from valve_data.utils.valve_line_data_table_import_export import export_valve_line_data_table_to_excel
+
+    if _import_files:
+        return
+    for data_table in ValveModelDataTable.objects.order_by('id'):
+        response = export_valve_line_data_table_to_excel(data_table)
+        handle, path = tempfile.mkstemp(suffix='.xlsx')
+        with os.fdopen(handle, 'wb') as output:
+            for chunk in response.streaming_content:
+                output.write(chunk)
+        response.close()
+        _import_files[data_table] = path
+    for dimension_table in ValveDimensionTable.objects.order_by('id'):
+        matrices = dimension_table.get_dimension_data(export=True)['matrices']
+        # Строка матрицы: legend, название, код параметра, PN, значения по DN
+        rows = ([row[1], row[2], matrix['pn'], ''] + list(row[4:])
+                for matrix in matrices for row in matrix['matrix'][1:])
+        export = StreamingExcelExport()
+        export.add_sheet('Шаблон ВГХ', ['Название параметра', 'Код параметра', 'PN код', 'PN название']
+                         + list(matrices[0]['matrix'][0][4:]), rows)
+        _import_files[dimension_table] = export.close()
+
+
+def _cleanup_import_files():
+    for path in _import_files.values():
+        if os.path.exists(path):
+            os.remove(path)
+    _import_files.clear()
+
+
+@register_benchmark('valve_data.excel_import', 'Импорт из Excel таблиц моделей и таблиц ВГХ (повторная загрузка выгрузки)',
+                    setup=_prepare_import_files, teardown=_cleanup_import_files)
+def excel_import():
+    from valve_data.models import ValveModelDataTable
+    from valve_data.services import ValveModelDataImporter, read_import_sheet
+    from valve_data.services.dimension_services import DimensionDataService
+
+    for table, path in _import_files.items():
+        if isinstance(table, ValveModelDataTable):
+            importer = ValveModelDataImporter(table)
+            status, message = importer.apply(importer.resolve(read_import_sheet(path)))
+        else:
+            imported, errors = DimensionDataService.import_data_to_table(table, path)
+            status, message = ('success' if not errors else 'error'), '; '.join(errors[:3])
+        if status != 'success':
+            raise RuntimeError(f"Импорт {table}: {message}")
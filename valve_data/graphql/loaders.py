@@ -0,0 +1,152 @@
+# valve_data/graphql/loaders.py
+"""
+Пакетные загрузчики узлов valve_data (core.graphql.loaders) - значения вычисляются
+сразу для всех серий/моделей ответа, количество запросов не зависит от размера страницы.
+"""
+from collections import defaultdict
+
+from core.graphql import get_loaders
+from valve_data.models import (
+    ValveLine, ValveLineResolved, ValveLineBodyColor, ValveLineModelData, ValveLineModelKvData,
+    AllowedDnTemplate
+)
+
+INHERITANCE_MAX_DEPTH = 10  # как ValveLineInheritanceMixin._will_inherit
+REQUIRED_FIELDS = ('name', 'code', 'valve_brand_id', 'valve_producer_id')  # get_missing_required_fields
+
+
+def with_resolved(info, valve_line: ValveLine) -> ValveLine:
+    """Серия с загруженными эффективными значениями (ValveLineResolved и его ссылки)"""
+    if not ValveLine.resolved.related.is_cached(valve_line):
+        resolved = get_loaders(info).loader(ValveLine, 'resolved', _load_resolved).load(valve_line)
+        if resolved is not None:
+            ValveLine.resolved.related.set_cached_value(valve_line, resolved)
+    return valve_line
+
+
+def load_body_colors_info(info, valve_line: ValveLine) -> list:
+    """Результат ValveLine.get_body_colors_info() для всех серий ответа"""
+    return get_loaders(info).loader(ValveLine, 'body_colors_info', _load_body_colors_info,
+                                    default=[]).load(valve_line)
+
+
+def load_has_kv_data(info, valve_line: ValveLine) -> bool:
+    """ValveLine.has_kv_data без загрузки таблиц Kv"""
+    return get_loaders(info).loader(ValveLine, 'has_kv_data', lambda lines: _load_has_kv_data(info, lines),
+                                    default=False).load(valve_line)
+
+
+def load_has_dimension_data(info, valve_line: ValveLine) -> bool:
+    """ValveLine.has_dimension_data: серии без таблицы ВГХ отсекаются пакетно"""
+    table_id = get_loaders(info).loader(ValveLine, 'dimension_table', _load_dimension_table_ids).load(valve_line)
+    return valve_line.has_dimension_data if table_id else False
+
+
+def load_has_required_data(info, valve_line: ValveLine) -> bool:
+    """ValveLine.has_required_data для всех серий ответа"""
+    return get_loaders(info).loader(ValveLine, 'has_required_data', _load_has_required_data,
+                                    default=False).load(valve_line)
+
+
+def load_model_data_line(info, model_data: ValveLineModelData):
+    """Серия, эффективная таблица данных которой содержит модель (первая по id)"""
+    return get_loaders(info).loader(
+        ValveLineModelData, 'valve_line', lambda items: _load_model_data_lines(info, items),
+        key_fn=lambda item: item.valve_model_data_table_id).load(model_data)
+
+
+# ==================== ПАКЕТНАЯ ЗАГРУЗКА ====================
+
+def _chains(valve_line_ids, length=None):
+    """Серия и ее предки (не более length, без повторов) по карте original_valve_line"""
+    parents = dict(ValveLine.objects.values_list('id', 'original_valve_line_id'))
+    chains = {}
+    for pk in valve_line_ids:
+        chain, current = [], pk
+        while current in parents and current not in chain and (length is None or len(chain) < length):
+            chain.append(current)
+            current = parents[current]
+        chains[pk] = chain
+    return chains
+
+
+def _load_resolved(valve_lines):
+    return ValveLineResolved.objects.select_related(*ValveLineResolved.FK_FIELDS).in_bulk(
+        [line.pk for line in valve_lines])
+
+
+def _load_body_colors_info(valve_lines):
+    # get_body_colors_info: собственные цвета серии, если их нет - цвета original_valve_line
+    chains = _chains([line.pk for line in valve_lines])
+    colors = defaultdict(list)
+    for color in ValveLineBodyColor.objects.filter(
+            valve_line_id__in={pk for chain in chains.values() for pk in chain}, is_available=True
+    ).select_related('body_color', 'option_variety').order_by('option_variety__sorting_order', 'sorting_order'):
+        colors[color.valve_line_id].append(color)
+
+    result = {}
+    for line in valve_lines:
+        source = next((pk for pk in chains[line.pk] if colors.get(pk)), None)
+        result[line.pk] = [line._format_body_color(color) for color in colors.get(source, [])]
+    return result
+
+
+def _load_has_kv_data(info, valve_lines):
+    # get_kv_data_info: есть строки Kv эффективной таблицы для DN из эффективной таблицы допустимых DN
+    tables = {}
+    for line in valve_lines:
+        resolved_line = with_resolved(info, line)
+        kv_table = resolved_line.effective_valve_model_kv_data_table
+        allowed_dn_table = resolved_line.effective_allowed_dn_table
+        if kv_table and allowed_dn_table:
+            tables[line.pk] = (kv_table.pk, allowed_dn_table.pk)
+    if not tables:
+        return {}
+
+    allowed_dn = defaultdict(set)
+    for template_id, dn_id in AllowedDnTemplate.objects.filter(
+            id__in={dn_table for _, dn_table in tables.values()}, dn__isnull=False).values_list('id', 'dn'):
+        allowed_dn[template_id].add(dn_id)
+
+    kv_dn = defaultdict(set)
+    for table_id, dn_id in ValveLineModelKvData.objects.filter(
+            valve_model_kv_data_table_id__in={kv_table for kv_table, _ in tables.values()}
+    ).values_list('valve_model_kv_data_table_id', 'valve_model_dn_id').distinct():
+        kv_dn[table_id].add(dn_id)
+
+    return {pk: bool(kv_dn[kv_table] & allowed_dn[dn_table]) for pk, (kv_table, dn_table) in tables.items()}
+
+
+def _load_dimension_table_ids(valve_lines):
+    # effective_valve_model_dimension_data_table: первое непустое значение цепочки (get_field_value_with_fallback)
+    chains = _chains([line.pk for line in valve_lines], 5)
+    tables = dict(ValveLine.objects.filter(
+        id__in={pk for chain in chains.values() for pk in chain}
+    ).values_list('id', 'valve_model_dimension_data_table_id'))
+    return {pk: next((tables[item] for item in chain if tables.get(item)), None) for pk, chain in chains.items()}
+
+
+def _load_has_required_data(valve_lines):
+    # get_missing_required_fields: значение серии или любого предка (не глубже INHERITANCE_MAX_DEPTH)
+    chains = _chains([line.pk for line in valve_lines], INHERITANCE_MAX_DEPTH + 1)
+    rows = {row[0]: row[1:] for row in ValveLine.objects.filter(
+        id__in={pk for chain in chains.values() for pk in chain}).values_list('id', *REQUIRED_FIELDS)}
+
+    result = {}
+    for line in valve_lines:
+        chain = chains[line.pk]
+        result[line.pk] = all(
+            rows[chain[0]][index] or any(rows[pk][index] not in (None, '') for pk in chain[1:])
+            for index in range(len(REQUIRED_FIELDS))
+        ) if chain else False
+    return result
+
+
+def _load_model_data_lines(info, model_data_items):
+    table_ids = {item.valve_model_data_table_id for item in model_data_items}
+    lines = {}
+    for line in ValveLine.objects.filter(resolved__valve_model_data_table_id__in=table_ids).select_related(
+            *ValveLineResolved.select_related_paths()).order_by('id'):
+        lines.setdefault(line.resolved.valve_model_data_table_id, line)
+    get_loaders(info).register(lines.values())
+    return lines
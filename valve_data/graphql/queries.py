@@ -3,137 +3,172 @@ import graphene
 from graphene_django import DjangoConnectionField
 from django.core.paginator import Paginator
 from django.db.models import Q
+from graphql import GraphQLError
 
-from .types import ValveModelDataResult , PageInfo , ValveLineModelDataNode , ValveLineNode , ValveLineFilterInput
+from .types import (
+    ValveModelDataResult , PageInfo , ValveLineModelDataNode , ValveLineNode , ValveLineFilterInput , ValveLinePage ,
+    ValveSizingCandidateNode
+)
+from core.graphql import CursorPaginator
 from producers.graphql.types import ProducerNode , BrandsNode
-from valve_data.models import ValveLine
+from valve_data.models import ValveLine , ValveLineResolved , AllowedDnTemplate
 from producers.models import Producer
 
+# Фильтр GraphQL -> строковое представление эффективного значения в ValveLineResolved
+VALVE_LINE_STRING_FILTERS = (
+    'valve_producer' , 'valve_brand' , 'valve_variety' , 'valve_function' , 'valve_actuation' ,
+    'valve_sealing_class' , 'body_material' , 'body_material_specified' ,
+    'shut_element_material' , 'shut_element_material_specified' ,
+    'sealing_element_material' , 'sealing_element_material_specified' ,
+)
+
+
+def ensure_valve_lines_resolved() :
+    """Досчитать эффективные значения серий, у которых еще нет строки ValveLineResolved"""
+    from valve_data.services import ValveLineResolver
+    missing = list(ValveLine.objects.filter(resolved__isnull=True).values_list('id' , flat=True))
+    if missing :
+        ValveLineResolver.refresh(missing , cascade=False)
+
+
+def apply_valve_line_filters(queryset , filters) :
+    """
+    Фильтры по эффективным значениям серий в SQL (по таблице ValveLineResolved)
+
+    Строковые фильтры сравниваются с str() эффективного объекта, температуры - диапазоны
+    по эффективным значениям, allowed_dn - принадлежность Dn шаблону допустимых Dn,
+    search - подстрока в эффективных названии, коде или описании без учета регистра.
+    """
+    ensure_valve_lines_resolved()
+
+    for filter_field in VALVE_LINE_STRING_FILTERS :
+        filter_values = getattr(filters , filter_field , None)
+        if filter_values :
+            queryset = queryset.filter(**{f'resolved__{filter_field}_str__in' : filter_values})
+
+    # Числовые фильтры по эффективным значениям
+    for filter_field in ('work_temp_min__gte' , 'work_temp_min__lte' , 'work_temp_max__gte' , 'work_temp_max__lte') :
+        value = getattr(filters , filter_field , None)
+        if value is not None :
+            queryset = queryset.filter(**{f'resolved__{filter_field}' : value})
+
+    # Точные фильтры по эффективным значениям
+    if getattr(filters , 'port_qty' , None) :
+        queryset = queryset.filter(resolved__port_qty_str=filters.port_qty)
+    if getattr(filters , 'construction_variety' , None) :
+        queryset = queryset.filter(resolved__construction_variety_str=filters.construction_variety)
+
+    # Фильтр по DN: Dn входит в эффективный шаблон допустимых Dn
+    if getattr(filters , 'allowed_dn' , None) :
+        dn = filters.allowed_dn.strip()
+        dn_condition = Q(dn__name=dn) | Q(dn__code=dn)
+        if dn.isdigit() :
+            dn_condition |= Q(dn__diameter_metric=int(dn))
+        templates = AllowedDnTemplate.objects.filter(dn_condition).values('id')
+        queryset = queryset.filter(resolved__allowed_dn_table_id__in=templates)
+
+    # Поиск по названию, коду и описанию (эффективные значения)
+    if getattr(filters , 'search' , None) :
+        search_term = filters.search.lower()
+        condition = Q(resolved__search_text__contains=search_term)
+        if search_term.strip() == 'без названия' :
+            # effective_name серии без названия - "Без названия" (только точный запрос заглушки)
+            condition |= Q(resolved__name__isnull=True)
+        queryset = queryset.filter(condition)
+
+    # Фильтры по статусу (прямые поля модели)
+    if getattr(filters , 'is_active' , None) is not None :
+        queryset = queryset.filter(is_active=filters.is_active)
+    if getattr(filters , 'is_approved' , None) is not None :
+        queryset = queryset.filter(is_approved=filters.is_approved)
+
+    return queryset
+
 
 class ValveLineQuery(graphene.ObjectType) :
     valve_lines = graphene.List(
         ValveLineNode ,
         filters=ValveLineFilterInput() ,
         first=graphene.Int() ,
-        skip=graphene.Int()
+        skip=graphene.Int(description="Смещение (устаревшее, для больших выборок используйте valve_lines_page)")
+    )
+    valve_lines_page = graphene.Field(
+        ValveLinePage ,
+        filters=ValveLineFilterInput() ,
+        first=graphene.Int() ,
+        after=graphene.String() ,
+        with_total_count=graphene.Boolean(default_value=True)
     )
     valve_line = graphene.Field(ValveLineNode , id=graphene.ID(required=True))
+    valve_sizing_search = graphene.List(
+        ValveSizingCandidateNode ,
+        required_kv=graphene.Float(description="Требуемый Kv, м3/ч") ,
+        flow=graphene.Float(description="Расход, м3/ч (вместо requiredKv, вместе с pressureDrop)") ,
+        pressure_drop=graphene.Float(description="Перепад давления на арматуре, бар") ,
+        density=graphene.Float(default_value=1000.0 , description="Плотность среды, кг/м3") ,
+        dn_min=graphene.Int() ,
+        dn_max=graphene.Int() ,
+        pn=graphene.Float(description="Требуемое давление, бар") ,
+        temperature=graphene.Float(description="Рабочая температура, °С") ,
+        working_medium=graphene.ID() ,
+        min_resistance=graphene.Int(default_value=2 , description="Наименьшая применимость материалов к среде (1-4)") ,
+        allow_unknown_resistance=graphene.Boolean(
+            default_value=True , description="Допускать материалы с неуказанной применимостью к среде") ,
+        max_angle=graphene.Float(default_value=70.0) ,
+        best_per_line=graphene.Boolean(default_value=True) ,
+        first=graphene.Int() ,
+        description="Подбор моделей арматуры по всему каталогу (ValveSizingIndex)"
+    )
 
-    def resolve_valve_lines(self , info , filters=None , first=None , skip=None , **kwargs) :
-        queryset = ValveLine.objects.all()
+    # Keyset-пагинация серий: по первичному ключу (уникален и проиндексирован)
+    VALVE_LINES_PAGE_ORDERING = ('id' ,)
 
+    @staticmethod
+    def _valve_lines_queryset(filters) :
+        queryset = ValveLine.objects.select_related(*ValveLineResolved.select_related_paths())
         if filters :
-            # Фильтрация по эффективным строковым значениям через геттеры
-            string_filters = {
-                'valve_producer' : 'effective_valve_producer_str' ,
-                'valve_brand' : 'effective_valve_brand_str' ,
-                'valve_variety' : 'effective_valve_variety_str' ,
-                'valve_function' : 'effective_valve_function_str' ,
-                'valve_actuation' : 'effective_valve_actuation_str' ,
-                'valve_sealing_class' : 'effective_valve_sealing_class_str' ,
-                'body_material' : 'effective_body_material_str' ,
-                'body_material_specified' : 'effective_body_material_specified_str' ,
-                'shut_element_material' : 'effective_shut_element_material_str' ,
-                'shut_element_material_specified' : 'effective_shut_element_material_specified_str' ,
-                'sealing_element_material' : 'effective_sealing_element_material_str' ,
-                'sealing_element_material_specified' : 'effective_sealing_element_material_specified_str' ,
-            }
-
-            # Применяем фильтры по эффективным значениям
-            for filter_field , getter_name in string_filters.items() :
-                if getattr(filters , filter_field , None) :
-                    filter_values = getattr(filters , filter_field)
-                    # Фильтруем в Python, так как эффективные значения вычисляются в коде
-                    filtered_ids = []
-                    for valve_line in queryset :
-                        effective_value = getattr(valve_line , getter_name , None)
-                        if effective_value and effective_value in filter_values :
-                            filtered_ids.append(valve_line.id)
-                    queryset = queryset.filter(id__in=filtered_ids)
-
-            # Числовые фильтры по эффективным значениям
-            if hasattr(filters , 'work_temp_min__gte') and filters.work_temp_min__gte is not None :
-                filtered_ids = [
-                    vl.id for vl in queryset
-                    if vl.effective_work_temp_min and vl.effective_work_temp_min >= filters.work_temp_min__gte
-                ]
-                queryset = queryset.filter(id__in=filtered_ids)
-
-            if hasattr(filters , 'work_temp_min__lte') and filters.work_temp_min__lte is not None :
-                filtered_ids = [
-                    vl.id for vl in queryset
-                    if vl.effective_work_temp_min and vl.effective_work_temp_min <= filters.work_temp_min__lte
-                ]
-                queryset = queryset.filter(id__in=filtered_ids)
-
-            if hasattr(filters , 'work_temp_max__gte') and filters.work_temp_max__gte is not None :
-                filtered_ids = [
-                    vl.id for vl in queryset
-                    if vl.effective_work_temp_max and vl.effective_work_temp_max >= filters.work_temp_max__gte
-                ]
-                queryset = queryset.filter(id__in=filtered_ids)
-
-            if hasattr(filters , 'work_temp_max__lte') and filters.work_temp_max__lte is not None :
-                filtered_ids = [
-                    vl.id for vl in queryset
-                    if vl.effective_work_temp_max and vl.effective_work_temp_max <= filters.work_temp_max__lte
-                ]
-                queryset = queryset.filter(id__in=filtered_ids)
-
-            # Точные фильтры по эффективным значениям
-            if filters.port_qty :
-                filtered_ids = [
-                    vl.id for vl in queryset
-                    if vl.effective_port_qty_str and vl.effective_port_qty_str == filters.port_qty
-                ]
-                queryset = queryset.filter(id__in=filtered_ids)
-
-            if filters.construction_variety :
-                filtered_ids = [
-                    vl.id for vl in queryset
-                    if
-                    vl.effective_construction_variety_str and vl.effective_construction_variety_str == filters.construction_variety
-                ]
-                queryset = queryset.filter(id__in=filtered_ids)
-
-            # Фильтр по DN через allowed_dn_table (используем эффективное значение)
-            if filters.allowed_dn :
-                filtered_ids = [
-                    vl.id for vl in queryset
-                    if vl.effective_allowed_dn_table_str and filters.allowed_dn in vl.effective_allowed_dn_table_str
-                ]
-                queryset = queryset.filter(id__in=filtered_ids)
-
-            # Поиск по названию и коду (используем эффективные значения)
-            if filters.search :
-                search_term = filters.search.lower()
-                filtered_ids = []
-                for valve_line in queryset :
-                    # Ищем в эффективных названиях и кодах
-                    if (valve_line.effective_name and search_term in valve_line.effective_name.lower()) or \
-                            (valve_line.effective_code and search_term in valve_line.effective_code.lower()) or \
-                            (
-                                    valve_line.effective_description and search_term in valve_line.effective_description.lower()) :
-                        filtered_ids.append(valve_line.id)
-                queryset = queryset.filter(id__in=filtered_ids)
-
-            # Фильтры по статусу (прямые поля модели)
-            if hasattr(filters , 'is_active') and filters.is_active is not None :
-                queryset = queryset.filter(is_active=filters.is_active)
-            if hasattr(filters , 'is_approved') and filters.is_approved is not None :
-                queryset = queryset.filter(is_approved=filters.is_approved)
-
-        # Пагинация
+            queryset = apply_valve_line_filters(queryset , filters)
+        return queryset
+
+    def resolve_valve_lines(self , info , filters=None , first=None , skip=None , **kwargs) :
+        queryset = ValveLineQuery._valve_lines_queryset(filters)
+
+        # Пагинация (в SQL, после фильтров); без first список ограничен MAX_PAGE_SIZE
         if skip :
+            if skip < 0 :
+                raise GraphQLError("Аргумент skip не может быть отрицательным")
             queryset = queryset[skip :]
-        if first :
-            queryset = queryset[:first]
+        return queryset[:CursorPaginator.page_size(first)]
 
-        return queryset
+    def resolve_valve_lines_page(self , info , filters=None , first=None , after=None , with_total_count=True) :
+        paginator = CursorPaginator(ValveLineQuery._valve_lines_queryset(filters) , ValveLineQuery.VALVE_LINES_PAGE_ORDERING)
+        return paginator.paginate(first , after , with_total_count)
 
     def resolve_valve_line(self , info , id) :
         return ValveLine.objects.get(id=id)
 
+    def resolve_valve_sizing_search(self , info , required_kv=None , flow=None , pressure_drop=None , density=1000.0 ,
+                                    dn_min=None , dn_max=None , pn=None , temperature=None , working_medium=None ,
+                                    min_resistance=2 , allow_unknown_resistance=True , max_angle=70.0 , best_per_line=True , first=None) :
+        from valve_data.services import ValveSizingIndex
+        if flow is not None and required_kv is None and not pressure_drop :
+            raise GraphQLError("Для подбора по расходу укажите pressureDrop больше 0")
+        try :
+            candidates = ValveSizingIndex.get_instance().search(
+                required_kv=required_kv , flow_m3h=flow , pressure_drop_bar=pressure_drop , density_kg_m3=density ,
+                dn_min=dn_min , dn_max=dn_max , pn=pn , temperature=temperature , working_medium=working_medium ,
+                min_resistance=min_resistance , allow_unknown_resistance=allow_unknown_resistance ,
+                max_angle=max_angle , best_per_line=best_per_line , limit=CursorPaginator.page_size(first))
+        except ValueError as e :
+            raise GraphQLError(str(e))
+
+        # Серии результатов - одним запросом
+        valve_lines = ValveLine.objects.select_related(*ValveLineResolved.select_related_paths()).in_bulk(
+            {candidate.valve_line_id for candidate in candidates})
+        for candidate in candidates :
+            candidate.valve_line = valve_lines.get(candidate.valve_line_id)
+        return candidates
+
 
 class Query(ValveLineQuery , graphene.ObjectType) :
     pass
\ No newline at end of file
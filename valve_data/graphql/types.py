@@ -5,8 +5,13 @@ from valve_data.models import ValveLineModelData , ValveLine
 from producers.graphql.types import ProducerNode , BrandsNode
 from params.graphql.types import ValveTypesNode , MeasureUnitsNode , StemSizeNode , MountingPlateTypesNode
 from typing import Optional
+from core.graphql import get_loaders , CursorPageInfo
 # Импортируем модель DnVariety
 from params.models import DnVariety
+from .loaders import (
+    with_resolved , load_body_colors_info , load_has_kv_data , load_has_dimension_data , load_has_required_data ,
+    load_model_data_line
+)
 
 class AllowedDnNode(DjangoObjectType) :
     class Meta :
@@ -85,87 +90,87 @@ class ValveLineNode(DjangoObjectType) :
     has_required_data = graphene.Boolean()
 
     def resolve_basic_info(self , info) :
-        return self.get_basic_info()
+        return with_resolved(info , self).get_basic_info()
 
     def resolve_technical_specs(self , info) :
-        return self.get_technical_specs()
+        return with_resolved(info , self).get_technical_specs()
 
     def resolve_temperature_info(self , info) :
-        return self.get_temperature_info()
+        return with_resolved(info , self).get_temperature_info()
 
     def resolve_body_colors_info(self , info) :
-        return self.get_body_colors_info()
+        return load_body_colors_info(info , self)
 
     def resolve_service_life_info(self , info) :
-        return self.get_service_life_info()
+        return with_resolved(info , self).get_service_life_info()
 
     # Резолверы для эффективных значений
     def resolve_effective_valve_producer(self , info) :
-        return self.effective_valve_producer_str
+        return with_resolved(info , self).effective_valve_producer_str
 
     def resolve_effective_valve_brand(self , info) :
-        return self.effective_valve_brand_str
+        return with_resolved(info , self).effective_valve_brand_str
 
     def resolve_effective_valve_variety(self , info) :
-        return self.effective_valve_variety_str
+        return with_resolved(info , self).effective_valve_variety_str
 
     def resolve_effective_valve_function(self , info) :
-        return self.effective_valve_function_str
+        return with_resolved(info , self).effective_valve_function_str
 
     def resolve_effective_valve_actuation(self , info) :
-        return self.effective_valve_actuation_str
+        return with_resolved(info , self).effective_valve_actuation_str
 
     def resolve_effective_valve_sealing_class(self , info) :
-        return self.effective_valve_sealing_class_str
+        return with_resolved(info , self).effective_valve_sealing_class_str
 
     def resolve_effective_body_material(self , info) :
-        return self.effective_body_material_str
+        return with_resolved(info , self).effective_body_material_str
 
     def resolve_effective_body_material_specified(self , info) :
-        return self.effective_body_material_specified_str
+        return with_resolved(info , self).effective_body_material_specified_str
 
     def resolve_effective_shut_element_material(self , info) :
-        return self.effective_shut_element_material_str
+        return with_resolved(info , self).effective_shut_element_material_str
 
     def resolve_effective_shut_element_material_specified(self , info) :
-        return self.effective_shut_element_material_specified_str
+        return with_resolved(info , self).effective_shut_element_material_specified_str
 
     def resolve_effective_sealing_element_material(self , info) :
-        return self.effective_sealing_element_material_str
+        return with_resolved(info , self).effective_sealing_element_material_str
 
     def resolve_effective_sealing_element_material_specified(self , info) :
-        return self.effective_sealing_element_material_specified_str
+        return with_resolved(info , self).effective_sealing_element_material_specified_str
 
     def resolve_effective_work_temp_min(self , info) :
-        return self.effective_work_temp_min
+        return with_resolved(info , self).effective_work_temp_min
 
     def resolve_effective_work_temp_max(self , info) :
-        return self.effective_work_temp_max
+        return with_resolved(info , self).effective_work_temp_max
 
     def resolve_effective_port_qty(self , info) :
-        return self.effective_port_qty_str
+        return with_resolved(info , self).effective_port_qty_str
 
     def resolve_effective_construction_variety(self , info) :
-        return self.effective_construction_variety_str
+        return with_resolved(info , self).effective_construction_variety_str
 
     def resolve_effective_allowed_dn_table(self , info) :
-        return self.effective_allowed_dn_table_str
+        return with_resolved(info , self).effective_allowed_dn_table_str
 
     # Резолверы для boolean properties
     def resolve_has_technical_data(self , info) :
-        return self.has_technical_data
+        return with_resolved(info , self).has_technical_data
 
     def resolve_has_options(self , info) :
-        return self.has_options
+        return bool(load_body_colors_info(info , self))
 
     def resolve_has_kv_data(self , info) :
-        return self.has_kv_data
+        return load_has_kv_data(info , self)
 
     def resolve_has_dimension_data(self , info) :
-        return self.has_dimension_data
+        return load_has_dimension_data(info , self)
 
     def resolve_has_required_data(self , info) :
-        return self.has_required_data
+        return load_has_required_data(info , self)
 
 
 class ValveLineFilterInput(graphene.InputObjectType) :
@@ -220,33 +225,35 @@ class ValveLineModelDataNode(DjangoObjectType) :
     valve_model_mounting_plate = graphene.List(MountingPlateTypesNode)
 
     def resolve_valve_model_model_line(self: ValveLineModelData , info) -> Optional[ValveLine] :
-        return self.valve_model_line
+        # У модели нет прямой ссылки на серию: серия находится по эффективной таблице данных
+        return load_model_data_line(info , self)
 
     def resolve_effective_valve_producer(self: ValveLineModelData , info) -> Optional :
         # Используем геттер из ValveLine
-        if self.valve_model_line :
-            return self.valve_model_line.effective_valve_producer
+        valve_line = load_model_data_line(info , self)
+        if valve_line :
+            return valve_line.effective_valve_producer
         return None
 
     def resolve_effective_valve_brand(self: ValveLineModelData , info) -> Optional :
         # Используем геттер из ValveLine
-        if self.valve_model_line :
-            return self.valve_model_line.effective_valve_brand
+        valve_line = load_model_data_line(info , self)
+        if valve_line :
+            return valve_line.effective_valve_brand
         return None
 
     def resolve_effective_valve_type(self: ValveLineModelData , info) -> Optional :
         # Используем геттер из ValveLine
-        if self.valve_model_line :
-            return self.valve_model_line.effective_valve_variety
+        valve_line = load_model_data_line(info , self)
+        if valve_line :
+            return valve_line.effective_valve_variety
         return None
 
     def resolve_valve_model_stem_size(self: ValveLineModelData , info) -> Optional :
-        return self.valve_model_stem_size
+        return get_loaders(info).foreign_key(ValveLineModelData , 'valve_model_stem_size').load(self)
 
     def resolve_valve_model_mounting_plate(self: ValveLineModelData , info) -> list :
-        if hasattr(self , 'valve_model_mounting_plate') :
-            return self.valve_model_mounting_plate.all()
-        return []
+        return get_loaders(info).related_list(ValveLineModelData , 'valve_model_mounting_plate').load(self)
 
 
 class PageInfo(graphene.ObjectType) :
@@ -259,4 +266,42 @@ class PageInfo(graphene.ObjectType) :
 class ValveModelDataResult(graphene.ObjectType) :
     items = graphene.List(ValveLineModelDataNode)
     total_count = graphene.Int()
-    page_info = graphene.Field(PageInfo)
\ No newline at end of file
+    page_info = graphene.Field(PageInfo)
+
+
+class ValveLinePage(graphene.ObjectType) :
+    """Страница серий при keyset-пагинации (valve_lines_page)"""
+    items = graphene.List(ValveLineNode)
+    page_info = graphene.Field(CursorPageInfo)
+
+
+class ValveSizingCandidateNode(graphene.ObjectType) :
+    """Модель арматуры, найденная подбором (valve_sizing_search)"""
+    valve_line = graphene.Field(ValveLineNode)
+    model_id = graphene.ID()
+    model_name = graphene.String()
+    dn = graphene.String()
+    pn = graphene.String()
+    dn_mm = graphene.Float()
+    pn_bar = graphene.Float()
+    kv_capacity = graphene.Float(description="Наибольший Kv при открытии не больше maxAngle, м3/ч")
+    opening_angle = graphene.Float(description="Угол открытия для требуемого Kv, градусов")
+    oversizing = graphene.Float(description="Запас по Kv: kvCapacity / requiredKv")
+    resistance = graphene.Int(description="Применимость материалов к рабочей среде: 1 - хотя бы один не применяется, "
+                                          "иначе наименьшая из указанных (0 - не указано)")
+    resistance_unknown = graphene.Boolean(description="Применимость указана не для всех материалов")
+    temp_min = graphene.Float()
+    temp_max = graphene.Float()
+
+    def resolve_dn(self , info) :
+        return self.dn.name
+
+    def resolve_pn(self , info) :
+        return self.pn.name if self.pn else None
+
+    def resolve_dn_mm(self , info) :
+        return self.dn.diameter_metric
+
+    def resolve_pn_bar(self , info) :
+        return self.pn.pressure_bar if self.pn else None
+
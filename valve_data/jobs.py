@@ -0,0 +1,99 @@
+# valve_data/jobs.py
+"""Фоновые задачи арматуры (core.services.JobQueue): импорт и выгрузка таблиц моделей и таблиц ВГХ"""
+import os
+from datetime import datetime
+
+from core.services import register_job
+
+
+@register_job('valve_data.rebuild_valve_line_resolved', 'Пересчет эффективных значений серий арматуры')
+def rebuild_valve_line_resolved(context):
+    """Пересчет ValveLineResolved порциями (как manage.py rebuild_valve_line_resolved). params: ids"""
+    from valve_data.models import ValveLine
+    from valve_data.services import ValveLineResolver
+
+    chunk_size = 200
+    ids = context.params.get('ids') or list(ValveLine.objects.order_by('pk').values_list('pk', flat=True))
+    count = 0
+    for start in range(0, len(ids), chunk_size):
+        context.progress(start, len(ids), f'Серии {start + 1}-{min(start + chunk_size, len(ids))} из {len(ids)}')
+        count += ValveLineResolver.refresh(ids[start:start + chunk_size], cascade=bool(context.params.get('ids')))
+    return {'refreshed': count}
+
+
+@register_job('valve_data.export_model_data', 'Выгрузка таблицы моделей арматуры в Excel')
+def export_model_data_table(context):
+    """Таблица моделей в Excel. params: valve_model_data_table_id"""
+    from core.services import StreamingExcelExport, iter_rows
+    from valve_data.models import ValveModelDataTable
+    from valve_data.utils.valve_line_data_table_import_export import (
+        MODEL_DATA_EXPORT_HEADERS, model_data_export_queryset, model_data_export_row,
+    )
+
+    table = ValveModelDataTable.objects.get(pk=context.params['valve_model_data_table_id'])
+    filename = f"valve_model_data_table_{table.code}.xlsx"
+    context.progress(0, message='Формирование файла', force=True)
+    export = StreamingExcelExport()
+    try:
+        count = export.add_sheet('Модели арматуры', MODEL_DATA_EXPORT_HEADERS,
+                                 iter_rows(model_data_export_queryset(valve_model_data_table=table),
+                                           model_data_export_row))
+        context.save_result_file(filename, export.close())
+    finally:
+        export.discard()
+    return {'file_name': filename, 'count': count}
+
+
+@register_job('valve_data.import_model_data', 'Импорт таблицы моделей арматуры')
+def import_model_data_table(context):
+    """
+    Применение подготовленного импорта таблицы моделей.
+    params: valve_model_data_table_id, import_id - лист в StagedImportStore (прочитан и сопоставлен
+    при загрузке файла, комбинации DN/PN для удаления - в его meta)
+    """
+    from core.services import StagedImportStore
+    from valve_data.models import ValveModelDataTable
+    from valve_data.services import ValveModelDataImporter
+
+    table_id = context.params['valve_model_data_table_id']
+    table = ValveModelDataTable.objects.get(pk=table_id)
+    staged = StagedImportStore.load(context.params['import_id'])
+    if staged is None or staged.meta.get('valve_model_data_table_id') != table_id:
+        raise ValueError("Подготовленный импорт устарел. Загрузите файл заново.")
+
+    context.progress(0, message='Запись моделей', force=True)
+    try:
+        status, message = ValveModelDataImporter(table).apply(staged.frame,
+                                                              staged.meta['combinations_to_delete'])
+    finally:
+        StagedImportStore.discard(staged.import_id)
+    return {'status': status, 'message': message, 'file_name': staged.meta.get('file_name')}
+
+
+@register_job('valve_data.export_dimensions', 'Выгрузка таблицы ВГХ в Excel')
+def export_dimension_table(context):
+    """Таблица ВГХ в Excel. params: dimension_table_id, dn_list, pn_list (необязательно)"""
+    from valve_data.models import ValveDimensionTable
+    from valve_data.services.dimension_services import DimensionDataService
+
+    table = ValveDimensionTable.objects.get(pk=context.params['dimension_table_id'])
+    filename = f"vgx_export_{table.code}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    context.progress(0, message='Формирование файла', force=True)
+    output_path = DimensionDataService.export_to_excel(
+        table, dn_list=context.params.get('dn_list') or None, pn_list=context.params.get('pn_list') or None,
+        output_path=context.temp_path(filename))
+    context.save_result_file(filename, output_path)
+    os.remove(output_path)
+    return {'file_name': filename}
+
+
+@register_job('valve_data.import_dimensions', 'Импорт таблицы ВГХ')
+def import_dimension_table(context):
+    """Импорт данных ВГХ из Excel с перезаписью (входной файл excel_file). params: dimension_table_id"""
+    from valve_data.models import ValveDimensionTable
+    from valve_data.services.dimension_services import DimensionDataService
+
+    table = ValveDimensionTable.objects.get(pk=context.params['dimension_table_id'])
+    context.progress(0, message='Импорт файла', force=True)
+    imported_count, errors = DimensionDataService.import_data_to_table(table, context.input_path('excel_file'))
+    return {'imported_count': imported_count, 'errors': errors}
@@ -0,0 +1,17 @@
+# management/commands/rebuild_valve_line_resolved.py
+from django.core.management.base import BaseCommand
+from django.utils.translation import gettext_lazy as _
+
+from valve_data.services import ValveLineResolver
+
+
+class Command(BaseCommand):
+    help = _('Пересчет материализованных эффективных значений серий арматуры (ValveLineResolved)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='ID серий (по умолчанию - все серии)')
+
+    def handle(self, *args, **options):
+        ids = options['ids'] or None
+        count = ValveLineResolver.refresh(ids)
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано серий: {count}'))
@@ -0,0 +1,146 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+MAX_RECURSION = 5  # как ValveLineResolver.MAX_RECURSION
+MAX_DEPTH = 10  # как ValveLineResolver.MAX_DEPTH
+STR_MAX_LENGTH = 255
+
+
+def _is_empty(value):
+    return value is None or (isinstance(value, str) and value.strip() == '')
+
+
+def _chain(pk, parents, length):
+    chain = []
+    current = pk
+    while current is not None and current in parents and len(chain) < length:
+        chain.append(current)
+        current = parents[current]
+    return chain
+
+
+def _display(obj):
+    """str() справочника: в исторических моделях нет __str__ моделей приложения"""
+    if obj._meta.model_name == 'valvevariety':
+        text = obj.text_description
+    else:
+        text = obj.name or (f"Material-{obj.pk}" if obj._meta.model_name == 'materialspecified' else '')
+    return str(text)[:STR_MAX_LENGTH]
+
+
+def fill_valve_line_resolved(apps, schema_editor):
+    """Первичный расчет эффективных значений существующих серий (правила ValveLineResolver)"""
+    ValveLine = apps.get_model('valve_data', 'ValveLine')
+    ValveLineResolved = apps.get_model('valve_data', 'ValveLineResolved')
+
+    fk_fields = [field for field in ValveLineResolved._meta.concrete_fields
+                 if field.is_relation and field.name != 'valve_line']
+    scalar_fields = [field.name for field in ValveLineResolved._meta.concrete_fields
+                     if not field.is_relation and field.name not in ('inheritance_depth', 'updated_at')
+                     and not field.name.endswith('_str')]
+    columns = scalar_fields + [field.attname for field in fk_fields]
+
+    values = {row['id']: row for row in ValveLine.objects.values('id', 'original_valve_line_id', *columns)}
+    parents = {pk: row['original_valve_line_id'] for pk, row in values.items()}
+
+    rows = []
+    for pk in values:
+        chain = [values[item] for item in _chain(pk, parents, MAX_RECURSION)]
+        row = {'valve_line_id': pk, 'inheritance_depth': len(_chain(pk, parents, MAX_DEPTH + 1)) - 1}
+        for column in columns:
+            row[column] = next((item[column] for item in chain if not _is_empty(item[column])), None)
+        rows.append(row)
+
+    for field in fk_fields:
+        ids = {row[field.attname] for row in rows if row[field.attname] is not None}
+        names = {pk: _display(obj) for pk, obj in field.related_model.objects.in_bulk(ids).items()}
+        for row in rows:
+            row[f"{field.name}_str"] = names.get(row[field.attname])
+
+    ValveLineResolved.objects.bulk_create([ValveLineResolved(**row) for row in rows], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materials', '0008_alter_materialgeneral_options_and_more'),
+        ('params', '0025_alter_pneumaticconnection_code'),
+        ('producers', '0002_brands_code_brands_description_brands_is_active_and_more'),
+        ('valve_data', '0063_delete_weightdimensionparameter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ValveLineResolved',
+            fields=[
+                ('valve_line', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resolved', serialize=False, to='valve_data.valveline', verbose_name='Серия')),
+                ('inheritance_depth', models.IntegerField(default=0, verbose_name='Глубина наследования')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Пересчитано')),
+                ('name', models.CharField(blank=True, db_index=True, max_length=100, null=True, verbose_name='Серия')),
+                ('code', models.CharField(blank=True, db_index=True, max_length=50, null=True, verbose_name='Код')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='Описание')),
+                ('features_text', models.TextField(blank=True, null=True, verbose_name='Особенности')),
+                ('application_text', models.TextField(blank=True, null=True, verbose_name='Где применяется')),
+                ('item_code_template', models.CharField(blank=True, max_length=100, null=True, verbose_name='Шаблон для артикула')),
+                ('work_temp_min', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Т раб мин, °С')),
+                ('work_temp_max', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Т раб макс, °С')),
+                ('temp_min', models.IntegerField(blank=True, null=True, verbose_name='Т мин, °С')),
+                ('temp_max', models.IntegerField(blank=True, null=True, verbose_name='Т макс, °С')),
+                ('warranty_period_min', models.IntegerField(blank=True, null=True, verbose_name='Гарантийный срок мин, мес')),
+                ('warranty_period_max', models.IntegerField(blank=True, null=True, verbose_name='Гарантийный срок не более, мес')),
+                ('valve_in_service_years', models.IntegerField(blank=True, null=True, verbose_name='Расчетный срок эксплуатации - не менее, лет')),
+                ('valve_in_service_years_comment', models.CharField(blank=True, max_length=500, null=True, verbose_name='Условие выработки срока эксплуатации')),
+                ('valve_in_service_cycles', models.IntegerField(blank=True, null=True, verbose_name='Расчетное количество циклов')),
+                ('valve_in_service_cycles_comment', models.CharField(blank=True, max_length=500, null=True, verbose_name='Условие выработки количества циклов')),
+                ('valve_producer_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Производитель (текст)')),
+                ('valve_brand_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Бренд (текст)')),
+                ('valve_variety_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Тип (текст)')),
+                ('valve_function_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Регулирующая/запорная (текст)')),
+                ('valve_actuation_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Управление (текст)')),
+                ('valve_sealing_class_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Класс герметичности (текст)')),
+                ('body_material_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Тип материала корпуса (текст)')),
+                ('body_material_specified_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Материал корпуса (текст)')),
+                ('shut_element_material_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Тип материала запорного элемента (текст)')),
+                ('shut_element_material_specified_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Материал запорного элемента (текст)')),
+                ('sealing_element_material_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Тип материала уплотнения (текст)')),
+                ('sealing_element_material_specified_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Материал уплотнения (текст)')),
+                ('option_variety_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Стандарт или опция (текст)')),
+                ('allowed_dn_table_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Допустимые Dn (текст)')),
+                ('port_qty_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Портов (текст)')),
+                ('construction_variety_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Конструкция (текст)')),
+                ('valve_model_data_table_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Шаблон таблицы данных (текст)')),
+                ('valve_model_kv_data_table_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Шаблон таблицы данных Kvs (текст)')),
+                ('pipe_connection_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Присоединение к трубе (текст)')),
+                ('warranty_period_min_variety_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Гарантийный срок мин описание (текст)')),
+                ('warranty_period_max_variety_str', models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Гарантийный срок не более, описание (текст)')),
+                ('allowed_dn_table', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='valve_data.alloweddntemplate', verbose_name='Допустимые Dn')),
+                ('body_material', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='materials.materialgeneral', verbose_name='Тип материала корпуса')),
+                ('body_material_specified', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='materials.materialspecified', verbose_name='Материал корпуса')),
+                ('construction_variety', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='valve_data.constructionvariety', verbose_name='Конструкция')),
+                ('option_variety', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='params.optionvariety', verbose_name='Стандарт или опция')),
+                ('pipe_connection', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='valve_data.valveconnectiontopipe', verbose_name='Присоединение к трубе')),
+                ('port_qty', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='valve_data.portqty', verbose_name='Портов')),
+                ('sealing_element_material', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='materials.materialgeneral', verbose_name='Тип материала уплотнения')),
+                ('sealing_element_material_specified', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='materials.materialspecified', verbose_name='Материал уплотнения')),
+                ('shut_element_material', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='materials.materialgeneral', verbose_name='Тип материала запорного элемента')),
+                ('shut_element_material_specified', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='materials.materialspecified', verbose_name='Материал запорного элемента')),
+                ('valve_actuation', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='params.valveactuationvariety', verbose_name='Управление')),
+                ('valve_brand', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='producers.brands', verbose_name='Бренд')),
+                ('valve_function', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='params.valvefunctionvariety', verbose_name='Регулирующая/запорная')),
+                ('valve_model_data_table', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='valve_data.valvemodeldatatable', verbose_name='Шаблон таблицы данных')),
+                ('valve_model_kv_data_table', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='valve_data.valvemodelkvdatatable', verbose_name='Шаблон таблицы данных Kvs')),
+                ('valve_producer', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='producers.producer', verbose_name='Производитель')),
+                ('valve_sealing_class', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='params.sealingclass', verbose_name='Класс герметичности')),
+                ('valve_variety', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='valve_data.valvevariety', verbose_name='Тип')),
+                ('warranty_period_max_variety', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='params.warrantytimeperiodvariety', verbose_name='Гарантийный срок не более, описание')),
+                ('warranty_period_min_variety', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='params.warrantytimeperiodvariety', verbose_name='Гарантийный срок мин описание')),
+            ],
+            options={
+                'verbose_name': 'Эффективные значения серии арматуры',
+                'verbose_name_plural': 'Эффективные значения серий арматуры',
+            },
+        ),
+        migrations.RunPython(fill_valve_line_resolved, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:01
+
+from django.db import migrations, models
+
+
+def fill_search_text(apps, schema_editor):
+    """Текст для поиска уже рассчитанных строк (как ValveLineResolver.search_text)"""
+    ValveLineResolved = apps.get_model('valve_data', 'ValveLineResolved')
+    objects = []
+    for obj in ValveLineResolved.objects.only('valve_line_id', 'name', 'code', 'description'):
+        obj.search_text = '\n'.join(str(value) for value in (obj.name, obj.code, obj.description) if value).lower()
+        objects.append(obj)
+    ValveLineResolved.objects.bulk_update(objects, ['search_text'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('valve_data', '0064_valvelineresolved'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='valvelineresolved',
+            name='search_text',
+            field=models.TextField(blank=True, default='', verbose_name='Текст для поиска'),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+    ]
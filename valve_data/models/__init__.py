@@ -17,6 +17,7 @@ from .dimensions.weight_dimension_parameter_variety import WeightDimensionParame
 
 # Потом импортируем ValveLine (теперь ValveDimensionTable уже загружен)
 from .valve_line import ValveLine
+from .valve_line_resolved import ValveLineResolved
 
 # from .drawing_models import DimensionTableDrawing
 __all__ = [
@@ -29,5 +30,6 @@ __all__ = [
     'DimensionTableParameter',
     'DimensionTableDrawingItem',
     'WeightDimensionParameterVariety',
-    'ValveLine'
+    'ValveLine',
+    'ValveLineResolved',
 ]
\ No newline at end of file
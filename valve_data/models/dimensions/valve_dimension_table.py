@@ -77,93 +77,41 @@ class ValveDimensionTable(models.Model):
             export: флаг экспортного формата
 
         Returns:
-            dict: структура с изображениями и матрицами данных
+            dict: структура с изображениями и матрицами данных.
+            Таблица компилируется один раз (DimensionMatrixCache), выборка DN/PN - срез
+            скомпилированной таблицы; кеш сбрасывается сигналами изменения данных ВГХ.
         """
         try :
-            logger.info(f"=== Начало get_dimension_data ===")
-            logger.info(f"Входные параметры: dn_list={dn_list}, pn_list={pn_list}, export={export}")
-            from valve_data.models import ValveDimensionData
+            from valve_data.services.dimension_matrix import DimensionMatrixCache
 
-            dn_objects = []
+            dn_objects = None
             dn_errors = []
-            pn_objects = []
+            pn_objects = None
             pn_errors = []
 
-            # Обрабатываем DN
+            # Обрабатываем DN (None - все DN, для которых есть данные таблицы)
             if dn_list is not None :
                 # Получаем объекты DN с помощью универсального геттера
                 dn_objects , dn_errors = DnVariety.get_dn_objects(dn_list)
                 # Логируем ошибки поиска DN
                 for error in dn_errors :
                     logger.warning(error)
-            else :
-                # Если dn_list=None, получаем все доступные DN для этой таблицы
-                logger.info("dn_list=None - получаем все доступные DN для таблицы")
-                unique_dns = ValveDimensionData.objects.filter(
-                    parameter__dimension_table=self
-                ).values_list('dn' , flat=True).distinct()
-                dn_objects = DnVariety.objects.filter(id__in=unique_dns)
-                logger.info(f"Получено всех доступных DN: {dn_objects.count()}")
-
-            # Обрабатываем PN
+                # СОРТИРУЕМ объекты по sorting_order
+                dn_objects = sorted(dn_objects , key=lambda x : x.sorting_order)
+
+            # Обрабатываем PN (None - все PN, для которых есть данные таблицы)
             if pn_list is not None :
-                # Получаем объекты PN с помощью универсального геттера
                 pn_objects , pn_errors = PnVariety.get_pn_objects(pn_list)
-                # Логируем ошибки поиска PN
                 for error in pn_errors :
                     logger.warning(error)
-            else :
-                # Если pn_list=None, получаем все доступные PN для этой таблицы
-                logger.info("pn_list=None - получаем все доступные PN для таблицы")
-                unique_pns = ValveDimensionData.objects.filter(
-                    parameter__dimension_table=self
-                ).values_list('pn' , flat=True).distinct()
-                pn_objects = PnVariety.objects.filter(id__in=unique_pns)
-                logger.info(f"Получено всех доступных PN: {pn_objects.count()}")
-
-            # СОРТИРУЕМ объекты по sorting_order
-            dn_objects = sorted(dn_objects , key=lambda x : x.sorting_order)
-            pn_objects = sorted(pn_objects , key=lambda x : x.sorting_order)
-
-            # Получаем все данные для текущей таблицы и фильтруем по DN/PN
-            all_data = ValveDimensionData.objects.filter(
-                parameter__dimension_table=self
-            )
-
-            if dn_objects :
-                all_data = all_data.filter(dn__in=dn_objects)
-            if pn_objects :
-                all_data = all_data.filter(pn__in=pn_objects)
-
-            logger.info(f"Фильтрация данных: DN={len(dn_objects)}, PN={len(pn_objects)}")
-            logger.info(f"Найдено записей ValveDimensionData: {all_data.count()}")
-
-            all_data = all_data.select_related(
-                'dn' , 'pn' , 'parameter' , 'parameter__parameter_variety'
-            ).order_by('parameter__sorting_order' , 'pn__sorting_order' , 'dn__sorting_order')
-
-            if not all_data.exists() :
-                logger.warning("Нет данных ValveDimensionData для указанных параметров")
-                return {
-                    'images' : [] ,
-                    'matrices' : [] ,
-                    'errors' : dn_errors + pn_errors  # Объединяем все ошибки
-                }
-
-            # Получаем изображения для запрошенных DN
-            images_data = self._get_images_for_dn_list(dn_objects , export)
+                pn_objects = sorted(pn_objects , key=lambda x : x.sorting_order)
 
-            # Группируем данные по PN для создания отдельных матриц
-            matrices = self._build_matrices(all_data , dn_objects , pn_objects , export)
+            result = DimensionMatrixCache.get_matrix(self.pk).render(dn_objects , pn_objects , export)
+            if not result['matrices'] and not result['images'] :
+                logger.debug("Нет данных ВГХ таблицы %s для DN=%s, PN=%s" , self.pk , dn_list , pn_list)
 
-            logger.info(f"=== Завершение get_dimension_data ===")
-            logger.info(f"Результат: {len(images_data)} изображений, {len(matrices)} матриц")
-
-            return {
-                'images' : images_data ,
-                'matrices' : matrices ,
-                'errors' : dn_errors + pn_errors  # Объединяем все ошибки
-            }
+            result['errors'] = dn_errors + pn_errors  # Объединяем все ошибки
+            return result
 
         except Exception as e :
             logger.error(f"Ошибка в универсальном геттере ВГХ: {e}")
@@ -173,177 +121,6 @@ class ValveDimensionTable(models.Model):
                 'errors' : [f"Системная ошибка: {str(e)}"]
             }
 
-    def _get_images_for_dn_list(self , dn_objects , export=False) :
-        """Получение изображений для списка DN"""
-        try :
-            logger.info(f"=== Поиск изображений по совпадению DN ===")
-            logger.info(f"Количество DN для поиска изображений: {len(dn_objects)}")
-            logger.info(f"DN список: {[dn.name for dn in dn_objects]}")
-
-            from valve_data.models import DimensionTableDrawingItem
-
-            # Получаем все связи с чертежами для этой таблицы
-            all_drawing_relations = DimensionTableDrawingItem.objects.filter(
-                dimension_table=self
-            ).select_related('drawing').prefetch_related('allowed_dn').order_by('display_order')
-
-            logger.info(f"Всего связей с чертежами для таблицы: {all_drawing_relations.count()}")
-
-            images_data = []
-            requested_dn_ids = {dn.id for dn in dn_objects}  # Множество ID запрошенных DN
-
-            logger.debug(f"ID запрошенных DN: {requested_dn_ids}")
-
-            for i , relation in enumerate(all_drawing_relations) :
-                # Получаем allowed_dn для этого изображения
-                allowed_dns = list(relation.allowed_dn.all())
-                allowed_dn_ids = {dn.id for dn in allowed_dns}
-
-                logger.debug(f"Изображение[{i}]: '{relation.drawing.title}'")
-                logger.debug(f"Allowed DN IDs: {allowed_dn_ids}")
-
-                # Проверяем, есть ли пересечение между allowed_dn и запрошенными dn
-                has_intersection = bool(requested_dn_ids & allowed_dn_ids)
-
-                if has_intersection :
-                    # Находим конкретные DN, которые совпадают
-                    matching_dns = [dn for dn in dn_objects if dn.id in allowed_dn_ids]
-                    matching_dn_names = [dn.name for dn in matching_dns]
-
-                    logger.debug(f"Совпадение найдено! Подходящие DN: {matching_dn_names}")
-
-                    image_info = {
-                        'drawing_title' : relation.drawing.title ,
-                        'drawing_description' : relation.description or relation.drawing.description ,
-                        'display_order' : relation.display_order ,
-                        'allowed_dns' : [dn.code if export else dn.name for dn in allowed_dns] ,
-                        'matching_dns' : [dn.code if export else dn.name for dn in matching_dns] ,
-                        'drawing_id' : relation.drawing.id
-                    }
-
-                    if not export :
-                        image_info['drawing_object'] = relation.drawing
-                        image_info['relation_object'] = relation
-                        image_info['allowed_dn_objects'] = allowed_dns
-                        image_info['matching_dn_objects'] = matching_dns
-
-                    images_data.append(image_info)
-                    logger.info(f"Добавлено изображение: '{relation.drawing.title}' для DN: {matching_dn_names}")
-                else :
-                    logger.debug(f"Изображение '{relation.drawing.title}' не подходит - нет совпадений по DN")
-
-            logger.info(f"Всего найдено изображений: {len(images_data)}")
-            return images_data
-
-        except Exception as e :
-            logger.error(f"Ошибка при получении изображений для списка DN: {e}")
-            return []
-
-    def _build_matrices(self , data_queryset , dn_objects , pn_objects , export=False) :
-        """Построение матриц данных с учетом переданных отсортированных DN и PN"""
-        logger.info(f"=== Построение матриц ===")
-        logger.info(f"Количество данных для обработки: {data_queryset.count()}")
-        logger.info(f"DN объектов: {len(dn_objects)}, PN объектов: {len(pn_objects)}")
-        logger.info(f"Режим export: {export}")
-
-        # Группируем данные по PN
-        data_by_pn = {}
-        for data in data_queryset :
-            pn_key = data.pn.code if export else data.pn.name
-            if pn_key not in data_by_pn :
-                data_by_pn[pn_key] = []
-            data_by_pn[pn_key].append(data)
-
-        logger.info(f"Сгруппировано по PN: {len(data_by_pn)} групп")
-
-        matrices = []
-
-        # Создаем списки ключей DN и PN в правильном порядке сортировки
-        sorted_dn_keys = [dn.code if export else dn.name for dn in dn_objects]
-        sorted_pn_keys = [pn.code if export else pn.name for pn in pn_objects]
-
-        # Итерируемся по PN в отсортированном порядке
-        for pn_key in sorted_pn_keys :
-            # Пропускаем PN, для которых нет данных
-            if pn_key not in data_by_pn :
-                logger.debug(f"Пропускаем PN {pn_key} - нет данных")
-                continue
-
-            pn_data = data_by_pn[pn_key]
-            logger.debug(f"Обработка PN: {pn_key}, количество записей: {len(pn_data)}")
-
-            # Группируем данные по параметрам и DN
-            param_dn_data = {}
-            unique_params = set()
-
-            for data in pn_data :
-                param_key = data.parameter.id
-                dn_key = data.dn.code if export else data.dn.name
-
-                unique_params.add(data.parameter)
-
-                if param_key not in param_dn_data :
-                    param_dn_data[param_key] = {}
-
-                param_dn_data[param_key][dn_key] = data.get_display_value()
-
-            # СОРТИРУЕМ параметры по sorting_order
-            sorted_params = sorted(unique_params , key=lambda x : x.sorting_order)
-
-            # Фильтруем DN ключи - оставляем только те, для которых есть данные
-            # и сохраняем порядок из sorted_dn_keys
-            available_dn_keys = [dn_key for dn_key in sorted_dn_keys
-                                 if any(dn_key in param_dn_data.get(param.id , {})
-                                        for param in sorted_params)]
-
-            logger.debug(f"Доступные DN ключи для PN {pn_key}: {available_dn_keys}")
-
-            # Создаем матрицу
-            matrix = []
-
-            # Заголовок строки в зависимости от режима
-            if export :
-                # Для экспорта: первая строка - DN коды
-                header_row = ['legend' , 'parame_name', 'parameter_variety_code' , pn_key] + available_dn_keys
-            else :
-                # Для обычного режима: первая строка - DN названия
-                header_row = ['legend' , 'parameter_variety_name'] + available_dn_keys
-
-            matrix.append(header_row)
-
-            # Заполняем данные параметров
-            for param in sorted_params :
-                row = []
-
-                if export :
-                    # Для экспорта
-                    row.extend([
-                        param.legend or '' ,
-                        param.name or '' ,
-                        param.parameter_variety.code if param.parameter_variety else '' ,
-                        pn_key
-                    ])
-                else :
-                    # Для обычного режима
-                    row.extend([
-                        param.legend or '' ,
-                        param.parameter_variety.name if param.parameter_variety else param.name or '' ,
-                    ])
-
-                # Добавляем значения для каждого DN (в отсортированном порядке)
-                for dn_key in available_dn_keys :
-                    value = param_dn_data.get(param.id , {}).get(dn_key , None)
-                    row.append(value)
-
-                matrix.append(row)
-
-            matrices.append({
-                'pn' : pn_key ,
-                'matrix' : matrix
-            })
-
-        logger.info(f"Всего построено матриц: {len(matrices)}")
-        return matrices
     # def _build_matrices(self , data_queryset , dn_objects , pn_objects , export=False) :
     #     """Построение матриц данных"""
     #     logger.info(f"=== Построение матриц ===")
@@ -333,24 +333,25 @@ class ValveLineDataGettersMixin(ValveLineInheritanceMixin):
             'body_color', 'option_variety'
         ).filter(is_available=True).order_by('option_variety__sorting_order', 'sorting_order')
 
-        colors_data = []
-        for color in body_colors:
-            color_info = {
-                'color_name': color.body_color.name,
-                'option_type': color.option_variety.name,
-                'additional_cost': float(color.additional_cost),
-                'lead_time_days': color.lead_time_days,
-                'option_code': color.option_code_template,
-                'hex_color': getattr(color.body_color, 'hex_code', '#CCCCCC'),
-                'source_comment': f"Цвет из текущей модели: {self.name}" if show_data_source else None
-            }
-            colors_data.append(color_info)
+        colors_data = [self._format_body_color(color, show_data_source) for color in body_colors]
 
         if not colors_data and self.original_valve_line:
             return self.original_valve_line.get_body_colors_info(show_data_source)
 
         return colors_data
 
+    def _format_body_color(self, color, show_data_source=False):
+        """Формирует описание цвета корпуса (ValveLineBodyColor с body_color и option_variety)"""
+        return {
+            'color_name': color.body_color.name,
+            'option_type': color.option_variety.name,
+            'additional_cost': float(color.additional_cost),
+            'lead_time_days': color.lead_time_days,
+            'option_code': color.option_code_template,
+            'hex_color': getattr(color.body_color, 'hex_code', '#CCCCCC'),
+            'source_comment': f"Цвет из текущей модели: {self.name}" if show_data_source else None
+        }
+
     def get_descriptions_info(self, show_data_source=False):
         """Получает описания с учетом наследования"""
         fields = [
@@ -1,4 +1,6 @@
-from django.core.exceptions import ValidationError
+from django.core.exceptions import ValidationError, ObjectDoesNotExist
+
+_NOT_RESOLVED = object()
 
 
 class ValveLineInheritanceMixin:
@@ -6,8 +8,14 @@ class ValveLineInheritanceMixin:
 
     def get_field_value_with_fallback(self, field_name, show_data_source=False, recursion_level=0, max_recursion=5):
         """
-        Рекурсивно получает значение поля с учетом original_valve_line
+        Рекурсивно получает значение поля с учетом original_valve_line.
+        Унаследованные значения берутся из ValveLineResolved, если строка уже рассчитана.
         """
+        if not show_data_source and recursion_level == 0:
+            resolved_value = self._get_resolved_value(field_name)
+            if resolved_value is not _NOT_RESOLVED:
+                return resolved_value
+
         if recursion_level >= max_recursion:
             if show_data_source:
                 return {
@@ -58,6 +66,41 @@ class ValveLineInheritanceMixin:
             }
         return None
 
+    def _get_resolved_value(self, field_name):
+        """
+        Значение из материализованной таблицы ValveLineResolved.
+        Собственное значение серии всегда читается из самой серии (в т.ч. несохраненное);
+        для ссылочных полей используется уже загруженный через select_related объект с тем же id.
+        """
+        from valve_data.models.valve_line_resolved import ValveLineResolved
+
+        if field_name not in ValveLineResolved.FIELDS or not self.pk:
+            return _NOT_RESOLVED
+        is_fk = field_name in ValveLineResolved.FK_FIELDS
+        own_value = getattr(self, f"{field_name}_id" if is_fk else field_name)
+
+        if not self._is_value_empty(own_value):
+            if is_fk and type(self).resolved.related.is_cached(self):
+                resolved = self.resolved
+                field = ValveLineResolved._meta.get_field(field_name)
+                if resolved is not None and field.is_cached(resolved) and field.value_from_object(resolved) == own_value:
+                    return getattr(resolved, field_name)
+            return _NOT_RESOLVED
+
+        if not self.original_valve_line_id:
+            return _NOT_RESOLVED
+        try:
+            resolved = self.resolved
+        except ObjectDoesNotExist:
+            return _NOT_RESOLVED
+        if resolved is None:
+            return _NOT_RESOLVED
+        try:
+            return getattr(resolved, field_name)
+        except ObjectDoesNotExist:
+            # Ссылочный объект удален, строка еще не пересчитана - рекурсивный обход
+            return _NOT_RESOLVED
+
     def _is_value_empty(self, value):
         """Проверяет, является ли значение пустым"""
         if value is None:
@@ -109,48 +109,42 @@ class ValveLineKvDataMixin:
         }
 
     def get_kv_by_dn_pn_angle(self, dn, pn, angle):
-        """Получает значение Kv по DN, PN и углу открытия с учетом наследования"""
-        from ..valve_line_model_kv_data import ValveLineModelKvData
-
-        kv_data_table = self.effective_valve_model_kv_data_table
-        if not kv_data_table:
+        """
+        Получает значение Kv по DN, PN и углу открытия с учетом наследования.
+        Между углами таблицы Kv интерполируется (скомпилированная таблица KvCurveCache).
+        """
+        curve = self._get_kv_curve(dn, pn)
+        if curve is None:
             return None
 
-        try:
-            kv_data = ValveLineModelKvData.objects.filter(
-                valve_model_kv_data_table=kv_data_table,
-                valve_model_dn__name=dn,
-                valve_model_pn__name=pn,
-                valve_model_openinig_angle=angle
-            ).select_related('valve_model_dn', 'valve_model_pn').first()
-
-            if kv_data:
-                return self._format_kv_data_row(kv_data)
-            return None
-        except ValveLineModelKvData.DoesNotExist:
+        kv_value = curve.kv_at(angle)
+        if kv_value is None:
             return None
+        return {
+            'dn': dn or "",
+            'pn': pn or "",
+            'opening_angle': float(angle),
+            'kv_value': kv_value,
+        }
+
+    def get_opening_angle_by_dn_pn_kv(self, dn, pn, kv_value):
+        """Наименьший угол открытия, при котором DN/PN дает требуемый Kv (None - не достигается)"""
+        curve = self._get_kv_curve(dn, pn)
+        return curve.angle_for_kv(kv_value) if curve is not None else None
 
     def get_kv_curve_by_dn_pn(self, dn, pn):
         """Получает кривую Kv (значения по углам) для конкретной DN/PN комбинации"""
-        from ..valve_line_model_kv_data import ValveLineModelKvData
+        curve = self._get_kv_curve(dn, pn)
+        return curve.as_points() if curve is not None else []
 
+    def _get_kv_curve(self, dn, pn):
+        """Кривая Kv эффективной таблицы по названиям DN/PN или None"""
         kv_data_table = self.effective_valve_model_kv_data_table
         if not kv_data_table:
-            return []
+            return None
 
-        kv_data_queryset = ValveLineModelKvData.objects.filter(
-            valve_model_kv_data_table=kv_data_table,
-            valve_model_dn__name=dn,
-            valve_model_pn__name=pn
-        ).select_related('valve_model_dn', 'valve_model_pn').order_by('valve_model_openinig_angle')
-
-        return [
-            {
-                'angle': float(data.valve_model_openinig_angle) if data.valve_model_openinig_angle else 0,
-                'kv_value': float(data.valve_model_kv) if data.valve_model_kv else 0,
-            }
-            for data in kv_data_queryset
-        ]
+        from valve_data.services import KvCurveCache
+        return KvCurveCache.get_table(kv_data_table.pk).curve(dn, pn)
 
     def get_all_kv_combinations(self):
         """Возвращает все доступные комбинации DN/PN с Kv данными"""
@@ -158,7 +152,7 @@ class ValveLineKvDataMixin:
         if not kv_data_table:
             return []
 
-        from ..valve_line_model_kv_data import ValveLineModelKvData
+        from ..base_models import ValveLineModelKvData
         combinations = ValveLineModelKvData.objects.filter(
             valve_model_kv_data_table=kv_data_table
         ).values_list(
@@ -0,0 +1,133 @@
+# valve_data/models/valve_line_resolved.py
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+def _resolved_fk(to, verbose_name):
+    """Ссылка на эффективное значение: без ограничения в БД, без обратной связи"""
+    return models.ForeignKey(to, blank=True, null=True, on_delete=models.DO_NOTHING, db_constraint=False,
+                             related_name='+', verbose_name=verbose_name)
+
+
+def _resolved_str(verbose_name):
+    """Строковое представление эффективного значения (для фильтров в SQL)"""
+    return models.CharField(max_length=255, blank=True, null=True, db_index=True, verbose_name=verbose_name)
+
+
+class ValveLineResolved(models.Model):
+    """
+    Материализованные эффективные значения серии арматуры.
+
+    Одна строка на ValveLine: значения полей с учетом цепочки original_valve_line
+    (как ValveLineInheritanceMixin.get_field_value_with_fallback). Для ссылочных полей хранится
+    ссылка на эффективный объект и его строковое представление (<поле>_str).
+    Пересчитывается ValveLineResolver при сохранении серии и каскадно для ее наследников.
+    """
+    SCALAR_FIELDS = (
+        'name', 'code', 'description', 'features_text', 'application_text', 'item_code_template',
+        'work_temp_min', 'work_temp_max', 'temp_min', 'temp_max',
+        'warranty_period_min', 'warranty_period_max',
+        'valve_in_service_years', 'valve_in_service_years_comment',
+        'valve_in_service_cycles', 'valve_in_service_cycles_comment',
+    )
+    FK_FIELDS = (
+        'valve_producer', 'valve_brand', 'valve_variety', 'valve_function', 'valve_actuation',
+        'valve_sealing_class', 'body_material', 'body_material_specified',
+        'shut_element_material', 'shut_element_material_specified',
+        'sealing_element_material', 'sealing_element_material_specified',
+        'option_variety', 'allowed_dn_table', 'port_qty', 'construction_variety',
+        'valve_model_data_table', 'valve_model_kv_data_table', 'pipe_connection',
+        'warranty_period_min_variety', 'warranty_period_max_variety',
+    )
+    FIELDS = SCALAR_FIELDS + FK_FIELDS
+
+    valve_line = models.OneToOneField('valve_data.ValveLine', on_delete=models.CASCADE, primary_key=True,
+                                      related_name='resolved', verbose_name=_("Серия"))
+    inheritance_depth = models.IntegerField(default=0, verbose_name=_("Глубина наследования"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Пересчитано"))
+    # Название, код и описание в нижнем регистре - поиск без учета регистра (в т.ч. кириллицы в SQLite)
+    search_text = models.TextField(blank=True, default='', verbose_name=_("Текст для поиска"))
+
+    # Простые поля
+    name = models.CharField(max_length=100, blank=True, null=True, db_index=True, verbose_name=_("Серия"))
+    code = models.CharField(max_length=50, blank=True, null=True, db_index=True, verbose_name=_("Код"))
+    description = models.TextField(blank=True, null=True, verbose_name=_("Описание"))
+    features_text = models.TextField(blank=True, null=True, verbose_name=_("Особенности"))
+    application_text = models.TextField(blank=True, null=True, verbose_name=_("Где применяется"))
+    item_code_template = models.CharField(max_length=100, blank=True, null=True,
+                                          verbose_name=_("Шаблон для артикула"))
+    work_temp_min = models.IntegerField(null=True, blank=True, db_index=True, verbose_name=_('Т раб мин, °С'))
+    work_temp_max = models.IntegerField(null=True, blank=True, db_index=True, verbose_name=_('Т раб макс, °С'))
+    temp_min = models.IntegerField(null=True, blank=True, verbose_name=_("Т мин, °С"))
+    temp_max = models.IntegerField(null=True, blank=True, verbose_name=_("Т макс, °С"))
+    warranty_period_min = models.IntegerField(null=True, blank=True, verbose_name=_("Гарантийный срок мин, мес"))
+    warranty_period_max = models.IntegerField(null=True, blank=True,
+                                              verbose_name=_("Гарантийный срок не более, мес"))
+    valve_in_service_years = models.IntegerField(null=True, blank=True,
+                                                 verbose_name=_("Расчетный срок эксплуатации - не менее, лет"))
+    valve_in_service_years_comment = models.CharField(max_length=500, blank=True, null=True,
+                                                      verbose_name=_("Условие выработки срока эксплуатации"))
+    valve_in_service_cycles = models.IntegerField(null=True, blank=True,
+                                                  verbose_name=_("Расчетное количество циклов"))
+    valve_in_service_cycles_comment = models.CharField(max_length=500, blank=True, null=True,
+                                                       verbose_name=_("Условие выработки количества циклов"))
+
+    # Ссылочные поля
+    valve_producer = _resolved_fk('producers.Producer', _("Производитель"))
+    valve_brand = _resolved_fk('producers.Brands', _("Бренд"))
+    valve_variety = _resolved_fk('valve_data.ValveVariety', _("Тип"))
+    valve_function = _resolved_fk('params.ValveFunctionVariety', _("Регулирующая/запорная"))
+    valve_actuation = _resolved_fk('params.ValveActuationVariety', _('Управление'))
+    valve_sealing_class = _resolved_fk('params.SealingClass', _("Класс герметичности"))
+    body_material = _resolved_fk('materials.MaterialGeneral', _('Тип материала корпуса'))
+    body_material_specified = _resolved_fk('materials.MaterialSpecified', _('Материал корпуса'))
+    shut_element_material = _resolved_fk('materials.MaterialGeneral', _('Тип материала запорного элемента'))
+    shut_element_material_specified = _resolved_fk('materials.MaterialSpecified', _('Материал запорного элемента'))
+    sealing_element_material = _resolved_fk('materials.MaterialGeneral', _("Тип материала уплотнения"))
+    sealing_element_material_specified = _resolved_fk('materials.MaterialSpecified', _("Материал уплотнения"))
+    option_variety = _resolved_fk('params.OptionVariety', _("Стандарт или опция"))
+    allowed_dn_table = _resolved_fk('valve_data.AllowedDnTemplate', _("Допустимые Dn"))
+    port_qty = _resolved_fk('valve_data.PortQty', _("Портов"))
+    construction_variety = _resolved_fk('valve_data.ConstructionVariety', _("Конструкция"))
+    valve_model_data_table = _resolved_fk('valve_data.ValveModelDataTable', _('Шаблон таблицы данных'))
+    valve_model_kv_data_table = _resolved_fk('valve_data.ValveModelKvDataTable', _('Шаблон таблицы данных Kvs'))
+    pipe_connection = _resolved_fk('valve_data.ValveConnectionToPipe', _("Присоединение к трубе"))
+    warranty_period_min_variety = _resolved_fk('params.WarrantyTimePeriodVariety',
+                                               _("Гарантийный срок мин описание"))
+    warranty_period_max_variety = _resolved_fk('params.WarrantyTimePeriodVariety',
+                                               _("Гарантийный срок не более, описание"))
+
+    # Строковые представления ссылочных полей
+    valve_producer_str = _resolved_str(_("Производитель (текст)"))
+    valve_brand_str = _resolved_str(_("Бренд (текст)"))
+    valve_variety_str = _resolved_str(_("Тип (текст)"))
+    valve_function_str = _resolved_str(_("Регулирующая/запорная (текст)"))
+    valve_actuation_str = _resolved_str(_("Управление (текст)"))
+    valve_sealing_class_str = _resolved_str(_("Класс герметичности (текст)"))
+    body_material_str = _resolved_str(_("Тип материала корпуса (текст)"))
+    body_material_specified_str = _resolved_str(_("Материал корпуса (текст)"))
+    shut_element_material_str = _resolved_str(_("Тип материала запорного элемента (текст)"))
+    shut_element_material_specified_str = _resolved_str(_("Материал запорного элемента (текст)"))
+    sealing_element_material_str = _resolved_str(_("Тип материала уплотнения (текст)"))
+    sealing_element_material_specified_str = _resolved_str(_("Материал уплотнения (текст)"))
+    option_variety_str = _resolved_str(_("Стандарт или опция (текст)"))
+    allowed_dn_table_str = _resolved_str(_("Допустимые Dn (текст)"))
+    port_qty_str = _resolved_str(_("Портов (текст)"))
+    construction_variety_str = _resolved_str(_("Конструкция (текст)"))
+    valve_model_data_table_str = _resolved_str(_("Шаблон таблицы данных (текст)"))
+    valve_model_kv_data_table_str = _resolved_str(_("Шаблон таблицы данных Kvs (текст)"))
+    pipe_connection_str = _resolved_str(_("Присоединение к трубе (текст)"))
+    warranty_period_min_variety_str = _resolved_str(_("Гарантийный срок мин описание (текст)"))
+    warranty_period_max_variety_str = _resolved_str(_("Гарантийный срок не более, описание (текст)"))
+
+    class Meta:
+        verbose_name = _("Эффективные значения серии арматуры")
+        verbose_name_plural = _("Эффективные значения серий арматуры")
+
+    def __str__(self):
+        return f"{self.name or self.valve_line_id} (эффективные значения)"
+
+    @classmethod
+    def select_related_paths(cls, prefix='resolved'):
+        """Пути для select_related, чтобы effective_* ссылочные поля читались без запросов"""
+        return [prefix] + [f"{prefix}__{field}" for field in cls.FK_FIELDS]
@@ -1,5 +1,26 @@
 from .valve_line_service import ValveLineDataService
+from .valve_line_resolver import ValveLineResolver
+from .dimension_matrix import DimensionMatrix, DimensionMatrixCache
+from .bulk_import import ReferenceMap, read_import_sheet
+from .model_data_import import ValveModelDataImporter
+from .kv_curves import KvCurve, KvCurveTable, KvCurveCache, KvSizing, KvSizingResult
+from .valve_sizing import ValveSizingIndex, ValveSizingCandidate
+from .mounting_compatibility import MountingCompatibilityIndex
 
 __all__ = [
     'ValveLineDataService',
+    'ValveLineResolver',
+    'DimensionMatrix',
+    'DimensionMatrixCache',
+    'ReferenceMap',
+    'read_import_sheet',
+    'ValveModelDataImporter',
+    'KvCurve',
+    'KvCurveTable',
+    'KvCurveCache',
+    'KvSizing',
+    'KvSizingResult',
+    'ValveSizingIndex',
+    'ValveSizingCandidate',
+    'MountingCompatibilityIndex',
 ]
\ No newline at end of file
@@ -0,0 +1,84 @@
+# valve_data/services/bulk_import.py
+import logging
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Порядок поиска DN/PN при импорте моделей арматуры: код -> числовое значение -> название
+MODEL_DATA_DN_LOOKUPS = (('code', str), ('diameter_metric', float), ('name', str))
+MODEL_DATA_PN_LOOKUPS = (('code', str), ('pressure_bar', float), ('name', str))
+
+
+def read_import_sheet(excel_file, **kwargs) -> pd.DataFrame:
+    """
+    Прочитать лист Excel для импорта один раз.
+
+    Используется python-calamine (в разы быстрее openpyxl); если файл им не читается,
+    повторяем чтение движком pandas по умолчанию.
+    """
+    try:
+        return pd.read_excel(excel_file, engine='calamine', **kwargs)
+    except Exception as e:
+        logger.debug("calamine не прочитал файл (%s), читаем движком по умолчанию", e)
+        if hasattr(excel_file, 'seek'):
+            excel_file.seek(0)
+        return pd.read_excel(excel_file, **kwargs)
+
+
+def is_empty_cell(value) -> bool:
+    """Пустая ячейка DataFrame (NaN/None)"""
+    return value is None or (not isinstance(value, (list, tuple)) and bool(pd.isna(value)))
+
+
+class ReferenceMap:
+    """
+    Справочник в памяти для сопоставления значений ячеек с объектами.
+
+    Объекты загружаются одним запросом; lookups - поля поиска в порядке приоритета вида
+    (поле, преобразование), преобразование применяется и к значению поля, и к тексту ячейки
+    (ValueError/TypeError - поле пропускается). При совпадении у нескольких объектов
+    используется первый по порядку выборки.
+
+        dn_map = ReferenceMap.for_model(DnVariety, MODEL_DATA_DN_LOOKUPS, is_active=True)
+        df['dn'] = dn_map.resolve_series(df['DN'])
+    """
+
+    def __init__(self, objects, lookups: Sequence[Tuple[str, Callable[[Any], Any]]]):
+        self.lookups = tuple(lookups)
+        self._indexes: Dict[str, Dict[Any, Any]] = {field: {} for field, _ in self.lookups}
+        for obj in objects:
+            for field, convert in self.lookups:
+                key = self._key(convert, getattr(obj, field, None))
+                if key is not None:
+                    self._indexes[field].setdefault(key, obj)
+
+    @classmethod
+    def for_model(cls, model, lookups, **filters) -> 'ReferenceMap':
+        return cls(model.objects.filter(**filters).order_by('sorting_order', 'id'), lookups)
+
+    @staticmethod
+    def _key(convert, value):
+        if value is None:
+            return None
+        try:
+            return convert(value)
+        except (ValueError, TypeError, ArithmeticError):
+            return None
+
+    def resolve(self, value) -> Optional[Any]:
+        """Объект по значению ячейки или None"""
+        if is_empty_cell(value):
+            return None
+        text = str(value).strip()
+        for field, convert in self.lookups:
+            key = self._key(convert, text)
+            if key is not None and key in self._indexes[field]:
+                return self._indexes[field][key]
+        return None
+
+    def resolve_series(self, series: pd.Series) -> pd.Series:
+        """Сопоставить столбец целиком: каждое уникальное значение ищется один раз"""
+        mapping = {value: self.resolve(value) for value in series.dropna().unique()}
+        return series.map(lambda value: mapping.get(value) if not is_empty_cell(value) else None)
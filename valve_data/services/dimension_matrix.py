@@ -0,0 +1,300 @@
+# valve_data/services/dimension_matrix.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DimensionMatrix:
+    """
+    Скомпилированная таблица ВГХ.
+
+    values[parameter, pn, dn] - отображаемое значение (ValveDimensionData.get_display_value)
+    present[parameter, pn, dn] - значение задано в таблице
+    parameters - параметры таблицы по sorting_order, dns/pns - DnVariety/PnVariety, для которых
+    есть данные, по sorting_order; drawings - связи с чертежами по display_order.
+    """
+
+    def __init__(self, table_id, parameters, dns, pns, values, present, drawings):
+        self.table_id = table_id
+        self.parameters = parameters
+        self.dns = dns
+        self.pns = pns
+        self.values = values
+        self.present = present
+        self.drawings = drawings
+        self.dn_index = {dn.id: i for i, dn in enumerate(dns)}
+        self.pn_index = {pn.id: i for i, pn in enumerate(pns)}
+
+    @classmethod
+    def build(cls, table_id) -> 'DimensionMatrix':
+        """Построить таблицу ВГХ фиксированным числом запросов"""
+        from params.models import DnVariety, PnVariety
+        from valve_data.models import DimensionTableDrawingItem, DimensionTableParameter, ValveDimensionData
+
+        rows = list(ValveDimensionData.objects.filter(parameter__dimension_table_id=table_id).order_by(
+            'parameter__sorting_order', 'pn__sorting_order', 'dn__sorting_order', 'id'
+        ).values_list('parameter_id', 'pn_id', 'dn_id', 'value', 'text_value'))
+
+        parameters = [
+            {
+                'id': param.id,
+                'name': param.name,
+                'legend': param.legend,
+                'sorting_order': param.sorting_order,
+                'has_variety': param.parameter_variety is not None,
+                'variety_name': param.parameter_variety.name if param.parameter_variety else None,
+                'variety_code': param.parameter_variety.code if param.parameter_variety else None,
+            }
+            for param in DimensionTableParameter.objects.filter(dimension_table_id=table_id).select_related(
+                'parameter_variety').order_by('sorting_order', 'id')
+        ]
+        dns = sorted(DnVariety.objects.filter(id__in={row[2] for row in rows}), key=lambda dn: dn.sorting_order)
+        pns = sorted(PnVariety.objects.filter(id__in={row[1] for row in rows}), key=lambda pn: pn.sorting_order)
+
+        parameter_index = {param['id']: i for i, param in enumerate(parameters)}
+        pn_index = {pn.id: i for i, pn in enumerate(pns)}
+        dn_index = {dn.id: i for i, dn in enumerate(dns)}
+        shape = (len(parameters), len(pns), len(dns))
+        values = np.full(shape, None, dtype=object)
+        present = np.zeros(shape, dtype=bool)
+        for parameter_id, pn_id, dn_id, value, text_value in rows:
+            position = (parameter_index[parameter_id], pn_index[pn_id], dn_index[dn_id])
+            # Как ValveDimensionData.get_display_value; при повторах остается последняя запись
+            values[position] = text_value if value is None else value
+            present[position] = True
+
+        drawings = []
+        for relation in DimensionTableDrawingItem.objects.filter(dimension_table_id=table_id).select_related(
+                'drawing').prefetch_related('allowed_dn').order_by('display_order'):
+            allowed_dns = list(relation.allowed_dn.all())
+            drawings.append({
+                'relation': relation,
+                'allowed_dns': allowed_dns,
+                'allowed_dn_ids': {dn.id for dn in allowed_dns},
+            })
+
+        return cls(table_id, parameters, dns, pns, values, present, drawings)
+
+    def render(self, dn_objects=None, pn_objects=None, export=False) -> Dict[str, List]:
+        """
+        Изображения и матрицы в формате ValveDimensionTable.get_dimension_data.
+
+        dn_objects/pn_objects - отсортированные DnVariety/PnVariety; None - все с данными таблицы.
+        Пустой список не ограничивает данные (как в исходном геттере), но столбцы матриц
+        и изображения строятся только по переданным DN.
+        """
+        if dn_objects is None:
+            dn_objects = self.dns
+        if pn_objects is None:
+            pn_objects = self.pns
+
+        dn_mask = self._mask(self.dn_index, dn_objects, len(self.dns))
+        pn_mask = self._mask(self.pn_index, pn_objects, len(self.pns))
+        if not self.present[:, pn_mask][:, :, dn_mask].any():
+            return {'images': [], 'matrices': []}
+
+        return {
+            'images': self._render_images(dn_objects, export),
+            'matrices': self._render_matrices(dn_objects, pn_objects, dn_mask, export),
+        }
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    @staticmethod
+    def _mask(index, objects, size):
+        if not objects:
+            return np.ones(size, dtype=bool)
+        mask = np.zeros(size, dtype=bool)
+        for obj in objects:
+            position = index.get(obj.id)
+            if position is not None:
+                mask[position] = True
+        return mask
+
+    def _render_images(self, dn_objects, export):
+        requested_dn_ids = {dn.id for dn in dn_objects}
+        images = []
+        for item in self.drawings:
+            if not requested_dn_ids & item['allowed_dn_ids']:
+                continue
+            relation = item['relation']
+            matching_dns = [dn for dn in dn_objects if dn.id in item['allowed_dn_ids']]
+            image_info = {
+                'drawing_title': relation.drawing.title,
+                'drawing_description': relation.description or relation.drawing.description,
+                'display_order': relation.display_order,
+                'allowed_dns': [dn.code if export else dn.name for dn in item['allowed_dns']],
+                'matching_dns': [dn.code if export else dn.name for dn in matching_dns],
+                'drawing_id': relation.drawing.id
+            }
+            if not export:
+                image_info['drawing_object'] = relation.drawing
+                image_info['relation_object'] = relation
+                image_info['allowed_dn_objects'] = list(item['allowed_dns'])
+                image_info['matching_dn_objects'] = matching_dns
+            images.append(image_info)
+        return images
+
+    def _render_matrices(self, dn_objects, pn_objects, dn_mask, export):
+        matrices = []
+        for pn in pn_objects:
+            p = self.pn_index.get(pn.id)
+            if p is None:
+                continue
+            # Параметры, для которых есть данные в выбранных DN этого PN
+            param_rows = np.flatnonzero(self.present[:, p, :][:, dn_mask].any(axis=1))
+            if not len(param_rows):
+                continue
+            pn_key = pn.code if export else pn.name
+
+            columns = []
+            for dn in dn_objects:
+                d = self.dn_index.get(dn.id)
+                if d is not None and self.present[param_rows, p, d].any():
+                    columns.append((dn.code if export else dn.name, d))
+
+            if export:
+                matrix = [['legend', 'parame_name', 'parameter_variety_code', pn_key] + [key for key, _ in columns]]
+            else:
+                matrix = [['legend', 'parameter_variety_name'] + [key for key, _ in columns]]
+
+            for i in param_rows:
+                param = self.parameters[i]
+                if export:
+                    row = [param['legend'] or '', param['name'] or '',
+                           param['variety_code'] if param['has_variety'] else '', pn_key]
+                else:
+                    row = [param['legend'] or '',
+                           param['variety_name'] if param['has_variety'] else param['name'] or '']
+                row.extend(self.values[i, p, d] if self.present[i, p, d] else None for _, d in columns)
+                matrix.append(row)
+
+            matrices.append({'pn': pn_key, 'matrix': matrix})
+        return matrices
+
+
+class DimensionMatrixCache:
+    """
+    Кеш скомпилированных таблиц ВГХ для ValveDimensionTable.get_dimension_data.
+
+    Два уровня:
+        LRU в памяти процесса - DimensionMatrix по таблице
+        общий кеш Django (необязательно) - settings.DIMENSION_MATRIX_CACHE_ALIAS, например 'default'
+    Таблица сбрасывается сигналами при изменении данных, параметров и чертежей
+    (valve_data/signals.py), справочники DN/PN/параметров/медиабиблиотеки сбрасывают все таблицы.
+    В общем кеше вместо удаления ключей увеличивается версия таблицы, поэтому старые записи
+    других процессов перестают использоваться; запись LRU помнит версию, с которой построена,
+    и при ее изменении не используется. Без общего кеша записи LRU живут не дольше
+    CACHE_TTL_SECONDS (сигналы доходят только до процесса, изменившего данные).
+    """
+    MAX_SIZE = 128
+    SHARED_TIMEOUT = 60 * 60
+    CACHE_TTL_SECONDS = 300  # страховка для других процессов, которые не получили сигнал
+
+    _matrices = OrderedDict()
+    _parameter_tables: Dict[int, int] = {}
+    _lock = threading.Lock()
+
+    # ==================== ПУБЛИЧНЫЕ МЕТОДЫ ====================
+
+    @classmethod
+    def get_matrix(cls, table_id) -> DimensionMatrix:
+        """Скомпилированная таблица: LRU процесса -> общий кеш -> БД"""
+        shared = cls._shared_cache()
+        shared_key = cls._shared_key(shared, table_id) if shared is not None else None
+        matrix = cls._lru_get(table_id, shared_key)
+        if matrix is not None:
+            return matrix
+
+        if shared_key:
+            matrix = shared.get(shared_key)
+        if matrix is None:
+            matrix = DimensionMatrix.build(table_id)
+            logger.debug("Скомпилирована таблица ВГХ %s: %s", table_id, matrix.values.shape)
+            if shared_key:
+                shared.set(shared_key, matrix, cls.SHARED_TIMEOUT)
+
+        cls._lru_put(table_id, matrix, shared_key)
+        return matrix
+
+    @classmethod
+    def invalidate(cls, table_id=None):
+        """Сбросить таблицу (или все таблицы, если не указана)"""
+        with cls._lock:
+            if table_id is None:
+                cls._matrices.clear()
+                cls._parameter_tables.clear()
+            else:
+                cls._matrices.pop(table_id, None)
+
+        shared = cls._shared_cache()
+        if shared is not None:
+            version_key = cls._version_key(table_id)
+            try:
+                shared.incr(version_key)
+            except ValueError:
+                shared.set(version_key, 1, None)
+
+    @classmethod
+    def invalidate_parameter(cls, parameter_id):
+        """Сбросить таблицу, которой принадлежит параметр"""
+        with cls._lock:
+            table_id = cls._parameter_tables.get(parameter_id)
+        if table_id is None:
+            from valve_data.models import DimensionTableParameter
+            table_id = DimensionTableParameter.objects.filter(pk=parameter_id).values_list(
+                'dimension_table_id', flat=True).first()
+        if table_id is not None:
+            cls.invalidate(table_id)
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    @classmethod
+    def _lru_get(cls, key, version) -> Optional[DimensionMatrix]:
+        """Таблица из LRU, если она построена с той же версией и не старше CACHE_TTL_SECONDS"""
+        with cls._lock:
+            entry = cls._matrices.get(key)
+            if entry is None:
+                return None
+            matrix, entry_version, stored_at = entry
+            if entry_version != version or time.monotonic() - stored_at >= cls.CACHE_TTL_SECONDS:
+                del cls._matrices[key]
+                return None
+            cls._matrices.move_to_end(key)
+            return matrix
+
+    @classmethod
+    def _lru_put(cls, key, matrix: DimensionMatrix, version):
+        with cls._lock:
+            cls._matrices[key] = (matrix, version, time.monotonic())
+            cls._matrices.move_to_end(key)
+            # Параметр -> таблица: сигналы строк данных сбрасывают таблицу без запроса к БД
+            for param in matrix.parameters:
+                cls._parameter_tables[param['id']] = key
+            while len(cls._matrices) > cls.MAX_SIZE:
+                cls._matrices.popitem(last=False)
+
+    @staticmethod
+    def _shared_cache():
+        alias = getattr(settings, 'DIMENSION_MATRIX_CACHE_ALIAS', None)
+        if not alias:
+            return None
+        from django.core.cache import caches
+        return caches[alias]
+
+    @staticmethod
+    def _version_key(table_id):
+        return f"dimension_matrix:version:{table_id if table_id is not None else 'all'}"
+
+    @classmethod
+    def _shared_key(cls, shared, table_id):
+        versions = shared.get_many([cls._version_key(None), cls._version_key(table_id)])
+        return "dimension_matrix:{}:{}:{}".format(
+            table_id, versions.get(cls._version_key(None), 0), versions.get(cls._version_key(table_id), 0))
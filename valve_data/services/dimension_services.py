@@ -2,8 +2,10 @@
 from django.db import transaction
 import pandas as pd
 import logging
-from openpyxl import Workbook
-from openpyxl.styles import Font , PatternFill
+
+from core.services import StreamingExcelExport
+from params.services import DnVarietyIndex , PnVarietyIndex
+from .bulk_import import read_import_sheet
 
 logger = logging.getLogger(__name__)
 
@@ -69,140 +71,65 @@ class DimensionDataService :
             dimension_table: ValveDimensionTable instance
             dn_list: список DN для экспорта
             pn_list: список PN для экспорта
-            output_path: путь для сохранения файла
+            output_path: путь для сохранения файла (None - временный файл)
 
         Returns:
             str: путь к созданному файлу
         """
-        try :
-            # Получаем данные в экспортном формате (с кодами)
-            result = dimension_table.get_dimension_data(dn_list , pn_list , export=True)
-
-            if not result['matrices'] :
-                raise ValueError("Нет данных для экспорта")
-
-            # Создаем workbook
-            wb = Workbook()
-
-            # Стили для заголовков
-            header_font = Font(bold=True , color="FFFFFF")
-            header_fill = PatternFill(start_color="366092" , end_color="366092" , fill_type="solid")
-
-            # Создаем основной лист с данными
-            ws = wb.active
-            ws.title = "Данные ВГХ"
-
-            # Заголовки для экспорта
-            headers = [
-                'Обнозначение на схеме' ,
-                'Код параметра' ,
-                'PN код' ,
-                'PN название'
-            ]
-
-            # Добавляем DN коды в заголовки
-            if result['matrices'] :
-                first_matrix = result['matrices'][0]['matrix']
-                if first_matrix and len(first_matrix) > 0 :
-                    # Пропускаем первые 4 колонки (legend, text_value, parameter_variety_code, pn)
-                    dn_headers = first_matrix[0][4 :]
-                    headers.extend(dn_headers)
-
-            # Записываем заголовки
-            for col_idx , header in enumerate(headers , 1) :
-                cell = ws.cell(row=1 , column=col_idx , value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-
-            # Записываем данные
-            row_idx = 2
+        # Получаем данные в экспортном формате (с кодами)
+        result = dimension_table.get_dimension_data(dn_list , pn_list , export=True)
+
+        if not result['matrices'] :
+            raise ValueError("Нет данных для экспорта")
+
+        # Заголовки для экспорта; DN коды - из первой матрицы (после legend, name, parameter_variety_code, pn)
+        headers = [
+            'Обнозначение на схеме' ,
+            'Код параметра' ,
+            'PN код' ,
+            'PN название'
+        ] + list(result['matrices'][0]['matrix'][0][4 :])
+
+        def data_rows() :
             for matrix_data in result['matrices'] :
-                matrix = matrix_data['matrix']
                 pn_code = matrix_data['pn']
-
-                # Пропускаем строку заголовков матрицы и обрабатываем данные
-                for row in matrix[1 :] :  # Пропускаем первую строку (заголовки)
-                    logger.info(f"row_idx:{row_idx} row:{row}")
+                # Пропускаем строку заголовков матрицы
+                for row in matrix_data['matrix'][1 :] :
                     if len(row) >= 4 :  # Минимум 4 колонки должно быть
-                        # Формируем строку для экспорта
-                        import_row = [
-                            row[0] ,  # legend -
-                            row[1] ,  # PARAM_NAME - название параметра
-                            row[2] ,  # parameter_variety_code - код параметра
-                            pn_code ,  # PN код
-
-                        ]
-
-                        # Добавляем значения DN
-                        import_row.extend(row[4 :])  # Значения DN
-
-                        # Записываем строку
-                        for col_idx , value in enumerate(import_row , 1) :
-                            ws.cell(row=row_idx , column=col_idx , value=value)
-
-                        row_idx += 1
-
-            # Создаем лист со справочниками
-            ws_ref = wb.create_sheet(title="Справочники")
-
-            # Заголовки справочников
-            ref_headers = ['Тип' , 'Код' , 'Название' , 'Описание']
-            for col_idx , header in enumerate(ref_headers , 1) :
-                cell = ws_ref.cell(row=1 , column=col_idx , value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-
-            # Заполняем справочник DN
-            row_idx = 2
-            dns = DnVariety.objects.filter(is_active=True).order_by('sorting_order')
-            for dn in dns :
-                ws_ref.cell(row=row_idx , column=1 , value='DN')
-                ws_ref.cell(row=row_idx , column=2 , value=dn.code)
-                ws_ref.cell(row=row_idx , column=3 , value=dn.name)
-                ws_ref.cell(row=row_idx , column=4 , value=dn.description or '')
-                row_idx += 1
-
-            # Заполняем справочник PN
-            pns = PnVariety.objects.filter(is_active=True).order_by('sorting_order')
-            for pn in pns :
-                ws_ref.cell(row=row_idx , column=1 , value='PN')
-                ws_ref.cell(row=row_idx , column=2 , value=pn.code)
-                ws_ref.cell(row=row_idx , column=3 , value=pn.name)
-                ws_ref.cell(row=row_idx , column=4 , value=pn.description or '')
-                row_idx += 1
-
-            # Авто-ширина колонок для всех листов
-            for ws in wb.worksheets :
-                for column in ws.columns :
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column :
-                        try :
-                            if len(str(cell.value)) > max_length :
-                                max_length = len(str(cell.value))
-                        except :
-                            pass
-                    adjusted_width = min((max_length + 2) , 50)
-                    ws.column_dimensions[column_letter].width = adjusted_width
-
-            # Сохраняем файл
-            if output_path is None :
-                output_path = f"dimension_export_{dimension_table.code}.xlsx"
+                        # legend, название параметра, код параметра, PN код, значения DN
+                        yield [row[0] , row[1] , row[2] , pn_code] + list(row[4 :])
 
-            wb.save(output_path)
-            logger.info("Успешно экспортировано данных в: %s" , output_path)
-            return output_path
+        def reference_rows() :
+            for label , model in (('DN' , DnVariety) , ('PN' , PnVariety)) :
+                for code , name , description in model.objects.filter(is_active=True).order_by(
+                        'sorting_order').values_list('code' , 'name' , 'description').iterator() :
+                    yield [label , code , name , description or '']
 
+        # Строки пишутся потоково (xlsxwriter constant_memory), по умолчанию - во временный файл
+        export = StreamingExcelExport(output_path)
+        try :
+            export.add_sheet("Данные ВГХ" , headers , data_rows() , styled_header=True)
+            export.add_sheet("Справочники" , ['Тип' , 'Код' , 'Название' , 'Описание'] , reference_rows() ,
+                             styled_header=True)
+            output_path = export.close()
         except Exception as e :
+            export.discard()
             logger.error("Ошибка при экспорте в Excel: %s" , str(e))
             raise
 
+        logger.info("Успешно экспортировано данных в: %s" , output_path)
+        return output_path
+
     @staticmethod
     @transaction.atomic
     def import_data_to_table(dimension_table , excel_file_path) :
         """
         Импорт данных ВГХ из Excel файла с полной перезаписью существующих данных
 
+        Файл читается один раз, DN/PN/параметры сопоставляются в памяти (индексы справочников -
+        как DnVariety.find_dn/PnVariety.find_pn), при отсутствии ошибок параметры и данные
+        записываются пакетно.
+
         Args:
             dimension_table: ValveDimensionTable instance
             excel_file_path: путь к файлу Excel
@@ -211,26 +138,44 @@ class DimensionDataService :
             tuple: (количество импортированных записей, список ошибок)
         """
         try :
-            df = pd.read_excel(excel_file_path)
+            df = read_import_sheet(excel_file_path)
         except Exception as e :
             return 0 , [f"Ошибка чтения файла: {str(e)}"]
 
         imported_count = 0
         errors = []
 
-        # ВРЕМЕННОЕ ХРАНИЛИЩЕ ДЛЯ НОВЫХ ДАННЫХ
+        # Справочники DN/PN - индексы в памяти, параметры таблицы - по одному запросу
+        dn_map = DnVarietyIndex.get_instance()
+        pn_map = PnVarietyIndex.get_instance()
+        varieties = {}
+        for variety in WeightDimensionParameterVariety.objects.filter(is_active=True).order_by('id') :
+            varieties.setdefault(variety.code , variety)
+        table_parameters = {}
+        for table_param in DimensionTableParameter.objects.filter(dimension_table=dimension_table).select_related(
+                'parameter_variety').order_by('id') :
+            table_parameters.setdefault(table_param.name , []).append(table_param)
+        parameters_count = sum(len(params) for params in table_parameters.values())
+
+        # Столбцы DN начиная с 5-го (после PN названия); заголовки общие для всех строк - ищем DN один раз
+        dn_columns = []
+        for col_index in range(4 , len(df.columns)) :
+            col_header = str(df.columns[col_index])
+            # Пустой заголовок - конец таблицы
+            if not col_header or col_header.strip() == '' :
+                break
+            dn_columns.append((col_index , col_header , dn_map.resolve(col_header)))
+
+        # ВРЕМЕННОЕ ХРАНИЛИЩЕ: параметры таблицы (существующие и новые) и значения по имени параметра
+        planned_parameters = {}
         new_data_records = []
 
-        # Используем enumerate для получения номера строки
-        for row_index , (index , row) in enumerate(df.iterrows() , start=2) :
+        for row_index , row in enumerate(df.itertuples(index=False , name=None) , start=2) :
             try :
-                # Получаем данные из фиксированных столбцов
-                # Первый столбец - название параметра
-                param_name = row.iloc[0] if len(row) > 0 else None
-                # Второй столбец - код параметра
-                param_code = row.iloc[1] if len(row) > 1 else None
-                # Третий столбец - PN код
-                pn_code = row.iloc[2] if len(row) > 2 else None
+                # Первый столбец - название параметра, второй - код параметра, третий - PN код
+                param_name = row[0] if len(row) > 0 else None
+                param_code = row[1] if len(row) > 1 else None
+                pn_code = row[2] if len(row) > 2 else None
 
                 # Проверяем обязательные поля
                 if not param_name or pd.isna(param_name) :
@@ -241,61 +186,48 @@ class DimensionDataService :
                     errors.append(f"Строка {row_index}: отсутствует PN код")
                     continue
 
-                # Ищем параметр по коду используя геттер из модели
+                # Системный параметр по коду
                 param_variety = None
                 if param_code and pd.notna(param_code) :
-                    try :
-                        param_variety = WeightDimensionParameterVariety.objects.get(
-                            code=param_code , is_active=True
-                        )
-                    except WeightDimensionParameterVariety.DoesNotExist :
+                    param_variety = varieties.get(str(param_code))
+                    if param_variety is None :
                         errors.append(f"Строка {row_index}: параметр с кодом '{param_code}' не найден")
                         continue
 
-                # Создаем или получаем параметр таблицы
-                table_param , created = DimensionTableParameter.objects.get_or_create(
-                    dimension_table=dimension_table ,
-                    name=param_name ,
-                    defaults={
-                        'parameter_variety' : param_variety ,
-                        'sorting_order' : DimensionTableParameter.objects.filter(
-                            dimension_table=dimension_table
-                        ).count() + 1
-                    }
-                )
-
-                # Если параметр уже существует, обновляем связь с системным параметром
-                if not created and param_variety and not table_param.parameter_variety :
+                # Параметр таблицы по названию: существующий или новый (создается при записи)
+                param_key = str(param_name)
+                existing_params = table_parameters.get(param_key , [])
+                if len(existing_params) > 1 :
+                    errors.append(f"Строка {row_index}: ошибка обработки - get() returned more than one "
+                                  f"DimensionTableParameter -- it returned {len(existing_params)}!")
+                    continue
+                table_param = planned_parameters.get(param_key)
+                if table_param is None :
+                    if existing_params :
+                        table_param = existing_params[0]
+                    else :
+                        parameters_count += 1
+                        table_param = DimensionTableParameter(
+                            dimension_table=dimension_table , name=param_key ,
+                            parameter_variety=param_variety , sorting_order=parameters_count
+                        )
+                    planned_parameters[param_key] = table_param
+                # Обновляем связь с системным параметром, если ее не было
+                if param_variety and not table_param.parameter_variety :
                     table_param.parameter_variety = param_variety
-                    table_param.save()
 
-                # Ищем PN используя геттер из модели
-                pn = PnVariety.find_pn(str(pn_code))
+                pn = pn_map.resolve(pn_code)
                 if not pn :
                     errors.append(f"Строка {row_index}: PN '{pn_code}' не найден")
                     continue
 
-                # Обрабатываем значения DN начиная с 4-го столбца
-                for col_index in range(4 , len(row)) :  # Начинаем с 4-го столбца (после PN названия)
-                    # Получаем заголовок столбца из первой строки DataFrame
-                    if col_index >= len(df.columns) :
-                        break
-
-                    col_header = str(df.columns[col_index])
-
-                    # Пропускаем пустые заголовки
-                    if not col_header or pd.isna(col_header) or col_header.strip() == '' :
-                        break
-
-                    # Получаем значение из текущей строки
-                    value = row.iloc[col_index] if col_index < len(row) else None
-
-                    # Ищем DN используя геттер из модели
-                    dn = DnVariety.find_dn(col_header)
+                for col_index , col_header , dn in dn_columns :
                     if not dn :
                         errors.append(f"Строка {row_index}: DN '{col_header}' не найден")
                         continue
 
+                    value = row[col_index]
+
                     # Обрабатываем значение
                     num_value = None
                     text_val = ""
@@ -308,44 +240,47 @@ class DimensionDataService :
                             # Если не число, сохраняем как текст
                             text_val = str(value) if value is not None else ""
 
-                    # СОЗДАЕМ ОБЪЕКТ ДЛЯ ВРЕМЕННОГО ХРАНЕНИЯ
-                    new_data_records.append(ValveDimensionData(
-                        dn=dn ,
-                        pn=pn ,
-                        parameter=table_param ,
-                        value=num_value ,
-                        text_value=text_val
-                    ))
-
+                    new_data_records.append((param_key , dn , pn , num_value , text_val))
                     imported_count += 1
-                    logger.debug("Подготовлена запись: %s, %s, %s" , dn.code , pn.code , param_name)
 
             except Exception as e :
                 errors.append(f"Строка {row_index}: ошибка обработки - {str(e)}")
                 logger.error("Ошибка в строке %d: %s" , row_index , str(e))
                 continue
 
-        # УДАЛЯЕМ СТАРЫЕ ДАННЫЕ ТОЛЬКО ЕСЛИ ЕСТЬ НОВЫЕ ДАННЫЕ
-        if new_data_records and not errors :
-            table_parameters = DimensionTableParameter.objects.filter(
-                dimension_table=dimension_table
-            )
-
-            # Удаляем данные измерений
-            deleted_count , _ = ValveDimensionData.objects.filter(
-                parameter__in=table_parameters
-            ).delete()
-
-            logger.info("Удалено существующих записей: %d" , deleted_count)
-
-            # СОЗДАЕМ НОВЫЕ ДАННЫЕ
-            ValveDimensionData.objects.bulk_create(new_data_records)
-            logger.info("Создано новых записей: %d" , len(new_data_records))
-
-        elif errors :
+        if errors :
             logger.warning("Импорт отменен из-за ошибок. Ошибок: %d" , len(errors))
             imported_count = 0  # Сбрасываем счетчик, так как данные не были сохранены
 
+        else :
+            # Параметры: новые - bulk_create, существующие - новая связь с системным параметром
+            existing_parameters = [param for param in planned_parameters.values() if param.pk is not None]
+            DimensionTableParameter.objects.bulk_create(
+                [param for param in planned_parameters.values() if param.pk is None])
+            DimensionTableParameter.objects.bulk_update(existing_parameters , ['parameter_variety'])
+
+            # УДАЛЯЕМ СТАРЫЕ ДАННЫЕ ТОЛЬКО ЕСЛИ ЕСТЬ НОВЫЕ ДАННЫЕ
+            if new_data_records :
+                deleted_count , _ = ValveDimensionData.objects.filter(
+                    parameter__dimension_table=dimension_table
+                ).delete()
+                logger.info("Удалено существующих записей: %d" , deleted_count)
+
+                # СОЗДАЕМ НОВЫЕ ДАННЫЕ
+                ValveDimensionData.objects.bulk_create([
+                    ValveDimensionData(dn=dn , pn=pn , parameter=planned_parameters[param_key] ,
+                                       value=num_value , text_value=text_val)
+                    for param_key , dn , pn , num_value , text_val in new_data_records
+                ] , batch_size=1000)
+                logger.info("Создано новых записей: %d" , len(new_data_records))
+
+            # bulk-операции не отправляют сигналы - сбрасываем скомпилированную таблицу и кеш GraphQL явно
+            from core.graphql import GraphQLResponseCache
+            from .dimension_matrix import DimensionMatrixCache
+            DimensionMatrixCache.invalidate(dimension_table.pk)
+            if GraphQLResponseCache.is_enabled() :
+                GraphQLResponseCache.invalidate('valve_data')
+
         logger.info("Импорт завершен. Импортировано записей: %d, ошибок: %d" ,
                     imported_count , len(errors))
         return imported_count , errors
@@ -354,24 +289,14 @@ class DimensionDataService :
     def create_empty_template(dimension_table , output_path=None) :
         """
         Создать пустой шаблон Excel для заполнения данных ВГХ
+
+        Returns:
+            str: путь к созданному файлу (None в output_path - временный файл)
         """
         # Получаем все системные параметры
         parameters = WeightDimensionParameterVariety.objects.filter(
             is_active=True
-        ).order_by('name')
-
-        # Получаем все PN и DN
-        pns = PnVariety.objects.all().order_by('sorting_order')
-        dns = DnVariety.objects.all().order_by('sorting_order')
-
-        # Создаем workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Шаблон ВГХ"
-
-        # Стили для заголовков
-        header_font = Font(bold=True , color="FFFFFF")
-        header_fill = PatternFill(start_color="366092" , end_color="366092" , fill_type="solid")
+        ).order_by('name').values_list('name' , 'code')
 
         # Заголовки для импорта
         headers = [
@@ -379,43 +304,17 @@ class DimensionDataService :
                       'Код параметра' ,
                       'PN код' ,
                       'PN название'
-                  ] + [f'DN{dn.code}' for dn in dns]
-
-        for col , header in enumerate(headers , 1) :
-            cell = ws.cell(row=1 , column=col , value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-
-        # Заполняем данными
-        row_num = 2
-
-        # Заполняем параметры
-        for param in parameters :
-            # Название параметра
-            ws.cell(row=row_num , column=1 , value=param.name)
-            # Код параметра
-            ws.cell(row=row_num , column=2 , value=param.code)
-            row_num += 1
-
-        # Авто-ширина колонок
-        for column in ws.columns :
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column :
-                try :
-                    if len(str(cell.value)) > max_length :
-                        max_length = len(str(cell.value))
-                except :
-                    pass
-            adjusted_width = (max_length + 2)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        # Сохраняем файл
-        if output_path is None :
-            output_path = f"dimension_template_{dimension_table.code}.xlsx"
-
-        wb.save(output_path)
-        return output_path
+                  ] + [f'DN{code}' for code in DnVariety.objects.order_by('sorting_order').values_list('code' , flat=True)]
+
+        export = StreamingExcelExport(output_path)
+        try :
+            # Строки параметров: название и код, остальное заполняется пользователем
+            export.add_sheet("Шаблон ВГХ" , headers , (list(param) for param in parameters.iterator()) ,
+                             styled_header=True)
+            return export.close()
+        except Exception :
+            export.discard()
+            raise
 
     @staticmethod
     @transaction.atomic
@@ -0,0 +1,314 @@
+# valve_data/services/kv_curves.py
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class KvCurve:
+    """
+    Кривая Kv одной комбинации DN/PN: angles - углы открытия по возрастанию, kvs - Kv, м3/ч.
+
+    Между заданными углами Kv интерполируется линейно, за пределами таблицы не экстраполируется.
+    Обратная задача (угол для требуемого Kv) решается по монотонной огибающей кривой.
+    """
+
+    def __init__(self, dn, pn, angles, kvs):
+        self.dn = dn
+        self.pn = pn
+        self.angles = np.asarray(angles, dtype=float)
+        self.kvs = np.asarray(kvs, dtype=float)
+        # Максимальный Kv, достижимый при открытии не больше угла angles[i]
+        self.envelope = np.maximum.accumulate(self.kvs)
+
+    def kv_at(self, angle) -> Optional[float]:
+        """Kv при угле открытия angle или None (угол вне таблицы)"""
+        angle = float(angle)
+        if not len(self.angles) or angle < self.angles[0] or angle > self.angles[-1]:
+            return None
+        return float(np.interp(angle, self.angles, self.kvs))
+
+    def capacity(self, max_angle) -> Optional[float]:
+        """Наибольший Kv при открытии не больше max_angle (None - угол меньше начала таблицы)"""
+        max_angle = float(max_angle)
+        if not len(self.angles) or max_angle < self.angles[0]:
+            return None
+        return float(np.interp(min(max_angle, self.angles[-1]), self.angles, self.envelope))
+
+    def angle_for_kv(self, kv) -> Optional[float]:
+        """
+        Наименьший угол открытия, при котором достигается Kv, или None (Kv больше максимального).
+        Если Kv достигается уже в начале таблицы, возвращается первый угол таблицы.
+        """
+        kv = float(kv)
+        if not len(self.angles) or kv > self.envelope[-1]:
+            return None
+        position = int(np.searchsorted(self.envelope, kv, side='left'))
+        if position == 0:
+            return float(self.angles[0])
+        kv_before, kv_after = self.envelope[position - 1], self.envelope[position]
+        angle_before, angle_after = self.angles[position - 1], self.angles[position]
+        return float(angle_before + (kv - kv_before) * (angle_after - angle_before) / (kv_after - kv_before))
+
+    def as_points(self) -> List[Dict[str, float]]:
+        """Точки кривой в формате ValveLineKvDataMixin.get_kv_curve_by_dn_pn"""
+        return [{'angle': float(angle), 'kv_value': float(kv)} for angle, kv in zip(self.angles, self.kvs)]
+
+
+class KvCurveTable:
+    """
+    Скомпилированная таблица Kv (ValveModelKvDataTable).
+
+    curves - кривые по DN (sorting_order, диаметр), затем PN (sorting_order; без PN - первыми);
+    grid - объединение углов всех кривых, grid_kvs[curve, angle] - Kv кривой в узлах grid
+    (NaN вне диапазона кривой). Узлы grid включают узлы каждой кривой, поэтому линейная
+    интерполяция по grid совпадает с интерполяцией каждой кривой - Kv всех кривых при
+    заданном угле считается одной векторной операцией.
+    """
+
+    def __init__(self, table_id, curves: Sequence[KvCurve]):
+        self.table_id = table_id
+        self.curves = list(curves)
+        self.dn_ids = np.array([curve.dn.id for curve in self.curves], dtype=np.int64)
+        self._by_names = {}
+        self._by_ids = {}
+        for curve in self.curves:
+            self._by_names.setdefault((curve.dn.name, curve.pn.name if curve.pn else None), curve)
+            self._by_ids[(curve.dn.id, curve.pn.id if curve.pn else None)] = curve
+
+        self.grid = np.unique(np.concatenate([curve.angles for curve in self.curves])) \
+            if self.curves else np.empty(0)
+        self.grid_kvs = np.full((len(self.curves), len(self.grid)), np.nan)
+        for i, curve in enumerate(self.curves):
+            inside = (self.grid >= curve.angles[0]) & (self.grid <= curve.angles[-1])
+            self.grid_kvs[i, inside] = np.interp(self.grid[inside], curve.angles, curve.kvs)
+        self._capacities: Dict[float, np.ndarray] = {}
+
+    @classmethod
+    def build(cls, table_id) -> 'KvCurveTable':
+        """Построить таблицу тремя запросами"""
+        from params.models import DnVariety, PnVariety
+        from valve_data.models import ValveLineModelKvData
+
+        rows = list(ValveLineModelKvData.objects.filter(
+            valve_model_kv_data_table_id=table_id, valve_model_dn__isnull=False
+        ).order_by('id').values_list('valve_model_dn_id', 'valve_model_pn_id',
+                                     'valve_model_openinig_angle', 'valve_model_kv'))
+        dns = DnVariety.objects.in_bulk({row[0] for row in rows})
+        pns = PnVariety.objects.in_bulk({row[1] for row in rows if row[1] is not None})
+
+        points = defaultdict(dict)
+        for dn_id, pn_id, angle, kv in rows:
+            # Пустые угол/Kv - 0, как в ValveLineKvDataMixin; при повторе угла остается последняя запись
+            points[(dn_id, pn_id)][float(angle or 0)] = float(kv or 0)
+
+        curves = []
+        for (dn_id, pn_id), angle_kvs in points.items():
+            angles = sorted(angle_kvs)
+            curves.append(KvCurve(dns[dn_id], pns.get(pn_id), angles, [angle_kvs[angle] for angle in angles]))
+        curves.sort(key=lambda curve: (
+            curve.dn.sorting_order, curve.dn.diameter_metric or 0, curve.dn.id,
+            curve.pn is not None, curve.pn.sorting_order if curve.pn else 0, curve.pn.id if curve.pn else 0,
+        ))
+        return cls(table_id, curves)
+
+    # ==================== ПОИСК ====================
+
+    def curve(self, dn_name, pn_name) -> Optional[KvCurve]:
+        """Кривая по названиям DN/PN (pn_name=None - строки без PN)"""
+        return self._by_names.get((dn_name, pn_name))
+
+    def find_curve(self, dn_id, pn_id=None) -> Optional[KvCurve]:
+        """Кривая по id DN/PN; если для PN кривой нет - кривая DN без PN"""
+        return self._by_ids.get((dn_id, pn_id)) or self._by_ids.get((dn_id, None))
+
+    def kv_at(self, angles) -> np.ndarray:
+        """
+        Kv всех кривых при углах angles: массив [угол, кривая] (NaN - угол вне кривой);
+        для скалярного угла - массив по кривым.
+        """
+        scalar = np.ndim(angles) == 0
+        angles = np.atleast_1d(np.asarray(angles, dtype=float))
+        size = len(self.grid)
+        if size < 2:
+            result = np.full((len(angles), len(self.curves)), np.nan)
+            if size:
+                result[angles == self.grid[0]] = self.grid_kvs[:, 0]
+            return result[0] if scalar else result
+
+        right = np.clip(np.searchsorted(self.grid, angles, side='right'), 1, size - 1)
+        left = right - 1
+        weight = ((angles - self.grid[left]) / (self.grid[right] - self.grid[left]))[:, None]
+        kv_left = self.grid_kvs[:, left].T
+        kv_right = self.grid_kvs[:, right].T
+        # В узле берется значение узла: соседний узел может быть уже вне диапазона кривой
+        result = np.where(weight == 0, kv_left,
+                          np.where(weight == 1, kv_right, kv_left * (1 - weight) + kv_right * weight))
+        result[(angles < self.grid[0]) | (angles > self.grid[-1])] = np.nan
+        return result[0] if scalar else result
+
+    def capacities(self, max_angle) -> np.ndarray:
+        """Наибольший Kv каждой кривой при открытии не больше max_angle (NaN - нет данных)"""
+        max_angle = float(max_angle)
+        capacities = self._capacities.get(max_angle)
+        if capacities is None:
+            capacities = np.array([
+                np.nan if value is None else value
+                for value in (curve.capacity(max_angle) for curve in self.curves)
+            ], dtype=float)
+            self._capacities[max_angle] = capacities
+        return capacities
+
+    def smallest_dn(self, required_kvs, max_angle=70.0, dn_ids: Optional[Iterable[int]] = None,
+                    pn_ids: Optional[Iterable[int]] = None) -> List[Optional['KvSizingResult']]:
+        """
+        Для каждого требуемого Kv - наименьший DN, кривая которого дает этот Kv при открытии
+        не больше max_angle (None - ни одна кривая не подходит).
+
+        dn_ids/pn_ids - ограничение допустимых DN/PN (None - без ограничения).
+        """
+        required = np.atleast_1d(np.asarray(required_kvs, dtype=float))
+        if not self.curves:
+            return [None] * len(required)
+
+        capacities = self.capacities(max_angle)
+        allowed = ~np.isnan(capacities)
+        if dn_ids is not None:
+            allowed &= np.isin(self.dn_ids, np.fromiter(dn_ids, dtype=np.int64))
+        if pn_ids is not None:
+            pn_ids = set(pn_ids)
+            allowed &= np.array([curve.pn is not None and curve.pn.id in pn_ids for curve in self.curves])
+
+        # [требование, кривая]: кривые упорядочены по DN - первая подходящая дает наименьший DN
+        fits = allowed[None, :] & (np.where(allowed, capacities, -np.inf)[None, :] >= required[:, None])
+        first = fits.argmax(axis=1)
+        found = fits[np.arange(len(required)), first]
+
+        results = []
+        for kv, index, ok in zip(required, first, found):
+            if not ok:
+                results.append(None)
+                continue
+            curve = self.curves[index]
+            results.append(KvSizingResult(self.table_id, curve, float(kv), curve.angle_for_kv(kv),
+                                          float(capacities[index])))
+        return results
+
+
+class KvSizingResult:
+    """Результат подбора: кривая DN/PN, требуемый Kv, угол открытия для него и Kv при max_angle"""
+
+    def __init__(self, table_id, curve: KvCurve, required_kv, opening_angle, capacity):
+        self.table_id = table_id
+        self.curve = curve
+        self.dn = curve.dn
+        self.pn = curve.pn
+        self.required_kv = required_kv
+        self.opening_angle = opening_angle
+        self.capacity = capacity
+
+    def as_dict(self) -> Dict:
+        return {
+            'dn': self.dn.name,
+            'pn': self.pn.name if self.pn else None,
+            'required_kv': self.required_kv,
+            'opening_angle': self.opening_angle,
+            'kv_at_max_angle': self.capacity,
+        }
+
+
+class KvCurveCache:
+    """
+    Кеш скомпилированных таблиц Kv в памяти процесса (LRU по таблице).
+
+    Таблица сбрасывается сигналами при изменении строк Kv, справочники DN/PN сбрасывают
+    все таблицы (valve_data/signals.py). Сигналы доходят только до процесса, изменившего
+    данные, поэтому таблица живет не дольше CACHE_TTL_SECONDS.
+    """
+    MAX_SIZE = 64
+    CACHE_TTL_SECONDS = 300  # страховка для других процессов, которые не получили сигнал
+
+    _tables = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_table(cls, table_id) -> KvCurveTable:
+        with cls._lock:
+            entry = cls._tables.get(table_id)
+            if entry is not None:
+                table, stored_at = entry
+                if time.monotonic() - stored_at < cls.CACHE_TTL_SECONDS:
+                    cls._tables.move_to_end(table_id)
+                    return table
+                del cls._tables[table_id]
+        table = KvCurveTable.build(table_id)
+        logger.debug("Скомпилирована таблица Kv %s: %d кривых", table_id, len(table.curves))
+        with cls._lock:
+            cls._tables[table_id] = (table, time.monotonic())
+            cls._tables.move_to_end(table_id)
+            while len(cls._tables) > cls.MAX_SIZE:
+                cls._tables.popitem(last=False)
+        return table
+
+    @classmethod
+    def invalidate(cls, table_id=None):
+        """Сбросить таблицу (или все таблицы, если не указана)"""
+        with cls._lock:
+            if table_id is None:
+                cls._tables.clear()
+            else:
+                cls._tables.pop(table_id, None)
+
+
+class KvSizing:
+    """Подбор DN по требуемому Kv для серий арматуры (эффективные таблицы Kv и допустимых DN)"""
+    DEFAULT_MAX_ANGLE = 70.0
+
+    @staticmethod
+    def required_kv(flow_m3h, pressure_drop_bar, density_kg_m3=1000.0) -> float:
+        """Требуемый Kv для жидкости: Kv = Q * sqrt((ρ / 1000) / ΔP)"""
+        if pressure_drop_bar <= 0:
+            raise ValueError("Перепад давления должен быть больше 0")
+        return float(flow_m3h) * math.sqrt((float(density_kg_m3) / 1000.0) / float(pressure_drop_bar))
+
+    @classmethod
+    def smallest_dn_by_valve_line(cls, required_kvs, max_angle=DEFAULT_MAX_ANGLE,
+                                  valve_line_ids: Optional[Iterable[int]] = None, pn_ids=None
+                                  ) -> Dict[int, List[Optional[KvSizingResult]]]:
+        """
+        Для каждой серии (ValveLineResolved) - наименьший допустимый DN под каждый требуемый Kv.
+
+        Серии с одинаковыми таблицами Kv и допустимых DN решаются одним векторным вызовом.
+
+        Returns:
+            dict: valve_line_id -> список KvSizingResult/None в порядке required_kvs
+        """
+        from valve_data.models import AllowedDnTemplate, ValveLineResolved
+
+        required = np.atleast_1d(np.asarray(required_kvs, dtype=float))
+        lines = ValveLineResolved.objects.filter(valve_model_kv_data_table__isnull=False,
+                                                 allowed_dn_table__isnull=False)
+        if valve_line_ids is not None:
+            lines = lines.filter(valve_line_id__in=list(valve_line_ids))
+        line_tables = list(lines.values_list('valve_line_id', 'valve_model_kv_data_table_id', 'allowed_dn_table_id'))
+
+        allowed_dn = defaultdict(set)
+        for template_id, dn_id in AllowedDnTemplate.objects.filter(
+                id__in={dn_table for _, _, dn_table in line_tables}, dn__isnull=False).values_list('id', 'dn'):
+            allowed_dn[template_id].add(dn_id)
+
+        solved = {}
+        result = {}
+        for valve_line_id, kv_table_id, dn_table_id in line_tables:
+            key = (kv_table_id, dn_table_id)
+            if key not in solved:
+                solved[key] = KvCurveCache.get_table(kv_table_id).smallest_dn(
+                    required, max_angle, dn_ids=allowed_dn[dn_table_id], pn_ids=pn_ids)
+            result[valve_line_id] = solved[key]
+        return result
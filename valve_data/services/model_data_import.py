@@ -0,0 +1,274 @@
+# valve_data/services/model_data_import.py
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from .bulk_import import MODEL_DATA_DN_LOOKUPS, MODEL_DATA_PN_LOOKUPS, ReferenceMap, is_empty_cell
+
+logger = logging.getLogger(__name__)
+
+
+class ValveModelDataImporter:
+    """
+    Пакетный импорт ValveLineModelData (моделей арматуры) в таблицу данных моделей.
+
+    Лист читается один раз, DN/PN/штоки/площадки сопоставляются со справочниками в памяти,
+    строки сравниваются с существующими записями таблицы по паре (DN, PN), изменения
+    записываются bulk_create/bulk_update/удалением одним запросом в одной транзакции.
+    Колонки файла - как в выгрузке (MODEL_DATA_EXPORT_HEADERS).
+    """
+    # Поле модели -> колонка файла; пустые ячейки не меняют значение
+    SIMPLE_FIELDS = {
+        'valve_model_torque_to_open': 'Момент откр',
+        'valve_model_torque_to_close': 'Момент закр',
+        'valve_model_rotations_to_open': 'Оборотов',
+        'name': 'Артикул',
+        'valve_model_thrust_to_close': 'Усилие на закр',
+        'valve_model_construction_length': 'Строит.длина',
+        'valve_model_stem_height': 'Высота Шток',
+    }
+    BATCH_SIZE = 500
+    # Столбцы с id найденных DN/PN (resolve); NaN - не найден
+    DN_ID_COLUMN = '_dn_id'
+    PN_ID_COLUMN = '_pn_id'
+
+    def __init__(self, valve_model_data_table):
+        self.table = valve_model_data_table
+
+    # ==================== ПУБЛИЧНЫЕ МЕТОДЫ ====================
+
+    def resolve(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Лист с id найденных DN/PN (DN_ID_COLUMN/PN_ID_COLUMN); справочники берутся из индексов
+        в памяти (params.services), без запросов к БД.
+
+        analyze/apply используют эти столбцы, если они есть, поэтому подготовленный лист
+        (StagedImportStore) применяется без повторного сопоставления.
+        """
+        if self.DN_ID_COLUMN in df.columns and self.PN_ID_COLUMN in df.columns:
+            return df
+        from params.services import DnVarietyIndex, PnVarietyIndex
+
+        resolved = df.copy()
+        for id_column, column, index, lookups in (
+                (self.DN_ID_COLUMN, 'DN', DnVarietyIndex, MODEL_DATA_DN_LOOKUPS),
+                (self.PN_ID_COLUMN, 'PN', PnVarietyIndex, MODEL_DATA_PN_LOOKUPS)):
+            objects = ReferenceMap(index.get_instance().objects, lookups).resolve_series(df[column]) \
+                if column in df.columns else pd.Series([None] * len(df), index=df.index, dtype=object)
+            resolved[id_column] = pd.Series([obj.id if obj else None for obj in objects],
+                                            index=df.index, dtype='float64')
+        return resolved
+
+    def analyze(self, df: pd.DataFrame) -> Tuple[List[Tuple[int, int]], List[Tuple[str, str]]]:
+        """
+        Комбинации (dn_id, pn_id) таблицы, которых нет в файле, и их коды для показа пользователю
+        """
+        from params.models import DnVariety, PnVariety
+        from valve_data.models import ValveLineModelData
+
+        dn_ids, pn_ids = self._resolved_ids(df)
+        imported = {(dn_id, pn_id) for dn_id, pn_id in zip(dn_ids, pn_ids) if dn_id and pn_id}
+
+        existing = set(ValveLineModelData.objects.filter(
+            valve_model_data_table=self.table,
+            valve_model_dn__isnull=False,
+            valve_model_pn__isnull=False,
+        ).values_list('valve_model_dn_id', 'valve_model_pn_id'))
+        combinations_to_delete = existing - imported
+
+        dns = DnVariety.objects.in_bulk({dn_id for dn_id, _ in combinations_to_delete})
+        pns = PnVariety.objects.in_bulk({pn_id for _, pn_id in combinations_to_delete})
+        combinations_display = [
+            (dns[dn_id].code or dns[dn_id].name, pns[pn_id].code or pns[pn_id].name)
+            for dn_id, pn_id in combinations_to_delete
+            if dn_id in dns and pn_id in pns
+        ]
+        return list(combinations_to_delete), combinations_display
+
+    def apply(self, df: pd.DataFrame, combinations_to_delete: Iterable = ()) -> Tuple[str, str]:
+        """
+        Удалить комбинации combinations_to_delete и записать строки файла.
+
+        Строка с ошибкой (нет DN/PN, не найден справочник, неверное значение) пропускается
+        целиком, остальные записываются.
+
+        Returns:
+            tuple: ('success' | 'partial_success', сообщение)
+        """
+        from params.models import MountingPlateTypes, StemSize
+        from valve_data.models import ValveLineModelData
+
+        combinations_to_delete = {tuple(combination) for combination in combinations_to_delete}
+        dn_ids, pn_ids = self._resolved_ids(df)
+        stem_map = ReferenceMap(StemSize.objects.order_by('id'), (('code', str),))
+        plate_ids = self._plate_ids_by_code(MountingPlateTypes.objects.values_list('code', 'id'))
+
+        errors = []
+        success_count = 0
+        new_models: Dict[Tuple[int, int], ValveLineModelData] = {}
+        changed_models = {}
+        plates_by_model = {}
+
+        with transaction.atomic():
+            existing = self._existing_models(combinations_to_delete)
+
+            records = df.to_dict('records')
+            for row_number, (row, dn_id, pn_id) in enumerate(zip(records, dn_ids, pn_ids), start=2):
+                dn_code = row.get('DN')
+                pn_code = row.get('PN')
+
+                if is_empty_cell(dn_code) or is_empty_cell(pn_code):
+                    errors.append(f"Строка {row_number}: отсутствует DN_code или PN_code")
+                    continue
+                if not dn_id:
+                    errors.append(f"Строка {row_number}: DN '{dn_code}' не найден")
+                    continue
+                if not pn_id:
+                    errors.append(f"Строка {row_number}: PN '{pn_code}' не найден")
+                    continue
+
+                key = (dn_id, pn_id)
+                found = existing.get(key, ())
+                if len(found) > 1:
+                    errors.append(f"Строка {row_number}: get() returned more than one "
+                                  f"ValveLineModelData -- it returned {len(found)}!")
+                    continue
+
+                try:
+                    changes = self._row_changes(row, stem_map)
+                except (ValidationError, ValueError, TypeError, ArithmeticError) as e:
+                    errors.append(f"Строка {row_number}: {e}")
+                    continue
+
+                if found:
+                    valve_model = found[0]
+                    if changes:
+                        changed_models[valve_model.pk] = valve_model
+                else:
+                    valve_model = new_models.get(key)
+                    if valve_model is None:
+                        valve_model = new_models[key] = ValveLineModelData(
+                            valve_model_data_table=self.table, valve_model_dn_id=dn_id, valve_model_pn_id=pn_id,
+                        )
+                for field, value in changes.items():
+                    setattr(valve_model, field, value)
+
+                plate_codes = row.get('Монт.площадка')
+                if not is_empty_cell(plate_codes):
+                    codes = [code.strip() for code in str(plate_codes).split(',') if code.strip()]
+                    plates_by_model[id(valve_model)] = (valve_model, [
+                        plate_id for code in codes for plate_id in plate_ids.get(code, ())
+                    ])
+                success_count += 1
+
+            if new_models:
+                ValveLineModelData.objects.bulk_create(new_models.values(), batch_size=self.BATCH_SIZE)
+            if changed_models:
+                ValveLineModelData.objects.bulk_update(
+                    changed_models.values(), ['valve_model_stem_size'] + list(self.SIMPLE_FIELDS),
+                    batch_size=self.BATCH_SIZE)
+            self._set_mounting_plates(plates_by_model.values())
+
+        # bulk-операции не отправляют сигналы
+        from core.graphql import GraphQLResponseCache
+        from .mounting_compatibility import MountingCompatibilityIndex
+        from .valve_sizing import ValveSizingIndex
+        if GraphQLResponseCache.is_enabled():
+            GraphQLResponseCache.invalidate('valve_data')
+        ValveSizingIndex.invalidate()
+        MountingCompatibilityIndex.update_valve_models(
+            [model.pk for model in new_models.values()] + list(changed_models)
+            + [model.pk for model, _ in plates_by_model.values()])
+
+        logger.info("Импорт моделей в таблицу %s: создано %d, обновлено %d, ошибок %d",
+                    self.table.pk, len(new_models), len(changed_models), len(errors))
+
+        if not errors:
+            return 'success', f"Успешно импортировано {success_count} записей"
+        return 'partial_success', (f"Успешно: {success_count}, Ошибок: {len(errors)}. Первые ошибки: "
+                                   + "; ".join(errors[:5]))
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    def _resolved_ids(self, df: pd.DataFrame):
+        """id DnVariety/PnVariety для каждой строки (None - не найден)"""
+        df = self.resolve(df)
+        return tuple(
+            [int(value) if pd.notna(value) else None for value in df[column]]
+            for column in (self.DN_ID_COLUMN, self.PN_ID_COLUMN)
+        )
+
+    def _existing_models(self, combinations_to_delete) -> Dict[Tuple[int, int], list]:
+        """Удалить комбинации combinations_to_delete, вернуть оставшиеся записи таблицы по (dn_id, pn_id)"""
+        from valve_data.models import ValveLineModelData
+
+        existing: Dict[Tuple[int, int], list] = {}
+        delete_ids = []
+        for valve_model in ValveLineModelData.objects.filter(
+                valve_model_data_table=self.table, valve_model_dn__isnull=False,
+                valve_model_pn__isnull=False).order_by('id'):
+            key = (valve_model.valve_model_dn_id, valve_model.valve_model_pn_id)
+            if key in combinations_to_delete:
+                delete_ids.append(valve_model.pk)
+            else:
+                existing.setdefault(key, []).append(valve_model)
+
+        if delete_ids:
+            deleted_count, _ = ValveLineModelData.objects.filter(pk__in=delete_ids).delete()
+            logger.info("Удалено комбинаций DN/PN таблицы %s: %d", self.table.pk, deleted_count)
+        return existing
+
+    def _row_changes(self, row, stem_map: ReferenceMap) -> Dict[str, object]:
+        """
+        Значения полей из строки файла, приведенные и проверенные так же, как при save()
+        (ValidationError/ArithmeticError - значение не может быть сохранено)
+        """
+        from valve_data.models import ValveLineModelData
+
+        changes = {}
+        stem_code = row.get('Шток')
+        if not is_empty_cell(stem_code):
+            stem_size = stem_map.resolve(stem_code)
+            if stem_size is not None:
+                changes['valve_model_stem_size'] = stem_size
+            else:
+                logger.debug("StemSize не найден по коду: %s", stem_code)
+
+        for field_name, column in self.SIMPLE_FIELDS.items():
+            value = row.get(column)
+            if is_empty_cell(value):
+                continue
+            field = ValveLineModelData._meta.get_field(field_name)
+            value = field.to_python(value)
+            field.get_db_prep_save(value, connection)
+            changes[field_name] = value
+        return changes
+
+    @staticmethod
+    def _plate_ids_by_code(codes_and_ids) -> Dict[str, List[int]]:
+        plate_ids: Dict[str, List[int]] = {}
+        for code, plate_id in codes_and_ids:
+            if code is not None:
+                plate_ids.setdefault(code, []).append(plate_id)
+        return plate_ids
+
+    def _set_mounting_plates(self, models_and_plates):
+        """Заменить монтажные площадки моделей: одно удаление и один bulk_create по промежуточной таблице"""
+        from valve_data.models import ValveLineModelData
+
+        models_and_plates = list(models_and_plates)
+        if not models_and_plates:
+            return
+        field = ValveLineModelData._meta.get_field('valve_model_mounting_plate')
+        through = field.remote_field.through
+        source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+
+        through.objects.filter(**{f'{source}_id__in': [model.pk for model, _ in models_and_plates]}).delete()
+        through.objects.bulk_create([
+            through(**{f'{source}_id': model.pk, f'{target}_id': plate_id})
+            for model, plate_ids in models_and_plates
+            for plate_id in dict.fromkeys(plate_ids)
+        ], batch_size=self.BATCH_SIZE)
@@ -0,0 +1,329 @@
+# valve_data/services/mounting_compatibility.py
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+import numpy as np
+from django.apps import apps
+
+logger = logging.getLogger(__name__)
+
+
+class _MountingSide:
+    """
+    Признаки монтажа одной стороны (модели арматуры или корпуса приводов) по столбцам.
+
+    plates[строка, площадка] - монтажные площадки, stem_size/stem_shape - id (-1 - не указано),
+    stem_diameter / stem_height - мм (NaN - не указано). Удаленные строки остаются на своих
+    местах без площадок (ни с чем не совместимы) и отсутствуют в position.
+    """
+
+    def __init__(self, plate_count):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.position: Dict[int, int] = {}
+        self.plates = np.zeros((0, plate_count), dtype=bool)
+        self.stem_size = np.empty(0, dtype=np.int64)
+        self.stem_shape = np.empty(0, dtype=np.int64)
+        self.stem_diameter = np.empty(0, dtype=float)
+        self.stem_height = np.empty(0, dtype=float)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def put(self, records, plate_rows) -> np.ndarray:
+        """Записать строки (id, stem_size, stem_shape, stem_diameter, stem_height); вернуть их позиции"""
+        positions = []
+        new_records = []
+        for record in records:
+            position = self.position.get(record[0])
+            if position is None:
+                position = len(self.ids) + len(new_records)
+                new_records.append(record)
+            positions.append(position)
+        if new_records:
+            count = len(new_records)
+            self.ids = np.concatenate([self.ids, np.zeros(count, dtype=np.int64)])
+            self.plates = np.vstack([self.plates, np.zeros((count, self.plates.shape[1]), dtype=bool)])
+            self.stem_size = np.concatenate([self.stem_size, np.full(count, -1, dtype=np.int64)])
+            self.stem_shape = np.concatenate([self.stem_shape, np.full(count, -1, dtype=np.int64)])
+            self.stem_diameter = np.concatenate([self.stem_diameter, np.full(count, np.nan)])
+            self.stem_height = np.concatenate([self.stem_height, np.full(count, np.nan)])
+
+        for position, (object_id, stem_size, stem_shape, stem_diameter, stem_height), plates in zip(
+                positions, records, plate_rows):
+            self.ids[position] = object_id
+            self.position[object_id] = position
+            self.plates[position] = plates
+            self.stem_size[position] = -1 if stem_size is None else stem_size
+            self.stem_shape[position] = -1 if stem_shape is None else stem_shape
+            self.stem_diameter[position] = np.nan if stem_diameter is None else float(stem_diameter)
+            # 0 в числовых полях моделей - значение по умолчанию, т.е. "не указано"
+            self.stem_height[position] = float(stem_height) if stem_height else np.nan
+        return np.array(positions, dtype=np.int64)
+
+    def remove(self, object_ids) -> np.ndarray:
+        positions = [self.position.pop(object_id) for object_id in object_ids if object_id in self.position]
+        positions = np.array(positions, dtype=np.int64)
+        self.plates[positions] = False
+        return positions
+
+
+class MountingCompatibilityIndex:
+    """
+    Индекс совместимости моделей арматуры (ValveLineModelData) с корпусами приводов.
+
+    Для каждого вида привода (BODY_MODELS) хранится битовая матрица [модель арматуры, корпус]
+    (np.packbits по корпусам). Корпус монтируется на модель, если:
+        - у них есть общая монтажная площадка;
+        - размер штока модели совпадает с размером штока корпуса, либо у корпуса задан
+          max_stem_diameter, форма штока совпадает (если задана у корпуса) и диаметр штока
+          модели не больше max_stem_diameter; корпус без требований к штоку подходит к любому;
+        - высота штока модели не больше max_stem_height корпуса (если обе заданы).
+    Изменение модели/корпуса пересчитывает только ее строку/столбец (сигналы valve_data/signals.py),
+    изменение справочников площадок и штоков сбрасывает индекс.
+    """
+    BODY_MODELS = {
+        'pneumatic': 'pneumatic_actuators.PneumaticActuatorBody',
+        'electric': 'electric_actuators.ModelBody',
+    }
+    CHUNK_SIZE = 4096  # строк арматуры на одну векторную операцию
+    CACHE_TTL_SECONDS = 300  # страховка для других процессов, которые не получили сигнал
+
+    _instance = None
+    _instance_built_at = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self):
+        from params.models import MountingPlateTypes
+
+        self.plate_index = {plate_id: i for i, plate_id in enumerate(
+            MountingPlateTypes.objects.order_by('id').values_list('id', flat=True))}
+        self._update_lock = threading.Lock()
+        self._stem_sizes = self._load_stem_sizes()
+
+        self.valves = _MountingSide(len(self.plate_index))
+        self.valves.put(*self._load_valve_models(None))
+        self.bodies: Dict[str, _MountingSide] = {}
+        self.bits: Dict[str, np.ndarray] = {}
+        for kind in self.BODY_MODELS:
+            side = _MountingSide(len(self.plate_index))
+            side.put(*self._load_bodies(kind, None))
+            self.bodies[kind] = side
+            self.bits[kind] = np.packbits(self._compatibility(self.valves, np.arange(len(self.valves)),
+                                                              side, np.arange(len(side))), axis=1)
+        logger.debug("MountingCompatibilityIndex: %d моделей, корпусов %s", len(self.valves),
+                     {kind: len(side) for kind, side in self.bodies.items()})
+
+    @classmethod
+    def get_instance(cls) -> 'MountingCompatibilityIndex':
+        """Индекс для текущего процесса (строится при первом обращении)"""
+        instance = cls._instance
+        if instance is not None and time.monotonic() - cls._instance_built_at < cls.CACHE_TTL_SECONDS:
+            return instance
+        with cls._lock:
+            if cls._instance is None or time.monotonic() - cls._instance_built_at >= cls.CACHE_TTL_SECONDS:
+                cls._instance = cls()
+                cls._instance_built_at = time.monotonic()
+            return cls._instance
+
+    @classmethod
+    def invalidate(cls):
+        """Сбросить индекс - следующий get_instance построит его заново"""
+        cls._instance = None
+
+    # ==================== ИНКРЕМЕНТАЛЬНОЕ ОБНОВЛЕНИЕ ====================
+
+    @classmethod
+    def update_valve_models(cls, model_ids: Iterable[int]):
+        """Пересчитать строки моделей арматуры (новые - добавить, удаленные из БД - убрать)"""
+        instance = cls._instance
+        if instance is not None:
+            instance._update_valves(set(model_ids))
+
+    @classmethod
+    def update_bodies(cls, kind: str, body_ids: Iterable[int]):
+        """Пересчитать столбцы корпусов вида kind"""
+        instance = cls._instance
+        if instance is not None:
+            instance._update_bodies(kind, set(body_ids))
+
+    def _update_valves(self, model_ids):
+        with self._update_lock:
+            records, plate_rows = self._load_valve_models(model_ids)
+            if not self._plates_known(plate_rows):
+                return
+            removed = self.valves.remove(model_ids - {record[0] for record in records})
+            positions = self.valves.put(records, plate_rows)
+            for kind, side in self.bodies.items():
+                bits = self.bits[kind]
+                if len(self.valves) > bits.shape[0]:
+                    bits = np.vstack([bits, np.zeros((len(self.valves) - bits.shape[0], bits.shape[1]), np.uint8)])
+                bits[removed] = 0
+                if len(positions):
+                    bits[positions] = np.packbits(
+                        self._compatibility(self.valves, positions, side, np.arange(len(side))), axis=1)
+                self.bits[kind] = bits
+
+    def _update_bodies(self, kind, body_ids):
+        with self._update_lock:
+            side = self.bodies[kind]
+            records, plate_rows = self._load_bodies(kind, body_ids)
+            if not self._plates_known(plate_rows):
+                return
+            removed = side.remove(body_ids - {record[0] for record in records})
+            positions = side.put(records, plate_rows)
+            bits = self.bits[kind]
+            width = (len(side) + 7) // 8
+            if width > bits.shape[1]:
+                bits = np.hstack([bits, np.zeros((bits.shape[0], width - bits.shape[1]), np.uint8)])
+            columns = np.concatenate([removed, positions])
+            if len(columns):
+                values = np.zeros((len(self.valves), len(columns)), dtype=bool)
+                if len(positions):
+                    values[:, len(removed):] = self._compatibility(self.valves, np.arange(len(self.valves)),
+                                                                   side, positions)
+                # Биты столбцов: байт column // 8, бит 7 - column % 8 (порядок np.packbits)
+                for column, value in zip(columns, values.T):
+                    mask = np.uint8(1 << (7 - column % 8))
+                    bits[:, column // 8] = np.where(value, bits[:, column // 8] | mask, bits[:, column // 8] & ~mask)
+            self.bits[kind] = bits
+
+    def _plates_known(self, plate_rows) -> bool:
+        # Новая монтажная площадка - новый столбец признаков: индекс строится заново
+        if plate_rows is None:
+            type(self).invalidate()
+            return False
+        return True
+
+    # ==================== ЗАПРОСЫ ====================
+
+    def matrix(self, kind: str, model_ids: Iterable[int], body_ids: Iterable[int]) -> np.ndarray:
+        """Матрица совместимости [модель, корпус] для заданных id (неизвестные - False)"""
+        side = self.bodies[kind]
+        model_ids, body_ids = list(model_ids), list(body_ids)
+        result = np.zeros((len(model_ids), len(body_ids)), dtype=bool)
+        rows = np.array([self.valves.position.get(model_id, -1) for model_id in model_ids], dtype=np.int64)
+        columns = np.array([side.position.get(body_id, -1) for body_id in body_ids], dtype=np.int64)
+        known_rows, known_columns = rows >= 0, columns >= 0
+        if known_rows.any() and known_columns.any():
+            unpacked = np.unpackbits(self.bits[kind][rows[known_rows]], axis=1, count=len(side)).astype(bool)
+            result[np.ix_(known_rows, known_columns)] = unpacked[:, columns[known_columns]]
+        return result
+
+    def is_compatible(self, kind: str, model_id: int, body_id: int) -> bool:
+        return bool(self.matrix(kind, [model_id], [body_id])[0, 0])
+
+    def bodies_for_models(self, kind: str, model_ids: Iterable[int]) -> Dict[int, List[int]]:
+        """Для каждой модели арматуры - id совместимых корпусов"""
+        side = self.bodies[kind]
+        result = {}
+        for model_id in model_ids:
+            row = self.valves.position.get(model_id)
+            if row is None:
+                result[model_id] = []
+                continue
+            columns = np.flatnonzero(np.unpackbits(self.bits[kind][row], count=len(side)))
+            result[model_id] = [int(body_id) for body_id in side.ids[columns]]
+        return result
+
+    def models_for_bodies(self, kind: str, body_ids: Iterable[int]) -> Dict[int, List[int]]:
+        """Для каждого корпуса - id моделей арматуры, на которые он монтируется"""
+        side = self.bodies[kind]
+        bits = self.bits[kind]
+        result = {}
+        for body_id in body_ids:
+            column = side.position.get(body_id)
+            if column is None:
+                result[body_id] = []
+                continue
+            rows = np.flatnonzero(bits[:, column // 8] & np.uint8(1 << (7 - column % 8)))
+            result[body_id] = [int(model_id) for model_id in self.valves.ids[rows]]
+        return result
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    def _compatibility(self, valves: _MountingSide, rows, bodies: _MountingSide, columns) -> np.ndarray:
+        """Совместимость строк rows арматуры со столбцами columns корпусов, по частям CHUNK_SIZE"""
+        result = np.zeros((len(rows), len(columns)), dtype=bool)
+        if not len(rows) or not len(columns):
+            return result
+        body_plates = bodies.plates[columns].astype(np.uint16)
+        body_size = bodies.stem_size[columns][None, :]
+        body_shape = bodies.stem_shape[columns][None, :]
+        body_diameter = bodies.stem_diameter[columns][None, :]
+        body_height = bodies.stem_height[columns][None, :]
+        no_stem_requirement = (body_size < 0) & (body_shape < 0) & np.isnan(body_diameter)
+
+        for start in range(0, len(rows), self.CHUNK_SIZE):
+            chunk = rows[start:start + self.CHUNK_SIZE]
+            plates_ok = (valves.plates[chunk].astype(np.uint16) @ body_plates.T) > 0
+            size = valves.stem_size[chunk][:, None]
+            shape = valves.stem_shape[chunk][:, None]
+            diameter = valves.stem_diameter[chunk][:, None]
+            height = valves.stem_height[chunk][:, None]
+            with np.errstate(invalid='ignore'):
+                stem_ok = ((size >= 0) & (size == body_size)) | no_stem_requirement | (
+                    (diameter <= body_diameter) & ((body_shape < 0) | (shape == body_shape)))
+                height_ok = np.isnan(height) | np.isnan(body_height) | (height <= body_height)
+            result[start:start + len(chunk)] = plates_ok & stem_ok & height_ok
+        return result
+
+    @staticmethod
+    def _load_stem_sizes():
+        from params.models import StemSize
+        return {stem_id: (shape_id, diameter) for stem_id, shape_id, diameter in
+                StemSize.objects.values_list('id', 'stem_type_id', 'stem_diameter')}
+
+    def _plate_rows(self, field, object_ids):
+        """Площадки (позиции столбцов) по id объектов; None - встретилась неизвестная площадка"""
+        through = field.remote_field.through
+        source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+        plates = defaultdict(list)
+        queryset = through.objects.all()
+        if object_ids is not None:
+            queryset = queryset.filter(**{f'{source}_id__in': object_ids})
+        for object_id, plate_id in queryset.values_list(f'{source}_id', f'{target}_id'):
+            if plate_id not in self.plate_index:
+                return None
+            plates[object_id].append(self.plate_index[plate_id])
+        return plates
+
+    def _rows(self, records, plates):
+        if plates is None:
+            return records, None
+        plate_rows = []
+        for record in records:
+            row = np.zeros(len(self.plate_index), dtype=bool)
+            row[plates.get(record[0], [])] = True
+            plate_rows.append(row)
+        return records, plate_rows
+
+    def _load_valve_models(self, model_ids):
+        """Признаки моделей арматуры (model_ids=None - все)"""
+        from valve_data.models import ValveLineModelData
+
+        queryset = ValveLineModelData.objects.order_by('id')
+        if model_ids is not None:
+            queryset = queryset.filter(id__in=model_ids)
+        records = []
+        for model_id, stem_size_id, stem_height in queryset.values_list(
+                'id', 'valve_model_stem_size_id', 'valve_model_stem_height'):
+            stem_shape, stem_diameter = self._stem_sizes.get(stem_size_id, (None, None))
+            records.append((model_id, stem_size_id, stem_shape, stem_diameter, stem_height))
+        field = ValveLineModelData._meta.get_field('valve_model_mounting_plate')
+        return self._rows(records, self._plate_rows(field, model_ids))
+
+    def _load_bodies(self, kind, body_ids):
+        """Признаки корпусов приводов вида kind (body_ids=None - все активные)"""
+        model = apps.get_model(self.BODY_MODELS[kind])
+        queryset = model.objects.order_by('id')
+        if any(field.name == 'is_active' for field in model._meta.fields):
+            queryset = queryset.filter(is_active=True)
+        if body_ids is not None:
+            queryset = queryset.filter(id__in=body_ids)
+        records = list(queryset.values_list('id', 'stem_size_id', 'stem_shape_id', 'max_stem_diameter',
+                                            'max_stem_height'))
+        field = model._meta.get_field('mounting_plate')
+        return self._rows(records, self._plate_rows(field, body_ids))
@@ -0,0 +1,181 @@
+# valve_data/services/valve_line_resolver.py
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class ValveLineResolver:
+    """
+    Пересчет материализованных эффективных значений серий арматуры (ValveLineResolved).
+
+    Правила совпадают с ValveLineInheritanceMixin.get_field_value_with_fallback:
+    значение берется из первой серии цепочки original_valve_line (не более MAX_RECURSION уровней),
+    в которой оно не пустое (None или строка из пробелов считаются пустыми).
+
+    При изменении серии пересчитываются она и все ее наследники. Запросы:
+    карта родителей (id, original_valve_line_id) всех серий, значения затронутых серий
+    и их предков, строки ссылочных объектов (по одному запросу на модель), запись пакетом.
+    """
+    MAX_RECURSION = 5
+    MAX_DEPTH = 10  # как ValveLineInheritanceMixin._get_inheritance_depth
+    STR_MAX_LENGTH = 255
+
+    @classmethod
+    def refresh(cls, valve_line_ids: Optional[Iterable[int]] = None, cascade: bool = True) -> int:
+        """
+        Пересчитать эффективные значения
+
+        Args:
+            valve_line_ids: ID серий; None - все серии
+            cascade: пересчитать также всех наследников указанных серий
+
+        Returns:
+            Количество пересчитанных строк
+        """
+        from valve_data.models import ValveLine
+
+        parents = dict(ValveLine.objects.values_list('id', 'original_valve_line_id'))
+        if valve_line_ids is None:
+            targets = set(parents)
+        else:
+            targets = {pk for pk in valve_line_ids if pk in parents}
+            if cascade:
+                targets |= cls.descendants(targets, parents)
+        if not targets:
+            return 0
+
+        needed = set()
+        for pk in targets:
+            needed.update(cls._chain(pk, parents, cls.MAX_RECURSION))
+
+        from valve_data.models.valve_line_resolved import ValveLineResolved
+        fk_columns = [f"{field}_id" for field in ValveLineResolved.FK_FIELDS]
+        values = {
+            row['id']: row for row in ValveLine.objects.filter(id__in=needed).values(
+                'id', *ValveLineResolved.SCALAR_FIELDS, *fk_columns)
+        }
+
+        resolved_rows = []
+        for pk in targets:
+            resolved_rows.append(cls._resolve(pk, parents, values))
+
+        strings = cls._load_strings(resolved_rows)
+        objects = []
+        for row in resolved_rows:
+            obj = ValveLineResolved(valve_line_id=row['id'], inheritance_depth=row['inheritance_depth'],
+                                    search_text=cls.search_text(row))
+            for field in ValveLineResolved.SCALAR_FIELDS:
+                setattr(obj, field, row[field])
+            for field in ValveLineResolved.FK_FIELDS:
+                related_id = row[f"{field}_id"]
+                setattr(obj, f"{field}_id", related_id)
+                setattr(obj, f"{field}_str", strings.get(field, {}).get(related_id))
+            objects.append(obj)
+
+        update_fields = ['inheritance_depth', 'updated_at', 'search_text', *ValveLineResolved.SCALAR_FIELDS,
+                         *[f"{field}_id" for field in ValveLineResolved.FK_FIELDS],
+                         *[f"{field}_str" for field in ValveLineResolved.FK_FIELDS]]
+        with transaction.atomic():
+            ValveLineResolved.objects.bulk_create(
+                objects, batch_size=500, update_conflicts=True,
+                unique_fields=['valve_line'], update_fields=update_fields)
+        logger.debug("ValveLineResolver: пересчитано серий %d", len(objects))
+        return len(objects)
+
+    @classmethod
+    def refresh_references(cls, related_model, pk) -> int:
+        """Пересчитать серии, эффективное значение которых ссылается на измененный объект"""
+        from django.db.models import Q
+        from valve_data.models.valve_line_resolved import ValveLineResolved
+
+        fields = cls.fields_for_model(related_model)
+        if not fields:
+            return 0
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f"{field}_id": pk})
+        ids = list(ValveLineResolved.objects.filter(condition).values_list('valve_line_id', flat=True))
+        return cls.refresh(ids, cascade=False) if ids else 0
+
+    @staticmethod
+    def search_text(row) -> str:
+        """Текст для поиска: эффективные название, код и описание в нижнем регистре"""
+        return '\n'.join(str(row[field]) for field in ('name', 'code', 'description') if row[field]).lower()
+
+    @staticmethod
+    def fields_for_model(related_model) -> List[str]:
+        """Ссылочные поля ValveLineResolved, указывающие на модель"""
+        from valve_data.models.valve_line_resolved import ValveLineResolved
+        return [field for field in ValveLineResolved.FK_FIELDS
+                if ValveLineResolved._meta.get_field(field).related_model is related_model]
+
+    @staticmethod
+    def descendants(valve_line_ids: Iterable[int], parents: Dict[int, Optional[int]]) -> Set[int]:
+        """Все наследники серий по карте {id: original_valve_line_id}"""
+        children = defaultdict(list)
+        for pk, parent_id in parents.items():
+            if parent_id is not None:
+                children[parent_id].append(pk)
+        result, stack = set(), list(valve_line_ids)
+        while stack:
+            for child in children.get(stack.pop(), ()):
+                if child not in result:
+                    result.add(child)
+                    stack.append(child)
+        return result
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    @staticmethod
+    def _chain(pk, parents, length) -> List[int]:
+        """Серия и ее предки, не более length элементов (повторы при циклах допустимы)"""
+        chain = []
+        current = pk
+        while current is not None and current in parents and len(chain) < length:
+            chain.append(current)
+            current = parents[current]
+        return chain
+
+    @staticmethod
+    def _is_empty(value) -> bool:
+        return value is None or (isinstance(value, str) and value.strip() == '')
+
+    @classmethod
+    def _resolve(cls, pk, parents, values) -> Dict:
+        from valve_data.models.valve_line_resolved import ValveLineResolved
+
+        chain = [values[item] for item in cls._chain(pk, parents, cls.MAX_RECURSION) if item in values]
+        row = {'id': pk, 'inheritance_depth': len(cls._chain(pk, parents, cls.MAX_DEPTH + 1)) - 1}
+        for field in (*ValveLineResolved.SCALAR_FIELDS, *[f"{f}_id" for f in ValveLineResolved.FK_FIELDS]):
+            row[field] = next((item[field] for item in chain if not cls._is_empty(item[field])), None)
+        return row
+
+    @classmethod
+    def _load_strings(cls, resolved_rows) -> Dict[str, Dict[int, str]]:
+        """str() эффективных ссылочных объектов: по одному запросу на модель"""
+        from valve_data.models.valve_line_resolved import ValveLineResolved
+
+        ids_by_model = defaultdict(set)
+        fields_by_model = defaultdict(list)
+        for field in ValveLineResolved.FK_FIELDS:
+            model = ValveLineResolved._meta.get_field(field).related_model
+            fields_by_model[model].append(field)
+            for row in resolved_rows:
+                if row[f"{field}_id"] is not None:
+                    ids_by_model[model].add(row[f"{field}_id"])
+
+        strings = {}
+        for model, ids in ids_by_model.items():
+            names = {}
+            for pk, obj in model.objects.in_bulk(ids).items():
+                try:
+                    names[pk] = str(obj)[:cls.STR_MAX_LENGTH]
+                except Exception as e:
+                    logger.warning("ValveLineResolver: ошибка str() для %s #%s: %s", model.__name__, pk, e)
+            for field in fields_by_model[model]:
+                strings[field] = names
+        return strings
@@ -0,0 +1,315 @@
+# valve_data/services/valve_sizing.py
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .kv_curves import KvCurveCache, KvSizing
+
+logger = logging.getLogger(__name__)
+
+
+class ValveSizingCandidate:
+    """Найденная модель арматуры: серия, DN/PN, Kv при max_angle, угол открытия для требуемого Kv"""
+
+    def __init__(self, valve_line_id, model_id, model_name, dn, pn, kv_capacity, opening_angle,
+                 oversizing, resistance, resistance_unknown, temp_min, temp_max):
+        self.valve_line_id = valve_line_id
+        self.model_id = model_id
+        self.model_name = model_name
+        self.dn = dn
+        self.pn = pn
+        self.kv_capacity = kv_capacity
+        self.opening_angle = opening_angle
+        self.oversizing = oversizing
+        self.resistance = resistance
+        self.resistance_unknown = resistance_unknown
+        self.temp_min = temp_min
+        self.temp_max = temp_max
+
+    def as_dict(self) -> Dict:
+        return {
+            'valve_line_id': self.valve_line_id,
+            'model_id': self.model_id,
+            'model_name': self.model_name,
+            'dn': self.dn.name,
+            'pn': self.pn.name if self.pn else None,
+            'kv_capacity': self.kv_capacity,
+            'opening_angle': self.opening_angle,
+            'oversizing': self.oversizing,
+            'resistance': self.resistance,
+            'resistance_unknown': self.resistance_unknown,
+            'temp_min': self.temp_min,
+            'temp_max': self.temp_max,
+        }
+
+
+class ValveSizingIndex:
+    """
+    Столбцовый индекс каталога для подбора арматуры.
+
+    Одна строка на модель (ValveLineModelData) эффективной таблицы моделей каждой активной серии
+    (ValveLineResolved), с учетом эффективной таблицы допустимых DN; у серии без таблицы моделей -
+    строка на кривую ее таблицы Kv (модели нет, PN может быть не указан):
+        dn_mm / pn_bar - условный диаметр и давление
+        temp_min / temp_max - рабочие температуры серии, при отсутствии - пересечение рабочих
+            температур материалов корпуса, запорного и уплотнительного элементов (NaN - не ограничено)
+        kv_open[строка, KV_ANGLES] - наибольший Kv при открытии не больше угла (KvCurveCache)
+        resistance[строка, среда] - применимость материалов к рабочей среде
+            (MaterialChemicalResistance.ResistanceType): NOT_ALLOWED, если хотя бы один материал
+            серии не применяется, иначе наименьшая из указанных; 0 - ни для одного материала не указано
+        resistance_unknown[строка, среда] - хотя бы для одного материала применимость не указана
+    Поиск - векторные маски по столбцам, без запросов к БД. Индекс сбрасывается сигналами
+    (valve_data/signals.py) и импортом моделей.
+    """
+    KV_ANGLES = (30.0, 45.0, 60.0, 70.0, 90.0)
+    MATERIAL_FIELDS = ('body_material_specified_id', 'shut_element_material_specified_id',
+                       'sealing_element_material_specified_id')
+    CACHE_TTL_SECONDS = 300  # страховка для других процессов, которые не получили сигнал
+    RESISTANCE_NOT_ALLOWED = 1  # MaterialChemicalResistance.ResistanceType.NOT_ALLOWED
+
+    _instance = None
+    _instance_built_at = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self):
+        from materials.models import MaterialChemicalResistance, MaterialSpecified, WorkingMedium
+        from params.models import DnVariety, PnVariety
+        from valve_data.models import AllowedDnTemplate, ValveLine, ValveLineModelData, ValveLineResolved
+        from .valve_line_resolver import ValveLineResolver
+
+        missing = list(ValveLine.objects.filter(resolved__isnull=True).values_list('id', flat=True))
+        if missing:
+            ValveLineResolver.refresh(missing, cascade=False)
+
+        lines = list(ValveLineResolved.objects.filter(valve_line__is_active=True).exclude(
+            valve_model_data_table__isnull=True, valve_model_kv_data_table__isnull=True
+        ).order_by('valve_line_id').values_list(
+            'valve_line_id', 'valve_model_data_table_id', 'valve_model_kv_data_table_id', 'allowed_dn_table_id',
+            'work_temp_min', 'work_temp_max', *self.MATERIAL_FIELDS))
+
+        allowed_dn = defaultdict(set)
+        for template_id, dn_id in AllowedDnTemplate.objects.filter(
+                id__in={line[3] for line in lines if line[3]}, dn__isnull=False).values_list('id', 'dn'):
+            allowed_dn[template_id].add(dn_id)
+
+        models_by_table = defaultdict(list)
+        for row in ValveLineModelData.objects.filter(
+                valve_model_data_table_id__in={line[1] for line in lines if line[1]},
+                valve_model_dn__isnull=False, valve_model_pn__isnull=False,
+        ).order_by('id').values_list('valve_model_data_table_id', 'id', 'name', 'valve_model_dn_id',
+                                     'valve_model_pn_id'):
+            models_by_table[row[0]].append(row[1:])
+
+        # Материалы: рабочие температуры и применимость к средам
+        self.media = list(WorkingMedium.objects.filter(is_active=True).order_by('sorting_order', 'id'))
+        self.media_index = {medium.id: i for i, medium in enumerate(self.media)}
+        material_temps = {material_id: (temp_min, temp_max) for material_id, temp_min, temp_max in
+                          MaterialSpecified.objects.values_list('id', 'work_temp_min', 'work_temp_max')}
+        material_resistance = defaultdict(lambda: np.zeros(len(self.media), dtype=np.int8))
+        for material_id, medium_id, resistance_type in MaterialChemicalResistance.objects.values_list(
+                'material_specified_id', 'working_medium_id', 'resistance_type'):
+            if medium_id in self.media_index:
+                material_resistance[material_id][self.media_index[medium_id]] = int(resistance_type or 0)
+
+        rows = []
+        for valve_line_id, model_table_id, kv_table_id, dn_table_id, work_temp_min, work_temp_max, *materials \
+                in lines:
+            materials = [material_id for material_id in materials if material_id]
+            temp_min, temp_max = self._temperature_limits(work_temp_min, work_temp_max, materials, material_temps)
+            resistance, resistance_unknown = self._resistance(
+                [material_resistance[material_id] for material_id in materials], len(self.media))
+            kv_table = KvCurveCache.get_table(kv_table_id) if kv_table_id else None
+            allowed = allowed_dn[dn_table_id] if dn_table_id else None
+            if model_table_id:
+                combinations = [(model_id, model_name, dn_id, pn_id, kv_table.find_curve(dn_id, pn_id)
+                                 if kv_table else None)
+                                for model_id, model_name, dn_id, pn_id in models_by_table[model_table_id]]
+            else:
+                combinations = [(None, None, curve.dn.id, curve.pn.id if curve.pn else None, curve)
+                                for curve in kv_table.curves]
+            for model_id, model_name, dn_id, pn_id, curve in combinations:
+                if allowed is not None and dn_id not in allowed:
+                    continue
+                rows.append((valve_line_id, model_id, model_name, dn_id, pn_id, temp_min, temp_max, resistance,
+                             resistance_unknown, curve))
+
+        dns = DnVariety.objects.in_bulk({row[3] for row in rows})
+        pns = PnVariety.objects.in_bulk({row[4] for row in rows if row[4] is not None})
+
+        self.valve_line_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.model_ids = np.array([row[1] or 0 for row in rows], dtype=np.int64)  # 0 - без модели
+        self.model_names = [row[2] for row in rows]
+        self.dns = [dns[row[3]] for row in rows]
+        self.pns = [pns.get(row[4]) for row in rows]
+        self.curves = [row[9] for row in rows]
+        self.dn_mm = np.array([self._number(dn.diameter_metric) for dn in self.dns], dtype=float)
+        self.pn_bar = np.array([self._number(pn.pressure_bar) if pn else np.nan for pn in self.pns], dtype=float)
+        self.temp_min = np.array([row[5] for row in rows], dtype=float)
+        self.temp_max = np.array([row[6] for row in rows], dtype=float)
+        self.resistance = np.array([row[7] for row in rows], dtype=np.int8).reshape(len(rows), len(self.media))
+        self.resistance_unknown = np.array([row[8] for row in rows], dtype=bool).reshape(len(rows), len(self.media))
+        self.kv_open = np.array([
+            [self._number(curve.capacity(angle)) if curve else np.nan for angle in self.KV_ANGLES]
+            for curve in self.curves
+        ], dtype=float).reshape(len(rows), len(self.KV_ANGLES))
+
+        logger.debug("ValveSizingIndex: %d строк, %d серий", len(rows), len(lines))
+
+    @classmethod
+    def get_instance(cls) -> 'ValveSizingIndex':
+        """Индекс для текущего процесса (строится при первом обращении)"""
+        instance = cls._instance
+        if instance is not None and time.monotonic() - cls._instance_built_at < cls.CACHE_TTL_SECONDS:
+            return instance
+        with cls._lock:
+            if cls._instance is None or time.monotonic() - cls._instance_built_at >= cls.CACHE_TTL_SECONDS:
+                if cls._instance is not None:
+                    # Истек срок - сигналы могли не дойти и до кеша кривых Kv этого процесса
+                    KvCurveCache.invalidate()
+                cls._instance = cls()
+                cls._instance_built_at = time.monotonic()
+            return cls._instance
+
+    @classmethod
+    def invalidate(cls):
+        """Сбросить индекс - следующий get_instance построит его заново"""
+        cls._instance = None
+
+    # ==================== ПОИСК ====================
+
+    def search(self, required_kv=None, flow_m3h=None, pressure_drop_bar=None, density_kg_m3=1000.0,
+               dn_min=None, dn_max=None, pn=None, temperature=None, working_medium=None,
+               min_resistance=2, allow_unknown_resistance=True, max_angle=KvSizing.DEFAULT_MAX_ANGLE,
+               valve_line_ids: Optional[Iterable[int]] = None, best_per_line=True,
+               limit=50) -> List[ValveSizingCandidate]:
+        """
+        Подбор моделей арматуры.
+
+        Args:
+            required_kv: требуемый Kv, м3/ч (или flow_m3h + pressure_drop_bar [+ density_kg_m3])
+            dn_min, dn_max: диапазон DN, мм
+            pn: требуемое давление, бар - PN модели не меньше (строки без PN не подходят)
+            temperature: рабочая температура, °С - в пределах температур серии (не заданы - подходит)
+            working_medium: WorkingMedium или id - применимость всех материалов не ниже min_resistance;
+                allow_unknown_resistance - допускать материалы с неуказанной применимостью
+                (неприменимый материал исключает серию в любом случае)
+            max_angle: наибольший допустимый угол открытия при требуемом Kv
+            best_per_line: одна модель на серию - наименьшие DN/PN с наименьшим запасом по Kv
+            limit: наибольшее число результатов
+
+        Returns:
+            list: ValveSizingCandidate по соответствию - наименьший запас по Kv, лучшая
+                применимость материалов, наименьший DN
+        """
+        if required_kv is None and flow_m3h is not None:
+            required_kv = KvSizing.required_kv(flow_m3h, pressure_drop_bar, density_kg_m3)
+
+        mask = np.ones(len(self.model_ids), dtype=bool)
+        if valve_line_ids is not None:
+            mask &= np.isin(self.valve_line_ids, np.fromiter(valve_line_ids, dtype=np.int64))
+        if dn_min is not None:
+            mask &= self.dn_mm >= float(dn_min)
+        if dn_max is not None:
+            mask &= self.dn_mm <= float(dn_max)
+        if pn is not None:
+            mask &= self.pn_bar >= float(pn)
+        if temperature is not None:
+            temperature = float(temperature)
+            mask &= np.isnan(self.temp_min) | (self.temp_min <= temperature)
+            mask &= np.isnan(self.temp_max) | (self.temp_max >= temperature)
+
+        resistance = np.zeros(len(self.model_ids), dtype=np.int8)
+        resistance_unknown = np.ones(len(self.model_ids), dtype=bool)
+        if working_medium is not None:
+            medium_id = getattr(working_medium, 'pk', working_medium)
+            column = self.media_index.get(int(medium_id))
+            if column is None:
+                raise ValueError(f"Рабочая среда {medium_id} не найдена")
+            resistance = self.resistance[:, column]
+            resistance_unknown = self.resistance_unknown[:, column]
+            if allow_unknown_resistance:
+                # Ни для одного материала не указано - подходит; иначе указанные не ниже min_resistance
+                mask &= (resistance == 0) | (resistance >= int(min_resistance))
+            else:
+                mask &= ~resistance_unknown & (resistance >= int(min_resistance))
+
+        capacity = self._capacities(max_angle)
+        oversizing = np.zeros(len(self.model_ids))
+        if required_kv is not None:
+            required_kv = float(required_kv)
+            mask &= ~np.isnan(capacity) & (capacity >= required_kv)
+            oversizing = capacity / required_kv if required_kv > 0 else capacity
+
+        rows = np.flatnonzero(mask)
+        if best_per_line and len(rows):
+            # В серии: наименьший DN, затем PN, затем наименьший запас
+            rows = rows[np.lexsort((oversizing[rows], self.pn_bar[rows], self.dn_mm[rows], self.valve_line_ids[rows]))]
+            _, first = np.unique(self.valve_line_ids[rows], return_index=True)
+            rows = rows[first]
+        rows = rows[np.lexsort((self.pn_bar[rows], self.dn_mm[rows], -resistance[rows].astype(int),
+                                oversizing[rows]))]
+        if limit is not None:
+            rows = rows[:limit]
+
+        return [
+            ValveSizingCandidate(
+                valve_line_id=int(self.valve_line_ids[i]),
+                model_id=int(self.model_ids[i]) or None,
+                model_name=self.model_names[i],
+                dn=self.dns[i],
+                pn=self.pns[i],
+                kv_capacity=None if np.isnan(capacity[i]) else float(capacity[i]),
+                opening_angle=self.curves[i].angle_for_kv(required_kv)
+                if required_kv is not None and self.curves[i] else None,
+                oversizing=float(oversizing[i]) if required_kv is not None else None,
+                resistance=int(resistance[i]),
+                resistance_unknown=bool(resistance_unknown[i]),
+                temp_min=None if np.isnan(self.temp_min[i]) else float(self.temp_min[i]),
+                temp_max=None if np.isnan(self.temp_max[i]) else float(self.temp_max[i]),
+            )
+            for i in rows
+        ]
+
+    # ==================== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ====================
+
+    @classmethod
+    def _resistance(cls, materials: List[np.ndarray], media_count: int):
+        """
+        Применимость набора материалов к средам: NOT_ALLOWED, если не применяется хотя бы
+        один материал, иначе наименьшая из указанных (0 - не указана ни для одного);
+        второй массив - признак материалов с неуказанной применимостью
+        """
+        if not materials:
+            return np.zeros(media_count, dtype=np.int8), np.ones(media_count, dtype=bool)
+        values = np.array(materials, dtype=np.int8)
+        unspecified = np.iinfo(np.int8).max
+        resistance = np.where(values > 0, values, unspecified).min(axis=0)
+        resistance[resistance == unspecified] = 0
+        resistance[(values == cls.RESISTANCE_NOT_ALLOWED).any(axis=0)] = cls.RESISTANCE_NOT_ALLOWED
+        return resistance.astype(np.int8), (values == 0).any(axis=0)
+
+    def _capacities(self, max_angle) -> np.ndarray:
+        """Наибольший Kv каждой строки при открытии не больше max_angle"""
+        max_angle = float(max_angle)
+        if max_angle in self.KV_ANGLES:
+            return self.kv_open[:, self.KV_ANGLES.index(max_angle)]
+        return np.array([self._number(curve.capacity(max_angle)) if curve else np.nan for curve in self.curves],
+                        dtype=float)
+
+    @staticmethod
+    def _temperature_limits(work_temp_min, work_temp_max, materials, material_temps):
+        material_limits = [material_temps[material_id] for material_id in materials if material_id in material_temps]
+        if work_temp_min is None and material_limits:
+            work_temp_min = max(temp_min for temp_min, _ in material_limits)
+        if work_temp_max is None and material_limits:
+            work_temp_max = min(temp_max for _, temp_max in material_limits)
+        return (np.nan if work_temp_min is None else work_temp_min,
+                np.nan if work_temp_max is None else work_temp_max)
+
+    @staticmethod
+    def _number(value):
+        return np.nan if value is None else float(value)
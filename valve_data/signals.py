@@ -1,8 +1,222 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
 
+from materials.models import MaterialChemicalResistance, MaterialSpecified, WorkingMedium
+from media_library.models import MediaLibraryItem
+from electric_actuators.models import ModelBody
+from params.models import DnVariety, PnVariety, MountingPlateTypes, StemSize
+from pneumatic_actuators.models import PneumaticActuatorBody
+from .models import (
+    ValveLine, ValveLineResolved, ValveDimensionData, DimensionTableParameter, DimensionTableDrawingItem,
+    WeightDimensionParameterVariety, ValveLineModelKvData, ValveModelKvDataTable, ValveLineModelData,
+    AllowedDnTemplate
+)
+
 @receiver(post_migrate)
 def create_predefined_parameters(sender, **kwargs):
     if sender.name == 'your_app_name':
         from .models import WeightDimensionParameterVariety
-        WeightDimensionParameterVariety.get_or_create_predefined()
\ No newline at end of file
+        WeightDimensionParameterVariety.get_or_create_predefined()
+
+
+@receiver(post_save, sender=ValveLine)
+def refresh_valve_line_resolved(sender, instance, raw=False, **kwargs):
+    """Пересчет эффективных значений серии и всех ее наследников"""
+    if raw:
+        return
+    from .services import ValveLineResolver
+    ValveLineResolver.refresh([instance.pk])
+
+
+@receiver(pre_delete, sender=ValveLine)
+def remember_valve_line_descendants(sender, instance, **kwargs):
+    """Наследники удаляемой серии теряют original_valve_line (SET_NULL) без сигналов save"""
+    from .services import ValveLineResolver
+    parents = dict(ValveLine.objects.values_list('id', 'original_valve_line_id'))
+    instance._resolved_descendants = ValveLineResolver.descendants([instance.pk], parents)
+
+
+@receiver(post_delete, sender=ValveLine)
+def refresh_valve_line_descendants(sender, instance, **kwargs):
+    descendants = getattr(instance, '_resolved_descendants', None)
+    if descendants:
+        from .services import ValveLineResolver
+        ValveLineResolver.refresh(descendants)
+
+
+def refresh_valve_line_references(sender, instance, raw=False, **kwargs):
+    """
+    Изменился или удален справочный объект - пересчитываем серии, которые на него ссылаются.
+    При удалении ссылки в ValveLine уже обнулены (SET_NULL), а в ValveLineResolved
+    ссылки без ограничения БД (DO_NOTHING) - без пересчета в них остался бы удаленный id.
+    """
+    if raw:
+        return
+    from .services import ValveLineResolver
+    ValveLineResolver.refresh_references(sender, instance.pk)
+
+
+for _related_model in {ValveLineResolved._meta.get_field(_field).related_model
+                       for _field in ValveLineResolved.FK_FIELDS}:
+    post_save.connect(refresh_valve_line_references, sender=_related_model,
+                      dispatch_uid=f'valve_line_resolved_{_related_model._meta.label_lower}')
+    post_delete.connect(refresh_valve_line_references, sender=_related_model,
+                        dispatch_uid=f'valve_line_resolved_delete_{_related_model._meta.label_lower}')
+
+
+@receiver(post_save, sender=ValveDimensionData)
+@receiver(post_delete, sender=ValveDimensionData)
+def invalidate_dimension_matrix_data(sender, instance, **kwargs):
+    """Сбрасывает скомпилированную таблицу ВГХ строки данных"""
+    from .services import DimensionMatrixCache
+    DimensionMatrixCache.invalidate_parameter(instance.parameter_id)
+
+
+@receiver(post_save, sender=DimensionTableDrawingItem)
+@receiver(post_delete, sender=DimensionTableDrawingItem)
+def invalidate_dimension_matrix_drawing(sender, instance, **kwargs):
+    """Сбрасывает скомпилированную таблицу ВГХ чертежа"""
+    from .services import DimensionMatrixCache
+    DimensionMatrixCache.invalidate(instance.dimension_table_id)
+
+
+@receiver(m2m_changed, sender=DimensionTableDrawingItem.allowed_dn.through)
+def invalidate_dimension_matrix_drawing_dn(sender, instance, reverse, **kwargs):
+    """Изменились допустимые DN чертежа (со стороны DnVariety - неизвестно, каких таблиц)"""
+    from .services import DimensionMatrixCache
+    DimensionMatrixCache.invalidate(None if reverse else instance.dimension_table_id)
+
+
+@receiver(post_save, sender=DimensionTableParameter)
+@receiver(post_delete, sender=DimensionTableParameter)
+@receiver(post_save, sender=WeightDimensionParameterVariety)
+@receiver(post_delete, sender=WeightDimensionParameterVariety)
+@receiver(post_save, sender=DnVariety)
+@receiver(post_delete, sender=DnVariety)
+@receiver(post_save, sender=PnVariety)
+@receiver(post_delete, sender=PnVariety)
+@receiver(post_save, sender=MediaLibraryItem)
+@receiver(post_delete, sender=MediaLibraryItem)
+def invalidate_dimension_matrix_all(sender, **kwargs):
+    """Параметры (могут перейти в другую таблицу), DN/PN и чертежи входят в таблицы ВГХ"""
+    from .services import DimensionMatrixCache
+    DimensionMatrixCache.invalidate()
+
+
+@receiver(post_save, sender=ValveLineModelKvData)
+@receiver(post_delete, sender=ValveLineModelKvData)
+def invalidate_kv_curve_table(sender, instance, **kwargs):
+    """Сбрасывает скомпилированную таблицу Kv строки данных"""
+    from .services import KvCurveCache
+    KvCurveCache.invalidate(instance.valve_model_kv_data_table_id)
+
+
+@receiver(post_delete, sender=ValveModelKvDataTable)
+def invalidate_kv_curve_table_deleted(sender, instance, **kwargs):
+    from .services import KvCurveCache
+    KvCurveCache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=DnVariety)
+@receiver(post_delete, sender=DnVariety)
+@receiver(post_save, sender=PnVariety)
+@receiver(post_delete, sender=PnVariety)
+def invalidate_kv_curve_all(sender, **kwargs):
+    """Названия и порядок DN/PN входят в кривые Kv"""
+    from .services import KvCurveCache
+    KvCurveCache.invalidate()
+
+
+@receiver(post_save, sender=ValveLine)
+@receiver(post_delete, sender=ValveLine)
+@receiver(post_save, sender=ValveLineModelData)
+@receiver(post_delete, sender=ValveLineModelData)
+@receiver(post_save, sender=ValveLineModelKvData)
+@receiver(post_delete, sender=ValveLineModelKvData)
+@receiver(post_save, sender=AllowedDnTemplate)
+@receiver(post_delete, sender=AllowedDnTemplate)
+@receiver(m2m_changed, sender=AllowedDnTemplate.dn.through)
+@receiver(post_save, sender=MaterialSpecified)
+@receiver(post_delete, sender=MaterialSpecified)
+@receiver(post_save, sender=MaterialChemicalResistance)
+@receiver(post_delete, sender=MaterialChemicalResistance)
+@receiver(post_save, sender=WorkingMedium)
+@receiver(post_delete, sender=WorkingMedium)
+@receiver(post_save, sender=DnVariety)
+@receiver(post_delete, sender=DnVariety)
+@receiver(post_save, sender=PnVariety)
+@receiver(post_delete, sender=PnVariety)
+def invalidate_valve_sizing_index(sender, **kwargs):
+    """Серии, модели, Kv, допустимые DN, материалы и справочники DN/PN входят в индекс подбора"""
+    from .services import ValveSizingIndex
+    ValveSizingIndex.invalidate()
+
+
+def _m2m_object_ids(instance, reverse, pk_set, action):
+    """id объектов со стороны модели по сигналу m2m_changed (None - неизвестно, какие)"""
+    if not reverse:
+        return [instance.pk]
+    return None if action == 'post_clear' else list(pk_set or ())
+
+
+@receiver(post_save, sender=ValveLineModelData)
+@receiver(post_delete, sender=ValveLineModelData)
+def update_mounting_compatibility_valve(sender, instance, raw=False, **kwargs):
+    """Пересчитывает строку модели арматуры в индексе совместимости с приводами"""
+    if raw:
+        return
+    from .services import MountingCompatibilityIndex
+    MountingCompatibilityIndex.update_valve_models([instance.pk])
+
+
+@receiver(m2m_changed, sender=ValveLineModelData.valve_model_mounting_plate.through)
+def update_mounting_compatibility_valve_plates(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    from .services import MountingCompatibilityIndex
+    model_ids = _m2m_object_ids(instance, reverse, pk_set, action)
+    if model_ids is None:
+        MountingCompatibilityIndex.invalidate()
+    else:
+        MountingCompatibilityIndex.update_valve_models(model_ids)
+
+
+def update_mounting_compatibility_body(sender, instance, raw=False, **kwargs):
+    """Пересчитывает столбец корпуса привода в индексе совместимости"""
+    if raw:
+        return
+    from .services import MountingCompatibilityIndex
+    MountingCompatibilityIndex.update_bodies(_ACTUATOR_BODY_KINDS[sender], [instance.pk])
+
+
+def update_mounting_compatibility_body_plates(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    from .services import MountingCompatibilityIndex
+    body_model = instance.__class__ if not reverse else next(
+        model for model in _ACTUATOR_BODY_KINDS if model.mounting_plate.through is sender)
+    body_ids = _m2m_object_ids(instance, reverse, pk_set, action)
+    if body_ids is None:
+        MountingCompatibilityIndex.invalidate()
+    else:
+        MountingCompatibilityIndex.update_bodies(_ACTUATOR_BODY_KINDS[body_model], body_ids)
+
+
+_ACTUATOR_BODY_KINDS = {PneumaticActuatorBody: 'pneumatic', ModelBody: 'electric'}
+for _body_model, _kind in _ACTUATOR_BODY_KINDS.items():
+    post_save.connect(update_mounting_compatibility_body, sender=_body_model,
+                      dispatch_uid=f'mounting_compatibility_{_kind}')
+    post_delete.connect(update_mounting_compatibility_body, sender=_body_model,
+                        dispatch_uid=f'mounting_compatibility_{_kind}_delete')
+    m2m_changed.connect(update_mounting_compatibility_body_plates, sender=_body_model.mounting_plate.through,
+                        dispatch_uid=f'mounting_compatibility_{_kind}_plates')
+
+
+@receiver(post_save, sender=StemSize)
+@receiver(post_delete, sender=StemSize)
+@receiver(post_save, sender=MountingPlateTypes)
+@receiver(post_delete, sender=MountingPlateTypes)
+def invalidate_mounting_compatibility(sender, **kwargs):
+    """Размеры штоков и список монтажных площадок входят в признаки всех моделей и корпусов"""
+    from .services import MountingCompatibilityIndex
+    MountingCompatibilityIndex.invalidate()
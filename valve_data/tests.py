@@ -1,3 +1,142 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from params.models import DnVariety, PnVariety
+from producers.models import Brands, Producer
+from valve_data.models import (
+    DimensionTableParameter, ValveDimensionData, ValveDimensionTable, ValveLine, ValveLineResolved, ValveVariety,
+)
+from valve_data.services import DimensionMatrixCache, ValveLineResolver
+
+
+class ValveLineResolverTests(TestCase):
+    """Материализованные значения совпадают с get_field_value_with_fallback по всей цепочке наследования"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.variety = ValveVariety.objects.create(symbolic_code='ЗД', actuator_gearbox_combinations='Q',
+                                                  text_description='Затвор дисковый')
+        cls.brand = Brands.objects.create(name='Бренд T', code='T')
+        cls.producer = Producer.objects.create(name='Производитель T', code='T')
+        cls.base = ValveLine.objects.create(name='Серия T', code='T', description='Базовая серия',
+                                            features_text='', application_text='', valve_variety=cls.variety,
+                                            valve_brand=cls.brand, valve_producer=cls.producer,
+                                            work_temp_min=-20, work_temp_max=120)
+        cls.child = ValveLine.objects.create(name='Серия T.1', code='T.1', description='  ', features_text='',
+                                             application_text='', original_valve_line=cls.base,
+                                             work_temp_max=100)
+        cls.grandchild = ValveLine.objects.create(name='Серия T.1.1', code='T.1.1', description='',
+                                                  features_text='', application_text='',
+                                                  original_valve_line=cls.child)
+
+    def assertResolved(self, valve_line):
+        valve_line = ValveLine.objects.get(pk=valve_line.pk)
+        resolved = ValveLineResolved.objects.get(valve_line=valve_line)
+        for field in ValveLineResolved.SCALAR_FIELDS:
+            with self.subTest(valve_line=valve_line.code, field=field):
+                self.assertEqual(getattr(resolved, field), valve_line.get_field_value_with_fallback(field))
+        for field in ValveLineResolved.FK_FIELDS:
+            with self.subTest(valve_line=valve_line.code, field=field):
+                expected = valve_line.get_field_value_with_fallback(field)
+                self.assertEqual(getattr(resolved, f"{field}_id"), expected.pk if expected else None)
+
+    def test_matches_fallback(self):
+        for valve_line in (self.base, self.child, self.grandchild):
+            self.assertResolved(valve_line)
+        resolved = ValveLineResolved.objects.get(valve_line=self.grandchild)
+        self.assertEqual(resolved.inheritance_depth, 2)
+        self.assertEqual(resolved.description, 'Базовая серия')
+        self.assertEqual(resolved.work_temp_max, 100)
+        self.assertEqual(resolved.valve_variety_id, self.variety.id)
+        self.assertEqual(resolved.valve_variety_str, str(self.variety))
+
+    def test_parent_change_cascades(self):
+        self.base.work_temp_min = -40
+        self.base.description = 'Новое описание'
+        self.base.save()
+        resolved = ValveLineResolved.objects.get(valve_line=self.grandchild)
+        self.assertEqual(resolved.work_temp_min, -40)
+        self.assertIn('новое описание', resolved.search_text)
+        for valve_line in (self.child, self.grandchild):
+            self.assertResolved(valve_line)
+
+    def test_refresh(self):
+        ValveLineResolved.objects.all().delete()
+        self.assertEqual(ValveLineResolver.refresh([self.base.pk], cascade=False), 1)
+        self.assertEqual(ValveLineResolver.refresh([self.base.pk]), 3)
+        self.assertEqual(ValveLineResolver.refresh([-1]), 0)
+        self.assertEqual(ValveLineResolver.descendants([self.child.pk], {
+            self.base.pk: None, self.child.pk: self.base.pk, self.grandchild.pk: self.child.pk,
+        }), {self.grandchild.pk})
+
+
+class DimensionMatrixCacheTests(TestCase):
+    """Таблица ВГХ: значения, повторное использование и сброс при изменении данных"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dns = DnVariety.objects.bulk_create([
+            DnVariety(name=f'DN{dn}', code=str(dn), diameter_metric=dn, diameter_inches='', sorting_order=dn)
+            for dn in (50, 80)
+        ])
+        cls.pns = PnVariety.objects.bulk_create([
+            PnVariety(name=f'PN{pn}', code=f'bar-{pn:03d}', pressure_bar=pn, sorting_order=pn) for pn in (10, 16)
+        ])
+        cls.table = ValveDimensionTable.objects.create(name='ВГХ T', code='T', description='')
+        cls.length, cls.height = DimensionTableParameter.objects.bulk_create([
+            DimensionTableParameter(dimension_table=cls.table, name='Строительная длина', legend='L',
+                                    sorting_order=1),
+            DimensionTableParameter(dimension_table=cls.table, name='Высота', legend='H', sorting_order=2),
+        ])
+        dn50, dn80 = cls.dns
+        pn10, pn16 = cls.pns
+        ValveDimensionData.objects.bulk_create([
+            ValveDimensionData(dn=dn50, pn=pn10, parameter=cls.length, value=Decimal('100'), text_value=''),
+            ValveDimensionData(dn=dn80, pn=pn10, parameter=cls.length, value=Decimal('120'), text_value=''),
+            ValveDimensionData(dn=dn50, pn=pn10, parameter=cls.height, value=None, text_value='по запросу'),
+            ValveDimensionData(dn=dn80, pn=pn16, parameter=cls.height, value=Decimal('300'), text_value=''),
+        ])
+
+    def setUp(self):
+        DimensionMatrixCache.invalidate()
+
+    def test_render(self):
+        data = DimensionMatrixCache.get_matrix(self.table.id).render()
+        self.assertEqual(data['images'], [])
+        self.assertEqual(data['matrices'], [
+            {'pn': 'PN10', 'matrix': [
+                ['legend', 'parameter_variety_name', 'DN50', 'DN80'],
+                ['L', 'Строительная длина', Decimal('100'), Decimal('120')],
+                ['H', 'Высота', 'по запросу', None],
+            ]},
+            {'pn': 'PN16', 'matrix': [
+                ['legend', 'parameter_variety_name', 'DN80'],
+                ['H', 'Высота', Decimal('300')],
+            ]},
+        ])
+
+    def test_render_filtered_export(self):
+        matrix = DimensionMatrixCache.get_matrix(self.table.id)
+        data = matrix.render(dn_objects=[self.dns[0]], pn_objects=[self.pns[0]], export=True)
+        self.assertEqual(data['matrices'], [
+            {'pn': 'bar-010', 'matrix': [
+                ['legend', 'parame_name', 'parameter_variety_code', 'bar-010', '50'],
+                ['L', 'Строительная длина', '', 'bar-010', Decimal('100')],
+                ['H', 'Высота', '', 'bar-010', 'по запросу'],
+            ]},
+        ])
+        self.assertEqual(matrix.render(dn_objects=[self.dns[0]], pn_objects=[self.pns[1]]),
+                         {'images': [], 'matrices': []})
+
+    def test_cached_until_data_change(self):
+        matrix = DimensionMatrixCache.get_matrix(self.table.id)
+        with self.assertNumQueries(0):
+            self.assertIs(DimensionMatrixCache.get_matrix(self.table.id), matrix)
+
+        item = ValveDimensionData.objects.get(parameter=self.length, dn=self.dns[0])
+        item.value = Decimal('110')
+        item.save()
+        rebuilt = DimensionMatrixCache.get_matrix(self.table.id)
+        self.assertIsNot(rebuilt, matrix)
+        self.assertEqual(rebuilt.render()['matrices'][0]['matrix'][1][2], Decimal('110'))